@@ -157,7 +157,7 @@ def get_stock_history(
         )
     
     except ValueError as e:
-        # period 参数不支持的错误（如 weekly/monthly）
+        # period 参数不支持的错误
         raise HTTPException(
             status_code=422,
             detail={
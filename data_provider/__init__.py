@@ -29,7 +29,7 @@
 提示：优先级数字越小越优先，同优先级按初始化顺序排列
 """
 
-from .base import BaseFetcher, DataFetcherManager
+from .base import BaseFetcher, DataFetcherManager, get_fetcher_manager
 from .efinance_fetcher import EfinanceFetcher
 from .akshare_fetcher import AkshareFetcher
 from .tushare_fetcher import TushareFetcher
@@ -40,6 +40,7 @@ from .yfinance_fetcher import YfinanceFetcher
 __all__ = [
     'BaseFetcher',
     'DataFetcherManager',
+    'get_fetcher_manager',
     'EfinanceFetcher',
     'AkshareFetcher',
     'TushareFetcher',
@@ -26,9 +26,11 @@ AkshareFetcher - 主数据源 (Priority 1)
 import logging
 import os
 import random
+import re
+import threading
 import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Dict, Any, List, Tuple
 
 import pandas as pd
@@ -41,9 +43,13 @@ from tenacity import (
 )
 
 from patch.eastmoney_patch import eastmoney_patch
+from src.snapshot_archive import archive_realtime_snapshot
 from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
+from .shared_cache import get_shared_cache, refresh_through_shared_cache
+from .single_flight import SingleFlight
 from .realtime_types import (
-    UnifiedRealtimeQuote, ChipDistribution, RealtimeSource,
+    UnifiedRealtimeQuote, ChipDistribution, RealtimeSource, RealtimeSnapshot,
     get_realtime_circuit_breaker, get_chip_circuit_breaker,
     safe_float, safe_int  # 使用统一的类型转换函数
 )
@@ -71,8 +77,10 @@ USER_AGENTS = [
 # - 批量分析场景：通常 30 只股票在 5 分钟内分析完，20 分钟足够覆盖
 # - 实时性要求：股票分析不需要秒级实时数据，20 分钟延迟可接受
 # - 防封禁：减少 API 调用频率
+# - snapshot: 刷新时构建的代码索引快照（RealtimeSnapshot），查询 O(1)
 _realtime_cache: Dict[str, Any] = {
     'data': None,
+    'snapshot': None,
     'timestamp': 0,
     'ttl': 1200  # 20分钟缓存有效期
 }
@@ -80,10 +88,242 @@ _realtime_cache: Dict[str, Any] = {
 # ETF 实时行情缓存
 _etf_realtime_cache: Dict[str, Any] = {
     'data': None,
+    'snapshot': None,
     'timestamp': 0,
     'ttl': 1200  # 20分钟缓存有效期
 }
 
+# 新浪/腾讯逐股行情缓存 {(来源, 代码): (写入时间, UnifiedRealtimeQuote)}
+# 由批量接口一次填充整个自选股列表，单股查询先查此缓存；有效期取 REALTIME_CACHE_TTL（见 _light_quote_ttl）
+_light_quote_cache: Dict[str, Any] = {
+    'quotes': {},
+}
+
+# 批量行情请求的 URL 最大长度（新浪/腾讯接口对过长的 list 参数会截断或拒绝）
+_QUOTE_BATCH_MAX_URL_LEN = 1000
+
+_LIGHT_QUOTE_URLS = {
+    'sina': 'http://hq.sinajs.cn/list=',
+    'tencent': 'http://qt.gtimg.cn/q=',
+}
+
+_LIGHT_QUOTE_REFERERS = {
+    'sina': 'http://finance.sina.com.cn',
+    'tencent': 'http://finance.qq.com',
+}
+
+# 响应中每只股票一行：var hq_str_sh600519="...";（新浪）/ v_sh600519="...";（腾讯）
+_LIGHT_QUOTE_LINE = re.compile(r'(?:hq_str_|v_)([a-z]{2}\d{6})="([^"]*)"')
+
+# 东财全量行情列名映射 {UnifiedRealtimeQuote 字段: (列名,)}，股票与 ETF 共用，缺失列自动跳过
+_EM_QUOTE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'price': ('最新价',),
+    'change_pct': ('涨跌幅',),
+    'change_amount': ('涨跌额',),
+    'volume': ('成交量',),
+    'amount': ('成交额',),
+    'volume_ratio': ('量比',),
+    'turnover_rate': ('换手率',),
+    'amplitude': ('振幅',),
+    'open_price': ('今开',),
+    'high': ('最高',),
+    'low': ('最低',),
+    'pe_ratio': ('市盈率-动态',),
+    'pb_ratio': ('市净率',),
+    'total_mv': ('总市值',),
+    'circ_mv': ('流通市值',),
+    'change_60d': ('60日涨跌幅',),
+    'high_52w': ('52周最高',),
+    'low_52w': ('52周最低',),
+}
+
+
+# 全量行情刷新合并：缓存过期瞬间多个线程同时未命中时，只有一个线程真正请求
+_refresh_flight = SingleFlight()
+
+
+def _is_cache_fresh(cache: Dict[str, Any]) -> bool:
+    """缓存是否在有效期内"""
+    return cache['data'] is not None and time.time() - cache['timestamp'] < cache['ttl']
+
+
+def _market_symbol(stock_code: str) -> str:
+    """A 股代码加交易所前缀（新浪/腾讯接口格式），如 600519 -> sh600519"""
+    if stock_code.startswith(('6', '5', '9')):
+        return f"sh{stock_code}"
+    return f"sz{stock_code}"
+
+
+def _chunk_symbols(symbols: List[str], base_url: str, max_len: int = _QUOTE_BATCH_MAX_URL_LEN) -> List[List[str]]:
+    """按 URL 长度将代码列表切分为多个批次（每批拼成 base_url + 逗号分隔代码）"""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = len(base_url)
+    for symbol in symbols:
+        extra = len(symbol) + (1 if current else 0)
+        if current and length + extra > max_len:
+            chunks.append(current)
+            current, length, extra = [], len(base_url), len(symbol)
+        current.append(symbol)
+        length += extra
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _parse_light_quote_text(text: str) -> Dict[str, str]:
+    """解析新浪/腾讯行情响应，返回 {带前缀代码: 引号内数据}，无数据的代码不返回"""
+    return {symbol: data for symbol, data in _LIGHT_QUOTE_LINE.findall(text) if data}
+
+
+def _parse_sina_quote(stock_code: str, data_str: str) -> Optional[UnifiedRealtimeQuote]:
+    """
+    解析新浪行情数据（引号内部分），字段不足时返回 None
+
+    新浪数据字段顺序：
+    0:名称 1:今开 2:昨收 3:最新价 4:最高 5:最低 6:买一价 7:卖一价
+    8:成交量(股) 9:成交额(元) ... 30:日期 31:时间
+    """
+    fields = data_str.split(',')
+    if len(fields) < 32:
+        logger.warning(f"[API返回] 新浪接口 {stock_code} 数据字段不足: {len(fields)}")
+        return None
+
+    # 使用 realtime_types.py 中的统一转换函数
+    price = safe_float(fields[3])
+    pre_close = safe_float(fields[2])
+    change_pct = None
+    change_amount = None
+    if price and pre_close and pre_close > 0:
+        change_amount = price - pre_close
+        change_pct = (change_amount / pre_close) * 100
+
+    return UnifiedRealtimeQuote(
+        code=stock_code,
+        name=fields[0],
+        source=RealtimeSource.AKSHARE_SINA,
+        price=price,
+        change_pct=change_pct,
+        change_amount=change_amount,
+        volume=safe_int(fields[8]),  # 成交量（股）
+        amount=safe_float(fields[9]),  # 成交额（元）
+        open_price=safe_float(fields[1]),
+        high=safe_float(fields[4]),
+        low=safe_float(fields[5]),
+        pre_close=pre_close,
+    )
+
+
+def _parse_tencent_quote(stock_code: str, data_str: str) -> Optional[UnifiedRealtimeQuote]:
+    """
+    解析腾讯行情数据（引号内部分），字段不足时返回 None
+
+    腾讯数据字段顺序（完整）：
+    1:名称 2:代码 3:最新价 4:昨收 5:今开 6:成交量(手) 7:外盘 8:内盘
+    9-28:买卖五档 30:时间戳 31:涨跌额 32:涨跌幅(%) 33:今开 34:最高 35:最低/成交量/成交额
+    36:成交量(手) 37:成交额(万) 38:换手率(%) 39:市盈率 43:振幅(%)
+    44:流通市值(亿) 45:总市值(亿) 46:市净率 47:涨停价 48:跌停价 49:量比
+    """
+    fields = data_str.split('~')
+    if len(fields) < 45:
+        logger.warning(f"[API返回] 腾讯接口 {stock_code} 数据字段不足: {len(fields)}")
+        return None
+
+    # 使用 realtime_types.py 中的统一转换函数
+    return UnifiedRealtimeQuote(
+        code=stock_code,
+        name=fields[1] if len(fields) > 1 else "",
+        source=RealtimeSource.TENCENT,
+        price=safe_float(fields[3]),
+        change_pct=safe_float(fields[32]),
+        change_amount=safe_float(fields[31]) if len(fields) > 31 else None,
+        volume=safe_int(fields[6]) * 100 if fields[6] else None,  # 腾讯返回的是手，转为股
+        open_price=safe_float(fields[5]),
+        high=safe_float(fields[34]) if len(fields) > 34 else None,
+        low=safe_float(fields[35].split('/')[0]) if len(fields) > 35 and '/' in str(fields[35]) else safe_float(fields[35]) if len(fields) > 35 else None,
+        pre_close=safe_float(fields[4]),
+        turnover_rate=safe_float(fields[38]) if len(fields) > 38 else None,
+        amplitude=safe_float(fields[43]) if len(fields) > 43 else None,
+        volume_ratio=safe_float(fields[49]) if len(fields) > 49 else None,  # 量比
+        pe_ratio=safe_float(fields[39]) if len(fields) > 39 else None,  # 市盈率
+        pb_ratio=safe_float(fields[46]) if len(fields) > 46 else None,  # 市净率
+        circ_mv=safe_float(fields[44]) * 100000000 if len(fields) > 44 and fields[44] else None,  # 流通市值(亿->元)
+        total_mv=safe_float(fields[45]) * 100000000 if len(fields) > 45 and fields[45] else None,  # 总市值(亿->元)
+    )
+
+
+_LIGHT_QUOTE_PARSERS = {
+    'sina': _parse_sina_quote,
+    'tencent': _parse_tencent_quote,
+}
+
+_light_quote_lock = threading.Lock()
+_quote_session = None
+
+
+def _light_quote_ttl() -> int:
+    """新浪/腾讯逐股行情缓存有效期（秒），与实时行情缓存配置 REALTIME_CACHE_TTL 一致"""
+    from src.config import get_config
+
+    return get_config().realtime_cache_ttl
+
+
+def _light_quote_key(source: str, stock_code: str) -> str:
+    return f"quote:{source}:{stock_code}"
+
+
+def _get_cached_light_quote(source: str, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
+    """
+    读取批量接口填充的新浪/腾讯逐股缓存，过期返回 None
+
+    进程内未命中时查共享缓存（其他进程的批量结果），命中后回填进程内缓存
+    """
+    entry = _light_quote_cache['quotes'].get((source, stock_code))
+    if entry is not None and time.time() - entry[0] < _light_quote_ttl():
+        return entry[1]
+
+    shared = get_shared_cache()
+    if shared is None:
+        return None
+    try:
+        hit = shared.get(_light_quote_key(source, stock_code))
+    except Exception as e:
+        logger.debug(f"[共享缓存] 读取 {source} {stock_code} 行情失败: {e}")
+        return None
+    if hit is None:
+        return None
+    with _light_quote_lock:
+        _light_quote_cache['quotes'][(source, stock_code)] = (hit[1], hit[0])
+    return hit[0]
+
+
+def _put_light_quotes(source: str, quotes: Dict[str, UnifiedRealtimeQuote]) -> None:
+    now = time.time()
+    with _light_quote_lock:
+        for code, quote in quotes.items():
+            _light_quote_cache['quotes'][(source, code)] = (now, quote)
+
+    shared = get_shared_cache()
+    if shared is not None and quotes:
+        try:
+            shared.put_many(
+                {_light_quote_key(source, code): quote for code, quote in quotes.items()},
+                _light_quote_ttl(),
+            )
+        except Exception as e:
+            logger.debug(f"[共享缓存] 写入 {source} 批量行情失败: {e}")
+
+
+def clear_light_quote_cache() -> None:
+    """清空新浪/腾讯逐股行情缓存（用于测试）"""
+    with _light_quote_lock:
+        _light_quote_cache['quotes'].clear()
+
+
+def _build_em_snapshot(df: pd.DataFrame) -> RealtimeSnapshot:
+    """将东财全量行情 DataFrame 构建为代码索引快照"""
+    return RealtimeSnapshot.from_dataframe(df, ('代码',), ('名称',), _EM_QUOTE_COLUMNS)
+
 
 def _is_etf_code(stock_code: str) -> bool:
     """
@@ -176,17 +416,12 @@ class AkshareFetcher(BaseFetcher):
     name = "AkshareFetcher"
     priority = int(os.getenv("AKSHARE_PRIORITY", "1"))
     
-    def __init__(self, sleep_min: float = 2.0, sleep_max: float = 5.0):
+    def __init__(self):
         """
         初始化 AkshareFetcher
-        
-        Args:
-            sleep_min: 最小休眠时间（秒）
-            sleep_max: 最大休眠时间（秒）
+
+        流控由按上游主机共享的令牌桶负责（见 rate_limiter.py）
         """
-        self.sleep_min = sleep_min
-        self.sleep_max = sleep_max
-        self._last_request_time: Optional[float] = None
         eastmoney_patch()
     
     def _set_random_user_agent(self) -> None:
@@ -205,26 +440,17 @@ class AkshareFetcher(BaseFetcher):
         except Exception as e:
             logger.debug(f"设置 User-Agent 失败: {e}")
     
-    def _enforce_rate_limit(self) -> None:
+    def _enforce_rate_limit(self, host: str = 'eastmoney') -> None:
         """
         强制执行速率限制
-        
-        策略：
-        1. 检查距离上次请求的时间间隔
-        2. 如果间隔不足，补充休眠时间
-        3. 然后再执行随机 jitter 休眠
+
+        从上游主机共享的令牌桶中获取令牌，仅在预算不足时等待。
+        多个线程、多个 Fetcher 访问同一主机时共用同一预算。
+
+        Args:
+            host: 上游主机标识（eastmoney / sina / tencent）
         """
-        if self._last_request_time is not None:
-            elapsed = time.time() - self._last_request_time
-            min_interval = self.sleep_min
-            if elapsed < min_interval:
-                additional_sleep = min_interval - elapsed
-                logger.debug(f"补充休眠 {additional_sleep:.2f} 秒")
-                time.sleep(additional_sleep)
-        
-        # 执行随机 jitter 休眠
-        self.random_sleep(self.sleep_min, self.sleep_max)
-        self._last_request_time = time.time()
+        get_rate_limiter(host).acquire()
     
     @retry(
         stop=stop_after_attempt(3),  # 最多重试3次
@@ -348,7 +574,7 @@ class AkshareFetcher(BaseFetcher):
         else:
             symbol = f"sz{stock_code}"
 
-        self._enforce_rate_limit()
+        self._enforce_rate_limit('sina')
 
         try:
             df = ak.stock_zh_a_daily(
@@ -397,7 +623,7 @@ class AkshareFetcher(BaseFetcher):
         else:
             symbol = f"sz{stock_code}"
 
-        self._enforce_rate_limit()
+        self._enforce_rate_limit('tencent')
 
         try:
             df = ak.stock_zh_a_hist_tx(
@@ -511,7 +737,7 @@ class AkshareFetcher(BaseFetcher):
         self._set_random_user_agent()
         
         # 防封禁策略 2: 强制休眠
-        self._enforce_rate_limit()
+        self._enforce_rate_limit('sina')
         
         # 美股代码直接使用大写
         symbol = stock_code.strip().upper()
@@ -650,6 +876,31 @@ class AkshareFetcher(BaseFetcher):
             
             raise DataFetchError(f"Akshare 获取港股数据失败: {e}") from e
     
+    def supports_minute_data(self, stock_code: str) -> bool:
+        """普通 A 股支持分钟线（东方财富）"""
+        return stock_code.isdigit() and len(stock_code) == 6 and not _is_etf_code(stock_code)
+    
+    def _fetch_minute_raw(self, stock_code: str, period: int, count: int) -> pd.DataFrame:
+        """
+        获取 A 股分钟线 (东方财富)
+        数据来源：ak.stock_zh_a_hist_min_em()，1 分钟线仅提供最近 5 个交易日
+        """
+        import akshare as ak
+
+        self._set_random_user_agent()
+        self._enforce_rate_limit()
+
+        logger.info(f"[API调用] ak.stock_zh_a_hist_min_em(symbol={stock_code}, period={period})")
+        df = ak.stock_zh_a_hist_min_em(symbol=stock_code, period=str(period), adjust='')
+        if df is None or df.empty:
+            return pd.DataFrame()
+
+        df = df.rename(columns={
+            '时间': 'time', '开盘': 'open', '收盘': 'close', '最高': 'high',
+            '最低': 'low', '成交量': 'volume', '成交额': 'amount',
+        })
+        return df.tail(count)
+    
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
         标准化 Akshare 数据
@@ -729,6 +980,86 @@ class AkshareFetcher(BaseFetcher):
             else:
                 return self._get_stock_realtime_quote_em(stock_code)
     
+    def _refresh_em_realtime_cache(self) -> pd.DataFrame:
+        """
+        全量刷新 A 股实时行情缓存（东方财富）
+
+        通过 _refresh_flight 调用，同一时刻只有一个线程执行；
+        进入时再检查一次缓存，避免刚完成的刷新被重复执行。
+        启用共享缓存时，其他进程刚刷新的结果直接复用。
+        失败时缓存空数据，避免同一轮任务对同一接口反复请求。
+        """
+        if _is_cache_fresh(_realtime_cache):
+            return _realtime_cache['data']
+
+        logger.info(f"[缓存未命中] 触发全量刷新 A股实时行情(东财)")
+        df, timestamp, fetched = refresh_through_shared_cache(
+            'akshare_em:stock', _realtime_cache['ttl'],
+            lambda: self._download_em_spot('stock_zh_a_spot_em', 'akshare_em', '只股票')
+        )
+        if df is None:
+            df = pd.DataFrame()
+        _realtime_cache['data'] = df
+        _realtime_cache['snapshot'] = _build_em_snapshot(df)
+        _realtime_cache['timestamp'] = timestamp
+        if fetched:
+            archive_realtime_snapshot(_realtime_cache['snapshot'], 'akshare_em', 'stock')
+        logger.info(f"[缓存更新] A股实时行情(东财) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
+        return df
+
+    def _refresh_etf_realtime_cache(self) -> pd.DataFrame:
+        """全量刷新 ETF 实时行情缓存（东方财富，通过 _refresh_flight 合并并发刷新，启用时经共享缓存）"""
+        if _is_cache_fresh(_etf_realtime_cache):
+            return _etf_realtime_cache['data']
+
+        df, timestamp, fetched = refresh_through_shared_cache(
+            'akshare_em:etf', _etf_realtime_cache['ttl'],
+            lambda: self._download_em_spot('fund_etf_spot_em', 'akshare_etf', '只ETF')
+        )
+        if df is None:
+            df = pd.DataFrame()
+        _etf_realtime_cache['data'] = df
+        _etf_realtime_cache['snapshot'] = _build_em_snapshot(df)
+        _etf_realtime_cache['timestamp'] = timestamp
+        if fetched:
+            archive_realtime_snapshot(_etf_realtime_cache['snapshot'], 'akshare_em', 'etf')
+        return df
+
+    def _download_em_spot(self, api_name: str, source_key: str, unit: str) -> Optional[pd.DataFrame]:
+        """
+        请求东财全量行情（ak.stock_zh_a_spot_em / ak.fund_etf_spot_em），最多尝试 2 次
+
+        Returns:
+            DataFrame，最终失败返回 None（记录熔断失败，不写入共享缓存）
+        """
+        import akshare as ak
+        circuit_breaker = get_realtime_circuit_breaker()
+
+        last_error: Optional[Exception] = None
+        for attempt in range(1, 3):
+            try:
+                # 防封禁策略
+                self._set_random_user_agent()
+                self._enforce_rate_limit()
+
+                logger.info(f"[API调用] ak.{api_name}() 获取实时行情... (attempt {attempt}/2)")
+                api_start = time.time()
+
+                df = getattr(ak, api_name)()
+
+                api_elapsed = time.time() - api_start
+                logger.info(f"[API返回] ak.{api_name} 成功: 返回 {len(df)} {unit}, 耗时 {api_elapsed:.2f}s")
+                circuit_breaker.record_success(source_key)
+                return df
+            except Exception as e:
+                last_error = e
+                logger.warning(f"[API错误] ak.{api_name} 获取失败 (attempt {attempt}/2): {e}")
+                time.sleep(min(2 ** attempt, 5))
+
+        logger.error(f"[API错误] ak.{api_name} 最终失败: {last_error}")
+        circuit_breaker.record_failure(source_key, str(last_error))
+        return None
+
     def _get_stock_realtime_quote_em(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取普通 A 股实时行情数据（东方财富数据源）
@@ -737,89 +1068,32 @@ class AkshareFetcher(BaseFetcher):
         优点：数据最全，含量比、换手率、市盈率、市净率、总市值、流通市值等
         缺点：全量拉取，数据量大，容易超时/限流
         """
-        import akshare as ak
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_em"
         
         try:
             # 检查缓存
             current_time = time.time()
-            if (_realtime_cache['data'] is not None and 
-                current_time - _realtime_cache['timestamp'] < _realtime_cache['ttl']):
+            if _is_cache_fresh(_realtime_cache):
                 df = _realtime_cache['data']
                 cache_age = int(current_time - _realtime_cache['timestamp'])
                 logger.debug(f"[缓存命中] A股实时行情(东财) - 缓存年龄 {cache_age}s/{_realtime_cache['ttl']}s")
             else:
-                # 触发全量刷新
-                logger.info(f"[缓存未命中] 触发全量刷新 A股实时行情(东财)")
-                last_error: Optional[Exception] = None
-                df = None
-                for attempt in range(1, 3):
-                    try:
-                        # 防封禁策略
-                        self._set_random_user_agent()
-                        self._enforce_rate_limit()
-
-                        logger.info(f"[API调用] ak.stock_zh_a_spot_em() 获取A股实时行情... (attempt {attempt}/2)")
-                        import time as _time
-                        api_start = _time.time()
-
-                        df = ak.stock_zh_a_spot_em()
-
-                        api_elapsed = _time.time() - api_start
-                        logger.info(f"[API返回] ak.stock_zh_a_spot_em 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
-                        circuit_breaker.record_success(source_key)
-                        break
-                    except Exception as e:
-                        last_error = e
-                        logger.warning(f"[API错误] ak.stock_zh_a_spot_em 获取失败 (attempt {attempt}/2): {e}")
-                        time.sleep(min(2 ** attempt, 5))
-
-                # 更新缓存：成功缓存数据；失败也缓存空数据，避免同一轮任务对同一接口反复请求
-                if df is None:
-                    logger.error(f"[API错误] ak.stock_zh_a_spot_em 最终失败: {last_error}")
-                    circuit_breaker.record_failure(source_key, str(last_error))
-                    df = pd.DataFrame()
-                _realtime_cache['data'] = df
-                _realtime_cache['timestamp'] = current_time
-                logger.info(f"[缓存更新] A股实时行情(东财) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
+                # 触发全量刷新（并发未命中的线程共享同一次刷新）
+                df = _refresh_flight.do('stock_em', self._refresh_em_realtime_cache)
 
             if df is None or df.empty:
                 logger.warning(f"[实时行情] A股实时行情数据为空，跳过 {stock_code}")
                 return None
             
-            # 查找指定股票
-            row = df[df['代码'] == stock_code]
-            if row.empty:
+            # 查找指定股票（O(1) 索引查询）
+            snapshot = _realtime_cache.get('snapshot') or _build_em_snapshot(df)
+            fields = snapshot.get(stock_code)
+            if fields is None:
                 logger.warning(f"[API返回] 未找到股票 {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get('名称', '')),
-                source=RealtimeSource.AKSHARE_EM,
-                price=safe_float(row.get('最新价')),
-                change_pct=safe_float(row.get('涨跌幅')),
-                change_amount=safe_float(row.get('涨跌额')),
-                volume=safe_int(row.get('成交量')),
-                amount=safe_float(row.get('成交额')),
-                volume_ratio=safe_float(row.get('量比')),
-                turnover_rate=safe_float(row.get('换手率')),
-                amplitude=safe_float(row.get('振幅')),
-                open_price=safe_float(row.get('今开')),
-                high=safe_float(row.get('最高')),
-                low=safe_float(row.get('最低')),
-                pe_ratio=safe_float(row.get('市盈率-动态')),
-                pb_ratio=safe_float(row.get('市净率')),
-                total_mv=safe_float(row.get('总市值')),
-                circ_mv=safe_float(row.get('流通市值')),
-                change_60d=safe_float(row.get('60日涨跌幅')),
-                high_52w=safe_float(row.get('52周最高')),
-                low_52w=safe_float(row.get('52周最低')),
-            )
+            quote = UnifiedRealtimeQuote(code=stock_code, source=RealtimeSource.AKSHARE_EM, **fields)
             
             logger.info(f"[实时行情-东财] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"量比={quote.volume_ratio}, 换手率={quote.turnover_rate}%")
@@ -839,28 +1113,29 @@ class AkshareFetcher(BaseFetcher):
         缺点：数据字段较少，无量比/PE/PB等
         
         接口格式：http://hq.sinajs.cn/list=sh600519,sz000001
+        批量预取（get_realtime_quotes_batch）填充的缓存命中时不再请求
         """
+        cached = _get_cached_light_quote('sina', stock_code)
+        if cached is not None:
+            logger.debug(f"[缓存命中] {stock_code} 实时行情(新浪批量)")
+            return cached
+
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_sina"
         
         try:
             import requests
             
-            # 判断市场前缀
-            if stock_code.startswith(('6', '5', '9')):
-                symbol = f"sh{stock_code}"
-            else:
-                symbol = f"sz{stock_code}"
-            
-            url = f"http://hq.sinajs.cn/list={symbol}"
+            symbol = _market_symbol(stock_code)
+            url = f"{_LIGHT_QUOTE_URLS['sina']}{symbol}"
             headers = {
-                'Referer': 'http://finance.sina.com.cn',
+                'Referer': _LIGHT_QUOTE_REFERERS['sina'],
                 'User-Agent': random.choice(USER_AGENTS)
             }
             
             logger.info(f"[API调用] 新浪财经接口获取 {stock_code} 实时行情...")
             
-            self._enforce_rate_limit()
+            self._enforce_rate_limit('sina')
             response = requests.get(url, headers=headers, timeout=10)
             response.encoding = 'gbk'
             
@@ -875,50 +1150,18 @@ class AkshareFetcher(BaseFetcher):
                 logger.warning(f"[API返回] 新浪接口未找到 {stock_code} 数据")
                 return None
             
-            # 提取引号内的数据
-            data_start = content.find('"')
-            data_end = content.rfind('"')
-            if data_start == -1 or data_end == -1:
+            data_str = _parse_light_quote_text(content).get(symbol)
+            if data_str is None:
                 logger.warning(f"[API返回] 新浪接口数据格式异常")
                 circuit_breaker.record_failure(source_key, "数据格式异常")
                 return None
             
-            data_str = content[data_start+1:data_end]
-            fields = data_str.split(',')
-            
-            if len(fields) < 32:
-                logger.warning(f"[API返回] 新浪接口数据字段不足: {len(fields)}")
+            quote = _parse_sina_quote(stock_code, data_str)
+            if quote is None:
                 return None
             
             circuit_breaker.record_success(source_key)
             
-            # 新浪数据字段顺序：
-            # 0:名称 1:今开 2:昨收 3:最新价 4:最高 5:最低 6:买一价 7:卖一价
-            # 8:成交量(股) 9:成交额(元) ... 30:日期 31:时间
-            # 使用 realtime_types.py 中的统一转换函数
-            price = safe_float(fields[3])
-            pre_close = safe_float(fields[2])
-            change_pct = None
-            change_amount = None
-            if price and pre_close and pre_close > 0:
-                change_amount = price - pre_close
-                change_pct = (change_amount / pre_close) * 100
-            
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=fields[0],
-                source=RealtimeSource.AKSHARE_SINA,
-                price=price,
-                change_pct=change_pct,
-                change_amount=change_amount,
-                volume=safe_int(fields[8]),  # 成交量（股）
-                amount=safe_float(fields[9]),  # 成交额（元）
-                open_price=safe_float(fields[1]),
-                high=safe_float(fields[4]),
-                low=safe_float(fields[5]),
-                pre_close=pre_close,
-            )
-            
             logger.info(f"[实时行情-新浪] {stock_code} {quote.name}: 价格={quote.price}, "
                        f"涨跌={quote.change_pct:.2f}%" if quote.change_pct else "")
             return quote
@@ -937,28 +1180,29 @@ class AkshareFetcher(BaseFetcher):
         缺点：无量比/PE/PB等估值数据
         
         接口格式：http://qt.gtimg.cn/q=sh600519,sz000001
+        批量预取（get_realtime_quotes_batch）填充的缓存命中时不再请求
         """
+        cached = _get_cached_light_quote('tencent', stock_code)
+        if cached is not None:
+            logger.debug(f"[缓存命中] {stock_code} 实时行情(腾讯批量)")
+            return cached
+
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "tencent"
         
         try:
             import requests
             
-            # 判断市场前缀
-            if stock_code.startswith(('6', '5', '9')):
-                symbol = f"sh{stock_code}"
-            else:
-                symbol = f"sz{stock_code}"
-            
-            url = f"http://qt.gtimg.cn/q={symbol}"
+            symbol = _market_symbol(stock_code)
+            url = f"{_LIGHT_QUOTE_URLS['tencent']}{symbol}"
             headers = {
-                'Referer': 'http://finance.qq.com',
+                'Referer': _LIGHT_QUOTE_REFERERS['tencent'],
                 'User-Agent': random.choice(USER_AGENTS)
             }
             
             logger.info(f"[API调用] 腾讯财经接口获取 {stock_code} 实时行情...")
             
-            self._enforce_rate_limit()
+            self._enforce_rate_limit('tencent')
             response = requests.get(url, headers=headers, timeout=10)
             response.encoding = 'gbk'
             
@@ -972,50 +1216,18 @@ class AkshareFetcher(BaseFetcher):
                 logger.warning(f"[API返回] 腾讯接口未找到 {stock_code} 数据")
                 return None
             
-            # 提取数据
-            data_start = content.find('"')
-            data_end = content.rfind('"')
-            if data_start == -1 or data_end == -1:
+            data_str = _parse_light_quote_text(content).get(symbol)
+            if data_str is None:
                 logger.warning(f"[API返回] 腾讯接口数据格式异常")
                 circuit_breaker.record_failure(source_key, "数据格式异常")
                 return None
             
-            data_str = content[data_start+1:data_end]
-            fields = data_str.split('~')
-            
-            if len(fields) < 45:
-                logger.warning(f"[API返回] 腾讯接口数据字段不足: {len(fields)}")
+            quote = _parse_tencent_quote(stock_code, data_str)
+            if quote is None:
                 return None
             
             circuit_breaker.record_success(source_key)
             
-            # 腾讯数据字段顺序（完整）：
-            # 1:名称 2:代码 3:最新价 4:昨收 5:今开 6:成交量(手) 7:外盘 8:内盘
-            # 9-28:买卖五档 30:时间戳 31:涨跌额 32:涨跌幅(%) 33:今开 34:最高 35:最低/成交量/成交额
-            # 36:成交量(手) 37:成交额(万) 38:换手率(%) 39:市盈率 43:振幅(%)
-            # 44:流通市值(亿) 45:总市值(亿) 46:市净率 47:涨停价 48:跌停价 49:量比
-            # 使用 realtime_types.py 中的统一转换函数
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=fields[1] if len(fields) > 1 else "",
-                source=RealtimeSource.TENCENT,
-                price=safe_float(fields[3]),
-                change_pct=safe_float(fields[32]),
-                change_amount=safe_float(fields[31]) if len(fields) > 31 else None,
-                volume=safe_int(fields[6]) * 100 if fields[6] else None,  # 腾讯返回的是手，转为股
-                open_price=safe_float(fields[5]),
-                high=safe_float(fields[34]) if len(fields) > 34 else None,
-                low=safe_float(fields[35].split('/')[0]) if len(fields) > 35 and '/' in str(fields[35]) else safe_float(fields[35]) if len(fields) > 35 else None,
-                pre_close=safe_float(fields[4]),
-                turnover_rate=safe_float(fields[38]) if len(fields) > 38 else None,
-                amplitude=safe_float(fields[43]) if len(fields) > 43 else None,
-                volume_ratio=safe_float(fields[49]) if len(fields) > 49 else None,  # 量比
-                pe_ratio=safe_float(fields[39]) if len(fields) > 39 else None,  # 市盈率
-                pb_ratio=safe_float(fields[46]) if len(fields) > 46 else None,  # 市净率
-                circ_mv=safe_float(fields[44]) * 100000000 if len(fields) > 44 and fields[44] else None,  # 流通市值(亿->元)
-                total_mv=safe_float(fields[45]) * 100000000 if len(fields) > 45 and fields[45] else None,  # 总市值(亿->元)
-            )
-            
             logger.info(f"[实时行情-腾讯] {stock_code} {quote.name}: 价格={quote.price}, "
                        f"涨跌={quote.change_pct}%, 量比={quote.volume_ratio}, 换手率={quote.turnover_rate}%")
             return quote
@@ -1025,6 +1237,99 @@ class AkshareFetcher(BaseFetcher):
             circuit_breaker.record_failure(source_key, str(e))
             return None
     
+    def _get_quote_session(self):
+        """新浪/腾讯批量行情共用的 requests.Session（连接池复用 HTTP 连接）"""
+        global _quote_session
+        if _quote_session is None:
+            with _light_quote_lock:
+                if _quote_session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    _quote_session = session
+        return _quote_session
+    
+    def get_realtime_quotes_batch(self, stock_codes: List[str], source: str = "sina") -> Dict[str, UnifiedRealtimeQuote]:
+        """
+        批量获取普通 A 股实时行情（新浪/腾讯，一次请求多只股票）
+        
+        新浪/腾讯接口支持逗号分隔的多个代码，按 URL 长度切分成少量请求，
+        通过连接池复用连接；结果写入逐股缓存，之后的单股查询直接命中。
+        港股、美股、ETF 不走这两个接口，直接跳过。
+        
+        Args:
+            stock_codes: 股票代码列表
+            source: sina / tencent
+            
+        Returns:
+            {代码: UnifiedRealtimeQuote}（含缓存命中的部分）
+        """
+        if source not in _LIGHT_QUOTE_PARSERS:
+            raise ValueError(f"批量行情仅支持 sina / tencent，收到: {source}")
+        
+        circuit_breaker = get_realtime_circuit_breaker()
+        source_key = "akshare_sina" if source == "sina" else "tencent"
+        if not circuit_breaker.is_available(source_key):
+            logger.warning(f"[熔断] 数据源 {source_key} 处于熔断状态，跳过批量行情")
+            return {}
+        
+        quotes: Dict[str, UnifiedRealtimeQuote] = {}
+        pending: Dict[str, str] = {}
+        for code in dict.fromkeys(stock_codes):
+            if _is_us_code(code) or _is_hk_code(code) or _is_etf_code(code):
+                continue
+            cached = _get_cached_light_quote(source, code)
+            if cached is not None:
+                quotes[code] = cached
+            else:
+                pending[_market_symbol(code)] = code
+        if not pending:
+            return quotes
+        
+        base_url = _LIGHT_QUOTE_URLS[source]
+        parser = _LIGHT_QUOTE_PARSERS[source]
+        session = self._get_quote_session()
+        total = len(quotes) + len(pending)
+        chunks = _chunk_symbols(list(pending), base_url)
+        logger.info(f"[API调用] {source} 批量获取 {len(pending)} 只股票实时行情，共 {len(chunks)} 个请求...")
+        
+        for chunk in chunks:
+            try:
+                self._enforce_rate_limit(source)
+                response = session.get(
+                    base_url + ','.join(chunk),
+                    headers={
+                        'Referer': _LIGHT_QUOTE_REFERERS[source],
+                        'User-Agent': random.choice(USER_AGENTS),
+                    },
+                    timeout=10,
+                )
+                response.encoding = 'gbk'
+                if response.status_code != 200:
+                    logger.warning(f"[API错误] {source} 批量接口返回状态码 {response.status_code}")
+                    circuit_breaker.record_failure(source_key, f"HTTP {response.status_code}")
+                    continue
+                
+                fetched: Dict[str, UnifiedRealtimeQuote] = {}
+                for symbol, data_str in _parse_light_quote_text(response.text).items():
+                    code = pending.get(symbol)
+                    quote = parser(code, data_str) if code else None
+                    if quote is not None:
+                        fetched[code] = quote
+                circuit_breaker.record_success(source_key)
+                _put_light_quotes(source, fetched)
+                quotes.update(fetched)
+            except Exception as e:
+                logger.error(f"[API错误] {source} 批量获取实时行情失败: {e}")
+                circuit_breaker.record_failure(source_key, str(e))
+        
+        logger.info(f"[实时行情-{source}] 批量获取完成: {len(quotes)}/{total} 只")
+        return quotes
+    
     def _get_etf_realtime_quote(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取 ETF 基金实时行情数据
@@ -1038,82 +1343,29 @@ class AkshareFetcher(BaseFetcher):
         Returns:
             UnifiedRealtimeQuote 对象，获取失败返回 None
         """
-        import akshare as ak
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "akshare_etf"
         
         try:
             # 检查缓存
-            current_time = time.time()
-            if (_etf_realtime_cache['data'] is not None and 
-                current_time - _etf_realtime_cache['timestamp'] < _etf_realtime_cache['ttl']):
+            if _is_cache_fresh(_etf_realtime_cache):
                 df = _etf_realtime_cache['data']
                 logger.debug(f"[缓存命中] 使用缓存的ETF实时行情数据")
             else:
-                last_error: Optional[Exception] = None
-                df = None
-                for attempt in range(1, 3):
-                    try:
-                        # 防封禁策略
-                        self._set_random_user_agent()
-                        self._enforce_rate_limit()
-
-                        logger.info(f"[API调用] ak.fund_etf_spot_em() 获取ETF实时行情... (attempt {attempt}/2)")
-                        import time as _time
-                        api_start = _time.time()
-
-                        df = ak.fund_etf_spot_em()
-
-                        api_elapsed = _time.time() - api_start
-                        logger.info(f"[API返回] ak.fund_etf_spot_em 成功: 返回 {len(df)} 只ETF, 耗时 {api_elapsed:.2f}s")
-                        circuit_breaker.record_success(source_key)
-                        break
-                    except Exception as e:
-                        last_error = e
-                        logger.warning(f"[API错误] ak.fund_etf_spot_em 获取失败 (attempt {attempt}/2): {e}")
-                        time.sleep(min(2 ** attempt, 5))
-
-                if df is None:
-                    logger.error(f"[API错误] ak.fund_etf_spot_em 最终失败: {last_error}")
-                    circuit_breaker.record_failure(source_key, str(last_error))
-                    df = pd.DataFrame()
-                _etf_realtime_cache['data'] = df
-                _etf_realtime_cache['timestamp'] = current_time
+                df = _refresh_flight.do('etf_em', self._refresh_etf_realtime_cache)
 
             if df is None or df.empty:
                 logger.warning(f"[实时行情] ETF实时行情数据为空，跳过 {stock_code}")
                 return None
             
-            # 查找指定 ETF
-            row = df[df['代码'] == stock_code]
-            if row.empty:
+            # 查找指定 ETF（O(1) 索引查询）
+            snapshot = _etf_realtime_cache.get('snapshot') or _build_em_snapshot(df)
+            fields = snapshot.get(stock_code)
+            if fields is None:
                 logger.warning(f"[API返回] 未找到 ETF {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            # ETF 行情数据构建
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get('名称', '')),
-                source=RealtimeSource.AKSHARE_EM,
-                price=safe_float(row.get('最新价')),
-                change_pct=safe_float(row.get('涨跌幅')),
-                change_amount=safe_float(row.get('涨跌额')),
-                volume=safe_int(row.get('成交量')),
-                amount=safe_float(row.get('成交额')),
-                volume_ratio=safe_float(row.get('量比')),
-                turnover_rate=safe_float(row.get('换手率')),
-                amplitude=safe_float(row.get('振幅')),
-                open_price=safe_float(row.get('今开')),
-                high=safe_float(row.get('最高')),
-                low=safe_float(row.get('最低')),
-                total_mv=safe_float(row.get('总市值')),
-                circ_mv=safe_float(row.get('流通市值')),
-                high_52w=safe_float(row.get('52周最高')),
-                low_52w=safe_float(row.get('52周最低')),
-            )
+            quote = UnifiedRealtimeQuote(code=stock_code, source=RealtimeSource.AKSHARE_EM, **fields)
             
             logger.info(f"[ETF实时行情] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"换手率={quote.turnover_rate}%")
@@ -1368,6 +1620,35 @@ class AkshareFetcher(BaseFetcher):
             logger.error(f"[Akshare] 获取指数行情失败: {e}")
             return None
 
+    def get_trade_dates(self, market: str, start_date: date, end_date: date) -> Optional[List[date]]:
+        """
+        获取 A 股交易日历中的开市日（新浪 ak.tool_trade_date_hist_sina，港股/美股不支持）
+
+        Args:
+            market: cn / hk / us
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            开市日列表，失败或不支持时返回 None
+        """
+        if market != 'cn':
+            return None
+
+        import akshare as ak
+
+        try:
+            self._enforce_rate_limit('sina')
+            logger.info("[API调用] ak.tool_trade_date_hist_sina() 获取交易日历...")
+            df = ak.tool_trade_date_hist_sina()
+            if df is None or df.empty:
+                return None
+            dates = pd.to_datetime(df['trade_date']).dt.date
+            return dates[(dates >= start_date) & (dates <= end_date)].tolist()
+        except Exception as e:
+            logger.warning(f"[Akshare] 获取交易日历失败: {e}")
+            return None
+
     def get_market_stats(self) -> Optional[Dict[str, Any]]:
         """
         获取市场涨跌统计
@@ -9,16 +9,19 @@ BaostockFetcher - 备用数据源 2 (Priority 3)
 优点：稳定、无配额限制
 
 关键策略：
-1. 管理 bs.login() 和 bs.logout() 生命周期
-2. 使用上下文管理器防止连接泄露
+1. 进程内共享一个登录会话，会话失效或空闲过久时惰性重新登录
+2. baostock 模块内部使用全局 socket，非线程安全：所有请求持锁串行执行
 3. 失败后指数退避重试
 """
 
+import atexit
 import logging
 import re
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Generator
+from typing import Any, Callable, Dict, List, Optional, Generator
 
 import pandas as pd
 from tenacity import (
@@ -29,12 +32,54 @@ from tenacity import (
     before_sleep_log,
 )
 
-from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS, UnsupportedCodeError
+from .rate_limiter import get_rate_limiter
 import os
 
 logger = logging.getLogger(__name__)
 
 
+# 共享登录会话状态（baostock 模块级全局连接，所有实例共用）
+_session_lock = threading.RLock()
+_session_state = {'logged_in': False, 'last_used': 0.0}
+
+# 会话空闲超过该秒数后，下次请求前重新登录（服务端会回收长时间空闲的连接）
+SESSION_IDLE_TIMEOUT = 600.0
+
+# 需要重新登录后重试的错误码：10001001 未登录，10002xxx 网络/socket 错误
+_RELOGIN_ERROR_PREFIXES = ('10001001', '10002')
+
+
+def _logout(bs) -> None:
+    """登出并标记会话失效（调用方需持有 _session_lock）"""
+    if not _session_state['logged_in']:
+        return
+    _session_state['logged_in'] = False
+    try:
+        logout_result = bs.logout()
+        if logout_result.error_code == '0':
+            logger.debug("Baostock 登出成功")
+        else:
+            logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
+    except Exception as e:
+        logger.warning(f"Baostock 登出时发生错误: {e}")
+
+
+def _logout_at_exit() -> None:
+    """进程退出时登出共享会话"""
+    if not _session_state['logged_in']:
+        return
+    try:
+        import baostock as bs
+    except ImportError:
+        return
+    with _session_lock:
+        _logout(bs)
+
+
+atexit.register(_logout_at_exit)
+
+
 def _is_us_code(stock_code: str) -> bool:
     """
     判断代码是否为美股
@@ -55,8 +100,8 @@ class BaostockFetcher(BaseFetcher):
     数据来源：证券宝 Baostock API
     
     关键策略：
-    - 使用上下文管理器管理连接生命周期
-    - 每次请求都重新登录/登出，防止连接泄露
+    - 共享登录会话，仅在首次使用、会话失效或空闲过久时登录
+    - 请求持锁串行执行（baostock 非线程安全）
     - 失败后指数退避重试
     
     Baostock 特点：
@@ -83,44 +128,88 @@ class BaostockFetcher(BaseFetcher):
             self._bs_module = bs
         return self._bs_module
     
+    def _enforce_rate_limit(self, host: str = 'baostock') -> None:
+        """
+        强制执行速率限制
+
+        从上游主机共享的令牌桶中获取令牌，仅在预算不足时等待。
+        多个线程访问同一主机时共用同一预算。
+
+        Args:
+            host: 上游主机标识（baostock）
+        """
+        get_rate_limiter(host).acquire()
+    
     @contextmanager
     def _baostock_session(self) -> Generator:
         """
-        Baostock 连接上下文管理器
+        Baostock 共享会话上下文管理器
         
         确保：
-        1. 进入上下文时自动登录
-        2. 退出上下文时自动登出
-        3. 异常时也能正确登出
+        1. 进入上下文时持有会话锁，同一时刻只有一个请求在使用 baostock
+        2. 未登录或空闲超过 SESSION_IDLE_TIMEOUT 时先（重新）登录
+        3. 块内出现异常时标记会话失效，下次请求重新登录
         
         使用示例：
-            with self._baostock_session():
+            with self._baostock_session() as bs:
                 # 在这里执行数据查询
         """
         bs = self._get_baostock()
-        login_result = None
         
-        try:
-            # 登录 Baostock
-            login_result = bs.login()
+        with _session_lock:
+            if _session_state['logged_in'] and time.time() - _session_state['last_used'] > SESSION_IDLE_TIMEOUT:
+                logger.debug("Baostock 会话空闲过久，重新登录")
+                _logout(bs)
             
-            if login_result.error_code != '0':
-                raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
+            if not _session_state['logged_in']:
+                login_result = bs.login()
+                if login_result.error_code != '0':
+                    raise DataFetchError(f"Baostock 登录失败: {login_result.error_msg}")
+                _session_state['logged_in'] = True
+                logger.debug("Baostock 登录成功")
             
-            logger.debug("Baostock 登录成功")
+            try:
+                yield bs
+            except Exception:
+                # 连接状态未知，下次请求重新登录
+                _logout(bs)
+                raise
+            finally:
+                _session_state['last_used'] = time.time()
+    
+    def _query(self, query: Callable[[Any], Any]) -> pd.DataFrame:
+        """
+        在共享会话中执行一次查询并读取全部结果
+        
+        结果集分页读取（rs.next）同样经过 socket，因此整个读取过程都在会话锁内完成。
+        返回未登录/网络错误码时重新登录并重试一次；每次查询先从 baostock 令牌桶获取令牌。
+        
+        Args:
+            query: 接收 baostock 模块、返回 ResultData 的函数
             
-            yield bs
+        Returns:
+            查询结果 DataFrame（可能为空）
             
-        finally:
-            # 确保登出，防止连接泄露
-            try:
-                logout_result = bs.logout()
-                if logout_result.error_code == '0':
-                    logger.debug("Baostock 登出成功")
-                else:
-                    logger.warning(f"Baostock 登出异常: {logout_result.error_msg}")
-            except Exception as e:
-                logger.warning(f"Baostock 登出时发生错误: {e}")
+        Raises:
+            DataFetchError: 登录失败或查询返回错误码
+        """
+        for attempt in range(2):
+            # 在会话锁外等待令牌，避免限速等待期间占用会话
+            self._enforce_rate_limit()
+            with self._baostock_session() as bs:
+                rs = query(bs)
+                if rs.error_code.startswith(_RELOGIN_ERROR_PREFIXES) and attempt == 0:
+                    logger.info(f"Baostock 会话失效（{rs.error_msg}），重新登录后重试")
+                    _logout(bs)
+                    continue
+                if rs.error_code != '0':
+                    raise DataFetchError(f"Baostock 查询失败: {rs.error_msg}")
+                
+                data_list = []
+                while rs.next():
+                    data_list.append(rs.get_row_data())
+                return pd.DataFrame(data_list, columns=rs.fields)
+        raise DataFetchError("Baostock 重新登录后查询仍失败")
     
     def _convert_stock_code(self, stock_code: str) -> str:
         """
@@ -161,6 +250,10 @@ class BaostockFetcher(BaseFetcher):
             logger.warning(f"无法确定股票 {code} 的市场，默认使用深市")
             return f"sz.{code}"
     
+    def supports_daily_code(self, stock_code: str) -> bool:
+        """不支持美股"""
+        return not _is_us_code(stock_code)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -182,45 +275,47 @@ class BaostockFetcher(BaseFetcher):
         """
         # 美股不支持，抛出异常让 DataFetcherManager 切换到其他数据源
         if _is_us_code(stock_code):
-            raise DataFetchError(f"BaostockFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
+            raise UnsupportedCodeError(f"BaostockFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
         
         # 转换代码格式
         bs_code = self._convert_stock_code(stock_code)
         
         logger.debug(f"调用 Baostock query_history_k_data_plus({bs_code}, {start_date}, {end_date})")
         
-        with self._baostock_session() as bs:
+        try:
+            # 查询日线数据
+            # adjustflag: 1-后复权，2-前复权，3-不复权
+            df = self._query(lambda bs: bs.query_history_k_data_plus(
+                code=bs_code,
+                fields="date,open,high,low,close,volume,amount,pctChg",
+                start_date=start_date,
+                end_date=end_date,
+                frequency="d",  # 日线
+                adjustflag="2"  # 前复权
+            ))
+        except Exception as e:
+            if isinstance(e, DataFetchError):
+                raise
+            raise DataFetchError(f"Baostock 获取数据失败: {e}") from e
+        
+        if df.empty:
+            raise DataFetchError(f"Baostock 未查询到 {stock_code} 的数据")
+        
+        return df
+    
+    def supports_batch_code(self, stock_code: str) -> bool:
+        """A 股代码可在共享会话内批量获取（用于历史数据回填）"""
+        return stock_code.isdigit() and len(stock_code) == 6
+    
+    def _fetch_raw_data_batch(self, stock_codes: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """批量获取日线：复用同一登录会话依次查询，单只失败不影响其余股票"""
+        results: Dict[str, pd.DataFrame] = {}
+        for stock_code in stock_codes:
             try:
-                # 查询日线数据
-                # adjustflag: 1-后复权，2-前复权，3-不复权
-                rs = bs.query_history_k_data_plus(
-                    code=bs_code,
-                    fields="date,open,high,low,close,volume,amount,pctChg",
-                    start_date=start_date,
-                    end_date=end_date,
-                    frequency="d",  # 日线
-                    adjustflag="2"  # 前复权
-                )
-                
-                if rs.error_code != '0':
-                    raise DataFetchError(f"Baostock 查询失败: {rs.error_msg}")
-                
-                # 转换为 DataFrame
-                data_list = []
-                while rs.next():
-                    data_list.append(rs.get_row_data())
-                
-                if not data_list:
-                    raise DataFetchError(f"Baostock 未查询到 {stock_code} 的数据")
-                
-                df = pd.DataFrame(data_list, columns=rs.fields)
-                
-                return df
-                
-            except Exception as e:
-                if isinstance(e, DataFetchError):
-                    raise
-                raise DataFetchError(f"Baostock 获取数据失败: {e}") from e
+                results[stock_code] = self._fetch_raw_data(stock_code, start_date, end_date)
+            except DataFetchError as e:
+                logger.debug(f"Baostock 批量获取 {stock_code} 失败: {e}")
+        return results
     
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
@@ -280,24 +375,15 @@ class BaostockFetcher(BaseFetcher):
         try:
             bs_code = self._convert_stock_code(stock_code)
             
-            with self._baostock_session() as bs:
-                # 查询股票基本信息
-                rs = bs.query_stock_basic(code=bs_code)
-                
-                if rs.error_code == '0':
-                    data_list = []
-                    while rs.next():
-                        data_list.append(rs.get_row_data())
-                    
-                    if data_list:
-                        # Baostock 返回的字段：code, code_name, ipoDate, outDate, type, status
-                        fields = rs.fields
-                        name_idx = fields.index('code_name') if 'code_name' in fields else None
-                        if name_idx is not None and len(data_list[0]) > name_idx:
-                            name = data_list[0][name_idx]
-                            self._stock_name_cache[stock_code] = name
-                            logger.debug(f"Baostock 获取股票名称成功: {stock_code} -> {name}")
-                            return name
+            # 查询股票基本信息
+            # Baostock 返回的字段：code, code_name, ipoDate, outDate, type, status
+            df = self._query(lambda bs: bs.query_stock_basic(code=bs_code))
+            
+            if not df.empty and 'code_name' in df.columns:
+                name = df.iloc[0]['code_name']
+                self._stock_name_cache[stock_code] = name
+                logger.debug(f"Baostock 获取股票名称成功: {stock_code} -> {name}")
+                return name
                 
         except Exception as e:
             logger.warning(f"Baostock 获取股票名称失败 {stock_code}: {e}")
@@ -311,33 +397,26 @@ class BaostockFetcher(BaseFetcher):
         使用 Baostock 的 query_stock_basic 接口获取全部股票列表
         
         Returns:
-            包含 code, name 列的 DataFrame，失败返回 None
+            包含 code, name, type（1 股票 / 2 指数 / 5 ETF 等）, status（1 上市 / 0 退市）列的 DataFrame，
+            失败返回 None
         """
         try:
-            with self._baostock_session() as bs:
-                # 查询所有股票基本信息
-                rs = bs.query_stock_basic()
+            # 查询所有股票基本信息
+            df = self._query(lambda bs: bs.query_stock_basic())
+            
+            if not df.empty:
+                # 转换代码格式（去除 sh. 或 sz. 前缀）
+                df['code'] = df['code'].str.split('.').str[-1]
+                df = df.rename(columns={'code_name': 'name'})
+                
+                # 更新缓存（指数代码与个股重叠，如 sh.000001 上证指数 / sz.000001 平安银行，不写入名称缓存）
+                if not hasattr(self, '_stock_name_cache'):
+                    self._stock_name_cache = {}
+                securities = df[df['type'] != '2']
+                self._stock_name_cache.update(zip(securities['code'], securities['name']))
                 
-                if rs.error_code == '0':
-                    data_list = []
-                    while rs.next():
-                        data_list.append(rs.get_row_data())
-                    
-                    if data_list:
-                        df = pd.DataFrame(data_list, columns=rs.fields)
-                        
-                        # 转换代码格式（去除 sh. 或 sz. 前缀）
-                        df['code'] = df['code'].apply(lambda x: x.split('.')[1] if '.' in x else x)
-                        df = df.rename(columns={'code_name': 'name'})
-                        
-                        # 更新缓存
-                        if not hasattr(self, '_stock_name_cache'):
-                            self._stock_name_cache = {}
-                        for _, row in df.iterrows():
-                            self._stock_name_cache[row['code']] = row['name']
-                        
-                        logger.info(f"Baostock 获取股票列表成功: {len(df)} 条")
-                        return df[['code', 'name']]
+                logger.info(f"Baostock 获取股票列表成功: {len(df)} 条")
+                return df[['code', 'name', 'type', 'status']]
                 
         except Exception as e:
             logger.warning(f"Baostock 获取股票列表失败: {e}")
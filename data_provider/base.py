@@ -14,11 +14,15 @@
 3. 指数退避重试机制
 """
 
+import contextvars
+import dataclasses
 import logging
 import random
+import threading
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, date, timedelta
 from typing import Optional, List, Tuple, Dict, Any
 
 import pandas as pd
@@ -30,6 +34,10 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from src.replay import replay_call, replayable
+
+from .source_health import SourceHealthTracker
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -37,6 +45,13 @@ logger = logging.getLogger(__name__)
 # === 标准化列名定义 ===
 STANDARD_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg']
 
+# === 分钟线标准列名与支持的周期（分钟）===
+MINUTE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'amount']
+MINUTE_PERIODS = (1, 5, 15, 30, 60)
+
+# 本地数据已是最新、未访问数据源时返回的来源名（调用方无需重复写库）
+LOCAL_CACHE_SOURCE = 'LocalCache'
+
 
 def normalize_stock_code(stock_code: str) -> str:
     """
@@ -89,6 +104,11 @@ class DataSourceUnavailableError(DataFetchError):
     pass
 
 
+class UnsupportedCodeError(DataFetchError):
+    """数据源不支持该代码所属市场/类型（能力限制，不计入数据源健康度）"""
+    pass
+
+
 class BaseFetcher(ABC):
     """
     数据源抽象基类
@@ -200,20 +220,18 @@ class BaseFetcher(ABC):
             标准化的 DataFrame，包含技术指标
         """
         # 计算日期范围
-        if end_date is None:
-            end_date = datetime.now().strftime('%Y-%m-%d')
-        
-        if start_date is None:
-            # 默认获取最近 30 个交易日（按日历日估算，多取一些）
-            from datetime import timedelta
-            start_dt = datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days * 2)
-            start_date = start_dt.strftime('%Y-%m-%d')
+        start_date, end_date = self._resolve_date_range(start_date, end_date, days)
         
         logger.info(f"[{self.name}] 获取 {stock_code} 数据: {start_date} ~ {end_date}")
         
         try:
             # Step 1: 获取原始数据
-            raw_df = self._fetch_raw_data(stock_code, start_date, end_date)
+            raw_df = replay_call(
+                'fetch_raw',
+                (self.name, stock_code, start_date, end_date),
+                lambda: self._fetch_raw_data(stock_code, start_date, end_date),
+                group=(self.name, stock_code),
+            )
             
             if raw_df is None or raw_df.empty:
                 raise DataFetchError(f"[{self.name}] 未获取到 {stock_code} 的数据")
@@ -232,7 +250,167 @@ class BaseFetcher(ABC):
             
         except Exception as e:
             logger.error(f"[{self.name}] 获取 {stock_code} 失败: {str(e)}")
-            raise DataFetchError(f"[{self.name}] {stock_code}: {str(e)}") from e
+            # 保留能力限制类型，供管理器区分"不支持"与"数据源故障"
+            error_cls = UnsupportedCodeError if isinstance(e, UnsupportedCodeError) else DataFetchError
+            raise error_cls(f"[{self.name}] {stock_code}: {str(e)}") from e
+    
+    @staticmethod
+    def _resolve_date_range(
+        start_date: Optional[str],
+        end_date: Optional[str],
+        days: int
+    ) -> Tuple[str, str]:
+        """计算日期范围：end_date 默认今天，start_date 默认按 days*2 个日历日估算"""
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        
+        if start_date is None:
+            # 默认获取最近 30 个交易日（按日历日估算，多取一些）
+            start_dt = datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days * 2)
+            start_date = start_dt.strftime('%Y-%m-%d')
+        
+        return start_date, end_date
+
+    def supports_daily_code(self, stock_code: str) -> bool:
+        """
+        是否能提供该代码的日线（按市场判断，不访问网络）
+
+        默认支持；只覆盖部分市场的子类（如不支持美股）按代码类型返回
+        """
+        return True
+
+    def supports_batch_code(self, stock_code: str) -> bool:
+        """
+        是否支持在一次批量请求中获取该代码的日线
+
+        默认不支持；实现了 _fetch_raw_data_batch 的子类按代码类型返回
+        """
+        return False
+
+    def _fetch_raw_data_batch(
+        self,
+        stock_codes: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取多只股票的原始数据（子类可选实现）
+
+        Returns:
+            {股票代码: 原始 DataFrame}，未获取到的代码可缺省
+        """
+        raise NotImplementedError(f"{self.name} 不支持批量获取")
+
+    def get_daily_data_batch(
+        self,
+        stock_codes: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: int = 30
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取日线数据（统一入口）
+
+        与 get_daily_data 相同的标准化/清洗/指标流程，逐只处理批量返回的原始数据
+
+        Returns:
+            {股票代码: 标准化 DataFrame}，仅包含获取成功的代码
+
+        Raises:
+            DataFetchError: 批量请求本身失败时抛出
+        """
+        start_date, end_date = self._resolve_date_range(start_date, end_date, days)
+        logger.info(f"[{self.name}] 批量获取 {len(stock_codes)} 只股票数据: {start_date} ~ {end_date}")
+
+        try:
+            raw_map = replay_call(
+                'fetch_raw_batch',
+                (self.name, tuple(stock_codes), start_date, end_date),
+                lambda: self._fetch_raw_data_batch(stock_codes, start_date, end_date),
+                group=(self.name, tuple(stock_codes)),
+            )
+        except Exception as e:
+            logger.error(f"[{self.name}] 批量获取失败: {str(e)}")
+            raise DataFetchError(f"[{self.name}] 批量获取失败: {str(e)}") from e
+
+        results: Dict[str, pd.DataFrame] = {}
+        for code, raw_df in raw_map.items():
+            if raw_df is None or raw_df.empty:
+                continue
+            try:
+                df = self._normalize_data(raw_df, code)
+                df = self._clean_data(df)
+                df = self._calculate_indicators(df)
+            except Exception as e:
+                logger.warning(f"[{self.name}] {code} 批量数据处理失败: {e}")
+                continue
+            if not df.empty:
+                results[code] = df
+
+        logger.info(f"[{self.name}] 批量获取成功 {len(results)}/{len(stock_codes)} 只")
+        return results
+
+    def supports_minute_data(self, stock_code: str) -> bool:
+        """
+        是否支持获取该代码的分钟线
+
+        默认不支持；实现了 _fetch_minute_raw 的子类按代码类型返回
+        """
+        return False
+
+    def _fetch_minute_raw(self, stock_code: str, period: int, count: int) -> pd.DataFrame:
+        """
+        获取最近 count 根分钟线（子类可选实现）
+
+        Returns:
+            包含 MINUTE_COLUMNS 列的 DataFrame（time 为 K 线结束时间）
+        """
+        raise NotImplementedError(f"{self.name} 不支持分钟线")
+
+    def get_minute_data(self, stock_code: str, period: int = 1, count: int = 240) -> pd.DataFrame:
+        """
+        获取分钟线（统一入口）
+
+        Args:
+            stock_code: 股票代码
+            period: 周期（分钟），取值见 MINUTE_PERIODS
+            count: 最近的 K 线根数
+
+        Returns:
+            按时间升序、time 唯一的标准化 DataFrame
+
+        Raises:
+            DataFetchError: 获取失败或无数据时抛出
+        """
+        if period not in MINUTE_PERIODS:
+            raise ValueError(f"不支持的分钟线周期: {period}，可选 {MINUTE_PERIODS}")
+
+        try:
+            raw_df = replay_call(
+                'fetch_minute',
+                (self.name, stock_code, period, count),
+                lambda: self._fetch_minute_raw(stock_code, period, count),
+                group=(self.name, stock_code, period),
+            )
+            if raw_df is None or raw_df.empty:
+                raise DataFetchError(f"[{self.name}] 未获取到 {stock_code} 的分钟线")
+
+            df = raw_df.reindex(columns=MINUTE_COLUMNS)
+            df['time'] = pd.to_datetime(df['time'])
+            for col in MINUTE_COLUMNS[1:]:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            df = (
+                df.dropna(subset=['time', 'close'])
+                .drop_duplicates(subset=['time'], keep='last')
+                .sort_values('time')
+                .reset_index(drop=True)
+            )
+            logger.debug(f"[{self.name}] {stock_code} {period} 分钟线 {len(df)} 根")
+            return df
+
+        except Exception as e:
+            logger.warning(f"[{self.name}] 获取 {stock_code} 分钟线失败: {e}")
+            raise DataFetchError(f"[{self.name}] {stock_code} 分钟线: {e}") from e
     
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -317,8 +495,16 @@ class DataFetcherManager:
     - 优先使用高优先级数据源
     - 失败后自动切换到下一个
     - 所有数据源都失败时抛出异常
+    
+    进程内共享：
+    - 通过 get_instance() / get_fetcher_manager() 获取共享实例，API、Bot、
+      分析流水线复用同一组数据源及其名称缓存、流控、熔断与连接池状态
+    - 直接构造 DataFetcherManager(fetchers=...) 仍可得到独立实例（用于测试）
     """
     
+    _shared_instance: Optional['DataFetcherManager'] = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self, fetchers: Optional[List[BaseFetcher]] = None):
         """
         初始化管理器
@@ -327,6 +513,13 @@ class DataFetcherManager:
             fetchers: 数据源列表（可选，默认按优先级自动创建）
         """
         self._fetchers: List[BaseFetcher] = []
+
+        # 日线数据源胜出统计（用于观察对冲请求的长尾收益）
+        self._daily_stats_lock = threading.Lock()
+        self._daily_source_stats: Dict[str, Any] = {'wins': {}, 'hedged_requests': 0, 'hedged_wins': 0}
+
+        # 各数据源 EWMA 延迟/成功率（用于自适应排序，静态优先级作为先验）
+        self._source_health = SourceHealthTracker()
         
         if fetchers:
             # 按优先级排序
@@ -335,6 +528,22 @@ class DataFetcherManager:
             # 默认数据源将在首次使用时延迟加载
             self._init_default_fetchers()
     
+    @classmethod
+    def get_instance(cls) -> 'DataFetcherManager':
+        """获取进程内共享实例（首次调用时初始化，线程安全）"""
+        if cls._shared_instance is None:
+            with cls._shared_lock:
+                if cls._shared_instance is None:
+                    cls._shared_instance = cls()
+                    logger.info("[数据源] 共享 DataFetcherManager 初始化完成")
+        return cls._shared_instance
+    
+    @classmethod
+    def reset_instance(cls) -> None:
+        """丢弃共享实例（用于测试或配置变更后重建数据源）"""
+        with cls._shared_lock:
+            cls._shared_instance = None
+    
     def _init_default_fetchers(self) -> None:
         """
         初始化默认数据源列表
@@ -388,13 +597,57 @@ class DataFetcherManager:
         """添加数据源并重新排序"""
         self._fetchers.append(fetcher)
         self._fetchers.sort(key=lambda f: f.priority)
+
+    def _rank_sources(self, category: str, sources: List[str]) -> List[str]:
+        """
+        按近期延迟与成功率调整数据源顺序
+
+        Args:
+            category: 调用类别（daily / realtime / chip / minute）
+            sources: 按静态优先级排列的数据源名称
+
+        Returns:
+            调整后的顺序；未启用 ADAPTIVE_SOURCE_PRIORITY 时原样返回
+        """
+        from src.config import get_config
+
+        if len(sources) < 2 or not get_config().adaptive_source_priority:
+            return list(sources)
+        return self._source_health.rank(category, sources)
+
+    def _ordered_fetchers(self) -> List[BaseFetcher]:
+        """获取日线数据源的当前尝试顺序"""
+        by_name = {f.name: f for f in self._fetchers}
+        return [by_name[name] for name in self._rank_sources('daily', [f.name for f in self._fetchers])]
+
+    def _daily_candidates(self, stock_code: str) -> List[BaseFetcher]:
+        """
+        获取能提供该代码日线的数据源（按当前尝试顺序）
+
+        不支持该市场的数据源直接跳过：既省去一次必然失败的调用，
+        也避免能力限制被记为数据源失败、拖累其在 A 股上的排序
+        """
+        return [f for f in self._ordered_fetchers() if f.supports_daily_code(stock_code)]
+
+    def get_source_health_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        获取各数据源健康度统计
+
+        Returns:
+            {类别: {数据源: {'latency': EWMA 耗时秒数, 'success_rate': EWMA 成功率, 'samples': 有效样本数}}}
+        """
+        return self._source_health.get_stats()
     
+    # 增量同步时从数据库回读的历史 K 线条数（保证 MA20 等指标在拼接处连续）
+    INCREMENTAL_LOOKBACK_BARS = 20
+
     def get_daily_data(
         self, 
         stock_code: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        days: int = 30
+        days: int = 30,
+        incremental: bool = False
     ) -> Tuple[pd.DataFrame, str]:
         """
         获取日线数据（自动切换数据源）
@@ -405,11 +658,17 @@ class DataFetcherManager:
         3. 记录每个数据源的失败原因
         4. 所有数据源失败后抛出详细异常
         
+        增量同步（incremental=True 且未指定 start_date）：
+        - 读取 stock_daily 中已存储的最新日期，只请求缺失区间
+        - 与本地历史 K 线拼接后重算均线/量比，仅返回新区间的数据
+        - 本地无数据或缺口过大时回退为全量获取
+        
         Args:
             stock_code: 股票代码
             start_date: 开始日期
             end_date: 结束日期
             days: 获取天数
+            incremental: 是否启用增量同步
             
         Returns:
             Tuple[DataFrame, str]: (数据, 成功的数据源名称)
@@ -420,9 +679,34 @@ class DataFetcherManager:
         # Normalize code (strip SH/SZ prefix etc.)
         stock_code = normalize_stock_code(stock_code)
 
+        if incremental and start_date is None:
+            result = self._get_daily_data_incremental(stock_code, end_date, days)
+            if result is not None:
+                return result
+
+        return self._fetch_daily_with_failover(stock_code, start_date, end_date, days)
+
+    def _fetch_daily_with_failover(
+        self,
+        stock_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        days: int
+    ) -> Tuple[pd.DataFrame, str]:
+        """按（自适应）优先级依次尝试各数据源获取日线数据（配置了对冲截止时间时并行对冲）"""
+        from src.config import get_config
+
+        if not any(f.supports_daily_code(stock_code) for f in self._fetchers):
+            raise DataFetchError(f"没有支持 {stock_code} 日线的数据源")
+
+        hedge_timeout = get_config().daily_hedge_timeout
+        if hedge_timeout > 0 and len(self._fetchers) > 1:
+            return self._fetch_daily_hedged(stock_code, start_date, end_date, days, hedge_timeout)
+
         errors = []
         
-        for fetcher in self._fetchers:
+        for fetcher in self._daily_candidates(stock_code):
+            call_start = time.time()
             try:
                 logger.info(f"尝试使用 [{fetcher.name}] 获取 {stock_code}...")
                 df = fetcher.get_daily_data(
@@ -432,11 +716,16 @@ class DataFetcherManager:
                     days=days
                 )
                 
-                if df is not None and not df.empty:
+                success = df is not None and not df.empty
+                self._source_health.record('daily', fetcher.name, time.time() - call_start, success)
+                if success:
                     logger.info(f"[{fetcher.name}] 成功获取 {stock_code}")
+                    self._record_daily_winner(fetcher.name, hedged=False)
                     return df, fetcher.name
                     
             except Exception as e:
+                if not isinstance(e, UnsupportedCodeError):
+                    self._source_health.record('daily', fetcher.name, time.time() - call_start, False)
                 error_msg = f"[{fetcher.name}] 失败: {str(e)}"
                 logger.warning(error_msg)
                 errors.append(error_msg)
@@ -447,6 +736,409 @@ class DataFetcherManager:
         error_summary = f"所有数据源获取 {stock_code} 失败:\n" + "\n".join(errors)
         logger.error(error_summary)
         raise DataFetchError(error_summary)
+
+    def _fetch_daily_hedged(
+        self,
+        stock_code: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        days: int,
+        hedge_timeout: float
+    ) -> Tuple[pd.DataFrame, str]:
+        """
+        对冲式并行故障切换
+
+        策略：
+        1. 启动最高优先级数据源
+        2. 超过 hedge_timeout 仍未返回，或已返回失败时，并行启动下一优先级数据源
+        3. 取第一个返回有效 DataFrame 的结果，其余请求结果直接丢弃
+        """
+        errors = []
+        pending: Dict[Any, BaseFetcher] = {}
+        launch_times: Dict[Any, float] = {}
+        ordered = self._daily_candidates(stock_code)
+        remaining = iter(ordered)
+        launched = 0
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=len(self._fetchers), thread_name_prefix="daily_hedge")
+
+        def launch_next() -> bool:
+            nonlocal launched
+            fetcher = next(remaining, None)
+            if fetcher is None:
+                return False
+            if launched > 0:
+                logger.info(f"[对冲请求] 并行启动 [{fetcher.name}] 获取 {stock_code}")
+            future = executor.submit(
+                contextvars.copy_context().run,
+                fetcher.get_daily_data,
+                stock_code=stock_code,
+                start_date=start_date,
+                end_date=end_date,
+                days=days
+            )
+            pending[future] = fetcher
+            launch_times[future] = time.time()
+            launched += 1
+            return True
+
+        try:
+            launch_next()
+            while pending:
+                done, _ = wait(list(pending), timeout=hedge_timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # 当前数据源超过截止时间未返回，启动下一个数据源对冲
+                    launch_next()
+                    continue
+
+                for future in done:
+                    fetcher = pending.pop(future)
+                    latency = time.time() - launch_times[future]
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        if not isinstance(e, UnsupportedCodeError):
+                            self._source_health.record('daily', fetcher.name, latency, False)
+                        error_msg = f"[{fetcher.name}] 失败: {str(e)}"
+                        logger.warning(error_msg)
+                        errors.append(error_msg)
+                        launch_next()
+                        continue
+
+                    success = df is not None and not df.empty
+                    self._source_health.record('daily', fetcher.name, latency, success)
+                    if success:
+                        hedged = launched > 1
+                        logger.info(
+                            f"[对冲请求] [{fetcher.name}] 胜出 {stock_code}，"
+                            f"耗时 {time.time() - start_time:.2f}s，已启动 {launched} 个数据源"
+                        )
+                        self._record_daily_winner(fetcher.name, hedged=hedged, primary=ordered[0].name)
+                        return df, fetcher.name
+
+                    errors.append(f"[{fetcher.name}] 返回空数据")
+                    launch_next()
+        finally:
+            # 不等待落败的请求，结果直接丢弃
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        error_summary = f"所有数据源获取 {stock_code} 失败:\n" + "\n".join(errors)
+        logger.error(error_summary)
+        raise DataFetchError(error_summary)
+
+    def _record_daily_winner(self, source_name: str, hedged: bool, primary: Optional[str] = None) -> None:
+        """记录日线数据的胜出数据源（primary 为本次请求首先启动的数据源）"""
+        with self._daily_stats_lock:
+            wins = self._daily_source_stats['wins']
+            wins[source_name] = wins.get(source_name, 0) + 1
+            if hedged:
+                self._daily_source_stats['hedged_requests'] += 1
+                if source_name != primary:
+                    self._daily_source_stats['hedged_wins'] += 1
+
+    def get_daily_source_stats(self) -> Dict[str, Any]:
+        """
+        获取日线数据源胜出统计
+
+        Returns:
+            {'wins': {数据源: 胜出次数}, 'hedged_requests': 触发对冲的请求数,
+             'hedged_wins': 由对冲数据源胜出的请求数}
+        """
+        with self._daily_stats_lock:
+            return {
+                'wins': dict(self._daily_source_stats['wins']),
+                'hedged_requests': self._daily_source_stats['hedged_requests'],
+                'hedged_wins': self._daily_source_stats['hedged_wins'],
+            }
+
+    def _get_daily_data_incremental(
+        self,
+        stock_code: str,
+        end_date: Optional[str],
+        days: int
+    ) -> Optional[Tuple[pd.DataFrame, str]]:
+        """
+        增量同步日线数据
+
+        从本地最新日期（含当日，用于刷新盘中未收盘的 K 线）请求到 end_date，
+        再与本地最近 INCREMENTAL_LOOKBACK_BARS 根 K 线拼接重算技术指标。
+
+        Returns:
+            (仅包含新区间的 DataFrame, 数据源名称)；需要回退全量获取时返回 None
+        """
+        last_date = self._get_incremental_start(stock_code, end_date, days)
+        if last_date is None:
+            return None
+
+        if end_date is None:
+            local = self._get_local_if_up_to_date(stock_code, last_date)
+            if local is not None:
+                return local
+
+        start_date = last_date.strftime('%Y-%m-%d')
+        df, source_name = self._fetch_daily_with_failover(stock_code, start_date, end_date, days)
+        fetcher = next(f for f in self._fetchers if f.name == source_name)
+        merged = self._merge_with_history(stock_code, last_date, df, fetcher)
+        if merged is None:
+            # 复权口径与本地历史不一致，全量窗口覆盖，避免拼接出错位的 K 线
+            return self._fetch_daily_with_failover(stock_code, None, end_date, days)
+        return merged, source_name
+
+    def _get_incremental_start(
+        self,
+        stock_code: str,
+        end_date: Optional[str],
+        days: int
+    ) -> Optional[date]:
+        """
+        获取增量同步的起始日期（本地已存储的最新日期）
+
+        Returns:
+            起始日期；本地无数据、缺口过大或读取失败时返回 None（回退全量获取）
+        """
+        from src.storage import get_db
+
+        try:
+            last_date = get_db().get_latest_date(stock_code)
+        except Exception as e:
+            logger.warning(f"[增量同步] 读取 {stock_code} 本地最新日期失败，回退全量获取: {e}")
+            return None
+
+        if last_date is None:
+            logger.info(f"[增量同步] {stock_code} 本地无历史数据，执行全量获取")
+            return None
+
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else date.today()
+        if last_date < end_dt - timedelta(days=days * 2):
+            logger.info(f"[增量同步] {stock_code} 本地最新日期 {last_date} 缺口过大，执行全量获取")
+            return None
+
+        logger.info(f"[增量同步] {stock_code} 本地最新 {last_date}，仅获取 {last_date} ~ {end_dt}")
+        return last_date
+
+    def _get_local_if_up_to_date(
+        self,
+        stock_code: str,
+        last_date: date
+    ) -> Optional[Tuple[pd.DataFrame, str]]:
+        """
+        本地最新日线已是最新应有 K 线（按交易日历）时，直接返回本地数据
+
+        周末、节假日及盘前盘中请求不会产生新 K 线，无需访问数据源
+
+        Returns:
+            (本地最新一根 K 线, LOCAL_CACHE_SOURCE)；需要请求数据源时返回 None
+        """
+        from src.storage import get_db
+        from src.trading_calendar import get_trading_calendar
+
+        try:
+            if not get_trading_calendar().is_bar_up_to_date(stock_code, last_date):
+                return None
+            local = get_db().get_daily_frame(stock_code, last_date, last_date)
+        except Exception as e:
+            logger.debug(f"[增量同步] {stock_code} 交易日历检查失败: {e}")
+            return None
+        if local is None or local.empty:
+            return None
+        logger.info(f"[增量同步] {stock_code} 本地最新 {last_date} 已是最新交易日数据，跳过请求")
+        return local, LOCAL_CACHE_SOURCE
+
+    def _merge_with_history(
+        self,
+        stock_code: str,
+        last_date: date,
+        df: pd.DataFrame,
+        fetcher: BaseFetcher
+    ) -> Optional[pd.DataFrame]:
+        """
+        将增量数据与本地最近 K 线拼接后重算指标，仅返回 last_date 及之后的数据
+
+        - 均线/量比与涨跌幅（pct_chg）均按拼接后的收盘价重算：短窗口首行由
+          close.pct_change() 得到的 0/NaN 不会覆盖本地已存储的正确值
+        - 以重叠日 last_date 的开盘价校验复权口径（开盘后开盘价即固定，
+          盘中写入的未收盘 K 线同样适用）
+
+        Returns:
+            拼接后的 DataFrame；重叠 K 线缺失或复权口径不一致时返回 None（调用方回退全量获取）
+        """
+        from src.storage import get_db
+
+        stored = get_db().get_latest_data(stock_code, days=self.INCREMENTAL_LOOKBACK_BARS + 1)
+        history = [bar.to_dict() for bar in stored if bar.date < last_date]
+        if not history:
+            return df
+
+        columns = [col for col in STANDARD_COLUMNS if col in df.columns]
+        history_df = pd.DataFrame(history)[columns]
+        new_df = df[columns].copy()
+        history_df['date'] = pd.to_datetime(history_df['date'])
+        new_df['date'] = pd.to_datetime(new_df['date'])
+
+        if not self._overlap_matches(stock_code, last_date, stored, new_df):
+            return None
+
+        merged = pd.concat([history_df, new_df], ignore_index=True)
+        merged = merged.drop_duplicates(subset=['date'], keep='last')
+        merged = merged.sort_values('date').reset_index(drop=True)
+
+        if 'pct_chg' in merged.columns:
+            recomputed = (merged['close'].pct_change() * 100).round(2)
+            is_new = merged['date'] >= pd.Timestamp(last_date)
+            merged.loc[is_new, 'pct_chg'] = recomputed[is_new]
+
+        merged = fetcher._calculate_indicators(merged)
+        return merged[merged['date'] >= pd.Timestamp(last_date)].reset_index(drop=True)
+
+    @staticmethod
+    def _overlap_matches(
+        stock_code: str,
+        last_date: date,
+        stored: List[Any],
+        new_df: pd.DataFrame
+    ) -> bool:
+        """校验增量数据中 last_date 的开盘价与本地一致（允许 1 分钱的舍入差异）"""
+        stored_bar = next((bar for bar in stored if bar.date == last_date), None)
+        if stored_bar is None or stored_bar.open is None:
+            return True
+        overlap = new_df[new_df['date'] == pd.Timestamp(last_date)]
+        if overlap.empty or 'open' not in overlap.columns:
+            logger.warning(f"[增量同步] {stock_code} 增量数据缺少重叠日 {last_date}，无法校验复权口径，回退全量获取")
+            return False
+
+        stored_open = float(stored_bar.open)
+        fetched_open = float(overlap['open'].iloc[-1])
+        if abs(fetched_open - stored_open) > max(0.011, abs(stored_open) * 0.001):
+            logger.warning(
+                f"[增量同步] {stock_code} {last_date} 开盘价与本地不一致"
+                f"（本地 {stored_open}，新数据 {fetched_open}），复权口径可能变化，回退全量获取"
+            )
+            return False
+        return True
+
+    def get_daily_data_batch(
+        self,
+        stock_codes: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        days: int = 30,
+        incremental: bool = False
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:
+        """
+        批量获取多只股票的日线数据
+
+        策略：
+        1. 按起始日期分组（增量同步时各代码的起点可能不同）
+        2. 代码的首选日线数据源（当前顺序中第一个支持该代码的数据源）支持批量时
+           （Tushare 合并 ts_code、Pytdx 复用连接、Yfinance 多 ticker 下载），一次请求覆盖多只股票；
+           不会为了批量越过不支持批量的高优先级数据源，保证复权口径与逐只获取一致
+        3. 批量未覆盖或失败的代码，逐只走 get_daily_data 故障切换
+
+        Args:
+            stock_codes: 股票代码列表
+            start_date: 开始日期
+            end_date: 结束日期
+            days: 获取天数
+            incremental: 是否启用增量同步
+
+        Returns:
+            {股票代码: (DataFrame, 数据源名称)}，全部数据源失败的代码不包含在内
+        """
+        codes = list(dict.fromkeys(normalize_stock_code(c) for c in stock_codes))
+        results: Dict[str, Tuple[pd.DataFrame, str]] = {}
+
+        groups: Dict[Optional[str], List[str]] = {}
+        last_dates: Dict[str, date] = {}
+        # 复权口径与本地不一致的代码，逐只全量获取
+        full_refetch = set()
+        for code in codes:
+            group_start = start_date
+            if incremental and start_date is None:
+                last_date = self._get_incremental_start(code, end_date, days)
+                if last_date is not None:
+                    local = self._get_local_if_up_to_date(code, last_date) if end_date is None else None
+                    if local is not None:
+                        results[code] = local
+                        continue
+                    last_dates[code] = last_date
+                    group_start = last_date.strftime('%Y-%m-%d')
+            groups.setdefault(group_start, []).append(code)
+
+        ordered = self._ordered_fetchers()
+        heads = {
+            code: next((f for f in ordered if f.supports_daily_code(code)), None)
+            for code in codes
+        }
+        for group_start, group_codes in groups.items():
+            pending = list(group_codes)
+            for fetcher in ordered:
+                batch_codes = [c for c in pending if heads[c] is fetcher and fetcher.supports_batch_code(c)]
+                # 单只股票无需批量，交给逐只故障切换
+                if len(batch_codes) < 2:
+                    continue
+                try:
+                    batch = fetcher.get_daily_data_batch(batch_codes, group_start, end_date, days)
+                except Exception as e:
+                    logger.warning(f"[批量获取] [{fetcher.name}] 失败，改由其他数据源获取: {e}")
+                    continue
+
+                for code, df in batch.items():
+                    if code in last_dates:
+                        df = self._merge_with_history(code, last_dates[code], df, fetcher)
+                        if df is None:
+                            full_refetch.add(code)
+                            continue
+                    results[code] = (df, fetcher.name)
+                pending = [c for c in pending if c not in batch]
+                if not pending:
+                    break
+
+        leftovers = [c for c in codes if c not in results]
+        logger.info(f"[批量获取] 批量覆盖 {len(results)}/{len(codes)} 只，剩余 {len(leftovers)} 只逐只获取")
+        for code in leftovers:
+            try:
+                results[code] = self.get_daily_data(
+                    code, start_date, end_date, days, incremental=incremental and code not in full_refetch
+                )
+            except DataFetchError as e:
+                logger.warning(f"[批量获取] {code} 逐只获取失败: {e}")
+
+        return results
+
+    def get_minute_data(self, stock_code: str, period: int = 1, count: int = 240) -> Tuple[pd.DataFrame, str]:
+        """
+        获取分钟线（自动切换数据源）
+
+        Args:
+            stock_code: 股票代码
+            period: 周期（分钟），取值见 MINUTE_PERIODS
+            count: 最近的 K 线根数
+
+        Returns:
+            Tuple[DataFrame, str]: (分钟线, 成功的数据源名称)
+
+        Raises:
+            DataFetchError: 没有支持该代码的数据源或全部失败时抛出
+        """
+        stock_code = normalize_stock_code(stock_code)
+        errors = []
+
+        candidates = [f for f in self._fetchers if f.supports_minute_data(stock_code)]
+        by_name = {f.name: f for f in candidates}
+        for name in self._rank_sources('minute', list(by_name)):
+            fetcher = by_name[name]
+            call_start = time.time()
+            try:
+                df = fetcher.get_minute_data(stock_code, period, count)
+                self._source_health.record('minute', name, time.time() - call_start, True)
+                return df, name
+            except Exception as e:
+                self._source_health.record('minute', name, time.time() - call_start, False)
+                errors.append(f"[{name}] 失败: {e}")
+
+        if not candidates:
+            raise DataFetchError(f"没有支持 {stock_code} 分钟线的数据源")
+        raise DataFetchError(f"所有数据源获取 {stock_code} 分钟线失败:\n" + "\n".join(errors))
     
     @property
     def available_fetchers(self) -> List[str]:
@@ -459,11 +1151,11 @@ class DataFetcherManager:
         
         策略：
         1. 检查优先级中是否包含全量拉取数据源（efinance/akshare_em）
-        2. 如果不包含，跳过预取（新浪/腾讯是单股票查询，无需预取）
+        2. 如果不包含，前两位中的新浪/腾讯按 URL 长度分批一次拉取整个列表，填充逐股缓存
         3. 如果自选股数量 >= 5 且使用全量数据源，则预取填充缓存
         
         这样做的好处：
-        - 使用新浪/腾讯时：每只股票独立查询，无全量拉取问题
+        - 使用新浪/腾讯时：几次批量请求代替每只股票一次请求，后续缓存命中
         - 使用 efinance/东财时：预取一次，后续缓存命中
         
         Args:
@@ -499,10 +1191,9 @@ class DataFetcherManager:
                 first_bulk_source_index = i
                 break
         
-        # 如果没有全量数据源，或者全量数据源排在第 3 位之后，跳过预取
+        # 如果没有全量数据源，或者全量数据源排在第 3 位之后，改为批量预取新浪/腾讯
         if first_bulk_source_index is None or first_bulk_source_index >= 2:
-            logger.info(f"[预取] 当前优先级使用轻量级数据源(sina/tencent)，无需预取")
-            return 0
+            return self._prefetch_light_quotes(stock_codes, priority_list[:2])
         
         # 如果股票数量少于 5 个，不进行批量预取（逐个查询更高效）
         if len(stock_codes) < 5:
@@ -529,6 +1220,43 @@ class DataFetcherManager:
             logger.error(f"[预取] 批量预取异常: {e}")
             return 0
     
+    def _prefetch_light_quotes(self, stock_codes: List[str], sources: List[str]) -> int:
+        """
+        通过新浪/腾讯批量接口预取实时行情（供 prefetch_realtime_quotes 调用）
+
+        补充字段时会用到排在后面的轻量数据源，因此前两位中的新浪/腾讯都会预取。
+
+        Returns:
+            预取成功的股票数量（多个数据源取最大值）
+        """
+        light_sources = []
+        for source in sources:
+            if source == 'akshare_sina':
+                light_sources.append('sina')
+            elif source in ('tencent', 'akshare_qq'):
+                light_sources.append('tencent')
+        fetcher = next((f for f in self._fetchers if f.name == "AkshareFetcher"), None)
+        if not light_sources or fetcher is None or not hasattr(fetcher, 'get_realtime_quotes_batch'):
+            logger.info("[预取] 当前优先级没有可批量预取的数据源，跳过预取")
+            return 0
+
+        codes = tuple(dict.fromkeys(stock_codes))
+        prefetched = 0
+        for source in dict.fromkeys(light_sources):
+            try:
+                quotes = replay_call(
+                    'realtime_quote_batch', (source, codes),
+                    lambda s=source: fetcher.get_realtime_quotes_batch(list(codes), source=s),
+                    on_miss={},
+                )
+            except Exception as e:
+                logger.warning(f"[预取] {source} 批量预取异常: {e}")
+                continue
+            prefetched = max(prefetched, len(quotes or {}))
+            logger.info(f"[预取] {source} 批量预取完成: {len(quotes or {})}/{len(codes)} 只")
+        return prefetched
+
+    @replayable('realtime_quote', on_miss=None)
     def get_realtime_quote(self, stock_code: str):
         """
         获取实时行情数据（自动故障切换）
@@ -577,8 +1305,11 @@ class DataFetcherManager:
             logger.warning(f"[实时行情] 美股 {stock_code} 无可用数据源")
             return None
         
-        # 获取配置的数据源优先级
-        source_priority = config.realtime_source_priority.split(',')
+        # 获取配置的数据源优先级（按近期延迟/成功率自适应调整）
+        source_priority = self._rank_sources(
+            'realtime',
+            [s.strip().lower() for s in config.realtime_source_priority.split(',') if s.strip()]
+        )
         
         errors = []
         # primary_quote holds the first successful result; we may supplement
@@ -586,8 +1317,7 @@ class DataFetcherManager:
         primary_quote = None
         
         for source in source_priority:
-            source = source.strip().lower()
-            
+            call_start = time.time()
             try:
                 quote = None
                 
@@ -631,7 +1361,9 @@ class DataFetcherManager:
                                 quote = fetcher.get_realtime_quote(stock_code)
                             break
                 
-                if quote is not None and quote.has_basic_data():
+                success = quote is not None and quote.has_basic_data()
+                self._source_health.record('realtime', source, time.time() - call_start, success)
+                if success:
                     if primary_quote is None:
                         # First successful source becomes primary
                         primary_quote = quote
@@ -639,7 +1371,10 @@ class DataFetcherManager:
                         # If all key supplementary fields are present, return early
                         if not self._quote_needs_supplement(primary_quote):
                             return primary_quote
-                        # Otherwise, continue to try later sources for missing fields
+                        # Otherwise, continue to try later sources for missing fields.
+                        # The quote may be the instance held by the shared realtime /
+                        # light-quote cache, so supplement a copy instead of mutating it.
+                        primary_quote = dataclasses.replace(primary_quote)
                         logger.debug(f"[实时行情] {stock_code} 部分字段缺失，尝试从后续数据源补充")
                         supplement_attempts = 0
                     else:
@@ -656,6 +1391,7 @@ class DataFetcherManager:
                             break
                     
             except Exception as e:
+                self._source_health.record('realtime', source, time.time() - call_start, False)
                 error_msg = f"[{source}] 失败: {str(e)}"
                 logger.warning(error_msg)
                 errors.append(error_msg)
@@ -704,15 +1440,17 @@ class DataFetcherManager:
                     filled.append(f)
         return filled
 
+    @replayable('chip_distribution', on_miss=None)
     def get_chip_distribution(self, stock_code: str):
         """
         获取筹码分布数据（带熔断和多数据源降级）
 
         策略：
         1. 检查配置开关
-        2. 检查熔断器状态
-        3. 依次尝试多个数据源：AkshareFetcher -> TushareFetcher -> EfinanceFetcher
-        4. 所有数据源失败则返回 None（降级兜底）
+        2. 命中当日 chip_snapshot 缓存则直接返回
+        3. 检查熔断器状态
+        4. 依次尝试多个数据源：AkshareFetcher -> TushareFetcher -> EfinanceFetcher，成功后写入缓存
+        5. 所有数据源失败则返回最近一次缓存数据，无缓存时返回 None（降级兜底）
 
         Args:
             stock_code: 股票代码
@@ -733,6 +1471,18 @@ class DataFetcherManager:
             logger.debug(f"[筹码分布] 功能已禁用，跳过 {stock_code}")
             return None
 
+        # 美股、ETF/指数没有筹码分布数据，不请求数据源（避免被记为数据源失败）
+        from .akshare_fetcher import _is_etf_code, _is_us_code
+        if _is_us_code(stock_code) or _is_etf_code(stock_code):
+            logger.debug(f"[筹码分布] {stock_code} 无筹码分布数据，跳过")
+            return None
+
+        # 当日已获取的筹码数据直接复用（每个交易日只更新一次）
+        cached = self._load_cached_chip(stock_code)
+        if cached is not None:
+            logger.debug(f"[筹码分布] {stock_code} 命中交易日缓存 (日期: {cached.date})")
+            return cached
+
         circuit_breaker = get_chip_circuit_breaker()
 
         # 定义筹码数据源优先级列表
@@ -741,6 +1491,9 @@ class DataFetcherManager:
             ("TushareFetcher", "tushare_chip"),
             ("EfinanceFetcher", "efinance_chip"),
         ]
+        # 按近期延迟/成功率自适应调整顺序
+        chip_order = self._rank_sources('chip', [key for _, key in chip_sources])
+        chip_sources.sort(key=lambda item: chip_order.index(item[1]))
 
         for fetcher_name, source_key in chip_sources:
             # 检查熔断器状态
@@ -748,32 +1501,128 @@ class DataFetcherManager:
                 logger.debug(f"[熔断] {fetcher_name} 筹码接口处于熔断状态，尝试下一个")
                 continue
 
+            call_start = time.time()
             try:
                 for fetcher in self._fetchers:
                     if fetcher.name == fetcher_name:
                         if hasattr(fetcher, 'get_chip_distribution'):
                             chip = fetcher.get_chip_distribution(stock_code)
+                            self._source_health.record(
+                                'chip', source_key, time.time() - call_start, chip is not None
+                            )
                             if chip is not None:
                                 circuit_breaker.record_success(source_key)
                                 logger.info(f"[筹码分布] {stock_code} 成功获取 (来源: {fetcher_name})")
+                                self._save_chip_cache(chip)
                                 return chip
                         break
             except Exception as e:
+                self._source_health.record('chip', source_key, time.time() - call_start, False)
                 logger.warning(f"[筹码分布] {fetcher_name} 获取 {stock_code} 失败: {e}")
                 circuit_breaker.record_failure(source_key, str(e))
                 continue
 
+        # 降级兜底：返回最近一次缓存的筹码数据（即使不是最新交易日）
+        stale = self._load_cached_chip(stock_code, allow_stale=True)
+        if stale is not None:
+            logger.warning(f"[筹码分布] {stock_code} 所有数据源均失败，使用 {stale.date} 的缓存数据")
+            return stale
         logger.warning(f"[筹码分布] {stock_code} 所有数据源均失败")
         return None
 
+    # 最新交易日筹码数据尚未取到时，重新检查是否已发布的间隔（分钟）
+    CHIP_RECHECK_MINUTES = 30
+
+    @classmethod
+    def _chip_snapshot_is_fresh(
+        cls,
+        stock_code: str,
+        trade_date: date,
+        fetched_at: Optional[datetime],
+        now: Optional[datetime] = None
+    ) -> bool:
+        """
+        判断缓存的筹码数据在当前时间是否仍是最新
+
+        以交易日历的"最新应有 K 线日期"为准（按交易所当地时间，周末、节假日沿用上一交易日）：
+        - 已覆盖最新应有日期：有效
+        - 最新应有日期的数据尚未发布：获取时已处于同一最新应有日期，且距今不足
+          CHIP_RECHECK_MINUTES 时视为有效，否则重新检查
+
+        Args:
+            now: 当前时间；不带时区的时间（含 fetched_at）视为本机当地时间
+        """
+        from src.trading_calendar import get_trading_calendar
+
+        calendar = get_trading_calendar()
+        now = (now or datetime.now()).astimezone()
+        expected = calendar.expected_bar_date_for(stock_code, now)
+        if trade_date >= expected:
+            return True
+        if fetched_at is None:
+            return False
+        fetched_at = fetched_at.astimezone()
+        if calendar.expected_bar_date_for(stock_code, fetched_at) < expected:
+            return False
+        return now - fetched_at < timedelta(minutes=cls.CHIP_RECHECK_MINUTES)
+
+    def _load_cached_chip(self, stock_code: str, allow_stale: bool = False):
+        """
+        从 chip_snapshot 表读取筹码数据
+
+        Args:
+            stock_code: 股票代码
+            allow_stale: 是否允许返回非最新交易日的数据（数据源全部失败时兜底）
+
+        Returns:
+            ChipDistribution 对象，无可用缓存时返回 None
+        """
+        from .realtime_types import ChipDistribution
+        from src.storage import get_db
+
+        try:
+            snapshot = get_db().get_latest_chip_snapshot(stock_code)
+        except Exception as e:
+            logger.debug(f"[筹码分布] 读取 {stock_code} 缓存失败: {e}")
+            return None
+        if snapshot is None:
+            return None
+        if not allow_stale and not self._chip_snapshot_is_fresh(
+            stock_code, snapshot['trade_date'], snapshot['fetched_at']
+        ):
+            return None
+
+        values = {
+            key: value for key, value in snapshot.items()
+            if key not in ('code', 'trade_date', 'fetched_at', 'source') and value is not None
+        }
+        return ChipDistribution(
+            code=stock_code,
+            date=snapshot['trade_date'].strftime('%Y-%m-%d'),
+            source=snapshot['source'] or '',
+            **values,
+        )
+
+    def _save_chip_cache(self, chip) -> None:
+        """保存筹码数据到 chip_snapshot 表（失败不影响主流程）"""
+        from dataclasses import asdict
+        from src.storage import get_db
+
+        try:
+            get_db().save_chip_snapshot(asdict(chip))
+        except Exception as e:
+            logger.debug(f"[筹码分布] 保存 {chip.code} 缓存失败: {e}")
+
     def get_stock_name(self, stock_code: str) -> Optional[str]:
         """
         获取股票中文名称（自动切换数据源）
         
         尝试从多个数据源获取股票名称：
-        1. 先从实时行情缓存中获取（如果有）
-        2. 依次尝试各个数据源的 get_stock_name 方法
-        3. 最后尝试让大模型通过搜索获取（需要外部调用）
+        1. 先从证券主数据内存索引中获取（无网络请求）
+        2. 从实时行情中获取
+        3. 依次尝试各个数据源的 get_stock_name 方法
+        
+        后两步解析到的名称会补录到证券主数据，下次直接命中。
         
         Args:
             stock_code: 股票代码
@@ -781,22 +1630,22 @@ class DataFetcherManager:
         Returns:
             股票中文名称，所有数据源都失败则返回 None
         """
+        from src.security_master import get_security_master
+
         # Normalize code (strip SH/SZ prefix etc.)
         stock_code = normalize_stock_code(stock_code)
+        master = get_security_master()
 
-        # 1. 先检查缓存
-        if hasattr(self, '_stock_name_cache') and stock_code in self._stock_name_cache:
-            return self._stock_name_cache[stock_code]
-        
-        # 初始化缓存
-        if not hasattr(self, '_stock_name_cache'):
-            self._stock_name_cache = {}
+        # 1. 证券主数据
+        name = master.get_name(stock_code)
+        if name:
+            return name
         
-        # 2. 尝试从实时行情中获取（最快）
+        # 2. 尝试从实时行情中获取
         quote = self.get_realtime_quote(stock_code)
         if quote and hasattr(quote, 'name') and quote.name:
             name = quote.name
-            self._stock_name_cache[stock_code] = name
+            master.remember(stock_code, name, 'realtime')
             logger.info(f"[股票名称] 从实时行情获取: {stock_code} -> {name}")
             return name
         
@@ -806,7 +1655,7 @@ class DataFetcherManager:
                 try:
                     name = fetcher.get_stock_name(stock_code)
                     if name:
-                        self._stock_name_cache[stock_code] = name
+                        master.remember(stock_code, name, fetcher.name)
                         logger.info(f"[股票名称] 从 {fetcher.name} 获取: {stock_code} -> {name}")
                         return name
                 except Exception as e:
@@ -821,8 +1670,8 @@ class DataFetcherManager:
         """
         批量获取股票中文名称
         
-        先尝试从支持批量查询的数据源获取股票列表，
-        然后再逐个查询缺失的股票名称。
+        先从证券主数据获取；有缺失且主数据已过期时批量刷新一次，
+        然后再逐个查询仍缺失的股票名称。
         
         Args:
             stock_codes: 股票代码列表
@@ -830,54 +1679,57 @@ class DataFetcherManager:
         Returns:
             {股票代码: 股票名称} 字典
         """
-        result = {}
-        missing_codes = set(stock_codes)
-        
-        # 1. 先检查缓存
-        if not hasattr(self, '_stock_name_cache'):
-            self._stock_name_cache = {}
-        
-        for code in stock_codes:
-            if code in self._stock_name_cache:
-                result[code] = self._stock_name_cache[code]
-                missing_codes.discard(code)
+        from src.security_master import get_security_master
+
+        master = get_security_master()
+
+        # 1. 证券主数据
+        result = master.get_names(stock_codes)
+        missing_codes = [code for code in stock_codes if code not in result]
         
-        if not missing_codes:
-            return result
-        
-        # 2. 尝试批量获取股票列表
-        for fetcher in self._fetchers:
-            if hasattr(fetcher, 'get_stock_list') and missing_codes:
-                try:
-                    stock_list = fetcher.get_stock_list()
-                    if stock_list is not None and not stock_list.empty:
-                        for _, row in stock_list.iterrows():
-                            code = row.get('code')
-                            name = row.get('name')
-                            if code and name:
-                                self._stock_name_cache[code] = name
-                                if code in missing_codes:
-                                    result[code] = name
-                                    missing_codes.discard(code)
-                        
-                        if not missing_codes:
-                            break
-                        
-                        logger.info(f"[股票名称] 从 {fetcher.name} 批量获取完成，剩余 {len(missing_codes)} 个待查")
-                except Exception as e:
-                    logger.debug(f"[股票名称] {fetcher.name} 批量获取失败: {e}")
-                    continue
+        # 2. 主数据过期时批量刷新
+        if missing_codes and self.refresh_security_master():
+            result.update(master.get_names(missing_codes))
+            missing_codes = [code for code in missing_codes if code not in result]
         
         # 3. 逐个获取剩余的
-        for code in list(missing_codes):
+        for code in missing_codes:
             name = self.get_stock_name(code)
             if name:
                 result[code] = name
-                missing_codes.discard(code)
         
         logger.info(f"[股票名称] 批量获取完成，成功 {len(result)}/{len(stock_codes)}")
         return result
 
+    def refresh_security_master(self, force: bool = False) -> int:
+        """
+        从支持 get_stock_list 的数据源批量刷新证券主数据（默认每日一次）
+        
+        Args:
+            force: 忽略刷新间隔强制刷新
+            
+        Returns:
+            刷新的记录数，未到刷新时间时为 0
+        """
+        from src.security_master import get_security_master
+
+        return get_security_master().refresh(self._fetchers, force=force)
+
+    def refresh_trading_calendar(self, markets: Optional[List[str]] = None, force: bool = False) -> int:
+        """
+        从支持 get_trade_dates 的数据源刷新交易日历（每个市场每日最多一次，覆盖充足时跳过）
+
+        Args:
+            markets: 需要刷新的市场（cn / hk / us），默认全部
+            force: 忽略刷新条件强制刷新
+
+        Returns:
+            刷新的交易日数
+        """
+        from src.trading_calendar import MARKETS, get_trading_calendar
+
+        return get_trading_calendar().refresh(self._fetchers, markets=markets or MARKETS, force=force)
+
     def get_main_indices(self) -> List[Dict[str, Any]]:
         """获取主要指数实时行情（自动切换数据源）"""
         for fetcher in self._fetchers:
@@ -891,8 +1743,24 @@ class DataFetcherManager:
                 continue
         return []
 
-    def get_market_stats(self) -> Dict[str, Any]:
-        """获取市场涨跌统计（自动切换数据源）"""
+    def get_market_stats(self, trade_date: Optional[date] = None) -> Dict[str, Any]:
+        """
+        获取市场涨跌统计（自动切换数据源）
+
+        Args:
+            trade_date: 交易日（默认当天）。历史日期只读取本地快照归档，不访问网络；
+                        当天所有数据源失败时回退归档中当天最后一次快照
+        """
+        from src.snapshot_archive import get_snapshot_archive
+
+        archive = get_snapshot_archive()
+        trade_date = trade_date or date.today()
+        if trade_date < date.today():
+            stats = archive.market_stats(trade_date) if archive is not None else None
+            if not stats:
+                logger.warning(f"[快照归档] 没有 {trade_date} 的全市场快照")
+            return stats or {}
+
         for fetcher in self._fetchers:
             try:
                 data = fetcher.get_market_stats()
@@ -902,7 +1770,11 @@ class DataFetcherManager:
             except Exception as e:
                 logger.warning(f"[{fetcher.name}] 获取市场统计失败: {e}")
                 continue
-        return {}
+
+        stats = archive.market_stats(trade_date) if archive is not None else None
+        if stats:
+            logger.info("[快照归档] 数据源均失败，使用当天最后一次快照计算市场统计")
+        return stats or {}
 
     def get_sector_rankings(self, n: int = 5) -> Tuple[List[Dict], List[Dict]]:
         """获取板块涨跌榜（自动切换数据源）"""
@@ -916,3 +1788,8 @@ class DataFetcherManager:
                 logger.warning(f"[{fetcher.name}] 获取板块排行失败: {e}")
                 continue
         return [], []
+
+
+def get_fetcher_manager() -> DataFetcherManager:
+    """获取共享数据源管理器的快捷方式"""
+    return DataFetcherManager.get_instance()
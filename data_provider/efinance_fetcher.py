@@ -40,11 +40,15 @@ from tenacity import (
 )
 
 from patch.eastmoney_patch import eastmoney_patch
-from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from src.snapshot_archive import archive_realtime_snapshot
+from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS, UnsupportedCodeError
+from .rate_limiter import get_rate_limiter
+from .shared_cache import refresh_through_shared_cache
+from .single_flight import SingleFlight
 from .realtime_types import (
-    UnifiedRealtimeQuote, RealtimeSource,
+    UnifiedRealtimeQuote, RealtimeSource, RealtimeSnapshot,
     get_realtime_circuit_breaker,
-    safe_float, safe_int  # 使用统一的类型转换函数
+    safe_float  # 使用统一的类型转换函数
 )
 
 
@@ -106,8 +110,10 @@ USER_AGENTS = [
 
 # 缓存实时行情数据（避免重复请求）
 # TTL 设为 10 分钟 (600秒)：批量分析场景下避免重复拉取
+# snapshot 为按代码索引的 RealtimeSnapshot，随 data 一起刷新（data 被其他途径刷新时置 None 重建）
 _realtime_cache: Dict[str, Any] = {
     'data': None,
+    'snapshot': None,
     'timestamp': 0,
     'ttl': 600  # 10分钟缓存有效期
 }
@@ -115,10 +121,55 @@ _realtime_cache: Dict[str, Any] = {
 # ETF 实时行情缓存（与股票分开缓存）
 _etf_realtime_cache: Dict[str, Any] = {
     'data': None,
+    'snapshot': None,
     'timestamp': 0,
     'ttl': 600  # 10分钟缓存有效期
 }
 
+# 实时行情列名映射 {UnifiedRealtimeQuote 字段: (中文列名, 英文列名)}
+_QUOTE_CODE_COLUMNS = ('股票代码', 'code')
+_QUOTE_NAME_COLUMNS = ('股票名称', 'name')
+_ETF_QUOTE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'price': ('最新价', 'price'),
+    'change_pct': ('涨跌幅', 'pct_chg'),
+    'change_amount': ('涨跌额', 'change'),
+    'volume': ('成交量', 'volume'),
+    'amount': ('成交额', 'amount'),
+    'turnover_rate': ('换手率', 'turnover_rate'),
+    'amplitude': ('振幅', 'amplitude'),
+    'high': ('最高', 'high'),
+    'low': ('最低', 'low'),
+    'open_price': ('开盘', 'open'),
+}
+_STOCK_QUOTE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    **_ETF_QUOTE_COLUMNS,
+    # efinance 股票行情额外返回量比、市盈率、市值等字段
+    'volume_ratio': ('量比', 'volume_ratio'),
+    'pe_ratio': ('市盈率', 'pe_ratio'),
+    'total_mv': ('总市值', 'total_mv'),
+    'circ_mv': ('流通市值', 'circ_mv'),
+}
+
+
+# 全量行情刷新合并：缓存过期瞬间多个线程同时未命中时，只有一个线程真正请求
+_refresh_flight = SingleFlight()
+
+
+def _is_cache_fresh(cache: Dict[str, Any]) -> bool:
+    """缓存是否在有效期内"""
+    return cache['data'] is not None and time.time() - cache['timestamp'] < cache['ttl']
+
+
+def _get_cached_snapshot(cache: Dict[str, Any], field_columns: Dict[str, Tuple[str, ...]]) -> RealtimeSnapshot:
+    """获取缓存对应的代码索引快照，未构建时基于缓存的 DataFrame 构建一次"""
+    snapshot = cache.get('snapshot')
+    if snapshot is None:
+        snapshot = RealtimeSnapshot.from_dataframe(
+            cache['data'], _QUOTE_CODE_COLUMNS, _QUOTE_NAME_COLUMNS, field_columns
+        )
+        cache['snapshot'] = snapshot
+    return snapshot
+
 
 def _is_etf_code(stock_code: str) -> bool:
     """
@@ -172,17 +223,12 @@ class EfinanceFetcher(BaseFetcher):
     name = "EfinanceFetcher"
     priority = int(os.getenv("EFINANCE_PRIORITY", "0"))  # 最高优先级，排在 AkshareFetcher 之前
     
-    def __init__(self, sleep_min: float = 1.5, sleep_max: float = 3.0):
+    def __init__(self):
         """
         初始化 EfinanceFetcher
-        
-        Args:
-            sleep_min: 最小休眠时间（秒）
-            sleep_max: 最大休眠时间（秒）
+
+        流控由按上游主机共享的令牌桶负责（见 rate_limiter.py）
         """
-        self.sleep_min = sleep_min
-        self.sleep_max = sleep_max
-        self._last_request_time: Optional[float] = None
         eastmoney_patch()
     
     def _set_random_user_agent(self) -> None:
@@ -198,27 +244,22 @@ class EfinanceFetcher(BaseFetcher):
         except Exception as e:
             logger.debug(f"设置 User-Agent 失败: {e}")
     
-    def _enforce_rate_limit(self) -> None:
+    def _enforce_rate_limit(self, host: str = 'eastmoney') -> None:
         """
         强制执行速率限制
-        
-        策略：
-        1. 检查距离上次请求的时间间隔
-        2. 如果间隔不足，补充休眠时间
-        3. 然后再执行随机 jitter 休眠
-        """
-        if self._last_request_time is not None:
-            elapsed = time.time() - self._last_request_time
-            min_interval = self.sleep_min
-            if elapsed < min_interval:
-                additional_sleep = min_interval - elapsed
-                logger.debug(f"补充休眠 {additional_sleep:.2f} 秒")
-                time.sleep(additional_sleep)
-        
-        # 执行随机 jitter 休眠
-        self.random_sleep(self.sleep_min, self.sleep_max)
-        self._last_request_time = time.time()
+
+        从上游主机共享的令牌桶中获取令牌，仅在预算不足时等待。
+        多个线程、多个 Fetcher 访问同一主机时共用同一预算。
+
+        Args:
+            host: 上游主机标识（eastmoney / sina / tencent）
+        """
+        get_rate_limiter(host).acquire()
     
+    def supports_daily_code(self, stock_code: str) -> bool:
+        """不支持美股"""
+        return not _is_us_code(stock_code)
+
     @retry(
         stop=stop_after_attempt(1),  # 减少到1次，避免触发限流
         wait=wait_exponential(multiplier=1, min=4, max=60),  # 保持等待时间设置
@@ -249,7 +290,7 @@ class EfinanceFetcher(BaseFetcher):
         """
         # 美股不支持，抛出异常让 DataFetcherManager 切换到 AkshareFetcher/YfinanceFetcher
         if _is_us_code(stock_code):
-            raise DataFetchError(f"EfinanceFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
+            raise UnsupportedCodeError(f"EfinanceFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
         
         # 根据代码类型选择不同的获取方法
         if _is_etf_code(stock_code):
@@ -450,6 +491,89 @@ class EfinanceFetcher(BaseFetcher):
         
         return df
     
+    def _refresh_realtime_cache(self) -> pd.DataFrame:
+        """
+        全量刷新 A 股实时行情缓存
+
+        通过 _refresh_flight 调用，同一时刻只有一个线程执行；
+        进入时再检查一次缓存，避免刚完成的刷新被重复执行。
+        启用共享缓存时，其他进程刚刷新的结果直接复用。
+        """
+        if _is_cache_fresh(_realtime_cache):
+            return _realtime_cache['data']
+
+        logger.info(f"[缓存未命中] 触发全量刷新 实时行情(efinance)")
+        df, timestamp, fetched = refresh_through_shared_cache(
+            'efinance:stock', _realtime_cache['ttl'], self._download_realtime_quotes
+        )
+        
+        # 更新缓存（刷新时即构建代码索引快照）
+        _realtime_cache['data'] = df
+        _realtime_cache['snapshot'] = None
+        snapshot = _get_cached_snapshot(_realtime_cache, _STOCK_QUOTE_COLUMNS)
+        _realtime_cache['timestamp'] = timestamp
+        if fetched:
+            archive_realtime_snapshot(snapshot, 'efinance', 'stock')
+        logger.info(f"[缓存更新] 实时行情(efinance) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
+        return df
+
+    def _download_realtime_quotes(self) -> pd.DataFrame:
+        """请求全市场 A 股实时行情（ef.stock.get_realtime_quotes）"""
+        import efinance as ef
+
+        # 防封禁策略
+        self._set_random_user_agent()
+        self._enforce_rate_limit()
+        
+        logger.info(f"[API调用] ef.stock.get_realtime_quotes() 获取实时行情...")
+        api_start = time.time()
+        
+        # efinance 的实时行情 API
+        df = ef.stock.get_realtime_quotes()
+        
+        api_elapsed = time.time() - api_start
+        logger.info(f"[API返回] ef.stock.get_realtime_quotes 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
+        get_realtime_circuit_breaker().record_success("efinance")
+        return df
+
+    def _refresh_etf_realtime_cache(self) -> pd.DataFrame:
+        """全量刷新 ETF 实时行情缓存（通过 _refresh_flight 合并并发刷新，启用时经共享缓存）"""
+        if _is_cache_fresh(_etf_realtime_cache):
+            return _etf_realtime_cache['data']
+
+        df, timestamp, fetched = refresh_through_shared_cache(
+            'efinance:etf', _etf_realtime_cache['ttl'], self._download_etf_realtime_quotes
+        )
+        if df is None:
+            df = pd.DataFrame()
+
+        _etf_realtime_cache['data'] = df
+        _etf_realtime_cache['snapshot'] = None
+        snapshot = _get_cached_snapshot(_etf_realtime_cache, _ETF_QUOTE_COLUMNS)
+        _etf_realtime_cache['timestamp'] = timestamp
+        if fetched:
+            archive_realtime_snapshot(snapshot, 'efinance', 'etf')
+        return df
+
+    def _download_etf_realtime_quotes(self) -> Optional[pd.DataFrame]:
+        """请求全市场 ETF 实时行情，结果为空时返回 None（不写入共享缓存）"""
+        import efinance as ef
+
+        self._set_random_user_agent()
+        self._enforce_rate_limit()
+
+        logger.info("[API调用] ef.stock.get_realtime_quotes(['ETF']) 获取ETF实时行情...")
+        api_start = time.time()
+        df = ef.stock.get_realtime_quotes(['ETF'])
+        api_elapsed = time.time() - api_start
+
+        if df is not None and not df.empty:
+            logger.info(f"[API返回] ETF 实时行情成功: {len(df)} 条, 耗时 {api_elapsed:.2f}s")
+            get_realtime_circuit_breaker().record_success("efinance_etf")
+            return df
+        logger.warning(f"[API返回] ETF 实时行情为空, 耗时 {api_elapsed:.2f}s")
+        return None
+
     def get_realtime_quote(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取实时行情数据
@@ -467,7 +591,6 @@ class EfinanceFetcher(BaseFetcher):
         if _is_etf_code(stock_code):
             return self._get_etf_realtime_quote(stock_code)
 
-        import efinance as ef
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "efinance"
         
@@ -479,82 +602,20 @@ class EfinanceFetcher(BaseFetcher):
         try:
             # 检查缓存
             current_time = time.time()
-            if (_realtime_cache['data'] is not None and 
-                current_time - _realtime_cache['timestamp'] < _realtime_cache['ttl']):
-                df = _realtime_cache['data']
+            if _is_cache_fresh(_realtime_cache):
                 cache_age = int(current_time - _realtime_cache['timestamp'])
                 logger.debug(f"[缓存命中] 实时行情(efinance) - 缓存年龄 {cache_age}s/{_realtime_cache['ttl']}s")
             else:
-                # 触发全量刷新
-                logger.info(f"[缓存未命中] 触发全量刷新 实时行情(efinance)")
-                # 防封禁策略
-                self._set_random_user_agent()
-                self._enforce_rate_limit()
-                
-                logger.info(f"[API调用] ef.stock.get_realtime_quotes() 获取实时行情...")
-                import time as _time
-                api_start = _time.time()
-                
-                # efinance 的实时行情 API
-                df = ef.stock.get_realtime_quotes()
-                
-                api_elapsed = _time.time() - api_start
-                logger.info(f"[API返回] ef.stock.get_realtime_quotes 成功: 返回 {len(df)} 只股票, 耗时 {api_elapsed:.2f}s")
-                circuit_breaker.record_success(source_key)
-                
-                # 更新缓存
-                _realtime_cache['data'] = df
-                _realtime_cache['timestamp'] = current_time
-                logger.info(f"[缓存更新] 实时行情(efinance) 缓存已刷新，TTL={_realtime_cache['ttl']}s")
+                # 触发全量刷新（并发未命中的线程共享同一次刷新）
+                _refresh_flight.do('stock', self._refresh_realtime_cache)
             
-            # 查找指定股票
-            # efinance 返回的列名可能是 '股票代码' 或 'code'
-            code_col = '股票代码' if '股票代码' in df.columns else 'code'
-            row = df[df[code_col] == stock_code]
-            if row.empty:
+            # 查找指定股票（O(1) 索引查询）
+            fields = _get_cached_snapshot(_realtime_cache, _STOCK_QUOTE_COLUMNS).get(stock_code)
+            if fields is None:
                 logger.warning(f"[API返回] 未找到股票 {stock_code} 的实时行情")
                 return None
             
-            row = row.iloc[0]
-            
-            # 使用 realtime_types.py 中的统一转换函数
-            # 获取列名（可能是中文或英文）
-            name_col = '股票名称' if '股票名称' in df.columns else 'name'
-            price_col = '最新价' if '最新价' in df.columns else 'price'
-            pct_col = '涨跌幅' if '涨跌幅' in df.columns else 'pct_chg'
-            chg_col = '涨跌额' if '涨跌额' in df.columns else 'change'
-            vol_col = '成交量' if '成交量' in df.columns else 'volume'
-            amt_col = '成交额' if '成交额' in df.columns else 'amount'
-            turn_col = '换手率' if '换手率' in df.columns else 'turnover_rate'
-            amp_col = '振幅' if '振幅' in df.columns else 'amplitude'
-            high_col = '最高' if '最高' in df.columns else 'high'
-            low_col = '最低' if '最低' in df.columns else 'low'
-            open_col = '开盘' if '开盘' in df.columns else 'open'
-            # efinance 也返回量比、市盈率、市值等字段
-            vol_ratio_col = '量比' if '量比' in df.columns else 'volume_ratio'
-            pe_col = '市盈率' if '市盈率' in df.columns else 'pe_ratio'
-            total_mv_col = '总市值' if '总市值' in df.columns else 'total_mv'
-            circ_mv_col = '流通市值' if '流通市值' in df.columns else 'circ_mv'
-            
-            quote = UnifiedRealtimeQuote(
-                code=stock_code,
-                name=str(row.get(name_col, '')),
-                source=RealtimeSource.EFINANCE,
-                price=safe_float(row.get(price_col)),
-                change_pct=safe_float(row.get(pct_col)),
-                change_amount=safe_float(row.get(chg_col)),
-                volume=safe_int(row.get(vol_col)),
-                amount=safe_float(row.get(amt_col)),
-                turnover_rate=safe_float(row.get(turn_col)),
-                amplitude=safe_float(row.get(amp_col)),
-                high=safe_float(row.get(high_col)),
-                low=safe_float(row.get(low_col)),
-                open_price=safe_float(row.get(open_col)),
-                volume_ratio=safe_float(row.get(vol_ratio_col)),  # 量比
-                pe_ratio=safe_float(row.get(pe_col)),  # 市盈率
-                total_mv=safe_float(row.get(total_mv_col)),  # 总市值
-                circ_mv=safe_float(row.get(circ_mv_col)),  # 流通市值
-            )
+            quote = UnifiedRealtimeQuote(code=stock_code, source=RealtimeSource.EFINANCE, **fields)
             
             logger.info(f"[实时行情-efinance] {stock_code} {quote.name}: 价格={quote.price}, 涨跌={quote.change_pct}%, "
                        f"量比={quote.volume_ratio}, 换手率={quote.turnover_rate}%")
@@ -571,7 +632,6 @@ class EfinanceFetcher(BaseFetcher):
 
         efinance 默认实时接口仅返回股票数据，ETF 需要显式传入 ['ETF']。
         """
-        import efinance as ef
         circuit_breaker = get_realtime_circuit_breaker()
         source_key = "efinance_etf"
 
@@ -581,73 +641,24 @@ class EfinanceFetcher(BaseFetcher):
 
         try:
             current_time = time.time()
-            if (
-                _etf_realtime_cache['data'] is not None and
-                current_time - _etf_realtime_cache['timestamp'] < _etf_realtime_cache['ttl']
-            ):
+            if _is_cache_fresh(_etf_realtime_cache):
                 df = _etf_realtime_cache['data']
                 cache_age = int(current_time - _etf_realtime_cache['timestamp'])
                 logger.debug(f"[缓存命中] ETF实时行情(efinance) - 缓存年龄 {cache_age}s/{_etf_realtime_cache['ttl']}s")
             else:
-                self._set_random_user_agent()
-                self._enforce_rate_limit()
-
-                logger.info("[API调用] ef.stock.get_realtime_quotes(['ETF']) 获取ETF实时行情...")
-                import time as _time
-                api_start = _time.time()
-                df = ef.stock.get_realtime_quotes(['ETF'])
-                api_elapsed = _time.time() - api_start
-
-                if df is not None and not df.empty:
-                    logger.info(f"[API返回] ETF 实时行情成功: {len(df)} 条, 耗时 {api_elapsed:.2f}s")
-                    circuit_breaker.record_success(source_key)
-                else:
-                    logger.warning(f"[API返回] ETF 实时行情为空, 耗时 {api_elapsed:.2f}s")
-                    df = pd.DataFrame()
-
-                _etf_realtime_cache['data'] = df
-                _etf_realtime_cache['timestamp'] = current_time
+                df = _refresh_flight.do('etf', self._refresh_etf_realtime_cache)
 
             if df is None or df.empty:
                 logger.warning(f"[实时行情] ETF实时行情数据为空(efinance)，跳过 {stock_code}")
                 return None
 
-            code_col = '股票代码' if '股票代码' in df.columns else 'code'
-            code_series = df[code_col].astype(str).str.zfill(6)
-            target_code = str(stock_code).strip().zfill(6)
-            row = df[code_series == target_code]
-            if row.empty:
+            target_code = RealtimeSnapshot.normalize_code(stock_code)
+            fields = _get_cached_snapshot(_etf_realtime_cache, _ETF_QUOTE_COLUMNS).get(target_code)
+            if fields is None:
                 logger.warning(f"[API返回] 未找到 ETF {stock_code} 的实时行情(efinance)")
                 return None
 
-            row = row.iloc[0]
-            name_col = '股票名称' if '股票名称' in df.columns else 'name'
-            price_col = '最新价' if '最新价' in df.columns else 'price'
-            pct_col = '涨跌幅' if '涨跌幅' in df.columns else 'pct_chg'
-            chg_col = '涨跌额' if '涨跌额' in df.columns else 'change'
-            vol_col = '成交量' if '成交量' in df.columns else 'volume'
-            amt_col = '成交额' if '成交额' in df.columns else 'amount'
-            turn_col = '换手率' if '换手率' in df.columns else 'turnover_rate'
-            amp_col = '振幅' if '振幅' in df.columns else 'amplitude'
-            high_col = '最高' if '最高' in df.columns else 'high'
-            low_col = '最低' if '最低' in df.columns else 'low'
-            open_col = '开盘' if '开盘' in df.columns else 'open'
-
-            quote = UnifiedRealtimeQuote(
-                code=target_code,
-                name=str(row.get(name_col, '')),
-                source=RealtimeSource.EFINANCE,
-                price=safe_float(row.get(price_col)),
-                change_pct=safe_float(row.get(pct_col)),
-                change_amount=safe_float(row.get(chg_col)),
-                volume=safe_int(row.get(vol_col)),
-                amount=safe_float(row.get(amt_col)),
-                turnover_rate=safe_float(row.get(turn_col)),
-                amplitude=safe_float(row.get(amp_col)),
-                high=safe_float(row.get(high_col)),
-                low=safe_float(row.get(low_col)),
-                open_price=safe_float(row.get(open_col)),
-            )
+            quote = UnifiedRealtimeQuote(code=target_code, source=RealtimeSource.EFINANCE, **fields)
 
             logger.info(
                 f"[ETF实时行情-efinance] {target_code} {quote.name}: "
@@ -738,23 +749,12 @@ class EfinanceFetcher(BaseFetcher):
         """
         获取市场涨跌统计 (efinance)
         """
-        import efinance as ef
-
         try:
-            self._set_random_user_agent()
-            self._enforce_rate_limit()
-
-            current_time = time.time()
-            if (
-                _realtime_cache['data'] is not None and
-                current_time - _realtime_cache['timestamp'] < _realtime_cache['ttl']
-            ):
+            if _is_cache_fresh(_realtime_cache):
                 df = _realtime_cache['data']
             else:
                 logger.info("[API调用] ef.stock.get_realtime_quotes() 获取市场统计...")
-                df = ef.stock.get_realtime_quotes()
-                _realtime_cache['data'] = df
-                _realtime_cache['timestamp'] = current_time
+                df = _refresh_flight.do('stock', self._refresh_realtime_cache)
 
             if df is None or df.empty:
                 logger.warning("[API返回] 市场统计数据为空")
@@ -16,9 +16,10 @@ PytdxFetcher - 通达信数据源 (Priority 2)
 
 import logging
 import re
+import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Generator, List, Tuple
+from typing import Optional, Generator, List, Tuple, Dict
 
 import pandas as pd
 from tenacity import (
@@ -29,12 +30,18 @@ from tenacity import (
     before_sleep_log,
 )
 
-from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS, UnsupportedCodeError
+from .pytdx_pool import TdxConnectionPool, TdxNoDataError
+from .rate_limiter import get_rate_limiter
 import os
 
 logger = logging.getLogger(__name__)
 
 
+# 分钟线周期 -> get_security_bars 的 category
+_MINUTE_CATEGORIES = {1: 8, 5: 0, 15: 1, 30: 2, 60: 3}
+
+
 def _is_us_code(stock_code: str) -> bool:
     """
     判断代码是否为美股
@@ -55,8 +62,8 @@ class PytdxFetcher(BaseFetcher):
     数据来源：通达信行情服务器
     
     关键策略：
-    - 自动选择最优服务器
-    - 连接失败自动切换服务器
+    - 长连接池复用，按测速结果优先连接最快的服务器
+    - 连接失败/心跳失败自动切换服务器
     - 失败后指数退避重试
     
     Pytdx 特点：
@@ -89,9 +96,8 @@ class PytdxFetcher(BaseFetcher):
             hosts: 服务器列表 [(host, port), ...]，默认使用内置列表
         """
         self._hosts = hosts or self.DEFAULT_HOSTS
-        self._api = None
-        self._connected = False
-        self._current_host_idx = 0
+        self._pool: Optional[TdxConnectionPool] = None
+        self._pool_lock = threading.Lock()
         self._stock_list_cache = None  # 股票列表缓存
         self._stock_name_cache = {}    # 股票名称缓存 {code: name}
     
@@ -108,55 +114,41 @@ class PytdxFetcher(BaseFetcher):
             logger.warning("pytdx 未安装，请运行: pip install pytdx")
             return None
     
+    def _get_pool(self) -> TdxConnectionPool:
+        """
+        获取连接池（首次使用时创建）
+
+        连接池在首次借出连接时并行测速所有服务器，之后定期重新测速
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    TdxHq_API = self._get_pytdx()
+                    if TdxHq_API is None:
+                        raise DataFetchError("pytdx 库未安装")
+                    from src.config import get_config
+
+                    self._pool = TdxConnectionPool(
+                        TdxHq_API, self._hosts, max_size=get_config().pytdx_pool_size
+                    )
+        return self._pool
+
     @contextmanager
     def _pytdx_session(self) -> Generator:
         """
         Pytdx 连接上下文管理器
         
-        确保：
-        1. 进入上下文时自动连接
-        2. 退出上下文时自动断开
-        3. 异常时也能正确断开
+        从连接池借出一条长连接：
+        1. 优先复用空闲连接（空闲过久时先做心跳检查）
+        2. 无空闲连接且未达上限时，按测速排序连接最快的服务器
+        3. 退出上下文时归还连接；块内抛出 TdxNoDataError 以外的异常时关闭该连接
         
         使用示例：
             with self._pytdx_session() as api:
                 # 在这里执行数据查询
         """
-        TdxHq_API = self._get_pytdx()
-        if TdxHq_API is None:
-            raise DataFetchError("pytdx 库未安装")
-        
-        api = TdxHq_API()
-        connected = False
-        
-        try:
-            # 尝试连接服务器（自动选择最优）
-            for i in range(len(self._hosts)):
-                host_idx = (self._current_host_idx + i) % len(self._hosts)
-                host, port = self._hosts[host_idx]
-                
-                try:
-                    if api.connect(host, port, time_out=5):
-                        connected = True
-                        self._current_host_idx = host_idx
-                        logger.debug(f"Pytdx 连接成功: {host}:{port}")
-                        break
-                except Exception as e:
-                    logger.debug(f"Pytdx 连接 {host}:{port} 失败: {e}")
-                    continue
-            
-            if not connected:
-                raise DataFetchError("Pytdx 无法连接任何服务器")
-            
+        with self._get_pool().connection() as api:
             yield api
-            
-        finally:
-            # 确保断开连接
-            try:
-                api.disconnect()
-                logger.debug("Pytdx 连接已断开")
-            except Exception as e:
-                logger.warning(f"Pytdx 断开连接时出错: {e}")
     
     def _get_market_code(self, stock_code: str) -> Tuple[int, str]:
         """
@@ -187,6 +179,22 @@ class PytdxFetcher(BaseFetcher):
         else:
             return 0, code  # 深圳
     
+    def supports_daily_code(self, stock_code: str) -> bool:
+        """不支持美股"""
+        return not _is_us_code(stock_code)
+
+    def _enforce_rate_limit(self, host: str = 'tdx') -> None:
+        """
+        强制执行速率限制
+
+        从上游主机共享的令牌桶中获取令牌，仅在预算不足时等待。
+        多个线程访问同一主机时共用同一预算。
+
+        Args:
+            host: 上游主机标识（通达信行情服务器共用 tdx）
+        """
+        get_rate_limiter(host).acquire()
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -207,47 +215,124 @@ class PytdxFetcher(BaseFetcher):
         """
         # 美股不支持，抛出异常让 DataFetcherManager 切换到其他数据源
         if _is_us_code(stock_code):
-            raise DataFetchError(f"PytdxFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
+            raise UnsupportedCodeError(f"PytdxFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
         
-        market, code = self._get_market_code(stock_code)
+        count = self._estimate_bar_count(start_date, end_date)
         
-        # 计算需要获取的交易日数量（估算）
-        from datetime import datetime as dt
-        start_dt = dt.strptime(start_date, '%Y-%m-%d')
-        end_dt = dt.strptime(end_date, '%Y-%m-%d')
+        # 异常在连接上下文之外包装，连接池据原始异常决定归还或关闭连接
+        try:
+            with self._pytdx_session() as api:
+                return self._fetch_bars(api, stock_code, start_date, end_date, count)
+        except DataFetchError:
+            raise
+        except Exception as e:
+            raise DataFetchError(f"Pytdx 获取数据失败: {e}") from e
+    
+    @staticmethod
+    def _estimate_bar_count(start_date: str, end_date: str) -> int:
+        """计算需要获取的交易日数量（估算）"""
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         days = (end_dt - start_dt).days
-        count = min(max(days * 5 // 7 + 10, 30), 800)  # 估算交易日，最大 800 条
-        
+        return min(max(days * 5 // 7 + 10, 30), 800)  # 估算交易日，最大 800 条
+    
+    @staticmethod
+    def _check_bars(data, stock_code: str, what: str = "数据") -> None:
+        """
+        区分 pytdx 的两种空返回
+
+        - None：请求过程中出现传输错误（pytdx 内部吞掉异常），连接不可再用
+        - 空列表：服务器正常响应但无数据，连接可归还
+        """
+        if data is None:
+            raise DataFetchError(f"Pytdx 请求 {stock_code} 的{what}无响应，连接可能已断开")
+        if len(data) == 0:
+            raise TdxNoDataError(f"Pytdx 未查询到 {stock_code} 的{what}")
+
+    def _fetch_bars(self, api, stock_code: str, start_date: str, end_date: str, count: int) -> pd.DataFrame:
+        """在已建立的连接上获取单只股票日 K 线并过滤日期范围"""
+        market, code = self._get_market_code(stock_code)
         logger.debug(f"调用 Pytdx get_security_bars(market={market}, code={code}, count={count})")
+        self._enforce_rate_limit()
+        
+        # 获取日 K 线数据
+        # category: 9-日线, 0-5分钟, 1-15分钟, 2-30分钟, 3-1小时
+        data = api.get_security_bars(
+            category=9,  # 日线
+            market=market,
+            code=code,
+            start=0,  # 从最新开始
+            count=count
+        )
+        
+        self._check_bars(data, stock_code)
+        
+        # 转换为 DataFrame
+        df = api.to_df(data)
+        
+        # 过滤日期范围
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        return df[(df['datetime'] >= start_date) & (df['datetime'] <= end_date)]
+    
+    def supports_batch_code(self, stock_code: str) -> bool:
+        """A 股代码可在同一个连接内批量获取"""
+        return stock_code.isdigit() and len(stock_code) == 6
+    
+    def _fetch_raw_data_batch(self, stock_codes: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取日线：复用同一个 TCP 连接依次请求，省去每只股票的建连/断连开销
+
+        单只股票无数据不影响其余股票；请求出错时关闭该连接，剩余股票换新连接继续；
+        无法借出连接时整体抛出异常
+        """
+        count = self._estimate_bar_count(start_date, end_date)
+        results: Dict[str, pd.DataFrame] = {}
+        remaining = list(stock_codes)
         
-        with self._pytdx_session() as api:
+        while remaining:
+            connected = False
             try:
-                # 获取日 K 线数据
-                # category: 9-日线, 0-5分钟, 1-15分钟, 2-30分钟, 3-1小时
-                data = api.get_security_bars(
-                    category=9,  # 日线
-                    market=market,
-                    code=code,
-                    start=0,  # 从最新开始
-                    count=count
-                )
-                
-                if data is None or len(data) == 0:
-                    raise DataFetchError(f"Pytdx 未查询到 {stock_code} 的数据")
-                
-                # 转换为 DataFrame
-                df = api.to_df(data)
-                
-                # 过滤日期范围
-                df['datetime'] = pd.to_datetime(df['datetime'])
-                df = df[(df['datetime'] >= start_date) & (df['datetime'] <= end_date)]
-                
-                return df
-                
+                with self._pytdx_session() as api:
+                    connected = True
+                    while remaining:
+                        stock_code = remaining.pop(0)
+                        try:
+                            results[stock_code] = self._fetch_bars(api, stock_code, start_date, end_date, count)
+                        except TdxNoDataError as e:
+                            logger.debug(f"Pytdx 批量获取 {stock_code} 失败: {e}")
             except Exception as e:
-                if isinstance(e, DataFetchError):
+                if not connected:
                     raise
-                raise DataFetchError(f"Pytdx 获取数据失败: {e}") from e
+                logger.debug(f"Pytdx 批量获取出错，关闭连接后继续剩余 {len(remaining)} 只: {e}")
+        
+        return results
+    
+    def supports_minute_data(self, stock_code: str) -> bool:
+        """A 股代码支持分钟线"""
+        return stock_code.isdigit() and len(stock_code) == 6
+    
+    def _fetch_minute_raw(self, stock_code: str, period: int, count: int) -> pd.DataFrame:
+        """
+        获取最近 count 根分钟线（单次请求最多 800 根）
+        
+        category: 8-1分钟, 0-5分钟, 1-15分钟, 2-30分钟, 3-1小时
+        """
+        category = _MINUTE_CATEGORIES[period]
+        market, code = self._get_market_code(stock_code)
+        
+        self._enforce_rate_limit()
+        with self._pytdx_session() as api:
+            data = api.get_security_bars(
+                category=category,
+                market=market,
+                code=code,
+                start=0,
+                count=min(count, 800)
+            )
+            self._check_bars(data, stock_code, "分钟线")
+            df = api.to_df(data)
+        
+        return df.rename(columns={'datetime': 'time', 'vol': 'volume'})
     
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
@@ -305,8 +390,13 @@ class PytdxFetcher(BaseFetcher):
                 # 获取股票列表（缓存）
                 if self._stock_list_cache is None:
                     # 获取深圳和上海股票列表
+                    self._enforce_rate_limit()
                     sz_stocks = api.get_security_list(0, 0)  # 深圳
+                    self._enforce_rate_limit()
                     sh_stocks = api.get_security_list(1, 0)  # 上海
+                    if sz_stocks is None or sh_stocks is None:
+                        # None 表示传输错误，抛出异常让连接池关闭该连接
+                        raise DataFetchError("Pytdx 股票列表请求无响应，连接可能已断开")
                     
                     self._stock_list_cache = {}
                     for stock in (sz_stocks or []) + (sh_stocks or []):
@@ -319,8 +409,11 @@ class PytdxFetcher(BaseFetcher):
                     return name
                 
                 # 尝试使用 get_finance_info
+                self._enforce_rate_limit()
                 finance_info = api.get_finance_info(market, code)
-                if finance_info and 'name' in finance_info:
+                if finance_info is None:
+                    raise DataFetchError("Pytdx 财务信息请求无响应，连接可能已断开")
+                if 'name' in finance_info:
                     name = finance_info['name']
                     self._stock_name_cache[stock_code] = name
                     return name
@@ -343,10 +436,13 @@ class PytdxFetcher(BaseFetcher):
         try:
             market, code = self._get_market_code(stock_code)
             
+            self._enforce_rate_limit()
             with self._pytdx_session() as api:
                 data = api.get_security_quotes([(market, code)])
+                if data is None:
+                    raise DataFetchError("Pytdx 实时行情请求无响应，连接可能已断开")
                 
-                if data and len(data) > 0:
+                if len(data) > 0:
                     quote = data[0]
                     return {
                         'code': stock_code,
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+通达信长连接池
+===================================
+
+设计目标：
+1. 复用 TdxHq_API 长连接，省去每只股票一次 TCP 握手与服务器协商
+2. 启动时并行测速所有服务器，按 建连 + 首次请求 耗时排序，定期重新测速
+3. 连接数有上限，流水线 worker 可并行取数而不会无限建连
+4. 借出前对空闲过久的连接做心跳检查，失效连接自动替换
+5. 只有块内抛出 TdxNoDataError（服务器正常响应但无数据）时归还连接，
+   其余异常（含 pytdx 以 None 表示的断连）一律关闭连接，不交给下一个调用方
+
+使用方式：
+    pool = TdxConnectionPool(TdxHq_API, hosts, max_size=4)
+    with pool.connection() as api:
+        api.get_security_bars(...)
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, List, Optional, Tuple
+
+from .base import DataFetchError
+
+logger = logging.getLogger(__name__)
+
+
+class TdxNoDataError(DataFetchError):
+    """服务器正常响应但该代码无数据（连接仍可用，可归还连接池）"""
+
+
+class _PooledConnection:
+    """池中的一条连接"""
+
+    __slots__ = ('api', 'host', 'last_used')
+
+    def __init__(self, api: Any, host: Tuple[str, int]):
+        self.api = api
+        self.host = host
+        self.last_used = time.time()
+
+
+class TdxConnectionPool:
+    """
+    有界的通达信连接池（线程安全）
+
+    每条连接同一时刻只借给一个线程，TdxHq_API 本身无需开启 multithread 锁。
+    """
+
+    CONNECT_TIMEOUT = 5.0        # 建连超时（秒）
+    HEARTBEAT_IDLE = 30.0        # 空闲超过该秒数的连接借出前先做心跳检查
+    RERANK_INTERVAL = 1800.0     # 服务器重新测速间隔（秒）
+    ACQUIRE_TIMEOUT = 30.0       # 连接池满时等待空闲连接的最长时间（秒）
+
+    def __init__(
+        self,
+        api_factory: Callable[[], Any],
+        hosts: List[Tuple[str, int]],
+        max_size: int = 4
+    ):
+        """
+        Args:
+            api_factory: 创建 TdxHq_API 实例的工厂（通常为 TdxHq_API 类本身）
+            hosts: 服务器列表 [(host, port), ...]
+            max_size: 最大连接数
+        """
+        self._api_factory = api_factory
+        self._hosts = list(hosts)
+        self.max_size = max(1, max_size)
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []
+        self._created = 0
+
+        self._ranked_hosts: List[Tuple[str, int]] = list(hosts)
+        self._ranked_at = 0.0
+        self._rank_lock = threading.Lock()
+
+    # === 服务器测速 ===
+
+    def _probe(self, host: Tuple[str, int]) -> Optional[float]:
+        """测量单个服务器 建连 + 一次轻量请求 的耗时，失败返回 None"""
+        api = self._api_factory()
+        start = time.time()
+        try:
+            if not api.connect(host[0], host[1], time_out=self.CONNECT_TIMEOUT):
+                return None
+            if api.get_security_count(0) is None:
+                return None
+            return time.time() - start
+        except Exception as e:
+            logger.debug(f"[Pytdx连接池] 测速 {host[0]}:{host[1]} 失败: {e}")
+            return None
+        finally:
+            try:
+                api.disconnect()
+            except Exception:
+                pass
+
+    def rank_hosts(self) -> List[Tuple[str, int]]:
+        """并行测速所有服务器并按耗时排序（不可达的服务器排在最后）"""
+        with ThreadPoolExecutor(max_workers=len(self._hosts), thread_name_prefix="tdx_probe") as executor:
+            latencies = list(executor.map(self._probe, self._hosts))
+
+        reachable = sorted(
+            (latency, idx) for idx, latency in enumerate(latencies) if latency is not None
+        )
+        unreachable = [idx for idx, latency in enumerate(latencies) if latency is None]
+        ranked = [self._hosts[idx] for _, idx in reachable] + [self._hosts[idx] for idx in unreachable]
+
+        self._ranked_hosts = ranked
+        self._ranked_at = time.time()
+        if reachable:
+            best_latency, best_idx = reachable[0]
+            host, port = self._hosts[best_idx]
+            logger.info(
+                f"[Pytdx连接池] 服务器测速完成：{len(reachable)}/{len(self._hosts)} 可达，"
+                f"最快 {host}:{port}（{best_latency * 1000:.0f}ms）"
+            )
+        else:
+            logger.warning("[Pytdx连接池] 服务器测速完成：全部不可达")
+        return ranked
+
+    def _maybe_rerank(self) -> None:
+        """首次使用或超过重新测速间隔时测速（只由一个线程执行，其余线程沿用旧排序）"""
+        if time.time() - self._ranked_at < self.RERANK_INTERVAL:
+            return
+        if not self._rank_lock.acquire(blocking=False):
+            return
+        try:
+            if time.time() - self._ranked_at >= self.RERANK_INTERVAL:
+                self.rank_hosts()
+        finally:
+            self._rank_lock.release()
+
+    # === 连接管理 ===
+
+    def _connect(self) -> _PooledConnection:
+        """按测速排序依次尝试建立新连接"""
+        for host in list(self._ranked_hosts):
+            api = self._api_factory()
+            try:
+                if api.connect(host[0], host[1], time_out=self.CONNECT_TIMEOUT):
+                    logger.debug(f"[Pytdx连接池] 新建连接 {host[0]}:{host[1]}")
+                    return _PooledConnection(api, host)
+            except Exception as e:
+                logger.debug(f"[Pytdx连接池] 连接 {host[0]}:{host[1]} 失败: {e}")
+        raise DataFetchError("Pytdx 无法连接任何服务器")
+
+    @staticmethod
+    def _close(conn: _PooledConnection) -> None:
+        try:
+            conn.api.disconnect()
+        except Exception as e:
+            logger.debug(f"[Pytdx连接池] 断开连接时出错: {e}")
+
+    def _is_alive(self, conn: _PooledConnection) -> bool:
+        """心跳检查：空闲过久的连接发送一次轻量请求确认仍可用"""
+        if time.time() - conn.last_used < self.HEARTBEAT_IDLE:
+            return True
+        try:
+            return conn.api.get_security_count(0) is not None
+        except Exception:
+            return False
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def _acquire(self) -> _PooledConnection:
+        deadline = time.time() + self.ACQUIRE_TIMEOUT
+        while True:
+            with self._cond:
+                if self._idle:
+                    conn = self._idle.pop()
+                elif self._created < self.max_size:
+                    self._created += 1
+                    conn = None
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise DataFetchError("Pytdx 连接池等待超时")
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                # 在锁外建连，避免阻塞其他线程归还/借出
+                try:
+                    return self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+
+            if self._is_alive(conn):
+                return conn
+            logger.debug(f"[Pytdx连接池] 连接 {conn.host[0]}:{conn.host[1]} 心跳失败，重新建连")
+            self._close(conn)
+            self._release_slot()
+
+    @contextmanager
+    def connection(self) -> Generator:
+        """
+        借出一条连接
+
+        块内抛出 TdxNoDataError 时归还连接；其余异常视为连接可能已损坏，直接关闭不再归还
+        """
+        self._maybe_rerank()
+        conn = self._acquire()
+        try:
+            yield conn.api
+        except TdxNoDataError:
+            self._return(conn)
+            raise
+        except BaseException:
+            self._close(conn)
+            self._release_slot()
+            raise
+        else:
+            self._return(conn)
+
+    def _return(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.time()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        """关闭所有空闲连接"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            self._close(conn)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+令牌桶限流器（按上游主机共享）
+===================================
+
+设计目标：
+1. 替代各 Fetcher 自行维护的 _last_request_time + 随机休眠
+2. 线程安全：流水线线程池并发请求时不会互相踩踏
+3. 按上游主机共享预算：efinance 与 akshare 都访问东财，共用同一个桶
+4. 仅在预算不足时等待，吞吐可贴近数据源真实上限
+
+配置方式：
+- RATE_LIMITS=eastmoney=0.5:2,sina=1:3
+  格式为 主机=每秒请求数:突发容量，未配置的主机使用 DEFAULT_HOST_LIMITS
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# 默认限流参数 {主机: (每秒请求数, 突发容量)}
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, float]] = {
+    'eastmoney': (0.5, 2),   # 东财（efinance / akshare em），反爬最严格
+    'sina': (1.0, 3),        # 新浪财经
+    'tencent': (2.0, 5),     # 腾讯财经
+    'tdx': (10.0, 10),       # 通达信行情服务器（长连接，单次请求开销小）
+    'baostock': (5.0, 5),    # Baostock（共享登录会话，请求本身串行）
+    'yahoo': (1.0, 3),       # Yahoo Finance，频繁请求易触发 429
+}
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    策略：
+    - 桶以 rate 个/秒的速度补充令牌，最多累积 burst 个
+    - acquire() 预占令牌后在锁外休眠，多个线程按到达顺序排队，不会集体惊醒
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预占令牌但不等待（供 asyncio 调用方自行 await asyncio.sleep）
+
+        Returns:
+            调用方需要等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，预算不足时阻塞等待
+
+        Returns:
+            实际等待的秒数
+        """
+        wait_time = self.reserve(tokens)
+        if wait_time > 0:
+            logger.debug(f"[限流] 等待 {wait_time:.2f} 秒")
+            time.sleep(wait_time)
+        return wait_time
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """非阻塞获取令牌，预算不足时立即返回 False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def _parse_rate_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    """解析 RATE_LIMITS 配置（host=rate:burst,...）"""
+    limits: Dict[str, Tuple[float, float]] = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        host, spec = item.split('=', 1)
+        rate_str, _, burst_str = spec.partition(':')
+        try:
+            rate = float(rate_str)
+            burst = float(burst_str) if burst_str else 1.0
+        except ValueError:
+            logger.warning(f"[限流] 无法解析 RATE_LIMITS 配置项: {item}")
+            continue
+        if rate > 0:
+            limits[host.strip().lower()] = (rate, burst)
+    return limits
+
+
+def get_rate_limiter(
+    host: str,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None
+) -> TokenBucket:
+    """
+    获取指定上游主机的共享令牌桶
+
+    优先级：RATE_LIMITS 配置 > 调用方传入的默认值 > DEFAULT_HOST_LIMITS
+
+    Args:
+        host: 上游主机标识（如 eastmoney / sina / tencent / tushare）
+        rate: 首次创建时使用的默认速率（每秒请求数）
+        burst: 首次创建时使用的默认突发容量
+    """
+    host = host.lower()
+    limiter = _limiters.get(host)
+    if limiter is not None:
+        return limiter
+
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            from src.config import get_config
+
+            configured = _parse_rate_limits(get_config().rate_limits)
+            if host in configured:
+                limiter_rate, limiter_burst = configured[host]
+            elif rate is not None:
+                limiter_rate, limiter_burst = rate, burst or 1.0
+            else:
+                limiter_rate, limiter_burst = DEFAULT_HOST_LIMITS.get(host, (1.0, 1.0))
+            limiter = TokenBucket(limiter_rate, limiter_burst)
+            _limiters[host] = limiter
+            logger.debug(f"[限流] 创建 {host} 令牌桶: {limiter_rate:.2f} 次/秒，突发 {limiter_burst:.0f}")
+        return limiter
+
+
+def reset_rate_limiters() -> None:
+    """清空所有令牌桶（主要用于测试或配置重载）"""
+    with _limiters_lock:
+        _limiters.clear()
@@ -17,7 +17,7 @@
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -175,6 +175,121 @@ class UnifiedRealtimeQuote:
         return self.volume_ratio is not None or self.turnover_rate is not None
 
 
+class RealtimeSnapshot:
+    """
+    全市场实时行情快照（按代码索引）
+
+    设计说明：
+    - 全量行情 DataFrame 在刷新时一次性完成列名识别与数值转换
+    - 各字段存为 float64 列数组，另建 code -> 行号 索引
+    - 单只股票查询为 O(1)，无需每次对 5000+ 行做布尔筛选
+    """
+
+    # 需要转换为整数的字段
+    INT_FIELDS = frozenset({'volume'})
+
+    def __init__(self, index: Dict[str, int], names: List[str], columns: Dict[str, Any]):
+        self._index = index
+        self._names = names
+        self._columns = columns
+
+    @staticmethod
+    def normalize_code(code: Any) -> str:
+        """统一代码格式：纯数字代码补齐 6 位"""
+        code = str(code).strip()
+        if code.isdigit() and len(code) < 6:
+            return code.zfill(6)
+        return code
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df,
+        code_columns: Tuple[str, ...],
+        name_columns: Tuple[str, ...],
+        field_columns: Dict[str, Tuple[str, ...]]
+    ) -> 'RealtimeSnapshot':
+        """
+        从全量行情 DataFrame 构建快照
+
+        Args:
+            df: 全量行情 DataFrame
+            code_columns: 代码列候选名（按顺序取第一个存在的列）
+            name_columns: 名称列候选名
+            field_columns: {UnifiedRealtimeQuote 字段名: 候选列名}
+        """
+        import pandas as pd
+
+        if df is None or df.empty:
+            return cls({}, [], {})
+
+        code_col = next((c for c in code_columns if c in df.columns), None)
+        if code_col is None:
+            return cls({}, [], {})
+
+        index: Dict[str, int] = {}
+        for row, code in enumerate(df[code_col].tolist()):
+            # 与原先 iloc[0] 行为一致：重复代码取第一行
+            index.setdefault(cls.normalize_code(code), row)
+
+        name_col = next((c for c in name_columns if c in df.columns), None)
+        if name_col is not None:
+            names = ['' if pd.isna(v) else str(v) for v in df[name_col].tolist()]
+        else:
+            names = [''] * len(df)
+
+        columns: Dict[str, Any] = {}
+        for field_name, candidates in field_columns.items():
+            col = next((c for c in candidates if c in df.columns), None)
+            if col is not None:
+                columns[field_name] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+
+        return cls(index, names, columns)
+
+    def to_frame(self):
+        """
+        转换为标准列名的 DataFrame（code, name, 各字段列），每个代码一行
+
+        用于归档全市场快照，列名与 UnifiedRealtimeQuote 字段一致，与原始数据源无关
+        """
+        import pandas as pd
+
+        rows = sorted(self._index.values())
+        codes = sorted(self._index, key=self._index.get)
+        data: Dict[str, Any] = {
+            'code': codes,
+            'name': [self._names[row] for row in rows],
+        }
+        for field_name, values in self._columns.items():
+            data[field_name] = values[rows]
+        return pd.DataFrame(data)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, code: Any) -> bool:
+        return self.normalize_code(code) in self._index
+
+    def get(self, code: Any) -> Optional[Dict[str, Any]]:
+        """
+        按代码获取单只股票的行情字段
+
+        Returns:
+            {'name': ..., 字段名: 值}，可直接用于构造 UnifiedRealtimeQuote；未找到返回 None
+        """
+        row = self._index.get(self.normalize_code(code))
+        if row is None:
+            return None
+
+        fields: Dict[str, Any] = {'name': self._names[row]}
+        for field_name, values in self._columns.items():
+            value = values[row]
+            if value != value:  # NaN
+                continue
+            fields[field_name] = int(value) if field_name in self.INT_FIELDS else float(value)
+        return fields
+
+
 @dataclass
 class ChipDistribution:
     """
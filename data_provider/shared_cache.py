@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+跨进程共享行情缓存
+===================================
+
+职责：
+1. 定时任务（main.py --schedule）、Web 服务（server.py / webui.py）与桌面端后端是独立进程，
+   各自的模块级 _realtime_cache 互不可见；配置 SHARED_CACHE_PATH 后，
+   全量行情快照与逐股行情经同一个本地 SQLite 文件共享
+2. 缓存未命中时通过租约（lease）保证同一时刻只有一个进程刷新，
+   其他进程等待刷新结果，整台机器共用一次全量下载
+
+说明：
+- 仅依赖标准库 sqlite3，无需额外服务；WAL 模式，读写互不阻塞
+- 值以 pickle + zlib 压缩保存，单条 INSERT OR REPLACE 写入，读者只会看到旧值或新值
+- 刷新失败不写入共享缓存，由各进程的本地缓存兜底
+- 文件中的数据会被反序列化，请放在仅本机用户可写的目录
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 刷新租约有效期（秒）：持有者崩溃时，其他进程最多等待这么久后接手刷新
+LEASE_SECONDS = 120
+
+# 等待其他进程刷新时的轮询间隔（秒）
+_POLL_INTERVAL = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry (expires_at);
+CREATE TABLE IF NOT EXISTS cache_lease (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """
+    基于 SQLite 文件的跨进程 TTL 缓存
+
+    使用方式：
+        cache = SharedCache('./data/shared_cache.db')
+        df, created_at, fetched = cache.get_or_refresh('efinance:stock', 1200, download)
+        cache.put_many({'quote:sina:600519': quote}, ttl=1200)
+    """
+
+    def __init__(self, path: str, lease_seconds: float = LEASE_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        读取未过期的缓存
+
+        Returns:
+            (值, 写入时间)，不存在或已过期返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entry WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return pickle.loads(zlib.decompress(row[0])), row[1]
+        except Exception as e:
+            logger.warning(f"[共享缓存] {key} 反序列化失败，忽略: {e}")
+            return None
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        """写入（替换）一条缓存"""
+        self.put_many({key: value}, ttl)
+
+    def put_many(self, items: Dict[str, Any], ttl: float) -> None:
+        """在一个事务内写入多条缓存，并顺带清理已过期的条目"""
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (key, zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)), now, now + ttl)
+            for key, value in items.items()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entry (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM cache_entry WHERE key = ?", [(k,) for k in keys])
+
+    def _acquire_lease(self, key: str) -> bool:
+        """尝试获取刷新租约（不存在或已过期时获得），原子操作"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO cache_lease (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE cache_lease.expires_at <= ?",
+                (key, self.owner, now + self.lease_seconds, now),
+            )
+            return cursor.rowcount == 1
+
+    def _release_lease(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_lease WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def get_or_refresh(
+        self,
+        key: str,
+        ttl: float,
+        refresh: Callable[[], Any],
+        wait_timeout: Optional[float] = None
+    ) -> Tuple[Any, float, bool]:
+        """
+        读取缓存，未命中时由一个进程刷新，其他进程等待其结果
+
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+            refresh: 刷新函数，返回 None 表示失败（不写入共享缓存）
+            wait_timeout: 等待其他进程刷新的最长时间，默认为租约有效期
+
+        Returns:
+            (值, 写入时间, 是否由本进程刷新)
+        """
+        deadline = time.time() + (self.lease_seconds if wait_timeout is None else wait_timeout)
+        waited = False
+        while True:
+            hit = self.get(key)
+            if hit is not None:
+                if waited:
+                    logger.info(f"[共享缓存] {key} 复用其他进程的刷新结果")
+                return hit[0], hit[1], False
+            if self._acquire_lease(key):
+                try:
+                    # 拿到租约前其他进程可能刚好写入，再检查一次
+                    hit = self.get(key)
+                    if hit is not None:
+                        return hit[0], hit[1], False
+                    value = refresh()
+                    if value is not None:
+                        try:
+                            self.put(key, value, ttl)
+                        except sqlite3.Error as e:
+                            logger.warning(f"[共享缓存] 写入 {key} 失败: {e}")
+                    return value, time.time(), True
+                finally:
+                    self._release_lease(key)
+            if time.time() >= deadline:
+                logger.warning(f"[共享缓存] 等待 {key} 刷新超时，本进程自行刷新")
+                return refresh(), time.time(), True
+            waited = True
+            time.sleep(_POLL_INTERVAL)
+
+
+_cache: Optional[SharedCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """获取跨进程共享缓存，未配置 SHARED_CACHE_PATH 时返回 None"""
+    global _cache, _cache_loaded
+    if _cache_loaded:
+        return _cache
+    with _cache_lock:
+        if not _cache_loaded:
+            from src.config import get_config
+
+            path = get_config().shared_cache_path
+            if path:
+                try:
+                    _cache = SharedCache(path)
+                    logger.info(f"[共享缓存] 已启用: {path}")
+                except Exception as e:
+                    logger.warning(f"[共享缓存] 打开 {path} 失败，仅使用进程内缓存: {e}")
+            _cache_loaded = True
+    return _cache
+
+
+def reset_shared_cache() -> None:
+    """关闭并丢弃当前共享缓存实例（用于测试或切换配置）"""
+    global _cache, _cache_loaded
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        _cache_loaded = False
+
+
+def refresh_through_shared_cache(key: str, ttl: float, refresh: Callable[[], Any]) -> Tuple[Any, float, bool]:
+    """
+    经共享缓存执行一次全量刷新；未启用共享缓存或共享缓存异常时直接调用 refresh
+
+    Returns:
+        (值, 写入时间, 是否由本进程刷新)
+    """
+    cache = get_shared_cache()
+    if cache is None:
+        return refresh(), time.time(), True
+    try:
+        return cache.get_or_refresh(key, ttl, refresh)
+    except sqlite3.Error as e:
+        logger.warning(f"[共享缓存] {key} 读写失败，本进程自行刷新: {e}")
+        return refresh(), time.time(), True
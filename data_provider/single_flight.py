@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+Single-flight 请求合并
+===================================
+
+设计目标：
+全量行情缓存过期的瞬间，线程池中多个 worker 会同时发现缓存未命中。
+SingleFlight 保证同一个 key 同一时刻只有一个线程真正执行刷新，
+其余线程等待并共享该次结果（或异常），避免重复下载全市场数据。
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    按 key 合并并发调用
+
+    使用方式：
+        flight = SingleFlight()
+        df = flight.do('realtime', refresh_func)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        执行 func，同一 key 的并发调用只执行一次
+
+        Returns:
+            func 的返回值（等待者与执行者拿到同一个对象）
+
+        Raises:
+            func 抛出的异常会同样抛给所有等待者
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            logger.debug(f"[合并请求] {key} 已有刷新进行中，等待其结果")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.waiters:
+                logger.debug(f"[合并请求] {key} 刷新完成，共享给 {call.waiters} 个等待线程")
+            call.done.set()
+        return call.result
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+数据源健康度统计与自适应排序
+===================================
+
+设计目标：
+1. 按调用类别（daily / realtime / chip / minute）记录各数据源的 EWMA 延迟与成功率
+2. 以静态优先级为先验，根据观测到的期望耗时动态调整尝试顺序
+3. 长时间无样本的数据源逐渐回归先验位置，降级数据源恢复后能被重新探测
+
+评分（越小越优先）：
+    观测得分 = EWMA 延迟 + (1 - EWMA 成功率) × 失败惩罚
+    先验得分 = PRIOR_BASE_LATENCY + 静态顺序 × PRIOR_STEP
+    最终得分 = w × 观测得分 + (1 - w) × 先验得分
+    w = n / (n + PRIOR_WEIGHT)，n 为按时间衰减后的有效样本数
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.run_profile import profile_record
+
+logger = logging.getLogger(__name__)
+
+
+class _SourceStats:
+    """单个数据源在某一类别下的统计"""
+
+    __slots__ = ('latency', 'success', 'samples', 'updated_at')
+
+    def __init__(self):
+        self.latency = 0.0
+        self.success = 1.0
+        self.samples = 0.0
+        self.updated_at = 0.0
+
+
+class SourceHealthTracker:
+    """
+    数据源健康度跟踪器（线程安全）
+
+    使用方式：
+        tracker = SourceHealthTracker()
+        tracker.record('daily', 'EfinanceFetcher', latency=12.3, success=False)
+        order = tracker.rank('daily', ['EfinanceFetcher', 'AkshareFetcher'])
+    """
+
+    ALPHA = 0.3                  # EWMA 平滑系数
+    FAILURE_PENALTY = 10.0       # 失败一次相当于多等待的秒数（约等于一次超时）
+    PRIOR_BASE_LATENCY = 1.0     # 先验：最高优先级数据源的假定耗时（秒）
+    PRIOR_STEP = 0.5             # 先验：静态顺序每靠后一位增加的耗时（秒）
+    PRIOR_WEIGHT = 3.0           # 先验相当于的样本数
+    DECAY_HALF_LIFE = 1800.0     # 有效样本数的衰减半衰期（秒）
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _SourceStats] = {}
+
+    def record(self, category: str, source: str, latency: float, success: bool) -> None:
+        """
+        记录一次调用结果
+
+        Args:
+            category: 调用类别（daily / realtime / chip / minute）
+            source: 数据源名称
+            latency: 本次调用耗时（秒）
+            success: 是否返回有效数据
+        """
+        profile_record(f"source.{category}.{source}", latency)
+        now = time.time()
+        with self._lock:
+            stats = self._stats.setdefault((category, source), _SourceStats())
+            if stats.samples == 0:
+                stats.latency = latency
+                stats.success = 1.0 if success else 0.0
+            else:
+                stats.latency += self.ALPHA * (latency - stats.latency)
+                stats.success += self.ALPHA * ((1.0 if success else 0.0) - stats.success)
+            stats.samples = self._decayed_samples(stats, now) + 1
+            stats.updated_at = now
+
+    def _decayed_samples(self, stats: _SourceStats, now: float) -> float:
+        if stats.samples == 0:
+            return 0.0
+        elapsed = max(0.0, now - stats.updated_at)
+        return stats.samples * math.pow(0.5, elapsed / self.DECAY_HALF_LIFE)
+
+    def score(self, category: str, source: str, prior_index: int) -> float:
+        """计算数据源得分（期望耗时，秒），越小越优先"""
+        prior = self.PRIOR_BASE_LATENCY + prior_index * self.PRIOR_STEP
+        with self._lock:
+            stats = self._stats.get((category, source))
+            if stats is None or stats.samples == 0:
+                return prior
+            samples = self._decayed_samples(stats, time.time())
+            observed = stats.latency + (1.0 - stats.success) * self.FAILURE_PENALTY
+        weight = samples / (samples + self.PRIOR_WEIGHT)
+        return weight * observed + (1.0 - weight) * prior
+
+    def rank(self, category: str, sources: Sequence[str]) -> List[str]:
+        """
+        按得分重新排序数据源
+
+        Args:
+            category: 调用类别
+            sources: 按静态优先级排列的数据源名称
+
+        Returns:
+            排序后的数据源名称（得分相同时保持静态顺序）
+        """
+        scored = [
+            (self.score(category, source, idx), idx, source)
+            for idx, source in enumerate(sources)
+        ]
+        ranked = [source for _, _, source in sorted(scored)]
+        if ranked != list(sources):
+            logger.debug(
+                f"[自适应优先级] {category} 顺序调整为: "
+                + ", ".join(f"{s}({score:.2f}s)" for score, _, s in sorted(scored))
+            )
+        return ranked
+
+    def get_stats(self, category: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        获取统计快照
+
+        Returns:
+            {类别: {数据源: {'latency': 秒, 'success_rate': 0~1, 'samples': 有效样本数}}}
+        """
+        now = time.time()
+        snapshot: Dict[str, Dict[str, Dict[str, float]]] = {}
+        with self._lock:
+            for (cat, source), stats in self._stats.items():
+                if category is not None and cat != category:
+                    continue
+                snapshot.setdefault(cat, {})[source] = {
+                    'latency': round(stats.latency, 3),
+                    'success_rate': round(stats.success, 3),
+                    'samples': round(self._decayed_samples(stats, now), 2),
+                }
+        return snapshot
@@ -17,8 +17,7 @@ TushareFetcher - 备用数据源 1 (Priority 2)
 import json as _json
 import logging
 import re
-import time
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Tuple, List, Dict, Any
 
 import pandas as pd
@@ -31,7 +30,8 @@ from tenacity import (
     before_sleep_log,
 )
 
-from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS
+from .base import BaseFetcher, DataFetchError, RateLimitError, STANDARD_COLUMNS, UnsupportedCodeError
+from .rate_limiter import get_rate_limiter
 from .realtime_types import UnifiedRealtimeQuote
 from src.config import get_config
 import os
@@ -99,8 +99,13 @@ class TushareFetcher(BaseFetcher):
             rate_limit_per_minute: 每分钟最大请求数（默认80，Tushare免费配额）
         """
         self.rate_limit_per_minute = rate_limit_per_minute
-        self._call_count = 0  # 当前分钟内的调用次数
-        self._minute_start: Optional[float] = None  # 当前计数周期开始时间
+        # 突发容量 burst + 每分钟补充 (limit - burst) 个令牌，任意 60 秒窗口内不超过配额
+        burst = min(5, max(1, rate_limit_per_minute // 10))
+        self._rate_limiter = get_rate_limiter(
+            'tushare',
+            rate=max(rate_limit_per_minute - burst, 1) / 60.0,
+            burst=burst,
+        )
         self._api: Optional[object] = None  # Tushare API 实例
 
         # 尝试初始化 API
@@ -210,44 +215,13 @@ class TushareFetcher(BaseFetcher):
     def _check_rate_limit(self) -> None:
         """
         检查并执行速率限制
-        
-        流控策略：
-        1. 检查是否进入新的一分钟
-        2. 如果是，重置计数器
-        3. 如果当前分钟调用次数超过限制，强制休眠
-        """
-        current_time = time.time()
-        
-        # 检查是否需要重置计数器（新的一分钟）
-        if self._minute_start is None:
-            self._minute_start = current_time
-            self._call_count = 0
-        elif current_time - self._minute_start >= 60:
-            # 已经过了一分钟，重置计数器
-            self._minute_start = current_time
-            self._call_count = 0
-            logger.debug("速率限制计数器已重置")
-        
-        # 检查是否超过配额
-        if self._call_count >= self.rate_limit_per_minute:
-            # 计算需要等待的时间（到下一分钟）
-            elapsed = current_time - self._minute_start
-            sleep_time = max(0, 60 - elapsed) + 1  # +1 秒缓冲
-            
-            logger.warning(
-                f"Tushare 达到速率限制 ({self._call_count}/{self.rate_limit_per_minute} 次/分钟)，"
-                f"等待 {sleep_time:.1f} 秒..."
-            )
-            
-            time.sleep(sleep_time)
-            
-            # 重置计数器
-            self._minute_start = time.time()
-            self._call_count = 0
-        
-        # 增加调用计数
-        self._call_count += 1
-        logger.debug(f"Tushare 当前分钟调用次数: {self._call_count}/{self.rate_limit_per_minute}")
+
+        使用进程内共享的 tushare 令牌桶：配额充足时立即放行，
+        不足时只等待到下一个令牌可用，而不是整分钟休眠。
+        """
+        waited = self._rate_limiter.acquire()
+        if waited > 1:
+            logger.info(f"Tushare 达到速率限制 ({self.rate_limit_per_minute} 次/分钟)，已等待 {waited:.1f} 秒")
     
     def _convert_stock_code(self, stock_code: str) -> str:
         """
@@ -288,6 +262,10 @@ class TushareFetcher(BaseFetcher):
             logger.warning(f"无法确定股票 {code} 的市场，默认使用深市")
             return f"{code}.SZ"
     
+    def supports_daily_code(self, stock_code: str) -> bool:
+        """需要 API 已初始化（配置 Token），不支持美股"""
+        return self._api is not None and not _is_us_code(stock_code)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -314,7 +292,7 @@ class TushareFetcher(BaseFetcher):
         
         # US stocks not supported
         if _is_us_code(stock_code):
-            raise DataFetchError(f"TushareFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
+            raise UnsupportedCodeError(f"TushareFetcher 不支持美股 {stock_code}，请使用 AkshareFetcher 或 YfinanceFetcher")
         
         # Rate-limit check
         self._check_rate_limit()
@@ -358,6 +336,56 @@ class TushareFetcher(BaseFetcher):
             
             raise DataFetchError(f"Tushare 获取数据失败: {e}") from e
     
+    # 单次 daily 调用返回的最大行数（Tushare 接口上限 6000，留出余量）
+    _BATCH_MAX_ROWS = 5000
+
+    def supports_batch_code(self, stock_code: str) -> bool:
+        """daily 接口支持逗号拼接多个 ts_code，仅限 A 股个股（ETF 走 fund_daily）"""
+        return (
+            self._api is not None
+            and stock_code.isdigit() and len(stock_code) == 6
+            and not _is_etf_code(stock_code)
+        )
+
+    def _fetch_raw_data_batch(self, stock_codes: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取日线：按 ts_code 逗号拼接，一次 daily 调用覆盖多只股票
+
+        按日期跨度估算每只股票的行数，分块保证单次返回不超过 _BATCH_MAX_ROWS
+        """
+        if self._api is None:
+            raise DataFetchError("Tushare API 未初始化，请检查 Token 配置")
+
+        ts_start = start_date.replace('-', '')
+        ts_end = end_date.replace('-', '')
+        span_days = (datetime.strptime(ts_end, '%Y%m%d') - datetime.strptime(ts_start, '%Y%m%d')).days + 1
+        chunk_size = max(1, self._BATCH_MAX_ROWS // max(1, span_days))
+
+        code_map = {self._convert_stock_code(code): code for code in stock_codes}
+        ts_codes = list(code_map)
+        results: Dict[str, pd.DataFrame] = {}
+
+        for i in range(0, len(ts_codes), chunk_size):
+            chunk = ts_codes[i:i + chunk_size]
+            self._check_rate_limit()
+            logger.debug(f"调用 Tushare daily({len(chunk)} 只, {ts_start}, {ts_end})")
+            try:
+                df = self._api.daily(ts_code=','.join(chunk), start_date=ts_start, end_date=ts_end)
+            except Exception as e:
+                error_msg = str(e).lower()
+                if any(keyword in error_msg for keyword in ['quota', '配额', 'limit', '权限']):
+                    logger.warning(f"Tushare 配额可能超限: {e}")
+                    raise RateLimitError(f"Tushare 配额超限: {e}") from e
+                raise DataFetchError(f"Tushare 批量获取数据失败: {e}") from e
+
+            if df is None or df.empty:
+                continue
+            for ts_code, group in df.groupby('ts_code'):
+                if ts_code in code_map:
+                    results[code_map[ts_code]] = group.reset_index(drop=True)
+
+        return results
+    
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
         标准化 Tushare 数据
@@ -481,13 +509,12 @@ class TushareFetcher(BaseFetcher):
             
             if df is not None and not df.empty:
                 # 转换 ts_code 为标准代码格式
-                df['code'] = df['ts_code'].apply(lambda x: x.split('.')[0])
+                df['code'] = df['ts_code'].str.split('.').str[0]
                 
                 # 更新缓存
                 if not hasattr(self, '_stock_name_cache'):
                     self._stock_name_cache = {}
-                for _, row in df.iterrows():
-                    self._stock_name_cache[row['code']] = row['name']
+                self._stock_name_cache.update(zip(df['code'], df['name']))
                 
                 logger.info(f"Tushare 获取股票列表成功: {len(df)} 条")
                 return df[['code', 'name', 'industry', 'area', 'market']]
@@ -497,6 +524,42 @@ class TushareFetcher(BaseFetcher):
         
         return None
     
+    # 各市场交易日历接口（港股/美股需要对应积分权限）
+    _TRADE_CAL_APIS = {'cn': 'trade_cal', 'hk': 'hk_tradecal', 'us': 'us_tradecal'}
+    
+    def get_trade_dates(self, market: str, start_date: date, end_date: date) -> Optional[List[date]]:
+        """
+        获取交易日历中的开市日
+        
+        Args:
+            market: cn / hk / us
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            开市日列表，失败返回 None
+        """
+        api_name = self._TRADE_CAL_APIS.get(market)
+        if self._api is None or api_name is None:
+            return None
+        
+        try:
+            self._check_rate_limit()
+            params = {
+                'start_date': start_date.strftime('%Y%m%d'),
+                'end_date': end_date.strftime('%Y%m%d'),
+                'is_open': '1',
+            }
+            if market == 'cn':
+                params['exchange'] = 'SSE'
+            df = getattr(self._api, api_name)(**params)
+            if df is None or df.empty:
+                return None
+            return pd.to_datetime(df['cal_date'], format='%Y%m%d').dt.date.tolist()
+        except Exception as e:
+            logger.warning(f"Tushare 获取 {market} 交易日历失败: {e}")
+            return None
+    
     def get_realtime_quote(self, stock_code: str) -> Optional[UnifiedRealtimeQuote]:
         """
         获取实时行情
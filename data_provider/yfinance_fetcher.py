@@ -29,6 +29,7 @@ from tenacity import (
 )
 
 from .base import BaseFetcher, DataFetchError, STANDARD_COLUMNS
+from .rate_limiter import get_rate_limiter
 from .realtime_types import UnifiedRealtimeQuote, RealtimeSource
 import os
 
@@ -60,6 +61,18 @@ class YfinanceFetcher(BaseFetcher):
         """初始化 YfinanceFetcher"""
         pass
     
+    def _enforce_rate_limit(self, host: str = 'yahoo') -> None:
+        """
+        强制执行速率限制
+
+        从上游主机共享的令牌桶中获取令牌，仅在预算不足时等待。
+        多个线程访问同一主机时共用同一预算。
+
+        Args:
+            host: 上游主机标识（yahoo）
+        """
+        get_rate_limiter(host).acquire()
+    
     def _convert_stock_code(self, stock_code: str) -> str:
         """
         转换股票代码为 Yahoo Finance 格式
@@ -146,6 +159,7 @@ class YfinanceFetcher(BaseFetcher):
         yf_code = self._convert_stock_code(stock_code)
         
         logger.debug(f"调用 yfinance.download({yf_code}, {start_date}, {end_date})")
+        self._enforce_rate_limit()
         
         try:
             # 使用 yfinance 下载数据
@@ -167,6 +181,47 @@ class YfinanceFetcher(BaseFetcher):
                 raise
             raise DataFetchError(f"Yahoo Finance 获取数据失败: {e}") from e
     
+    def supports_batch_code(self, stock_code: str) -> bool:
+        """美股代码可合并到一次多 ticker 下载（A 股/港股优先走国内数据源）"""
+        return self._is_us_stock(stock_code)
+
+    def _fetch_raw_data_batch(self, stock_codes: List[str], start_date: str, end_date: str) -> Dict[str, pd.DataFrame]:
+        """
+        批量获取日线：一次 yf.download 下载多个 ticker，按 ticker 拆分
+
+        group_by='ticker' 时返回 (ticker, 字段) 两级列名，逐个 ticker 取出子表
+        """
+        import yfinance as yf
+
+        code_map = {self._convert_stock_code(code): code for code in stock_codes}
+        logger.debug(f"调用 yfinance.download({len(code_map)} 个 ticker, {start_date}, {end_date})")
+        self._enforce_rate_limit()
+
+        try:
+            df = yf.download(
+                tickers=list(code_map),
+                start=start_date,
+                end=end_date,
+                progress=False,
+                auto_adjust=True,
+                group_by='ticker',
+            )
+        except Exception as e:
+            raise DataFetchError(f"Yahoo Finance 批量获取数据失败: {e}") from e
+
+        results: Dict[str, pd.DataFrame] = {}
+        if df is None or df.empty or not isinstance(df.columns, pd.MultiIndex):
+            return results
+
+        tickers = set(df.columns.get_level_values(0))
+        for yf_code, stock_code in code_map.items():
+            if yf_code not in tickers:
+                continue
+            sub_df = df[yf_code].dropna(how='all')
+            if not sub_df.empty:
+                results[stock_code] = sub_df
+        return results
+    
     def _normalize_data(self, df: pd.DataFrame, stock_code: str) -> pd.DataFrame:
         """
         标准化 Yahoo Finance 数据
@@ -246,6 +301,7 @@ class YfinanceFetcher(BaseFetcher):
         try:
             for ak_code, (yf_code, name) in yf_mapping.items():
                 try:
+                    self._enforce_rate_limit()
                     ticker = yf.Ticker(yf_code)
                     # 获取最近2天数据以计算涨跌
                     hist = ticker.history(period='2d')
@@ -328,6 +384,7 @@ class YfinanceFetcher(BaseFetcher):
             symbol = stock_code.strip().upper()
             logger.debug(f"[Yfinance] 获取美股 {symbol} 实时行情")
             
+            self._enforce_rate_limit()
             ticker = yf.Ticker(symbol)
             
             # 尝试获取 fast_info（更快，但字段较少）
@@ -347,6 +404,7 @@ class YfinanceFetcher(BaseFetcher):
             except Exception:
                 # 回退到 history 方法获取最新数据
                 logger.debug(f"[Yfinance] fast_info 失败，尝试 history 方法")
+                self._enforce_rate_limit()
                 hist = ticker.history(period='2d')
                 if hist.empty:
                     logger.warning(f"[Yfinance] 无法获取 {symbol} 的数据")
@@ -69,6 +69,7 @@ def parse_arguments() -> argparse.Namespace:
   python main.py --single-notify    # 启用单股推送模式（每分析完一只立即推送）
   python main.py --schedule         # 启用定时任务模式
   python main.py --market-review    # 仅运行大盘复盘
+  python main.py --resume           # 续跑最近一次中断的分析（只处理未完成的股票）
         '''
     )
 
@@ -102,6 +103,15 @@ def parse_arguments() -> argparse.Namespace:
         help='启用单股推送模式：每分析完一只股票立即推送，而不是汇总推送'
     )
 
+    parser.add_argument(
+        '--resume',
+        nargs='?',
+        const='latest',
+        default=None,
+        metavar='RUN_ID',
+        help='续跑中断的分析：不指定 RUN_ID 时续跑最近一次未完成的运行，只处理未完成的股票与阶段'
+    )
+
     parser.add_argument(
         '--workers',
         type=int,
@@ -229,11 +239,12 @@ def run_full_analysis(
             save_context_snapshot=save_context_snapshot
         )
 
-        # 1. 运行个股分析
+        # 1. 运行个股分析（--resume 时按运行清单续跑）
         results = pipeline.run(
             stock_codes=stock_codes,
             dry_run=args.dry_run,
-            send_notification=not args.no_notify
+            send_notification=not args.no_notify,
+            resume=getattr(args, 'resume', None)
         )
 
         # Issue #128: 分析间隔 - 在个股分析和大盘分析之间添加延迟
@@ -419,6 +430,8 @@ def main() -> int:
     if args.stocks:
         stock_codes = [code.strip() for code in args.stocks.split(',') if code.strip()]
         logger.info(f"使用命令行指定的股票列表: {stock_codes}")
+        if args.resume:
+            logger.warning("--resume 续跑时使用运行清单中的股票列表，忽略 --stocks")
 
     # === 处理 --webui / --webui-only 参数，映射到 --serve / --serve-only ===
     if args.webui:
@@ -529,7 +542,16 @@ def main() -> int:
             from src.scheduler import run_with_schedule
 
             def scheduled_task():
+                if config.schedule_trading_days_only:
+                    from src.trading_calendar import get_trading_calendar
+
+                    codes = stock_codes or get_config().stock_list
+                    if not get_trading_calendar().any_market_open_today(codes):
+                        logger.info("自选股所在市场今日均休市，跳过本次定时任务")
+                        return
                 run_full_analysis(config, args, stock_codes)
+                # --resume 只作用于启动时的第一次运行，之后的定时任务正常分析
+                args.resume = None
 
             run_with_schedule(
                 task=scheduled_task,
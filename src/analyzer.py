@@ -10,76 +10,23 @@ A股自选股智能分析系统 - AI分析层
 3. 结合技术面和消息面生成分析报告
 """
 
+import asyncio
 import json
 import logging
 import time
-from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, fields
+from typing import Optional, Dict, Any, Generator, List, Tuple
 from json_repair import repair_json
 
 from src.config import get_config
+# STOCK_NAME_MAP 已迁移至证券主数据模块，保留导入以兼容旧引用
+from src.security_master import STOCK_NAME_MAP, get_security_master  # noqa: F401
+from src.replay import get_traffic_archive, replay_call
+from src.run_profile import profile_count, profile_record
 
 logger = logging.getLogger(__name__)
 
 
-# 股票名称映射（常见股票）
-STOCK_NAME_MAP = {
-    # === A股 ===
-    '600519': '贵州茅台',
-    '000001': '平安银行',
-    '300750': '宁德时代',
-    '002594': '比亚迪',
-    '600036': '招商银行',
-    '601318': '中国平安',
-    '000858': '五粮液',
-    '600276': '恒瑞医药',
-    '601012': '隆基绿能',
-    '002475': '立讯精密',
-    '300059': '东方财富',
-    '002415': '海康威视',
-    '600900': '长江电力',
-    '601166': '兴业银行',
-    '600028': '中国石化',
-
-    # === 美股 ===
-    'AAPL': '苹果',
-    'TSLA': '特斯拉',
-    'MSFT': '微软',
-    'GOOGL': '谷歌A',
-    'GOOG': '谷歌C',
-    'AMZN': '亚马逊',
-    'NVDA': '英伟达',
-    'META': 'Meta',
-    'AMD': 'AMD',
-    'INTC': '英特尔',
-    'BABA': '阿里巴巴',
-    'PDD': '拼多多',
-    'JD': '京东',
-    'BIDU': '百度',
-    'NIO': '蔚来',
-    'XPEV': '小鹏汽车',
-    'LI': '理想汽车',
-    'COIN': 'Coinbase',
-    'MSTR': 'MicroStrategy',
-
-    # === 港股 (5位数字) ===
-    '00700': '腾讯控股',
-    '03690': '美团',
-    '01810': '小米集团',
-    '09988': '阿里巴巴',
-    '09618': '京东集团',
-    '09888': '百度集团',
-    '01024': '快手',
-    '00981': '中芯国际',
-    '02015': '理想汽车',
-    '09868': '小鹏汽车',
-    '00005': '汇丰控股',
-    '01299': '友邦保险',
-    '00941': '中国移动',
-    '00883': '中国海洋石油',
-}
-
-
 def get_stock_name_multi_source(
     stock_code: str,
     context: Optional[Dict] = None,
@@ -90,7 +37,7 @@ def get_stock_name_multi_source(
 
     获取策略（按优先级）：
     1. 从传入的 context 中获取（realtime 数据）
-    2. 从静态映射表 STOCK_NAME_MAP 获取
+    2. 从证券主数据（内存索引）获取
     3. 从 DataFetcherManager 获取（各数据源）
     4. 返回默认名称（股票+代码）
 
@@ -114,15 +61,16 @@ def get_stock_name_multi_source(
         if 'realtime' in context and context['realtime'].get('name'):
             return context['realtime']['name']
 
-    # 2. 从静态映射表获取
-    if stock_code in STOCK_NAME_MAP:
-        return STOCK_NAME_MAP[stock_code]
+    # 2. 从证券主数据获取
+    name = get_security_master().get_name(stock_code)
+    if name:
+        return name
 
     # 3. 从数据源获取
     if data_manager is None:
         try:
-            from data_provider.base import DataFetcherManager
-            data_manager = DataFetcherManager()
+            from data_provider.base import get_fetcher_manager
+            data_manager = get_fetcher_manager()
         except Exception as e:
             logger.debug(f"无法初始化 DataFetcherManager: {e}")
 
@@ -130,8 +78,6 @@ def get_stock_name_multi_source(
         try:
             name = data_manager.get_stock_name(stock_code)
             if name:
-                # 更新缓存
-                STOCK_NAME_MAP[stock_code] = name
                 return name
         except Exception as e:
             logger.debug(f"从数据源获取股票名称失败: {e}")
@@ -235,6 +181,12 @@ class AnalysisResult:
             'change_pct': self.change_pct,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AnalysisResult':
+        """由 to_dict() 的结果（如分析历史的 raw_result）还原，忽略未知字段"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
     def get_core_conclusion(self) -> str:
         """获取核心结论（一句话）"""
         if self.dashboard and 'core_conclusion' in self.dashboard:
@@ -523,6 +475,9 @@ class GeminiAnalyzer:
         self._using_fallback = False  # 是否正在使用备选模型
         self._use_openai = False  # 是否使用 OpenAI 兼容 API
         self._openai_client = None  # OpenAI 客户端
+        self._openai_client_kwargs: Dict[str, Any] = {}  # OpenAI 客户端参数（异步客户端复用）
+        self._async_openai_client = None  # AsyncOpenAI 客户端（按事件循环懒加载）
+        self._async_openai_loop = None
 
         # 检查 Gemini API Key 是否有效（过滤占位符）
         gemini_key_valid = self._api_key and not self._api_key.startswith('your_') and len(self._api_key) > 10
@@ -580,6 +535,7 @@ class GeminiAnalyzer:
                 client_kwargs["base_url"] = config.openai_base_url
 
             self._openai_client = OpenAI(**client_kwargs)
+            self._openai_client_kwargs = client_kwargs
             self._current_model_name = config.openai_model
             self._use_openai = True
             logger.info(f"OpenAI 兼容 API 初始化成功 (base_url: {config.openai_base_url}, model: {config.openai_model})")
@@ -671,90 +627,161 @@ class GeminiAnalyzer:
         """检查分析器是否可用"""
         return self._model is not None or self._openai_client is not None
 
-    def _call_openai_api(self, prompt: str, generation_config: dict) -> str:
-        """
-        调用 OpenAI 兼容 API
+    def _openai_request_kwargs(self, prompt: str, generation_config: dict, mode: Optional[str]) -> dict:
+        """构造 chat.completions.create 参数；mode 为输出长度参数名（None 表示不传）"""
+        config = get_config()
+        kwargs = {
+            "model": self._current_model_name,
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": generation_config.get('temperature', config.openai_temperature),
+        }
+        if mode is not None:
+            kwargs[mode] = generation_config.get('max_output_tokens', 8192)
+        return kwargs
 
-        Args:
-            prompt: 提示词
-            generation_config: 生成配置
+    def _downgrade_token_param_mode(self, mode: Optional[str], error_message: str) -> Tuple[bool, Optional[str]]:
+        """
+        模型不支持当前输出长度参数时降级（max_tokens → max_completion_tokens → 不传），并按模型记住
 
         Returns:
-            响应文本
+            (是否降级, 新的参数名)
+        """
+        def _is_unsupported_param_error(param_name: str) -> bool:
+            lower_msg = error_message.lower()
+            return ('400' in lower_msg or "unsupported parameter" in lower_msg or "unsupported param" in lower_msg) and param_name in lower_msg
+
+        if mode == "max_tokens" and _is_unsupported_param_error("max_tokens"):
+            new_mode = "max_completion_tokens"
+        elif mode == "max_completion_tokens" and _is_unsupported_param_error("max_completion_tokens"):
+            new_mode = None
+        else:
+            return False, mode
+        self._token_param_mode[self._current_model_name] = new_mode
+        return True, new_mode
+
+    @staticmethod
+    def _openai_retry_delay(attempt: int, base_delay: float) -> float:
+        return min(base_delay * (2 ** (attempt - 1)), 60)
+
+    @staticmethod
+    def _openai_response_text(response: Any) -> str:
+        if response and response.choices and response.choices[0].message.content:
+            return response.choices[0].message.content
+        raise ValueError("OpenAI API 返回空响应")
+
+    @staticmethod
+    def _log_openai_failure(attempt: int, max_retries: int, error: Exception) -> None:
+        error_str = str(error)
+        is_rate_limit = '429' in error_str or 'rate' in error_str.lower() or 'quota' in error_str.lower()
+        
+        if is_rate_limit:
+            logger.warning(f"[OpenAI] API 限流，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+        else:
+            logger.warning(f"[OpenAI] API 调用失败，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
+
+    def _openai_call_steps(self, prompt: str, generation_config: dict) -> Generator[Tuple[str, Any], Any, str]:
+        """
+        OpenAI 兼容 API 的重试、指数退避与输出长度参数降级流程（同步/异步调用共用）
+
+        生成器依次产出 ('sleep', 等待秒数) 或 ('request', chat.completions.create 参数)，
+        由调用方执行：请求结果通过 send 传回，请求异常通过 throw 传回。结束时返回响应文本
         """
         config = get_config()
         max_retries = config.gemini_max_retries
         base_delay = config.gemini_retry_delay
 
-        def _build_base_request_kwargs() -> dict:
-            kwargs = {
-                "model": self._current_model_name,
-                "messages": [
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": generation_config.get('temperature', config.openai_temperature),
-            }
-            return kwargs
-
-        def _is_unsupported_param_error(error_message: str, param_name: str) -> bool:
-            lower_msg = error_message.lower()
-            return ('400' in lower_msg or "unsupported parameter" in lower_msg or "unsupported param" in lower_msg) and param_name in lower_msg
-
         if not hasattr(self, "_token_param_mode"):
             self._token_param_mode = {}
-
-        max_output_tokens = generation_config.get('max_output_tokens', 8192)
-        model_name = self._current_model_name
-        mode = self._token_param_mode.get(model_name, "max_tokens")
-
-        def _kwargs_with_mode(mode_value):
-            kwargs = _build_base_request_kwargs()
-            if mode_value is not None:
-                kwargs[mode_value] = max_output_tokens
-            return kwargs
+        mode = self._token_param_mode.get(self._current_model_name, "max_tokens")
 
         for attempt in range(max_retries):
             try:
                 if attempt > 0:
-                    delay = base_delay * (2 ** (attempt - 1))
-                    delay = min(delay, 60)
+                    delay = self._openai_retry_delay(attempt, base_delay)
                     logger.info(f"[OpenAI] 第 {attempt + 1} 次重试，等待 {delay:.1f} 秒...")
-                    time.sleep(delay)
+                    profile_count('llm_retry.openai')
+                    profile_record('llm.retry_wait', delay)
+                    yield 'sleep', delay
 
                 try:
-                    response = self._openai_client.chat.completions.create(**_kwargs_with_mode(mode))
+                    response = yield 'request', self._openai_request_kwargs(prompt, generation_config, mode)
                 except Exception as e:
-                    error_str = str(e)
-                    if mode == "max_tokens" and _is_unsupported_param_error(error_str, "max_tokens"):
-                        mode = "max_completion_tokens"
-                        self._token_param_mode[model_name] = mode
-                        response = self._openai_client.chat.completions.create(**_kwargs_with_mode(mode))
-                    elif mode == "max_completion_tokens" and _is_unsupported_param_error(error_str, "max_completion_tokens"):
-                        mode = None
-                        self._token_param_mode[model_name] = mode
-                        response = self._openai_client.chat.completions.create(**_kwargs_with_mode(mode))
-                    else:
+                    downgraded, mode = self._downgrade_token_param_mode(mode, str(e))
+                    if not downgraded:
                         raise
+                    response = yield 'request', self._openai_request_kwargs(prompt, generation_config, mode)
 
-                if response and response.choices and response.choices[0].message.content:
-                    return response.choices[0].message.content
-                else:
-                    raise ValueError("OpenAI API 返回空响应")
+                return self._openai_response_text(response)
                     
             except Exception as e:
-                error_str = str(e)
-                is_rate_limit = '429' in error_str or 'rate' in error_str.lower() or 'quota' in error_str.lower()
-                
-                if is_rate_limit:
-                    logger.warning(f"[OpenAI] API 限流，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
-                else:
-                    logger.warning(f"[OpenAI] API 调用失败，第 {attempt + 1}/{max_retries} 次尝试: {error_str[:100]}")
-                
+                self._log_openai_failure(attempt, max_retries, e)
                 if attempt == max_retries - 1:
                     raise
         
         raise Exception("OpenAI API 调用失败，已达最大重试次数")
+
+    def _call_openai_api(self, prompt: str, generation_config: dict) -> str:
+        """
+        调用 OpenAI 兼容 API
+
+        Args:
+            prompt: 提示词
+            generation_config: 生成配置
+
+        Returns:
+            响应文本
+        """
+        steps = self._openai_call_steps(prompt, generation_config)
+        outcome, error = None, None
+        while True:
+            try:
+                kind, value = steps.throw(error) if error is not None else steps.send(outcome)
+            except StopIteration as stop:
+                return stop.value
+            outcome, error = None, None
+            try:
+                if kind == 'sleep':
+                    time.sleep(value)
+                else:
+                    outcome = self._openai_client.chat.completions.create(**value)
+            except Exception as e:
+                error = e
+
+    def _get_async_openai_client(self) -> Any:
+        """
+        获取当前事件循环的 AsyncOpenAI 客户端
+
+        异步客户端的连接池绑定创建时的事件循环，每次 asyncio.run 都是新循环，因此按循环懒加载
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_openai_client is None or self._async_openai_loop is not loop:
+            from openai import AsyncOpenAI
+
+            self._async_openai_client = AsyncOpenAI(**self._openai_client_kwargs)
+            self._async_openai_loop = loop
+        return self._async_openai_client
+
+    async def _call_openai_api_async(self, prompt: str, generation_config: dict) -> str:
+        """调用 OpenAI 兼容 API（AsyncOpenAI，重试与参数降级流程与 _call_openai_api 共用 _openai_call_steps）"""
+        client = self._get_async_openai_client()
+        steps = self._openai_call_steps(prompt, generation_config)
+        outcome, error = None, None
+        while True:
+            try:
+                kind, value = steps.throw(error) if error is not None else steps.send(outcome)
+            except StopIteration as stop:
+                return stop.value
+            outcome, error = None, None
+            try:
+                if kind == 'sleep':
+                    await asyncio.sleep(value)
+                else:
+                    outcome = await client.chat.completions.create(**value)
+            except Exception as e:
+                error = e
     
     def _call_api_with_retry(self, prompt: str, generation_config: dict) -> str:
         """
@@ -792,6 +819,8 @@ class GeminiAnalyzer:
                     delay = base_delay * (2 ** (attempt - 1))  # 指数退避: 5, 10, 20, 40...
                     delay = min(delay, 60)  # 最大60秒
                     logger.info(f"[Gemini] 第 {attempt + 1} 次重试，等待 {delay:.1f} 秒...")
+                    profile_count('llm_retry.gemini')
+                    profile_record('llm.retry_wait', delay)
                     time.sleep(delay)
                 
                 response = self._model.generate_content(
@@ -876,102 +905,202 @@ class GeminiAnalyzer:
         request_delay = config.gemini_request_delay
         if request_delay > 0:
             logger.debug(f"[LLM] 请求前等待 {request_delay:.1f} 秒...")
+            profile_record('llm.request_delay', request_delay)
             time.sleep(request_delay)
         
-        # 优先从上下文获取股票名称（由 main.py 传入）
-        name = context.get('stock_name')
-        if not name or name.startswith('股票'):
-            # 备选：从 realtime 中获取
-            if 'realtime' in context and context['realtime'].get('name'):
-                name = context['realtime']['name']
-            else:
-                # 最后从映射表获取
-                name = STOCK_NAME_MAP.get(code, f'股票{code}')
+        name = self._resolve_stock_name(context, code)
         
         # 如果模型不可用，返回默认结果
         if not self.is_available():
-            return AnalysisResult(
-                code=code,
-                name=name,
-                sentiment_score=50,
-                trend_prediction='震荡',
-                operation_advice='持有',
-                confidence_level='低',
-                analysis_summary='AI 分析功能未启用（未配置 API Key）',
-                risk_warning='请配置 Gemini API Key 后重试',
-                success=False,
-                error_message='Gemini API Key 未配置',
-            )
+            return self._unavailable_result(code, name)
         
         try:
-            # 格式化输入（包含技术面数据和新闻）
-            prompt = self._format_prompt(context, name, news_context)
+            prompt, generation_config, api_provider = self._prepare_request(context, code, name, news_context)
             
-            # 获取模型名称
-            model_name = getattr(self, '_current_model_name', None)
-            if not model_name:
-                model_name = getattr(self._model, '_model_name', 'unknown')
-                if hasattr(self._model, 'model_name'):
-                    model_name = self._model.model_name
-            
-            logger.info(f"========== AI 分析 {name}({code}) ==========")
-            logger.info(f"[LLM配置] 模型: {model_name}")
-            logger.info(f"[LLM配置] Prompt 长度: {len(prompt)} 字符")
-            logger.info(f"[LLM配置] 是否包含新闻: {'是' if news_context else '否'}")
+            # 使用带重试的 API 调用
+            start_time = time.time()
+            response_text = replay_call(
+                'llm',
+                (prompt, sorted(generation_config.items())),
+                lambda: self._call_api_with_retry(prompt, generation_config),
+                group=code,
+            )
+            return self._finish_analysis(
+                response_text, context, code, name, news_context, api_provider, time.time() - start_time
+            )
             
-            # 记录完整 prompt 到日志（INFO级别记录摘要，DEBUG记录完整）
-            prompt_preview = prompt[:500] + "..." if len(prompt) > 500 else prompt
-            logger.info(f"[LLM Prompt 预览]\n{prompt_preview}")
-            logger.debug(f"=== 完整 Prompt ({len(prompt)}字符) ===\n{prompt}\n=== End Prompt ===")
+        except Exception as e:
+            return self._failed_result(code, name, e)
 
-            # 设置生成配置（从配置文件读取温度参数）
-            config = get_config()
-            generation_config = {
-                "temperature": config.gemini_temperature,
-                "max_output_tokens": 8192,
-            }
+    async def analyze_async(
+        self,
+        context: Dict[str, Any],
+        news_context: Optional[str] = None
+    ) -> AnalysisResult:
+        """
+        分析单只股票（异步版本，PIPELINE_MODE=async 使用）
 
-            # 根据实际使用的 API 显示日志
-            api_provider = "OpenAI" if self._use_openai else "Gemini"
-            logger.info(f"[LLM调用] 开始调用 {api_provider} API...")
-            
-            # 使用带重试的 API 调用
-            start_time = time.time()
-            response_text = self._call_api_with_retry(prompt, generation_config)
-            elapsed = time.time() - start_time
+        OpenAI 兼容 API 通过 AsyncOpenAI 调用，等待响应时不占用线程；
+        Gemini SDK 或启用流量录制/回放时，在事件循环的有界线程池中执行同步调用
 
-            # 记录响应信息
-            logger.info(f"[LLM返回] {api_provider} API 响应成功, 耗时 {elapsed:.2f}s, 响应长度 {len(response_text)} 字符")
-            
-            # 记录响应预览（INFO级别）和完整响应（DEBUG级别）
-            response_preview = response_text[:300] + "..." if len(response_text) > 300 else response_text
-            logger.info(f"[LLM返回 预览]\n{response_preview}")
-            logger.debug(f"=== {api_provider} 完整响应 ({len(response_text)}字符) ===\n{response_text}\n=== End Response ===")
-            
-            # 解析响应
-            result = self._parse_response(response_text, code, name)
-            result.raw_response = response_text
-            result.search_performed = bool(news_context)
-            result.market_snapshot = self._build_market_snapshot(context)
+        Args:
+            context: 从 storage.get_analysis_context() 获取的上下文数据
+            news_context: 预先搜索的新闻内容（可选）
 
-            logger.info(f"[LLM解析] {name}({code}) 分析完成: {result.trend_prediction}, 评分 {result.sentiment_score}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"AI 分析 {name}({code}) 失败: {e}")
-            return AnalysisResult(
-                code=code,
-                name=name,
-                sentiment_score=50,
-                trend_prediction='震荡',
-                operation_advice='持有',
-                confidence_level='低',
-                analysis_summary=f'分析过程出错: {str(e)[:100]}',
-                risk_warning='分析失败，请稍后重试或手动分析',
-                success=False,
-                error_message=str(e),
+        Returns:
+            AnalysisResult 对象
+        """
+        code = context.get('code', 'Unknown')
+        config = get_config()
+
+        request_delay = config.gemini_request_delay
+        if request_delay > 0:
+            logger.debug(f"[LLM] 请求前等待 {request_delay:.1f} 秒...")
+            profile_record('llm.request_delay', request_delay)
+            await asyncio.sleep(request_delay)
+
+        name = self._resolve_stock_name(context, code)
+
+        if not self.is_available():
+            return self._unavailable_result(code, name)
+
+        try:
+            prompt, generation_config, api_provider = self._prepare_request(context, code, name, news_context)
+
+            start_time = time.time()
+            if self._use_openai and get_traffic_archive() is None:
+                response_text = await self._call_openai_api_async(prompt, generation_config)
+            else:
+                response_text = await asyncio.to_thread(
+                    replay_call,
+                    'llm',
+                    (prompt, sorted(generation_config.items())),
+                    lambda: self._call_api_with_retry(prompt, generation_config),
+                    group=code,
+                )
+            return self._finish_analysis(
+                response_text, context, code, name, news_context, api_provider, time.time() - start_time
             )
+
+        except Exception as e:
+            return self._failed_result(code, name, e)
+
+    def _resolve_stock_name(self, context: Dict[str, Any], code: str) -> str:
+        """优先从上下文获取股票名称（由 main.py 传入）"""
+        name = context.get('stock_name')
+        if not name or name.startswith('股票'):
+            # 备选：从 realtime 中获取
+            if 'realtime' in context and context['realtime'].get('name'):
+                name = context['realtime']['name']
+            else:
+                # 最后从证券主数据获取
+                name = get_security_master().get_name(code) or f'股票{code}'
+        return name
+
+    @staticmethod
+    def _unavailable_result(code: str, name: str) -> AnalysisResult:
+        return AnalysisResult(
+            code=code,
+            name=name,
+            sentiment_score=50,
+            trend_prediction='震荡',
+            operation_advice='持有',
+            confidence_level='低',
+            analysis_summary='AI 分析功能未启用（未配置 API Key）',
+            risk_warning='请配置 Gemini API Key 后重试',
+            success=False,
+            error_message='Gemini API Key 未配置',
+        )
+
+    def _prepare_request(
+        self,
+        context: Dict[str, Any],
+        code: str,
+        name: str,
+        news_context: Optional[str]
+    ) -> Tuple[str, dict, str]:
+        """
+        格式化 Prompt 并确定生成配置
+
+        Returns:
+            (prompt, generation_config, API 提供方名称)
+        """
+        # 格式化输入（包含技术面数据和新闻）
+        prompt = self._format_prompt(context, name, news_context)
+        
+        # 获取模型名称
+        model_name = getattr(self, '_current_model_name', None)
+        if not model_name:
+            model_name = getattr(self._model, '_model_name', 'unknown')
+            if hasattr(self._model, 'model_name'):
+                model_name = self._model.model_name
+        
+        logger.info(f"========== AI 分析 {name}({code}) ==========")
+        logger.info(f"[LLM配置] 模型: {model_name}")
+        logger.info(f"[LLM配置] Prompt 长度: {len(prompt)} 字符")
+        logger.info(f"[LLM配置] 是否包含新闻: {'是' if news_context else '否'}")
+        
+        # 记录完整 prompt 到日志（INFO级别记录摘要，DEBUG记录完整）
+        prompt_preview = prompt[:500] + "..." if len(prompt) > 500 else prompt
+        logger.info(f"[LLM Prompt 预览]\n{prompt_preview}")
+        logger.debug(f"=== 完整 Prompt ({len(prompt)}字符) ===\n{prompt}\n=== End Prompt ===")
+
+        # 设置生成配置（从配置文件读取温度参数）
+        config = get_config()
+        generation_config = {
+            "temperature": config.gemini_temperature,
+            "max_output_tokens": 8192,
+        }
+
+        # 根据实际使用的 API 显示日志
+        api_provider = "OpenAI" if self._use_openai else "Gemini"
+        logger.info(f"[LLM调用] 开始调用 {api_provider} API...")
+        return prompt, generation_config, api_provider
+
+    def _finish_analysis(
+        self,
+        response_text: str,
+        context: Dict[str, Any],
+        code: str,
+        name: str,
+        news_context: Optional[str],
+        api_provider: str,
+        elapsed: float
+    ) -> AnalysisResult:
+        """记录响应并解析为 AnalysisResult"""
+        # 记录响应信息
+        logger.info(f"[LLM返回] {api_provider} API 响应成功, 耗时 {elapsed:.2f}s, 响应长度 {len(response_text)} 字符")
+        
+        # 记录响应预览（INFO级别）和完整响应（DEBUG级别）
+        response_preview = response_text[:300] + "..." if len(response_text) > 300 else response_text
+        logger.info(f"[LLM返回 预览]\n{response_preview}")
+        logger.debug(f"=== {api_provider} 完整响应 ({len(response_text)}字符) ===\n{response_text}\n=== End Response ===")
+        
+        # 解析响应
+        result = self._parse_response(response_text, code, name)
+        result.raw_response = response_text
+        result.search_performed = bool(news_context)
+        result.market_snapshot = self._build_market_snapshot(context)
+
+        logger.info(f"[LLM解析] {name}({code}) 分析完成: {result.trend_prediction}, 评分 {result.sentiment_score}")
+        
+        return result
+
+    @staticmethod
+    def _failed_result(code: str, name: str, error: Exception) -> AnalysisResult:
+        logger.error(f"AI 分析 {name}({code}) 失败: {error}")
+        return AnalysisResult(
+            code=code,
+            name=name,
+            sentiment_score=50,
+            trend_prediction='震荡',
+            operation_advice='持有',
+            confidence_level='低',
+            analysis_summary=f'分析过程出错: {str(error)[:100]}',
+            risk_warning='分析失败，请稍后重试或手动分析',
+            success=False,
+            error_message=str(error),
+        )
     
     def _format_prompt(
         self, 
@@ -994,7 +1123,7 @@ class GeminiAnalyzer:
         # 优先使用上下文中的股票名称（从 realtime_quote 获取）
         stock_name = context.get('stock_name', name)
         if not stock_name or stock_name == f'股票{code}':
-            stock_name = STOCK_NAME_MAP.get(code, f'股票{code}')
+            stock_name = get_security_master().get_name(code) or f'股票{code}'
             
         today = context.get('today', {})
         
@@ -1062,6 +1191,21 @@ class GeminiAnalyzer:
 | 90%筹码集中度 | {chip.get('concentration_90', 0):.2%} | <15%为集中 |
 | 70%筹码集中度 | {chip.get('concentration_70', 0):.2%} | |
 | 筹码状态 | {chip.get('chip_status', '未知')} | |
+"""
+        
+        # 添加盘中分钟线聚合数据
+        if context.get('intraday'):
+            intraday = context['intraday']
+            hourly = ' / '.join(
+                f"{h['time']} {h['share']:.0%}" for h in intraday.get('hourly_volume', [])
+            ) or 'N/A'
+            prompt += f"""
+### 盘中分时数据（分钟线聚合，截至 {intraday.get('last_time', 'N/A')}）
+| 指标 | 数值 |
+|------|------|
+| 开盘/最高/最低/最新 | {intraday.get('open')} / {intraday.get('high')} / {intraday.get('low')} / {intraday.get('close')} |
+| 累计成交额 | {self._format_amount(intraday.get('amount'))} |
+| 分时段成交量占比 | {hourly} |
 """
         
         # 添加趋势分析结果（基于交易理念的预判）
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 列式日线存储
+===================================
+
+职责：
+1. 按股票代码分区保存日线为 Arrow IPC（Feather v2）文件
+2. 通过内存映射零拷贝读取为 pandas DataFrame，长窗口加载免去逐行 ORM 开销
+3. 作为 SQLite stock_daily 的可选镜像，由 DatabaseManager 统一调度
+
+说明：
+- 依赖 pyarrow（可选），未安装时 DatabaseManager 自动回退 SQLite 查询
+- 文件不压缩，保证 memory_map 读取时数值列无需解码即可直接引用
+- 写入采用临时文件 + os.replace 原子替换，读者不会看到半写文件
+"""
+
+import logging
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 列式存储保存的日线列（与 StockDaily 数值字段一致）
+BAR_COLUMNS = [
+    'date', 'open', 'high', 'low', 'close', 'volume', 'amount', 'pct_chg',
+    'ma5', 'ma10', 'ma20', 'volume_ratio',
+]
+
+
+def is_bar_store_available() -> bool:
+    """pyarrow 是否可用"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ColumnarBarStore:
+    """
+    按代码分区的列式日线存储
+
+    目录结构：
+        {root}/{code}.arrow
+
+    使用方式：
+        store = ColumnarBarStore('./data/bars')
+        store.write('600519', df)
+        df = store.read('600519', start_date, end_date)
+    """
+
+    SUFFIX = '.arrow'
+
+    def __init__(self, root_dir: str):
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, code: str) -> Path:
+        return self.root / f"{code}{self.SUFFIX}"
+
+    def _lock(self, code: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(code, threading.Lock())
+
+    def has(self, code: str) -> bool:
+        """是否存在该代码的列式文件"""
+        return self._path(code).exists()
+
+    def first_date(self, code: str) -> Optional[date]:
+        """列式文件中最早的日期（用于判断是否覆盖查询区间）"""
+        bounds = self.date_bounds(code)
+        return bounds[0] if bounds else None
+
+    def date_bounds(self, code: str) -> Optional[Tuple[date, date]]:
+        """
+        列式文件覆盖的 (最早日期, 最新日期)
+
+        文件按日期升序写入，只读取首尾非空 record batch，无需加载整个文件
+        """
+        import pyarrow as pa
+
+        path = self._path(code)
+        if not path.exists():
+            return None
+
+        with pa.memory_map(str(path), 'r') as source:
+            reader = pa.ipc.open_file(source)
+            batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+            batches = [batch for batch in batches if batch.num_rows]
+            if not batches:
+                return None
+            first = batches[0].column(batches[0].schema.get_field_index('date'))
+            last = batches[-1].column(batches[-1].schema.get_field_index('date'))
+            return first[0].as_py(), last[len(last) - 1].as_py()
+
+    def read(
+        self,
+        code: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        内存映射读取日线
+
+        Args:
+            code: 股票代码
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+
+        Returns:
+            按日期升序的 DataFrame（date 列为 datetime.date），文件不存在时返回 None
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        path = self._path(code)
+        if not path.exists():
+            return None
+
+        with pa.memory_map(str(path), 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+
+            # 文件按日期升序写入：统计区间外的行数得到切片边界，零拷贝切片代替逐行过滤
+            dates = table.column('date')
+            lo, hi = 0, table.num_rows
+            if start_date is not None:
+                lo = pc.sum(pc.less(dates, pa.scalar(start_date, pa.date32()))).as_py() or 0
+            if end_date is not None:
+                hi = table.num_rows - (pc.sum(pc.greater(dates, pa.scalar(end_date, pa.date32()))).as_py() or 0)
+            return table.slice(lo, max(hi - lo, 0)).to_pandas(date_as_object=True)
+
+    def write(self, code: str, df: pd.DataFrame) -> int:
+        """
+        合并写入日线（按日期 upsert，新数据覆盖旧数据）
+
+        Args:
+            code: 股票代码
+            df: 包含 date 及 BAR_COLUMNS 中任意列的 DataFrame
+
+        Returns:
+            写入后文件中的总行数
+        """
+        import pyarrow as pa
+
+        if df is None or df.empty:
+            return 0
+
+        new_df = df.reindex(columns=BAR_COLUMNS).copy()
+        new_df['date'] = pd.to_datetime(new_df['date']).dt.date
+        for col in BAR_COLUMNS[1:]:
+            new_df[col] = pd.to_numeric(new_df[col], errors='coerce').astype('float64')
+
+        with self._lock(code):
+            existing = self.read(code)
+            if existing is not None and not existing.empty:
+                new_df = pd.concat([existing, new_df], ignore_index=True)
+            new_df = (
+                new_df.drop_duplicates(subset=['date'], keep='last')
+                .sort_values('date')
+                .reset_index(drop=True)
+            )
+
+            table = pa.Table.from_pandas(new_df, preserve_index=False)
+            path = self._path(code)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+
+        logger.debug(f"[列式存储] {code} 写入完成，共 {len(new_df)} 条")
+        return len(new_df)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 分析用日线窗口缓存
+===================================
+
+职责：
+1. 每只股票一次性从数据库读取最近 N 根日线（默认 120 根，覆盖 MA60/MACD/RSI 的预热期）
+2. 同一份 DataFrame 同时供趋势分析（StockTrendAnalyzer）与 AI 分析上下文使用，
+   单只股票在一次运行中只查询一次
+3. 日线写入后按股票失效，下一次读取重新加载
+"""
+
+import logging
+import threading
+from typing import Dict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 默认窗口长度：MA60 需要 60 根，MACD(12,26,9) 的 EMA 需要更长的预热
+DEFAULT_WINDOW_BARS = 120
+
+
+class BarWindowLoader:
+    """
+    按股票缓存的日线窗口
+
+    使用方式：
+        loader = BarWindowLoader(db, bars=120)
+        df = loader.get('600519')        # 首次查询数据库，之后命中缓存
+        loader.invalidate('600519')      # 写入新日线后调用
+    """
+
+    def __init__(self, db, bars: int = DEFAULT_WINDOW_BARS):
+        self.db = db
+        self.bars = max(int(bars), 2)
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code: str) -> pd.DataFrame:
+        """
+        获取股票最近 bars 根日线（按日期升序）
+
+        返回的 DataFrame 在多个调用方之间共享，调用方不应原地修改
+        """
+        with self._lock:
+            frame = self._frames.get(code)
+            if frame is not None:
+                self.hits += 1
+                return frame
+            self.misses += 1
+
+        frame = self.db.get_bar_window(code, self.bars)
+        logger.debug(f"[日线窗口] {code} 加载 {len(frame)} 根")
+        with self._lock:
+            # 并发加载同一只股票时保留先写入的一份，保证调用方拿到同一对象
+            return self._frames.setdefault(code, frame)
+
+    def invalidate(self, code: str) -> None:
+        with self._lock:
+            self._frames.pop(code, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self.hits = 0
+            self.misses = 0
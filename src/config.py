@@ -154,6 +154,24 @@ class Config:
     # 是否保存分析上下文快照（用于历史回溯）
     save_context_snapshot: bool = True
 
+    # 日线增量同步：仅拉取本地最新日期之后缺失的 K 线
+    enable_incremental_sync: bool = True
+
+    # 列式日线存储目录（Arrow IPC，内存映射读取），留空则不启用
+    bar_store_dir: str = ""
+
+    # 分钟线采集周期（1/5/15/30/60 分钟），0 表示不采集；采集后增量聚合为更高周期 K 线
+    minute_bar_period: int = 0
+
+    # 分析用日线窗口长度（根），趋势分析（MA60/MACD/RSI）与 AI 分析上下文共用，新股票首次获取日线也按此长度
+    analysis_window_bars: int = 120
+
+    # 全市场行情快照归档目录（按日期分区的压缩 Parquet），留空则不启用
+    snapshot_archive_dir: str = ""
+
+    # 跨进程共享行情缓存（SQLite 文件路径），定时任务/Web 服务/桌面端共用一次全量刷新，留空则不启用
+    shared_cache_path: str = ""
+
     # === 回测配置 ===
     backtest_enabled: bool = True
     backtest_eval_window_days: int = 10
@@ -167,6 +185,16 @@ class Config:
     
     # === 系统配置 ===
     max_workers: int = 3  # 低并发防封禁
+    # 流水线模式：threads（每个线程端到端处理一只股票）/ staged（分阶段流水线）/ async（asyncio 异步 I/O）
+    pipeline_mode: str = "threads"
+    # 分阶段流水线各阶段并发数（fetch/enrich/search/llm/persist，如 "llm=2,search=3"），未配置的阶段默认 max_workers
+    pipeline_stage_workers: str = ""
+    # 分阶段流水线各阶段速率预算（格式同 RATE_LIMITS，如 "llm=0.5:2"）
+    pipeline_stage_rates: str = ""
+    # 分阶段流水线阶段间队列长度（下游变慢时反压上游）
+    pipeline_queue_size: int = 4
+    # async 模式同时处理的股票数上限（同步数据源调用仍受 max_workers 线程池限制）
+    pipeline_async_concurrency: int = 64
     debug: bool = False
     http_proxy: Optional[str] = None  # HTTP 代理 (例如: http://127.0.0.1:10809)
     https_proxy: Optional[str] = None # HTTPS 代理
@@ -174,6 +202,7 @@ class Config:
     # === 定时任务配置 ===
     schedule_enabled: bool = False            # 是否启用定时任务
     schedule_time: str = "18:00"              # 每日推送时间（HH:MM 格式）
+    schedule_trading_days_only: bool = True   # 自选股所在市场均休市时跳过定时任务
     market_review_enabled: bool = True        # 是否启用大盘复盘
 
     # === 实时行情增强数据配置 ===
@@ -192,6 +221,22 @@ class Config:
     realtime_cache_ttl: int = 600
     # 熔断器冷却时间（秒）
     circuit_breaker_cooldown: int = 300
+    # 日线对冲请求截止时间（秒）：当前数据源超时未返回时并行启动下一数据源，0 表示顺序切换
+    daily_hedge_timeout: float = 0.0
+    # 自适应数据源排序：按 EWMA 延迟与成功率动态调整日线/实时行情/筹码数据源顺序（静态优先级作为先验）
+    adaptive_source_priority: bool = True
+    # 分析前批量预取日线：仅在各股票的首选日线数据源支持批量时合并请求（默认关闭，逐只获取）
+    daily_batch_prefetch: bool = False
+    # 通达信长连接池最大连接数（流水线 worker 并行取数时复用）
+    pytdx_pool_size: int = 4
+
+    # === 离线录制/回放（性能压测）===
+    # off: 关闭；record: 录制数据源/搜索/大模型的原始返回；replay: 从档案回放，不访问网络
+    replay_mode: str = "off"
+    replay_archive: str = "./data/replay.db"
+    # 回放延迟 = 录制耗时 × replay_latency_scale + replay_latency_ms
+    replay_latency_scale: float = 1.0
+    replay_latency_ms: float = 0.0
 
     # Discord 机器人状态
     discord_bot_status: str = "A股智能分析 | /help"
@@ -203,6 +248,9 @@ class Config:
     
     # Tushare 每分钟最大请求数（免费配额）
     tushare_rate_limit_per_minute: int = 80
+
+    # 按上游主机的令牌桶限流（host=每秒请求数:突发容量，逗号分隔），留空使用内置默认值
+    rate_limits: str = ""
     
     # 重试配置
     max_retries: int = 3
@@ -407,6 +455,12 @@ class Config:
             markdown_to_image_max_chars=int(os.getenv('MARKDOWN_TO_IMAGE_MAX_CHARS', '15000')),
             database_path=os.getenv('DATABASE_PATH', './data/stock_analysis.db'),
             save_context_snapshot=os.getenv('SAVE_CONTEXT_SNAPSHOT', 'true').lower() == 'true',
+            enable_incremental_sync=os.getenv('ENABLE_INCREMENTAL_SYNC', 'true').lower() == 'true',
+            bar_store_dir=os.getenv('BAR_STORE_DIR', ''),
+            minute_bar_period=int(os.getenv('MINUTE_BAR_PERIOD', '0')),
+            analysis_window_bars=max(int(os.getenv('ANALYSIS_WINDOW_BARS', '120')), 30),
+            snapshot_archive_dir=os.getenv('SNAPSHOT_ARCHIVE_DIR', ''),
+            shared_cache_path=os.getenv('SHARED_CACHE_PATH', ''),
             backtest_enabled=os.getenv('BACKTEST_ENABLED', 'true').lower() == 'true',
             backtest_eval_window_days=int(os.getenv('BACKTEST_EVAL_WINDOW_DAYS', '10')),
             backtest_min_age_days=int(os.getenv('BACKTEST_MIN_AGE_DAYS', '14')),
@@ -415,11 +469,17 @@ class Config:
             log_dir=os.getenv('LOG_DIR', './logs'),
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             max_workers=int(os.getenv('MAX_WORKERS', '3')),
+            pipeline_mode=os.getenv('PIPELINE_MODE', 'threads').strip().lower(),
+            pipeline_stage_workers=os.getenv('PIPELINE_STAGE_WORKERS', ''),
+            pipeline_stage_rates=os.getenv('PIPELINE_STAGE_RATES', ''),
+            pipeline_queue_size=int(os.getenv('PIPELINE_QUEUE_SIZE', '4')),
+            pipeline_async_concurrency=max(int(os.getenv('PIPELINE_ASYNC_CONCURRENCY', '64')), 1),
             debug=os.getenv('DEBUG', 'false').lower() == 'true',
             http_proxy=os.getenv('HTTP_PROXY'),
             https_proxy=os.getenv('HTTPS_PROXY'),
             schedule_enabled=os.getenv('SCHEDULE_ENABLED', 'false').lower() == 'true',
             schedule_time=os.getenv('SCHEDULE_TIME', '18:00'),
+            schedule_trading_days_only=os.getenv('SCHEDULE_TRADING_DAYS_ONLY', 'true').lower() == 'true',
             market_review_enabled=os.getenv('MARKET_REVIEW_ENABLED', 'true').lower() == 'true',
             webui_enabled=os.getenv('WEBUI_ENABLED', 'false').lower() == 'true',
             webui_host=os.getenv('WEBUI_HOST', '127.0.0.1'),
@@ -457,7 +517,16 @@ class Config:
             # - tushare: Tushare Pro，需要2000积分，数据全面
             realtime_source_priority=cls._resolve_realtime_source_priority(),
             realtime_cache_ttl=int(os.getenv('REALTIME_CACHE_TTL', '600')),
-            circuit_breaker_cooldown=int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '300'))
+            circuit_breaker_cooldown=int(os.getenv('CIRCUIT_BREAKER_COOLDOWN', '300')),
+            daily_hedge_timeout=float(os.getenv('DAILY_HEDGE_TIMEOUT', '0')),
+            adaptive_source_priority=os.getenv('ADAPTIVE_SOURCE_PRIORITY', 'true').lower() == 'true',
+            daily_batch_prefetch=os.getenv('DAILY_BATCH_PREFETCH', 'false').lower() == 'true',
+            pytdx_pool_size=int(os.getenv('PYTDX_POOL_SIZE', '4')),
+            replay_mode=os.getenv('REPLAY_MODE', 'off').lower(),
+            replay_archive=os.getenv('REPLAY_ARCHIVE', './data/replay.db'),
+            replay_latency_scale=float(os.getenv('REPLAY_LATENCY_SCALE', '1.0')),
+            replay_latency_ms=float(os.getenv('REPLAY_LATENCY_MS', '0')),
+            rate_limits=os.getenv('RATE_LIMITS', ''),
         )
     
     @classmethod
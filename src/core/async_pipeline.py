@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - asyncio 异步分析模式
+===================================
+
+职责：
+1. PIPELINE_MODE=async 时由 StockAnalysisPipeline.run 调用，在单个事件循环中并发处理整个自选股列表
+2. 情报搜索（博查/Brave）、OpenAI 兼容大模型、自定义 Webhook 推送通过共享的 httpx.AsyncClient /
+   AsyncOpenAI 异步发出，等待网络时不占用线程，单进程可同时挂起数百个 I/O
+3. 同步数据源（akshare/efinance/tushare 等）、SQLite 读写与 SDK 类客户端（Gemini、Tavily、SerpAPI、
+   邮件等）在事件循环的默认线程池中执行，线程池大小为 MAX_WORKERS，对数据源的并发压力与 threads 模式一致
+
+并发与限速：
+- PIPELINE_ASYNC_CONCURRENCY：同时处理的股票数上限
+- PIPELINE_STAGE_WORKERS / PIPELINE_STAGE_RATES：与 staged 模式相同的阶段名（fetch/enrich/search/llm/persist），
+  分别限制各阶段同时进行的调用数与每秒调用数
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from data_provider.rate_limiter import TokenBucket
+from src.analyzer import AnalysisResult
+from src.enums import ReportType
+
+if TYPE_CHECKING:
+    from src.core.pipeline import StockAnalysisPipeline, StockJob
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAnalysisRunner:
+    """
+    asyncio 模式的自选股分析执行器
+
+    使用方式：
+        results = AsyncAnalysisRunner(pipeline).run(
+            stock_codes, dry_run=False, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+    """
+
+    def __init__(self, pipeline: 'StockAnalysisPipeline'):
+        self.pipeline = pipeline
+        self.concurrency = max(int(getattr(pipeline.config, 'pipeline_async_concurrency', 64)), 1)
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def run(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float
+    ) -> List[AnalysisResult]:
+        """在新的事件循环中处理全部股票，阻塞直到完成"""
+        return asyncio.run(
+            self._run(stock_codes, dry_run, single_stock_notify, report_type, analysis_delay)
+        )
+
+    async def _run(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float
+    ) -> List[AnalysisResult]:
+        import httpx
+        from src.core.pipeline import StockJob
+
+        pipeline = self.pipeline
+        # asyncio.to_thread / run_in_executor(None) 使用默认线程池，限制为 MAX_WORKERS
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=pipeline.max_workers, thread_name_prefix='async-io')
+        )
+
+        workers, rates = pipeline._stage_budgets(analysis_delay)
+        default_workers = {
+            'fetch': pipeline.max_workers,
+            'enrich': pipeline.max_workers,
+            'search': self.concurrency,
+            'llm': self.concurrency,
+            'persist': 1,
+        }
+        self._limits = {
+            name: asyncio.Semaphore(workers.get(name, default))
+            for name, default in default_workers.items()
+        }
+        self._buckets = {
+            name: TokenBucket(rate, burst) for name, (rate, burst) in rates.items() if name in default_workers
+        }
+        logger.info(
+            f"asyncio 模式: 并发股票数 {self.concurrency}, 线程池 {pipeline.max_workers}, 阶段并发 "
+            + ", ".join(f"{name}×{workers.get(name, default)}" for name, default in default_workers.items())
+        )
+
+        slots = asyncio.Semaphore(self.concurrency)
+        # 运行清单读取查询 id 需访问 SQLite，放到线程池执行，不阻塞事件循环
+        query_ids = await asyncio.to_thread(lambda: [pipeline._query_id_for(code) for code in stock_codes])
+        jobs = [
+            StockJob(code=code, report_type=report_type, query_id=query_id)
+            for code, query_id in zip(stock_codes, query_ids)
+        ]
+        # 每只股票最多 5 个维度的情报搜索同时进行
+        limits = httpx.Limits(max_connections=self.concurrency * 5, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+            outputs = await asyncio.gather(*(
+                self._process(job, slots, client, dry_run, single_stock_notify) for job in jobs
+            ))
+        if dry_run:
+            return []
+        return [result for result in outputs if result]
+
+    async def _stage(self, name: str, call: Callable[[], Awaitable[Any]], job: 'StockJob') -> Any:
+        """在阶段并发上限与速率预算内执行一次调用（计时不含排队与限速等待）"""
+        async with self._limits[name]:
+            bucket = self._buckets.get(name)
+            if bucket is not None:
+                wait_time = bucket.reserve()
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+            with self.pipeline.profiler.span(name, job.query_id, job.code):
+                return await call()
+
+    async def _search_intel(self, job: 'StockJob', client: Any) -> None:
+        """多维度情报搜索（异步），完成后记录到运行清单"""
+        pipeline = self.pipeline
+        code = job.code
+        if pipeline.search_service.is_available:
+            logger.info(f"[{code}] 开始多维度情报搜索...")
+            intel_results = await self._stage(
+                'search',
+                lambda: pipeline.search_service.search_comprehensive_intel_async(
+                    stock_code=code, stock_name=job.stock_name, max_searches=5, client=client
+                ),
+                job,
+            )
+            await asyncio.to_thread(pipeline._apply_intel_results, job, intel_results)
+        else:
+            logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
+        await asyncio.to_thread(pipeline._checkpoint, code, 'search', job.news_context)
+
+    async def _process(
+        self,
+        job: 'StockJob',
+        slots: asyncio.Semaphore,
+        client: Any,
+        dry_run: bool,
+        single_stock_notify: bool
+    ) -> Optional[AnalysisResult]:
+        """单只股票：获取数据 → 增强数据 → 情报搜索 → AI 分析 → 保存/推送"""
+        pipeline = self.pipeline
+        code = job.code
+        async with slots:
+            logger.info(f"========== 开始处理 {code} ==========")
+            try:
+                success, error = await self._stage(
+                    'fetch', lambda: asyncio.to_thread(pipeline.fetch_and_save_stock_data, code), job
+                )
+                if not success:
+                    logger.warning(f"[{code}] 数据获取失败: {error}")
+                    # 即使获取失败，也尝试用已有数据分析
+                if dry_run:
+                    logger.info(f"[{code}] 跳过 AI 分析（dry-run 模式）")
+                    return None
+
+                await self._stage('enrich', lambda: asyncio.to_thread(pipeline._enrich_stock, job), job)
+
+                if not await asyncio.to_thread(pipeline._restore_intel, job):
+                    await self._search_intel(job, client)
+
+                context = await asyncio.to_thread(pipeline._build_llm_context, job)
+                result = await self._stage(
+                    'llm', lambda: pipeline.analyzer.analyze_async(context, news_context=job.news_context), job
+                )
+                # 写入运行清单检查点（SQLite），同样在线程池中执行
+                if await asyncio.to_thread(pipeline._apply_analysis_result, job, result) is None:
+                    return None
+
+                await self._stage('persist', lambda: asyncio.to_thread(pipeline._persist_analysis, job), job)
+                logger.info(f"[{code}] 分析完成: {result.operation_advice}, 评分 {result.sentiment_score}")
+
+                if single_stock_notify:
+                    with pipeline.profiler.span('notify', job.query_id, code):
+                        await pipeline._notify_single_stock_async(code, result, job.report_type, client=client)
+                return job.result
+
+            except Exception as e:
+                # 捕获所有异常，确保单股失败不影响整体
+                logger.exception(f"[{code}] 处理过程发生未知异常: {e}")
+                return None
+
@@ -11,22 +11,34 @@ A股自选股智能分析系统 - 核心分析流水线
 4. 提供股票分析的核心功能
 """
 
+import asyncio
+import contextvars
+import json
 import logging
 import time
 import uuid
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from src.config import get_config, Config
 from src.storage import get_db
-from data_provider import DataFetcherManager
+from data_provider import get_fetcher_manager
+from data_provider.base import LOCAL_CACHE_SOURCE, normalize_stock_code
 from data_provider.realtime_types import ChipDistribution
-from src.analyzer import GeminiAnalyzer, AnalysisResult, STOCK_NAME_MAP
+from src.analyzer import GeminiAnalyzer, AnalysisResult
+from src.security_master import get_security_master
+from src.minute_bars import MinuteBarSync
+from src.bar_window import BarWindowLoader
+from src.run_profile import RunProfiler, activate_profiler
+from src.run_manifest import RunManifest
+from src.trading_calendar import get_trading_calendar, market_of
 from src.notification import NotificationService, NotificationChannel
 from src.search_service import SearchService
 from src.enums import ReportType
+from src.core.staged_executor import Stage, StagedExecutor, parse_stage_rates, parse_stage_workers
 from src.stock_analyzer import StockTrendAnalyzer, TrendAnalysisResult
 from bot.models import BotMessage
 
@@ -34,6 +46,22 @@ from bot.models import BotMessage
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class StockJob:
+    """单只股票在分析各阶段之间传递的中间结果"""
+    code: str
+    report_type: ReportType = ReportType.SIMPLE
+    query_id: str = ""
+    stock_name: str = ""
+    realtime_quote: Any = None
+    chip_data: Optional[ChipDistribution] = None
+    intraday: Optional[Dict[str, Any]] = None
+    trend_result: Optional[TrendAnalysisResult] = None
+    news_context: Optional[str] = None
+    enhanced_context: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[AnalysisResult] = None
+
+
 class StockAnalysisPipeline:
     """
     股票分析主流程调度器
@@ -71,7 +99,22 @@ class StockAnalysisPipeline:
         
         # 初始化各模块
         self.db = get_db()
-        self.fetcher_manager = DataFetcherManager()
+        self.fetcher_manager = get_fetcher_manager()
+        # 交易日历：判断最新应有 K 线日期，避免休市/盘中的无效请求
+        self.trading_calendar = get_trading_calendar()
+        # 已通过批量预取写入数据库的股票，逐只处理时跳过网络请求
+        self._prefetched_daily: Set[str] = set()
+        # 分钟线采集与增量聚合（MINUTE_BAR_PERIOD > 0 时启用）
+        self.minute_bar_sync = (
+            MinuteBarSync(self.db, self.fetcher_manager, self.config.minute_bar_period)
+            if self.config.minute_bar_period > 0 else None
+        )
+        # 分析用日线窗口：每只股票只读取一次，趋势分析与 AI 上下文共用
+        self.bar_windows = BarWindowLoader(self.db, self.config.analysis_window_bars)
+        # 阶段耗时剖析：每次 run() 重新创建，结束时写出 run_profile_*.json
+        self.profiler = RunProfiler()
+        # 运行清单：run() 期间逐股记录阶段完成情况，中断后可续跑
+        self.manifest: Optional[RunManifest] = None
         # 不再单独创建 akshare_fetcher，统一使用 fetcher_manager 获取增强数据
         self.trend_analyzer = StockTrendAnalyzer()  # 趋势分析器
         self.analyzer = GeminiAnalyzer()
@@ -110,8 +153,8 @@ class StockAnalysisPipeline:
         获取并保存单只股票数据
         
         断点续传逻辑：
-        1. 检查数据库是否已有今日数据
-        2. 如果有且不强制刷新，则跳过网络请求
+        1. 按交易日历确定最新应有 K 线日期（收盘后为当日，周末/节假日/盘前盘中为上一交易日）
+        2. 数据库已有该日期数据且不强制刷新时，跳过网络请求
         3. 否则从数据源获取并保存
         
         Args:
@@ -121,23 +164,52 @@ class StockAnalysisPipeline:
         Returns:
             Tuple[是否成功, 错误信息]
         """
+        if not force_refresh and self._stage_done(code, 'data'):
+            logger.info(f"[{code}] 运行清单记录日线已就绪，跳过获取（续跑）")
+            return True, None
+        success, error = self._fetch_and_save(code, force_refresh)
+        if success:
+            self._checkpoint(code, 'data')
+        return success, error
+
+    def _fetch_and_save(self, code: str, force_refresh: bool) -> Tuple[bool, Optional[str]]:
+        """断点续传检查后从数据源获取日线并保存"""
         try:
-            today = date.today()
+            expected_date = self.trading_calendar.expected_bar_date_for(code)
+            backfill = self._needs_backfill(code)
             
-            # 断点续传检查：如果今日数据已存在，跳过
-            if not force_refresh and self.db.has_today_data(code, today):
-                logger.info(f"[{code}] 今日数据已存在，跳过获取（断点续传）")
+            # 断点续传检查：如果最新交易日数据已存在，跳过
+            if not force_refresh and not backfill and self.db.has_today_data(code, expected_date):
+                logger.info(f"[{code}] 最新交易日 {expected_date} 数据已存在，跳过获取（断点续传）")
+                self.profiler.record_cache('daily_data', hit=True)
+                return True, None
+
+            if not force_refresh and code in self._prefetched_daily:
+                logger.info(f"[{code}] 日线已批量预取，跳过获取")
+                self.profiler.record_cache('daily_data', hit=True)
                 return True, None
             
-            # 从数据源获取数据
-            logger.info(f"[{code}] 开始从数据源获取数据...")
-            df, source_name = self.fetcher_manager.get_daily_data(code, days=30)
+            # 从数据源获取数据（增量同步：本地已有历史时只拉取缺失区间；历史不足分析窗口时全量补齐）
+            if backfill:
+                logger.info(f"[{code}] 本地日线不足 {self.config.analysis_window_bars} 根，全量补齐历史...")
+            else:
+                logger.info(f"[{code}] 开始从数据源获取数据...")
+            df, source_name = self.fetcher_manager.get_daily_data(
+                code,
+                days=self.config.analysis_window_bars,
+                incremental=self.config.enable_incremental_sync and not force_refresh and not backfill,
+            )
             
             if df is None or df.empty:
                 return False, "获取数据为空"
+            # 本地已有数据满足增量同步要求时数据源管理器直接返回本地缓存
+            self.profiler.record_cache('daily_data', hit=source_name == LOCAL_CACHE_SOURCE)
+            if source_name == LOCAL_CACHE_SOURCE:
+                return True, None
             
             # 保存到数据库
             saved_count = self.db.save_daily_data(df, code, source_name)
+            self.bar_windows.invalidate(code)
             logger.info(f"[{code}] 数据保存成功（来源: {source_name}，新增 {saved_count} 条）")
             
             return True, None
@@ -147,6 +219,109 @@ class StockAnalysisPipeline:
             logger.error(f"[{code}] {error_msg}")
             return False, error_msg
     
+    def _needs_backfill(self, code: str) -> bool:
+        """
+        本地日线是否不足分析窗口（如旧版本按 30 天获取的历史）
+
+        增量同步只会向后追加，历史不足时需按 analysis_window_bars 全量获取一次，
+        否则 MA60/MACD 等长周期指标会一直回退
+        """
+        return len(self.bar_windows.get(code)) < self.config.analysis_window_bars
+
+    def prefetch_daily_data(self, stock_codes: List[str]) -> int:
+        """
+        批量预取日线数据并保存
+
+        最新交易日数据已存在的股票跳过，其余交给 DataFetcherManager.get_daily_data_batch，
+        由支持批量的数据源一次请求覆盖多只股票，减少逐只请求的往返次数。
+
+        Args:
+            stock_codes: 股票代码列表
+
+        Returns:
+            成功预取并保存的股票数量
+        """
+        # 历史不足分析窗口的股票留给逐只获取做全量补齐（批量预取按增量同步只会向后追加）
+        pending = [
+            code for code in stock_codes
+            if not self.db.has_today_data(code, self.trading_calendar.expected_bar_date_for(code))
+            and not self._needs_backfill(code)
+        ]
+        if len(pending) < 2:
+            return 0
+
+        try:
+            batch = self.fetcher_manager.get_daily_data_batch(
+                pending,
+                days=self.config.analysis_window_bars,
+                incremental=self.config.enable_incremental_sync,
+            )
+        except Exception as e:
+            logger.warning(f"[批量获取] 日线批量预取失败，改为逐只获取: {e}")
+            return 0
+
+        prefetched = 0
+        for code in pending:
+            fetched = batch.get(normalize_stock_code(code))
+            if fetched is None:
+                continue
+            df, source_name = fetched
+            if df is None or df.empty:
+                continue
+            if source_name == LOCAL_CACHE_SOURCE:
+                self._prefetched_daily.add(code)
+                continue
+            try:
+                saved_count = self.db.save_daily_data(df, code, source_name)
+            except Exception as e:
+                logger.warning(f"[{code}] 批量预取数据保存失败: {e}")
+                continue
+            self._prefetched_daily.add(code)
+            self.bar_windows.invalidate(code)
+            prefetched += 1
+            logger.info(f"[{code}] 批量预取数据保存成功（来源: {source_name}，新增 {saved_count} 条）")
+
+        logger.info(f"[批量获取] 日线预取完成: {prefetched}/{len(pending)} 只")
+        return prefetched
+
+    def _stage_done(self, code: str, stage: str) -> bool:
+        return self.manifest is not None and self.manifest.is_done(code, stage)
+
+    def _checkpoint(self, code: str, stage: str, news_context: Optional[str] = None) -> None:
+        """在运行清单中记录阶段完成（未启用清单时为空操作）"""
+        if self.manifest is not None:
+            self.manifest.mark(code, stage, news_context=news_context)
+
+    def _query_id_for(self, code: str) -> str:
+        """股票的查询链路 id：启用运行清单时沿用清单中的 id，续跑结果与首次运行关联"""
+        if self.manifest is not None:
+            query_id = self.manifest.query_id(code)
+            if query_id:
+                return query_id
+        return uuid.uuid4().hex
+
+    def _restore_intel(self, job: StockJob) -> bool:
+        """续跑时复用运行清单中已完成的情报搜索结果"""
+        if not self._stage_done(job.code, 'search'):
+            return False
+        job.news_context = self.manifest.news_context(job.code)
+        logger.info(f"[{job.code}] 情报搜索已在本次运行中完成，复用已保存的情报（续跑）")
+        return True
+
+    def _restore_saved_result(self, code: str) -> Optional[AnalysisResult]:
+        """由 AnalysisHistory 中已保存的记录还原分析结果（续跑时重建汇总报告）"""
+        query_id = self.manifest.query_id(code) if self.manifest is not None else None
+        if not query_id:
+            return None
+        records = self.db.get_analysis_history(code=code, query_id=query_id, limit=1)
+        if not records or not records[0].raw_result:
+            return None
+        try:
+            return AnalysisResult.from_dict(json.loads(records[0].raw_result))
+        except Exception as e:
+            logger.warning(f"[{code}] 还原已保存的分析结果失败: {e}")
+            return None
+
     def analyze_stock(self, code: str, report_type: ReportType, query_id: str) -> Optional[AnalysisResult]:
         """
         分析单只股票（增强版：含量比、换手率、筹码分析、多维度情报）
@@ -159,6 +334,8 @@ class StockAnalysisPipeline:
         5. 从数据库获取分析上下文
         6. 调用 AI 进行综合分析
         
+        各步骤拆分为独立的阶段方法，分阶段流水线（PIPELINE_MODE=staged）按阶段分别调度。
+        
         Args:
             query_id: 查询链路关联 id
             code: 股票代码
@@ -167,159 +344,207 @@ class StockAnalysisPipeline:
         Returns:
             AnalysisResult 或 None（如果分析失败）
         """
+        job = StockJob(code=code, report_type=report_type, query_id=query_id)
         try:
-            # 获取股票名称（优先从实时行情获取真实名称）
-            stock_name = STOCK_NAME_MAP.get(code, '')
-            
-            # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
-            realtime_quote = None
-            try:
-                realtime_quote = self.fetcher_manager.get_realtime_quote(code)
-                if realtime_quote:
-                    # 使用实时行情返回的真实股票名称
-                    if realtime_quote.name:
-                        stock_name = realtime_quote.name
-                    # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
-                    volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
-                    turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
-                    logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
-                              f"量比={volume_ratio}, 换手率={turnover_rate}% "
-                              f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
-                else:
-                    logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
-            except Exception as e:
-                logger.warning(f"[{code}] 获取实时行情失败: {e}")
+            with self.profiler.span('enrich', query_id, code):
+                self._enrich_stock(job)
+            with self.profiler.span('search', query_id, code):
+                self._search_stock_intel(job)
+            with self.profiler.span('llm', query_id, code):
+                self._run_llm_analysis(job)
+            with self.profiler.span('persist', query_id, code):
+                self._persist_analysis(job)
+            return job.result
             
-            # 如果还是没有名称，使用代码作为名称
-            if not stock_name:
-                stock_name = f'股票{code}'
-            
-            # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护
-            chip_data = None
+        except Exception as e:
+            logger.error(f"[{code}] 分析失败: {e}")
+            logger.exception(f"[{code}] 详细错误信息:")
+            return None
+    
+    def _enrich_stock(self, job: StockJob) -> StockJob:
+        """阶段：实时行情、筹码分布、分钟线与趋势分析（Step 1 ~ 3）"""
+        code = job.code
+        # 获取股票名称（证券主数据内存查询，实时行情返回名称时以行情为准）
+        stock_name = get_security_master().get_name(code) or ''
+        
+        # Step 1: 获取实时行情（量比、换手率等）- 使用统一入口，自动故障切换
+        realtime_quote = None
+        try:
+            realtime_quote = self.fetcher_manager.get_realtime_quote(code)
+            if realtime_quote:
+                # 使用实时行情返回的真实股票名称
+                if realtime_quote.name:
+                    stock_name = realtime_quote.name
+                # 兼容不同数据源的字段（有些数据源可能没有 volume_ratio）
+                volume_ratio = getattr(realtime_quote, 'volume_ratio', None)
+                turnover_rate = getattr(realtime_quote, 'turnover_rate', None)
+                logger.info(f"[{code}] {stock_name} 实时行情: 价格={realtime_quote.price}, "
+                          f"量比={volume_ratio}, 换手率={turnover_rate}% "
+                          f"(来源: {realtime_quote.source.value if hasattr(realtime_quote, 'source') else 'unknown'})")
+            else:
+                logger.info(f"[{code}] 实时行情获取失败或已禁用，将使用历史数据进行分析")
+        except Exception as e:
+            logger.warning(f"[{code}] 获取实时行情失败: {e}")
+        
+        # 如果还是没有名称，使用代码作为名称
+        if not stock_name:
+            stock_name = f'股票{code}'
+        job.stock_name = stock_name
+        job.realtime_quote = realtime_quote
+        
+        # Step 2: 获取筹码分布 - 使用统一入口，带熔断保护
+        try:
+            job.chip_data = self.fetcher_manager.get_chip_distribution(code)
+            if job.chip_data:
+                logger.info(f"[{code}] 筹码分布: 获利比例={job.chip_data.profit_ratio:.1%}, "
+                          f"90%集中度={job.chip_data.concentration_90:.2%}")
+            else:
+                logger.debug(f"[{code}] 筹码分布获取失败或已禁用")
+        except Exception as e:
+            logger.warning(f"[{code}] 获取筹码分布失败: {e}")
+        
+        # Step 2.5: 分钟线同步（增量聚合，提供当日分时成交量）
+        if self.minute_bar_sync is not None:
             try:
-                chip_data = self.fetcher_manager.get_chip_distribution(code)
-                if chip_data:
-                    logger.info(f"[{code}] 筹码分布: 获利比例={chip_data.profit_ratio:.1%}, "
-                              f"90%集中度={chip_data.concentration_90:.2%}")
-                else:
-                    logger.debug(f"[{code}] 筹码分布获取失败或已禁用")
+                self.minute_bar_sync.sync(code)
+                job.intraday = self.minute_bar_sync.get_intraday_summary(code)
             except Exception as e:
-                logger.warning(f"[{code}] 获取筹码分布失败: {e}")
+                logger.warning(f"[{code}] 分钟线同步失败: {e}")
+        
+        # Step 3: 趋势分析（基于交易理念）
+        try:
+            # 日线窗口与 Step 5 的分析上下文共用，只查询一次
+            window = self.bar_windows.get(code)
+            if not window.empty:
+                job.trend_result = self.trend_analyzer.analyze(window, code)
+                logger.info(f"[{code}] 趋势分析: {job.trend_result.trend_status.value}, "
+                          f"买入信号={job.trend_result.buy_signal.value}, 评分={job.trend_result.signal_score}")
+        except Exception as e:
+            logger.warning(f"[{code}] 趋势分析失败: {e}")
+        return job
+    
+    def _search_stock_intel(self, job: StockJob) -> StockJob:
+        """阶段：多维度情报搜索并保存（Step 4）"""
+        code, stock_name = job.code, job.stock_name
+        if self._restore_intel(job):
+            return job
+        # Step 4: 多维度情报搜索（最新消息+风险排查+业绩预期）
+        if self.search_service.is_available:
+            logger.info(f"[{code}] 开始多维度情报搜索...")
             
-            # Step 3: 趋势分析（基于交易理念）
-            trend_result: Optional[TrendAnalysisResult] = None
+            # 使用多维度搜索（最多5次搜索）
+            intel_results = self.search_service.search_comprehensive_intel(
+                stock_code=code,
+                stock_name=stock_name,
+                max_searches=5
+            )
+            self._apply_intel_results(job, intel_results)
+        else:
+            logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
+        self._checkpoint(code, 'search', news_context=job.news_context)
+        return job
+
+    def _apply_intel_results(self, job: StockJob, intel_results: Dict[str, Any]) -> None:
+        """格式化情报报告并保存新闻情报（同步与异步模式共用）"""
+        code, stock_name = job.code, job.stock_name
+        # 格式化情报报告
+        if intel_results:
+            job.news_context = self.search_service.format_intel_report(intel_results, stock_name)
+            total_results = sum(
+                len(r.results) for r in intel_results.values() if r.success
+            )
+            logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
+            logger.debug(f"[{code}] 情报搜索结果:\n{job.news_context}")
+
+            # 保存新闻情报到数据库（用于后续复盘与查询）
             try:
-                # 获取历史数据进行趋势分析
-                context = self.db.get_analysis_context(code)
-                if context and 'raw_data' in context:
-                    import pandas as pd
-                    raw_data = context['raw_data']
-                    if isinstance(raw_data, list) and len(raw_data) > 0:
-                        df = pd.DataFrame(raw_data)
-                        trend_result = self.trend_analyzer.analyze(df, code)
-                        logger.info(f"[{code}] 趋势分析: {trend_result.trend_status.value}, "
-                                  f"买入信号={trend_result.buy_signal.value}, 评分={trend_result.signal_score}")
+                query_context = self._build_query_context(query_id=job.query_id)
+                for dim_name, response in intel_results.items():
+                    if response and response.success and response.results:
+                        self.db.save_news_intel(
+                            code=code,
+                            name=stock_name,
+                            dimension=dim_name,
+                            query=response.query,
+                            response=response,
+                            query_context=query_context
+                        )
             except Exception as e:
-                logger.warning(f"[{code}] 趋势分析失败: {e}")
-            
-            # Step 4: 多维度情报搜索（最新消息+风险排查+业绩预期）
-            news_context = None
-            if self.search_service.is_available:
-                logger.info(f"[{code}] 开始多维度情报搜索...")
-                
-                # 使用多维度搜索（最多5次搜索）
-                intel_results = self.search_service.search_comprehensive_intel(
-                    stock_code=code,
-                    stock_name=stock_name,
-                    max_searches=5
-                )
-                
-                # 格式化情报报告
-                if intel_results:
-                    news_context = self.search_service.format_intel_report(intel_results, stock_name)
-                    total_results = sum(
-                        len(r.results) for r in intel_results.values() if r.success
-                    )
-                    logger.info(f"[{code}] 情报搜索完成: 共 {total_results} 条结果")
-                    logger.debug(f"[{code}] 情报搜索结果:\n{news_context}")
-
-                    # 保存新闻情报到数据库（用于后续复盘与查询）
-                    try:
-                        query_context = self._build_query_context(query_id=query_id)
-                        for dim_name, response in intel_results.items():
-                            if response and response.success and response.results:
-                                self.db.save_news_intel(
-                                    code=code,
-                                    name=stock_name,
-                                    dimension=dim_name,
-                                    query=response.query,
-                                    response=response,
-                                    query_context=query_context
-                                )
-                    except Exception as e:
-                        logger.warning(f"[{code}] 保存新闻情报失败: {e}")
-            else:
-                logger.info(f"[{code}] 搜索服务不可用，跳过情报搜索")
-            
-            # Step 5: 获取分析上下文（技术面数据）
-            context = self.db.get_analysis_context(code)
-            
-            if context is None:
-                logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
-                from datetime import date
-                context = {
-                    'code': code,
-                    'stock_name': stock_name,
-                    'date': date.today().isoformat(),
-                    'data_missing': True,
-                    'today': {},
-                    'yesterday': {}
-                }
-            
-            # Step 6: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
-            enhanced_context = self._enhance_context(
-                context, 
-                realtime_quote, 
-                chip_data, 
-                trend_result,
-                stock_name  # 传入股票名称
-            )
-            
-            # Step 7: 调用 AI 分析（传入增强的上下文和新闻）
-            result = self.analyzer.analyze(enhanced_context, news_context=news_context)
+                logger.warning(f"[{code}] 保存新闻情报失败: {e}")
+    
+    def _run_llm_analysis(self, job: StockJob) -> Optional[StockJob]:
+        """阶段：组装上下文并调用 AI 分析（Step 5 ~ 7），分析失败返回 None"""
+        context = self._build_llm_context(job)
+        
+        # Step 7: 调用 AI 分析（传入增强的上下文和新闻）
+        result = self.analyzer.analyze(context, news_context=job.news_context)
+        return self._apply_analysis_result(job, result)
 
-            # Step 7.5: 填充分析时的价格信息到 result
-            if result:
-                realtime_data = enhanced_context.get('realtime', {})
-                result.current_price = realtime_data.get('price')
-                result.change_pct = realtime_data.get('change_pct')
+    def _build_llm_context(self, job: StockJob) -> Dict[str, Any]:
+        """组装 AI 分析上下文（Step 5 ~ 6），同步与异步模式共用"""
+        code = job.code
+        # Step 5: 获取分析上下文（技术面数据，取自已缓存的日线窗口）
+        context = self.db.get_analysis_context(code, window=self.bar_windows.get(code))
+        
+        if context is None:
+            logger.warning(f"[{code}] 无法获取历史行情数据，将仅基于新闻和实时行情分析")
+            context = {
+                'code': code,
+                'stock_name': job.stock_name,
+                'date': date.today().isoformat(),
+                'data_missing': True,
+                'today': {},
+                'yesterday': {}
+            }
+        
+        # Step 6: 增强上下文数据（添加实时行情、筹码、趋势分析结果、股票名称）
+        job.enhanced_context = self._enhance_context(
+            context, 
+            job.realtime_quote, 
+            job.chip_data, 
+            job.trend_result,
+            job.stock_name,  # 传入股票名称
+            intraday=job.intraday,
+        )
+        return job.enhanced_context
 
-            # Step 8: 保存分析历史记录
-            if result:
-                try:
-                    context_snapshot = self._build_context_snapshot(
-                        enhanced_context=enhanced_context,
-                        news_content=news_context,
-                        realtime_quote=realtime_quote,
-                        chip_data=chip_data
-                    )
-                    self.db.save_analysis_history(
-                        result=result,
-                        query_id=query_id,
-                        report_type=report_type.value,
-                        news_content=news_context,
-                        context_snapshot=context_snapshot,
-                        save_snapshot=self.save_context_snapshot
-                    )
-                except Exception as e:
-                    logger.warning(f"[{code}] 保存分析历史失败: {e}")
+    def _apply_analysis_result(self, job: StockJob, result: Optional[AnalysisResult]) -> Optional[StockJob]:
+        """记录 AI 分析结果，分析失败返回 None"""
+        if not result:
+            return None
 
-            return result
-            
+        # Step 7.5: 填充分析时的价格信息到 result
+        realtime_data = job.enhanced_context.get('realtime', {})
+        result.current_price = realtime_data.get('price')
+        result.change_pct = realtime_data.get('change_pct')
+        job.result = result
+        self._checkpoint(job.code, 'llm')
+        return job
+    
+    def _persist_analysis(self, job: StockJob) -> StockJob:
+        """阶段：保存分析历史记录（Step 8）"""
+        if job.result is None:
+            return job
+        try:
+            context_snapshot = self._build_context_snapshot(
+                enhanced_context=job.enhanced_context,
+                news_content=job.news_context,
+                realtime_quote=job.realtime_quote,
+                chip_data=job.chip_data
+            )
+            saved = self.db.save_analysis_history(
+                result=job.result,
+                query_id=job.query_id,
+                report_type=job.report_type.value,
+                news_content=job.news_context,
+                context_snapshot=context_snapshot,
+                save_snapshot=self.save_context_snapshot
+            )
+            if saved:
+                self._checkpoint(job.code, 'saved')
         except Exception as e:
-            logger.error(f"[{code}] 分析失败: {e}")
-            logger.exception(f"[{code}] 详细错误信息:")
-            return None
+            logger.warning(f"[{job.code}] 保存分析历史失败: {e}")
+        return job
     
     def _enhance_context(
         self,
@@ -327,12 +552,13 @@ class StockAnalysisPipeline:
         realtime_quote,
         chip_data: Optional[ChipDistribution],
         trend_result: Optional[TrendAnalysisResult],
-        stock_name: str = ""
+        stock_name: str = "",
+        intraday: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         增强分析上下文
         
-        将实时行情、筹码分布、趋势分析结果、股票名称添加到上下文中
+        将实时行情、筹码分布、趋势分析结果、盘中分钟线聚合、股票名称添加到上下文中
         
         Args:
             context: 原始上下文
@@ -340,6 +566,7 @@ class StockAnalysisPipeline:
             chip_data: 筹码分布数据
             trend_result: 趋势分析结果
             stock_name: 股票名称
+            intraday: 盘中分钟线聚合摘要（MinuteBarSync.get_intraday_summary）
             
         Returns:
             增强后的上下文
@@ -400,6 +627,9 @@ class StockAnalysisPipeline:
                 'risk_factors': trend_result.risk_factors,
             }
         
+        if intraday:
+            enhanced['intraday'] = intraday
+        
         return enhanced
     
     def _describe_volume_ratio(self, volume_ratio: float) -> str:
@@ -534,10 +764,12 @@ class StockAnalysisPipeline:
             AnalysisResult 或 None
         """
         logger.info(f"========== 开始处理 {code} ==========")
+        effective_query_id = analysis_query_id or self.query_id or uuid.uuid4().hex
         
         try:
             # Step 1: 获取并保存数据
-            success, error = self.fetch_and_save_stock_data(code)
+            with self.profiler.span('fetch', effective_query_id, code):
+                success, error = self.fetch_and_save_stock_data(code)
             
             if not success:
                 logger.warning(f"[{code}] 数据获取失败: {error}")
@@ -548,7 +780,6 @@ class StockAnalysisPipeline:
                 logger.info(f"[{code}] 跳过 AI 分析（dry-run 模式）")
                 return None
             
-            effective_query_id = analysis_query_id or self.query_id or uuid.uuid4().hex
             result = self.analyze_stock(code, report_type, query_id=effective_query_id)
             
             if result:
@@ -558,24 +789,9 @@ class StockAnalysisPipeline:
                 )
                 
                 # 单股推送模式（#55）：每分析完一只股票立即推送
-                if single_stock_notify and self.notifier.is_available():
-                    try:
-                        # 根据报告类型选择生成方法
-                        if report_type == ReportType.FULL:
-                            # 完整报告：使用决策仪表盘格式
-                            report_content = self.notifier.generate_dashboard_report([result])
-                            logger.info(f"[{code}] 使用完整报告格式")
-                        else:
-                            # 精简报告：使用单股报告格式（默认）
-                            report_content = self.notifier.generate_single_stock_report(result)
-                            logger.info(f"[{code}] 使用精简报告格式")
-                        
-                        if self.notifier.send(report_content, email_stock_codes=[code]):
-                            logger.info(f"[{code}] 单股推送成功")
-                        else:
-                            logger.warning(f"[{code}] 单股推送失败")
-                    except Exception as e:
-                        logger.error(f"[{code}] 单股推送异常: {e}")
+                if single_stock_notify:
+                    with self.profiler.span('notify', effective_query_id, code):
+                        self._notify_single_stock(code, result, report_type)
             
             return result
             
@@ -584,76 +800,317 @@ class StockAnalysisPipeline:
             logger.exception(f"[{code}] 处理过程发生未知异常: {e}")
             return None
     
+    def _build_single_stock_report(self, code: str, result: AnalysisResult, report_type: ReportType) -> str:
+        # 根据报告类型选择生成方法
+        if report_type == ReportType.FULL:
+            # 完整报告：使用决策仪表盘格式
+            logger.info(f"[{code}] 使用完整报告格式")
+            return self.notifier.generate_dashboard_report([result])
+        # 精简报告：使用单股报告格式（默认）
+        logger.info(f"[{code}] 使用精简报告格式")
+        return self.notifier.generate_single_stock_report(result)
+
+    async def _notify_single_stock_async(
+        self, code: str, result: AnalysisResult, report_type: ReportType, client: Any = None
+    ) -> None:
+        """单股推送（异步模式）：各渠道并发发送"""
+        if not self.notifier.is_available():
+            return
+        try:
+            report_content = self._build_single_stock_report(code, result, report_type)
+            if await self.notifier.send_async(report_content, email_stock_codes=[code], client=client):
+                logger.info(f"[{code}] 单股推送成功")
+                await asyncio.to_thread(self._checkpoint, code, 'notified')
+            else:
+                logger.warning(f"[{code}] 单股推送失败")
+        except Exception as e:
+            logger.error(f"[{code}] 单股推送异常: {e}")
+
+    def _notify_single_stock(self, code: str, result: AnalysisResult, report_type: ReportType) -> None:
+        """单股推送（#55）：分析完一只股票立即推送"""
+        if not self.notifier.is_available():
+            return
+        try:
+            report_content = self._build_single_stock_report(code, result, report_type)
+            if self.notifier.send(report_content, email_stock_codes=[code]):
+                logger.info(f"[{code}] 单股推送成功")
+                self._checkpoint(code, 'notified')
+            else:
+                logger.warning(f"[{code}] 单股推送失败")
+        except Exception as e:
+            logger.error(f"[{code}] 单股推送异常: {e}")
+    
     def run(
         self, 
         stock_codes: Optional[List[str]] = None,
         dry_run: bool = False,
-        send_notification: bool = True
+        send_notification: bool = True,
+        resume: Optional[str] = None
     ) -> List[AnalysisResult]:
         """
         运行完整的分析流程
         
         流程：
         1. 获取待分析的股票列表
-        2. 使用线程池并发处理
+        2. 并发处理：默认线程池逐只端到端处理，PIPELINE_MODE=staged 时走分阶段流水线，
+           PIPELINE_MODE=async 时走 asyncio 异步模式
         3. 收集分析结果
         4. 发送通知
         
+        非 dry-run 运行会创建运行清单，逐股记录 data/search/llm/saved/notified 阶段；
+        resume 续跑时只处理未完成的股票与阶段，已保存的分析结果从 AnalysisHistory 还原后一起生成汇总报告。
+        
         Args:
             stock_codes: 股票代码列表（可选，默认使用配置中的自选股）
             dry_run: 是否仅获取数据不分析
             send_notification: 是否发送推送通知
+            resume: 续跑的运行 id，'latest' 表示最近一次未完成的运行（续跑时忽略 stock_codes）
             
         Returns:
             分析结果列表
         """
+        # 每次运行独立剖析；数据源、搜索、大模型、推送等底层模块通过激活的剖析器记录细分耗时
+        self.profiler = RunProfiler()
+        previous_profiler = activate_profiler(self.profiler)
+        try:
+            return self._run_analysis(stock_codes, dry_run, send_notification, resume)
+        finally:
+            activate_profiler(previous_profiler)
+            self.manifest = None
+
+    def _run_analysis(
+        self,
+        stock_codes: Optional[List[str]],
+        dry_run: bool,
+        send_notification: bool,
+        resume: Optional[str]
+    ) -> List[AnalysisResult]:
         start_time = time.time()
         
-        # 使用配置中的股票列表
-        if stock_codes is None:
-            self.config.refresh_stock_list()
-            stock_codes = self.config.stock_list
+        if resume:
+            # 续跑：股票列表与各股 query_id 以运行清单为准
+            self.manifest = RunManifest.load(
+                self.db, None if resume == 'latest' else resume, query_source=self.query_source
+            )
+            if self.manifest is None:
+                logger.error(f"[运行清单] 未找到可续跑的运行: {resume}")
+                return []
+            stock_codes = self.manifest.stock_codes
+            logger.info(
+                f"[运行清单] 续跑 {self.manifest.run_id}（创建于 {self.manifest.created_at}），"
+                f"已完成阶段: {self.manifest.progress()}"
+            )
+        else:
+            # 使用配置中的股票列表
+            if stock_codes is None:
+                self.config.refresh_stock_list()
+                stock_codes = self.config.stock_list
+            
+            if not stock_codes:
+                logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
+                return []
+            self.manifest = None if dry_run else self._create_manifest(stock_codes)
         
-        if not stock_codes:
-            logger.error("未配置自选股列表，请在 .env 文件中设置 STOCK_LIST")
-            return []
+        all_codes = list(stock_codes)
+        # 已保存分析结果的股票不再重跑，结果由分析历史还原
+        restored = self._restore_completed() if resume else {}
+        stock_codes = [code for code in all_codes if code not in restored]
+        if restored:
+            logger.info(f"[运行清单] {len(restored)} 只股票已完成分析，从分析历史还原结果")
         
         logger.info(f"===== 开始分析 {len(stock_codes)} 只股票 =====")
+        # 日线窗口按运行缓存，上一次运行（定时任务复用调度器时）的窗口不再沿用
+        self.bar_windows.clear()
         logger.info(f"股票列表: {', '.join(stock_codes)}")
         logger.info(f"并发数: {self.max_workers}, 模式: {'仅获取数据' if dry_run else '完整分析'}")
         
+        # === 证券主数据每日刷新一次（名称解析全部走内存索引）===
+        try:
+            with self.profiler.span('security_master'):
+                self.fetcher_manager.refresh_security_master()
+        except Exception as e:
+            logger.warning(f"证券主数据刷新失败，沿用已有数据: {e}")
+        
+        # === 交易日历覆盖不足时刷新（断点续传与增量同步据此判断数据是否最新）===
+        try:
+            with self.profiler.span('trading_calendar'):
+                self.fetcher_manager.refresh_trading_calendar(
+                    sorted({'cn'} | {market_of(code) for code in stock_codes})
+                )
+        except Exception as e:
+            logger.warning(f"交易日历刷新失败，沿用已有日历: {e}")
+        
         # === 批量预取实时行情（优化：避免每只股票都触发全量拉取）===
         # 只有股票数量 >= 5 时才进行预取，少量股票直接逐个查询更高效
         if len(stock_codes) >= 5:
-            prefetch_count = self.fetcher_manager.prefetch_realtime_quotes(stock_codes)
+            with self.profiler.span('prefetch_realtime'):
+                prefetch_count = self.fetcher_manager.prefetch_realtime_quotes(stock_codes)
             if prefetch_count > 0:
                 logger.info(f"已启用批量预取架构：一次拉取全市场数据，{len(stock_codes)} 只股票共享缓存")
         
+        # === 批量预取日线（可选：首选数据源支持批量时一次请求覆盖多只股票）===
+        if getattr(self.config, 'daily_batch_prefetch', False):
+            with self.profiler.span('prefetch_daily'):
+                self.prefetch_daily_data(stock_codes)
+        
         # 单股推送模式（#55）：从配置读取
         single_stock_notify = getattr(self.config, 'single_stock_notify', False)
         # Issue #119: 从配置读取报告类型
         report_type_str = getattr(self.config, 'report_type', 'simple').lower()
+        if self.manifest is not None and self.manifest.report_type:
+            # 续跑沿用首次运行记录的报告类型，避免与已推送的报告不一致
+            report_type_str = self.manifest.report_type
         report_type = ReportType.FULL if report_type_str == 'full' else ReportType.SIMPLE
         # Issue #128: 从配置读取分析间隔
         analysis_delay = getattr(self.config, 'analysis_delay', 0)
 
         if single_stock_notify:
             logger.info(f"已启用单股推送模式：每分析完一只股票立即推送（报告类型: {report_type_str}）")
+            # 续跑：补发中断前已保存但未推送成功的单股报告
+            if send_notification:
+                for code, result in restored.items():
+                    if not self._stage_done(code, 'notified'):
+                        self._notify_single_stock(code, result, report_type)
+        
+        if self.config.pipeline_mode == 'async':
+            # asyncio 模式：搜索/大模型/Webhook 走异步 HTTP，同步数据源在有界线程池执行
+            from src.core.async_pipeline import AsyncAnalysisRunner
+            results = AsyncAnalysisRunner(self).run(
+                stock_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+            )
+        elif self.config.pipeline_mode == 'staged':
+            # 分阶段流水线：各阶段独立并发与限速，股票依次流过
+            results = self._run_staged(
+                stock_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+            )
+        else:
+            results = self._run_threaded(
+                stock_codes,
+                dry_run=dry_run,
+                single_stock_notify=single_stock_notify and send_notification,
+                report_type=report_type,
+                analysis_delay=analysis_delay,
+            )
+        
+        results = list(restored.values()) + results
+        
+        # 统计
+        elapsed_time = time.time() - start_time
+        
+        # dry-run 模式下，数据获取成功即视为成功
+        if dry_run:
+            # 检查哪些股票的最新交易日数据已存在
+            success_count = sum(
+                1 for code in all_codes
+                if self.db.has_today_data(code, self.trading_calendar.expected_bar_date_for(code))
+            )
+            fail_count = len(all_codes) - success_count
+        else:
+            success_count = len(results)
+            fail_count = len(all_codes) - success_count
+        
+        logger.info("===== 分析完成 =====")
+        logger.info(f"成功: {success_count}, 失败: {fail_count}, 耗时: {elapsed_time:.2f} 秒")
+        
+        # 发送通知（单股推送模式下跳过汇总推送，避免重复）
+        if results and send_notification and not dry_run:
+            with self.profiler.span('summary_notify'):
+                if single_stock_notify:
+                    # 单股推送模式：只保存汇总报告，不再重复推送
+                    logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
+                    self._send_notifications(results, skip_push=True)
+                elif self.manifest is not None and self.manifest.summary_sent:
+                    # 续跑：中断前的运行已推送过汇总报告
+                    logger.info("[运行清单] 汇总报告已推送过，续跑仅保存报告到本地")
+                    self._send_notifications(results, skip_push=True)
+                else:
+                    self._send_notifications(results)
         
+        if self.manifest is not None:
+            self.manifest.finish(summary_sent=bool(results and send_notification and not dry_run))
+        self._save_run_profile(len(all_codes), success_count, dry_run)
+        return results
+
+    def _create_manifest(self, stock_codes: List[str]) -> Optional[RunManifest]:
+        """创建本次运行的清单，失败时不启用续跑（不影响分析）"""
+        try:
+            manifest = RunManifest.create(
+                self.db,
+                stock_codes,
+                query_source=self.query_source,
+                report_type=getattr(self.config, 'report_type', 'simple').lower(),
+            )
+        except Exception as e:
+            logger.warning(f"[运行清单] 创建失败，本次运行不支持续跑: {e}")
+            return None
+        logger.info(f"[运行清单] 运行 id: {manifest.run_id}（中断后可用 --resume 续跑）")
+        return manifest
+
+    def _restore_completed(self) -> Dict[str, AnalysisResult]:
+        """还原运行清单中已保存分析结果的股票；分析历史缺失的股票重新分析"""
+        restored: Dict[str, AnalysisResult] = {}
+        for code in self.manifest.stock_codes:
+            if not self._stage_done(code, 'saved'):
+                continue
+            result = self._restore_saved_result(code)
+            if result is None:
+                logger.warning(f"[{code}] 运行清单记录已保存，但未找到分析历史，重新分析")
+                continue
+            restored[code] = result
+        return restored
+
+    def _save_run_profile(self, stock_count: int, success_count: int, dry_run: bool) -> None:
+        """将本次运行的阶段耗时剖析写入报告目录（run_profile_YYYYMMDD_HHMMSS.json）"""
+        profiler = self.profiler
+        profiler.add_cache_counts('bar_window', self.bar_windows.hits, self.bar_windows.misses)
+        try:
+            content = profiler.to_json(
+                checkpoint_run_id=self.manifest.run_id if self.manifest is not None else None,
+                mode=self.config.pipeline_mode,
+                dry_run=dry_run,
+                max_workers=self.max_workers,
+                stock_count=stock_count,
+                success_count=success_count,
+            )
+            filepath = self.notifier.get_reports_dir() / f"run_profile_{profiler.run_id}.json"
+            filepath.write_text(content, encoding='utf-8')
+            logger.info(f"[耗时剖析] 运行剖析已保存: {filepath}")
+            profiler.log_summary()
+        except Exception as e:
+            logger.warning(f"[耗时剖析] 运行剖析保存失败: {e}")
+    
+    def _run_threaded(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float
+    ) -> List[AnalysisResult]:
+        """线程池模式：每个线程端到端处理一只股票（process_single_stock）"""
         results: List[AnalysisResult] = []
         
         # 使用线程池并发处理
         # 注意：max_workers 设置较低（默认3）以避免触发反爬
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交任务
+            # 提交任务（复制上下文，工作线程记录到本次运行的剖析器）
             future_to_code = {
                 executor.submit(
+                    contextvars.copy_context().run,
                     self.process_single_stock,
                     code,
                     skip_analysis=dry_run,
-                    single_stock_notify=single_stock_notify and send_notification,
+                    single_stock_notify=single_stock_notify,
                     report_type=report_type,  # Issue #119: 传递报告类型
-                    analysis_query_id=uuid.uuid4().hex,
+                    analysis_query_id=self._query_id_for(code),
                 ): code
                 for code in stock_codes
             }
@@ -673,33 +1130,95 @@ class StockAnalysisPipeline:
 
                 except Exception as e:
                     logger.error(f"[{code}] 任务执行失败: {e}")
-        
-        # 统计
-        elapsed_time = time.time() - start_time
-        
-        # dry-run 模式下，数据获取成功即视为成功
-        if dry_run:
-            # 检查哪些股票的数据今天已存在
-            success_count = sum(1 for code in stock_codes if self.db.has_today_data(code))
-            fail_count = len(stock_codes) - success_count
-        else:
-            success_count = len(results)
-            fail_count = len(stock_codes) - success_count
-        
-        logger.info("===== 分析完成 =====")
-        logger.info(f"成功: {success_count}, 失败: {fail_count}, 耗时: {elapsed_time:.2f} 秒")
-        
-        # 发送通知（单股推送模式下跳过汇总推送，避免重复）
-        if results and send_notification and not dry_run:
-            if single_stock_notify:
-                # 单股推送模式：只保存汇总报告，不再重复推送
-                logger.info("单股推送模式：跳过汇总推送，仅保存报告到本地")
-                self._send_notifications(results, skip_push=True)
-            else:
-                self._send_notifications(results)
-        
         return results
     
+    def _stage_budgets(self, analysis_delay: float) -> Tuple[Dict[str, int], Dict[str, tuple]]:
+        """读取各阶段并发数与速率预算（分阶段与异步模式共用）"""
+        workers = parse_stage_workers(self.config.pipeline_stage_workers)
+        rates = parse_stage_rates(self.config.pipeline_stage_rates)
+        if 'llm' not in rates and analysis_delay > 0:
+            rates['llm'] = (1.0 / analysis_delay, 1.0)
+        return workers, rates
+
+    def _build_stages(
+        self,
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float
+    ) -> List[Stage]:
+        """
+        构建分阶段流水线：数据获取 → 增强数据 → 情报搜索 → AI 分析 → 保存/推送
+
+        各阶段并发数默认为 max_workers（保存/推送为 1），可由 PIPELINE_STAGE_WORKERS 覆盖；
+        速率预算由 PIPELINE_STAGE_RATES 配置，未配置 AI 阶段速率且设置了 ANALYSIS_DELAY 时，
+        AI 阶段按每 ANALYSIS_DELAY 秒一次限速。
+        """
+        workers, rates = self._stage_budgets(analysis_delay)
+
+        def fetch(job: StockJob) -> StockJob:
+            logger.info(f"========== 开始处理 {job.code} ==========")
+            success, error = self.fetch_and_save_stock_data(job.code)
+            if not success:
+                logger.warning(f"[{job.code}] 数据获取失败: {error}")
+                # 即使获取失败，也尝试用已有数据分析
+            return job
+
+        def persist(job: StockJob) -> Optional[AnalysisResult]:
+            # 保存与单股推送分别计时，与线程池模式的阶段划分一致
+            with self.profiler.span('persist', job.query_id, job.code):
+                self._persist_analysis(job)
+            result = job.result
+            logger.info(f"[{job.code}] 分析完成: {result.operation_advice}, 评分 {result.sentiment_score}")
+            if single_stock_notify:
+                with self.profiler.span('notify', job.query_id, job.code):
+                    self._notify_single_stock(job.code, result, report_type)
+            return result
+
+        def profiled(name: str, fn):
+            def timed(job: StockJob):
+                with self.profiler.span(name, job.query_id, job.code):
+                    return fn(job)
+            return timed
+
+        steps = [('fetch', profiled('fetch', fetch), self.max_workers)]
+        if not dry_run:
+            steps += [
+                ('enrich', profiled('enrich', self._enrich_stock), self.max_workers),
+                ('search', profiled('search', self._search_stock_intel), self.max_workers),
+                ('llm', profiled('llm', self._run_llm_analysis), self.max_workers),
+                ('persist', persist, 1),
+            ]
+        stages = []
+        for name, fn, default_workers in steps:
+            rate, burst = rates.get(name, (None, 1.0))
+            stages.append(Stage(name, fn, workers=workers.get(name, default_workers), rate=rate, burst=burst))
+        return stages
+    
+    def _run_staged(
+        self,
+        stock_codes: List[str],
+        dry_run: bool,
+        single_stock_notify: bool,
+        report_type: ReportType,
+        analysis_delay: float
+    ) -> List[AnalysisResult]:
+        """分阶段流水线模式：有界队列衔接各阶段，网络 I/O 与大模型延迟在整个列表上重叠"""
+        stages = self._build_stages(dry_run, single_stock_notify, report_type, analysis_delay)
+        logger.info("分阶段流水线: " + " → ".join(
+            f"{stage.name}×{stage.workers}" + (f"@{stage.rate:g}/s" if stage.rate else "")
+            for stage in stages
+        ))
+        jobs = [
+            StockJob(code=code, report_type=report_type, query_id=self._query_id_for(code))
+            for code in stock_codes
+        ]
+        executor = StagedExecutor(stages, queue_size=self.config.pipeline_queue_size)
+        outputs = executor.run(jobs)
+        if dry_run:
+            return []
+        return [result for result in outputs if result]
+    
     def _send_notifications(self, results: List[AnalysisResult], skip_push: bool = False) -> None:
         """
         发送分析结果通知
@@ -735,7 +1254,8 @@ class StockAnalysisPipeline:
                     dashboard_content = self.notifier.generate_wechat_dashboard(results)
                     logger.info(f"企业微信仪表盘长度: {len(dashboard_content)} 字符")
                     logger.debug(f"企业微信推送内容:\n{dashboard_content}")
-                    wechat_success = self.notifier.send_to_wechat(dashboard_content)
+                    with self.profiler.span(f"report.{NotificationChannel.WECHAT.value}"):
+                        wechat_success = self.notifier.send_to_wechat(dashboard_content)
 
                 # 其他渠道：发完整报告（避免自定义 Webhook 被 wechat 截断逻辑污染）
                 non_wechat_success = False
@@ -743,6 +1263,7 @@ class StockAnalysisPipeline:
                 for channel in channels:
                     if channel == NotificationChannel.WECHAT:
                         continue
+                    channel_start = time.perf_counter()
                     if channel == NotificationChannel.FEISHU:
                         non_wechat_success = self.notifier.send_to_feishu(report) or non_wechat_success
                     elif channel == NotificationChannel.TELEGRAM:
@@ -787,6 +1308,7 @@ class StockAnalysisPipeline:
                         non_wechat_success = self.notifier.send_to_astrbot(report) or non_wechat_success
                     else:
                         logger.warning(f"未知通知渠道: {channel}")
+                    self.profiler.record(f"report.{channel.value}", time.perf_counter() - channel_start)
 
                 success = wechat_success or non_wechat_success or context_success
                 if success:
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 分阶段流水线执行器
+===================================
+
+职责：
+1. 将逐只股票的端到端处理拆成多个阶段（数据获取 → 增强数据 → 情报搜索 → AI 分析 → 保存/推送），
+   阶段之间用有界队列衔接，股票依次流过各阶段
+2. 每个阶段独立的并发数与令牌桶速率预算，数据源与大模型的等待在整个自选股列表上重叠
+3. 下游变慢时有界队列反压上游，内存中排队的股票数量有上限
+
+配置方式（StockAnalysisPipeline 使用）：
+- PIPELINE_STAGE_WORKERS=fetch=3,enrich=3,search=2,llm=2,persist=1
+- PIPELINE_STAGE_RATES=llm=0.5:2    格式同 RATE_LIMITS（每秒次数:突发容量）
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from data_provider.rate_limiter import TokenBucket, _parse_rate_limits
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class Stage:
+    """
+    流水线阶段
+
+    Attributes:
+        name: 阶段名（日志与配置键）
+        fn: 处理函数，接收上一阶段的输出；返回 None 表示该项在此结束（不再进入后续阶段）
+        workers: 并发线程数
+        rate: 每秒最多开始处理的项数（None 表示不限）
+        burst: 令牌桶突发容量
+    """
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    rate: Optional[float] = None
+    burst: float = 1.0
+
+
+def parse_stage_workers(value: str) -> Dict[str, int]:
+    """解析 PIPELINE_STAGE_WORKERS 配置（stage=workers,...）"""
+    workers: Dict[str, int] = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        name, count = item.split('=', 1)
+        try:
+            workers[name.strip().lower()] = max(int(count), 1)
+        except ValueError:
+            logger.warning(f"[流水线] 无法解析 PIPELINE_STAGE_WORKERS 配置项: {item}")
+    return workers
+
+
+def parse_stage_rates(value: str) -> Dict[str, tuple]:
+    """解析 PIPELINE_STAGE_RATES 配置（stage=rate:burst,...）"""
+    return _parse_rate_limits(value)
+
+
+class StagedExecutor:
+    """
+    有界队列衔接的多阶段执行器
+
+    使用方式：
+        executor = StagedExecutor([
+            Stage('fetch', fetch_fn, workers=3),
+            Stage('llm', llm_fn, workers=2, rate=0.5, burst=2),
+        ], queue_size=4)
+        outputs = executor.run(items, on_complete=callback)
+    """
+
+    def __init__(self, stages: Sequence[Stage], queue_size: int = 4):
+        if not stages:
+            raise ValueError("至少需要一个阶段")
+        self.stages = list(stages)
+        self.queue_size = max(int(queue_size), 1)
+
+    def run(
+        self,
+        items: Sequence[Any],
+        on_complete: Optional[Callable[[Any, Any], None]] = None
+    ) -> List[Any]:
+        """
+        让所有项流过各阶段，阻塞直到全部完成
+
+        Args:
+            items: 输入项（进入第一个阶段）
+            on_complete: 每项离开流水线时回调 (输入项, 最后阶段输出或 None)，在工作线程中调用
+
+        Returns:
+            成功走完所有阶段的输出（按完成顺序）
+        """
+        if not items:
+            return []
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        buckets = [
+            TokenBucket(stage.rate, stage.burst) if stage.rate else None
+            for stage in self.stages
+        ]
+        outputs: List[Any] = []
+        remaining = [len(items)]
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def finish(origin: Any, output: Any) -> None:
+            with lock:
+                if output is not None:
+                    outputs.append(output)
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if on_complete is not None:
+                try:
+                    on_complete(origin, output)
+                except Exception as e:
+                    logger.error(f"[流水线] 完成回调异常: {e}")
+            if finished:
+                done.set()
+
+        def worker(index: int) -> None:
+            stage = self.stages[index]
+            source = queues[index]
+            is_last = index == len(self.stages) - 1
+            while True:
+                entry = source.get()
+                if entry is _STOP:
+                    return
+                origin, value = entry
+                if buckets[index] is not None:
+                    buckets[index].acquire()
+                try:
+                    result = stage.fn(value)
+                except Exception as e:
+                    logger.exception(f"[流水线] 阶段 {stage.name} 处理异常: {e}")
+                    result = None
+                if result is None or is_last:
+                    finish(origin, result if is_last else None)
+                else:
+                    # 下一阶段队列满时阻塞，形成反压
+                    queues[index + 1].put((origin, result))
+
+        # 工作线程在调用方上下文的副本中运行（如当前运行的剖析器）
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(max(stage.workers, 1)):
+                thread = threading.Thread(
+                    target=contextvars.copy_context().run, args=(worker, index),
+                    name=f"stage-{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        def feed() -> None:
+            for item in items:
+                queues[0].put((item, item))
+
+        feeder = threading.Thread(target=feed, name="stage-feeder", daemon=True)
+        feeder.start()
+
+        done.wait()
+        feeder.join()
+        for index, stage in enumerate(self.stages):
+            for _ in range(max(stage.workers, 1)):
+                queues[index].put(_STOP)
+        for thread in threads:
+            thread.join()
+        return outputs
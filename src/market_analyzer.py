@@ -20,7 +20,7 @@ import pandas as pd
 
 from src.config import get_config
 from src.search_service import SearchService
-from data_provider.base import DataFetcherManager
+from data_provider.base import get_fetcher_manager
 
 logger = logging.getLogger(__name__)
 
@@ -98,7 +98,7 @@ class MarketAnalyzer:
         self.config = get_config()
         self.search_service = search_service
         self.analyzer = analyzer
-        self.data_manager = DataFetcherManager()
+        self.data_manager = get_fetcher_manager()
 
     def get_market_overview(self) -> MarketOverview:
         """
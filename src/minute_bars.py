@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 分钟线采集与增量聚合
+===================================
+
+职责：
+1. 从数据源拉取分钟线，只请求本地最新一根之后的部分，写入紧凑的 stock_bar 表
+2. 新分钟到达时增量更新更高周期（5/15/30/60 分钟、日、周）的聚合 K 线，
+   只合并新增分钟，不从头重算
+3. 为盘中分析提供当日聚合行情与分时段成交量分布
+
+聚合规则：
+- 分钟级周期按 A 股交易时段切分（09:30-11:30、13:00-15:00），
+  K 线以结束时间标记，如 60 分钟线为 10:30 / 11:30 / 14:00 / 15:00
+- 日线以当日 0 点标记，周线以周一 0 点标记
+- 正在形成的最后一分钟被修订时，按修订前后的差值修正聚合量；
+  更早的分钟被修订时，仅重算受影响的聚合 K 线
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DAY_PERIOD = 1440
+WEEK_PERIOD = 10080
+
+# 由分钟线聚合的周期（分钟）
+AGGREGATE_PERIODS = (5, 15, 30, 60, DAY_PERIOD, WEEK_PERIOD)
+
+_BAR_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'amount']
+
+# A 股交易时段（距 0 点的分钟数）
+_MORNING_OPEN, _MORNING_CLOSE = 9 * 60 + 30, 11 * 60 + 30
+_AFTERNOON_OPEN = 13 * 60
+_SESSION_MINUTES = 240
+
+
+def bucket_times(times: pd.Series, period: int) -> pd.Series:
+    """
+    计算每根分钟线所属聚合 K 线的时间标记
+
+    Args:
+        times: 分钟线结束时间（datetime64）
+        period: 目标周期（分钟）
+
+    Returns:
+        与 times 对齐的聚合 K 线时间
+    """
+    days = times.dt.normalize()
+    if period == DAY_PERIOD:
+        return days
+    if period == WEEK_PERIOD:
+        return days - pd.to_timedelta(times.dt.weekday, unit='D')
+
+    # 交易时段内的第几分钟（1~240），午休与盘前盘后归入相邻时段
+    clock = (times.dt.hour * 60 + times.dt.minute).to_numpy()
+    session_minute = np.where(
+        clock <= _MORNING_CLOSE,
+        clock - _MORNING_OPEN,
+        np.where(clock <= _AFTERNOON_OPEN, 120, 120 + clock - _AFTERNOON_OPEN),
+    ).clip(1, _SESSION_MINUTES)
+
+    end_minute = np.minimum(np.ceil(session_minute / period) * period, _SESSION_MINUTES)
+    end_clock = np.where(
+        end_minute <= 120,
+        _MORNING_OPEN + end_minute,
+        _AFTERNOON_OPEN + end_minute - 120,
+    )
+    return days + pd.to_timedelta(end_clock, unit='m')
+
+
+def aggregate_bars(df: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    将分钟线聚合为更高周期 K 线（向量化 groupby）
+
+    open 为空的行（差值修正行）不参与开盘价
+    """
+    if df.empty:
+        return pd.DataFrame(columns=_BAR_COLUMNS)
+    grouped = df.groupby(bucket_times(df['time'], period), sort=True)
+    result = grouped.agg(
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        volume=('volume', 'sum'),
+        amount=('amount', 'sum'),
+    )
+    result.index.name = 'time'
+    return result.reset_index()
+
+
+def merge_bars(existing: pd.DataFrame, update: pd.DataFrame) -> pd.DataFrame:
+    """
+    将新增部分的聚合结果合并到已存储的聚合 K 线上
+
+    Args:
+        existing: 已存储的聚合 K 线（与 update 时间重叠的部分）
+        update: 由新增分钟聚合出的 K 线（时间上晚于 existing 中已合并的分钟）
+
+    Returns:
+        合并后的 K 线
+    """
+    if existing.empty:
+        return update
+    merged = update.merge(existing, on='time', how='left', suffixes=('', '_old'))
+    has_old = merged['close_old'].notna()
+    merged['open'] = merged['open_old'].where(has_old, merged['open'])
+    merged['high'] = merged[['high', 'high_old']].max(axis=1)
+    merged['low'] = merged[['low', 'low_old']].min(axis=1)
+    merged['volume'] = merged['volume'] + merged['volume_old'].fillna(0)
+    merged['amount'] = merged['amount'] + merged['amount_old'].fillna(0)
+    return merged[_BAR_COLUMNS]
+
+
+class MinuteBarSync:
+    """
+    分钟线采集与增量聚合
+
+    使用方式：
+        sync = MinuteBarSync(db, fetcher_manager, base_period=1)
+        sync.sync('600519')
+        summary = sync.get_intraday_summary('600519')
+    """
+
+    MAX_FETCH_COUNT = 800
+
+    def __init__(self, db: Any, fetcher_manager: Any = None, base_period: int = 1):
+        """
+        Args:
+            db: DatabaseManager
+            fetcher_manager: DataFetcherManager（仅 sync 需要）
+            base_period: 采集的分钟线周期
+        """
+        self.db = db
+        self.fetcher_manager = fetcher_manager
+        self.base_period = base_period
+        self.periods = [
+            p for p in AGGREGATE_PERIODS if p > base_period and p % base_period == 0
+        ]
+
+    def _fetch_count(self, last_time: Optional[datetime]) -> int:
+        """估算需要请求的分钟线根数（多取一根以覆盖正在形成的 K 线）"""
+        if last_time is None:
+            return self.MAX_FETCH_COUNT
+        elapsed = (datetime.now() - last_time).total_seconds() / 60
+        days = (datetime.now().date() - last_time.date()).days
+        if days > 0:
+            elapsed = min(elapsed, (days + 1) * _SESSION_MINUTES)
+        return int(min(max(elapsed / self.base_period + 2, 2), self.MAX_FETCH_COUNT))
+
+    def sync(self, code: str) -> Dict[int, int]:
+        """
+        拉取并保存新增分钟线，增量更新聚合 K 线
+
+        Returns:
+            {周期: 写入的 K 线数}
+        """
+        last_time = self.db.get_latest_bar_time(code, self.base_period)
+        df, source = self.fetcher_manager.get_minute_data(
+            code, self.base_period, self._fetch_count(last_time)
+        )
+        counts = self.ingest(code, df)
+        logger.info(f"[分钟线] {code} 从 {source} 同步完成: {counts}")
+        return counts
+
+    def ingest(self, code: str, df: pd.DataFrame) -> Dict[int, int]:
+        """
+        写入分钟线并增量聚合
+
+        Args:
+            code: 股票代码
+            df: 标准化分钟线（MINUTE_COLUMNS）
+
+        Returns:
+            {周期: 写入的 K 线数}
+        """
+        if df is None or df.empty:
+            return {}
+        df = df[_BAR_COLUMNS].sort_values('time').reset_index(drop=True)
+
+        last_time = self.db.get_latest_bar_time(code, self.base_period)
+        fresh = df if last_time is None else df[df['time'] > last_time]
+        overlap = df.iloc[0:0] if last_time is None else df[df['time'] <= last_time]
+
+        delta_rows, rebuild_from = self._diff_overlap(code, overlap, last_time)
+
+        self.db.save_bars(code, self.base_period, df)
+        counts = {self.base_period: len(fresh)}
+
+        if rebuild_from is not None:
+            # 更早的分钟被修订：重算受影响的聚合 K 线
+            for period in self.periods:
+                counts[period] = self._rebuild(code, period, rebuild_from)
+            return counts
+
+        increment = pd.concat([delta_rows, fresh], ignore_index=True) if not delta_rows.empty else fresh
+        if increment.empty:
+            return counts
+        for period in self.periods:
+            update = aggregate_bars(increment, period)
+            existing = self.db.get_bars(code, period, update['time'].min(), update['time'].max())
+            counts[period] = self.db.save_bars(code, period, merge_bars(existing, update))
+        return counts
+
+    def _diff_overlap(
+        self,
+        code: str,
+        overlap: pd.DataFrame,
+        last_time: Optional[datetime]
+    ):
+        """
+        对比重叠部分与已存储分钟线
+
+        Returns:
+            (差值修正行, 需要重算的起始时间)：
+            - 仅最后一分钟变化时返回其差值行（open 为空），无需重算
+            - 更早的分钟变化时返回最早变化的时间
+        """
+        empty = overlap.iloc[0:0]
+        if overlap.empty:
+            return empty, None
+
+        stored = self.db.get_bars(code, self.base_period, overlap['time'].min(), last_time)
+        compared = overlap.merge(stored, on='time', how='left', suffixes=('', '_old'))
+        value_cols = _BAR_COLUMNS[1:]
+        old = compared[[f"{c}_old" for c in value_cols]].to_numpy(dtype=float)
+        new = compared[value_cols].to_numpy(dtype=float)
+        changed = ~np.isclose(new, old, equal_nan=True).all(axis=1)
+        if not changed.any():
+            return empty, None
+
+        changed_times = compared.loc[changed, 'time']
+        if changed_times.min() < pd.Timestamp(last_time) or compared.loc[changed, 'close_old'].isna().any():
+            return empty, changed_times.min()
+
+        row = compared.loc[changed].iloc[0]
+        delta = pd.DataFrame([{
+            'time': row['time'],
+            'open': np.nan,
+            'high': row['high'],
+            'low': row['low'],
+            'close': row['close'],
+            'volume': row['volume'] - row['volume_old'],
+            'amount': row['amount'] - row['amount_old'],
+        }])
+        return delta, None
+
+    def _rebuild(self, code: str, period: int, since: datetime) -> int:
+        """从已存储的分钟线重算 since 之后受影响的聚合 K 线"""
+        since = pd.Timestamp(since).normalize()
+        if period == WEEK_PERIOD:
+            since -= pd.Timedelta(days=since.weekday())
+        minutes = self.db.get_bars(code, self.base_period, since)
+        return self.db.save_bars(code, period, aggregate_bars(minutes, period))
+
+    def get_intraday_summary(self, code: str) -> Optional[Dict[str, Any]]:
+        """
+        获取最近一个交易日的聚合行情与分时段成交量分布
+
+        Returns:
+            {'date', 'open', 'high', 'low', 'close', 'volume', 'amount', 'minutes',
+             'hourly_volume': [{'time': 'HH:MM', 'volume', 'share'}]}，无数据时返回 None
+        """
+        last_time = self.db.get_latest_bar_time(code, self.base_period)
+        if last_time is None:
+            return None
+        day = pd.Timestamp(last_time).normalize()
+        daily = self.db.get_bars(code, DAY_PERIOD, day, day)
+        if daily.empty:
+            return None
+
+        bar = daily.iloc[-1]
+        summary: Dict[str, Any] = {
+            'date': day.strftime('%Y-%m-%d'),
+            'open': float(bar['open']),
+            'high': float(bar['high']),
+            'low': float(bar['low']),
+            'close': float(bar['close']),
+            'volume': float(bar['volume']),
+            'amount': float(bar['amount']),
+            'last_time': pd.Timestamp(last_time).strftime('%H:%M'),
+        }
+
+        hourly: List[Dict[str, Any]] = []
+        if 60 in self.periods:
+            hours = self.db.get_bars(code, 60, day, day + pd.Timedelta(days=1))
+            total = float(hours['volume'].sum()) or 1.0
+            hourly = [
+                {'time': t.strftime('%H:%M'), 'volume': float(v), 'share': round(float(v) / total, 4)}
+                for t, v in zip(hours['time'], hours['volume'])
+            ]
+        summary['hourly_volume'] = hourly
+        return summary
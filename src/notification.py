@@ -14,6 +14,7 @@ A股自选股智能分析系统 - 通知层
    - 邮件 SMTP
    - Pushover（手机/桌面推送）
 """
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -23,6 +24,7 @@ import smtplib
 import re
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -41,6 +43,7 @@ except ImportError:
 from src.config import get_config
 from src.analyzer import AnalysisResult
 from src.formatters import format_feishu_markdown, markdown_to_html_document
+from src.run_profile import profile_span
 from bot.models import BotMessage
 
 logger = logging.getLogger(__name__)
@@ -2553,7 +2556,7 @@ class NotificationService:
                 logger.error("自定义 Webhook %d 图片推送异常: %s", i + 1, e)
         return success_count > 0
 
-    def _post_custom_webhook(self, url: str, payload: dict, timeout: int = 30) -> bool:
+    def _custom_webhook_headers(self) -> Dict[str, str]:
         headers = {
             'Content-Type': 'application/json; charset=utf-8',
             'User-Agent': 'StockAnalysis/1.0',
@@ -2561,6 +2564,10 @@ class NotificationService:
         # 支持 Bearer Token 认证（#51）
         if self._custom_webhook_bearer_token:
             headers['Authorization'] = f'Bearer {self._custom_webhook_bearer_token}'
+        return headers
+
+    def _post_custom_webhook(self, url: str, payload: dict, timeout: int = 30) -> bool:
+        headers = self._custom_webhook_headers()
         body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
         response = requests.post(url, data=body, headers=headers, timeout=timeout, verify=self._webhook_verify_ssl)
         if response.status_code == 200:
@@ -2569,6 +2576,54 @@ class NotificationService:
         logger.debug(f"响应内容: {response.text[:200]}")
         return False
 
+    async def _post_custom_webhook_async(self, url: str, payload: dict, client: Any, timeout: int = 30) -> bool:
+        """通过共享的 httpx.AsyncClient 推送（关闭 SSL 校验时客户端无法按请求切换，改走线程池）"""
+        if not self._webhook_verify_ssl:
+            return await asyncio.to_thread(self._post_custom_webhook, url, payload, timeout)
+        headers = self._custom_webhook_headers()
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        response = await client.post(url, content=body, headers=headers, timeout=timeout)
+        if response.status_code == 200:
+            return True
+        logger.error(f"自定义 Webhook 推送失败: HTTP {response.status_code}")
+        logger.debug(f"响应内容: {response.text[:200]}")
+        return False
+
+    async def _send_to_custom_async(self, content: str, client: Any) -> bool:
+        """推送消息到所有自定义 Webhook（并发），逻辑同 send_to_custom"""
+        if not self._custom_webhook_urls:
+            logger.warning("未配置自定义 Webhook，跳过推送")
+            return False
+
+        async def send_one(i: int, url: str) -> bool:
+            try:
+                # 钉钉分批发送需按顺序逐批推送，保留同步实现
+                if self._is_dingtalk_webhook(url):
+                    ok = await asyncio.to_thread(self._send_dingtalk_chunked, url, content, 20000)
+                    if ok:
+                        logger.info(f"自定义 Webhook {i+1}（钉钉）推送成功")
+                    else:
+                        logger.error(f"自定义 Webhook {i+1}（钉钉）推送失败")
+                    return ok
+
+                payload = self._build_custom_webhook_payload(url, content)
+                ok = await self._post_custom_webhook_async(url, payload, client, timeout=30)
+                if ok:
+                    logger.info(f"自定义 Webhook {i+1} 推送成功")
+                else:
+                    logger.error(f"自定义 Webhook {i+1} 推送失败")
+                return ok
+            except Exception as e:
+                logger.error(f"自定义 Webhook {i+1} 推送异常: {e}")
+                return False
+
+        outcomes = await asyncio.gather(
+            *(send_one(i, url) for i, url in enumerate(self._custom_webhook_urls))
+        )
+        success_count = sum(1 for ok in outcomes if ok)
+        logger.info(f"自定义 Webhook 推送完成：成功 {success_count}/{len(self._custom_webhook_urls)}")
+        return success_count > 0
+
     def _chunk_markdown_by_bytes(self, content: str, max_bytes: int) -> List[str]:
         def get_bytes(s: str) -> int:
             return len(s.encode('utf-8'))
@@ -3224,23 +3279,8 @@ class NotificationService:
             logger.warning("通知服务不可用，跳过推送")
             return False
 
-        # Markdown to image (Issue #289): convert once if any channel needs it.
-        # Per-channel decision via _should_use_image_for_channel (see send() docstring for fallback rules).
-        image_bytes = None
-        channels_needing_image = {
-            ch for ch in self._available_channels
-            if ch.value in self._markdown_to_image_channels
-        }
-        if channels_needing_image:
-            from src.md2img import markdown_to_image
-            image_bytes = markdown_to_image(
-                content, max_chars=self._markdown_to_image_max_chars
-            )
-            if image_bytes:
-                logger.info("Markdown 已转换为图片，将向 %s 发送图片",
-                            [ch.value for ch in channels_needing_image])
-            elif channels_needing_image:
-                logger.warning("Markdown 转图片失败，将回退为文本发送")
+        image_bytes = self._render_markdown_image(content)
+        receivers = self._email_receivers(email_stock_codes, email_send_to_all)
 
         channel_names = self.get_channel_names()
         logger.info(f"正在向 {len(self._available_channels)} 个渠道发送通知：{channel_names}")
@@ -3249,65 +3289,171 @@ class NotificationService:
         fail_count = 0
 
         for channel in self._available_channels:
-            channel_name = ChannelDetector.get_channel_name(channel)
-            use_image = self._should_use_image_for_channel(channel, image_bytes)
-            try:
-                if channel == NotificationChannel.WECHAT:
-                    if use_image:
-                        result = self._send_wechat_image(image_bytes)
-                    else:
-                        result = self.send_to_wechat(content)
-                elif channel == NotificationChannel.FEISHU:
-                    result = self.send_to_feishu(content)
-                elif channel == NotificationChannel.TELEGRAM:
-                    if use_image:
-                        result = self._send_telegram_photo(image_bytes)
-                    else:
-                        result = self.send_to_telegram(content)
-                elif channel == NotificationChannel.EMAIL:
-                    receivers = None
-                    if email_send_to_all and self._stock_email_groups:
-                        receivers = self.get_all_email_receivers()
-                    elif email_stock_codes and self._stock_email_groups:
-                        receivers = self.get_receivers_for_stocks(email_stock_codes)
-                    if use_image:
-                        result = self._send_email_with_inline_image(
-                            image_bytes, receivers=receivers
-                        )
-                    else:
-                        result = self.send_to_email(content, receivers=receivers)
-                elif channel == NotificationChannel.PUSHOVER:
-                    result = self.send_to_pushover(content)
-                elif channel == NotificationChannel.PUSHPLUS:
-                    result = self.send_to_pushplus(content)
-                elif channel == NotificationChannel.SERVERCHAN3:
-                    result = self.send_to_serverchan3(content)
-                elif channel == NotificationChannel.CUSTOM:
-                    if use_image:
-                        result = self._send_custom_webhook_image(
-                            image_bytes, fallback_content=content
-                        )
-                    else:
-                        result = self.send_to_custom(content)
-                elif channel == NotificationChannel.DISCORD:
-                    result = self.send_to_discord(content)
-                elif channel == NotificationChannel.ASTRBOT:
-                    result = self.send_to_astrbot(content)
-                else:
-                    logger.warning(f"不支持的通知渠道: {channel}")
-                    result = False
+            if self._send_to_channel_safely(channel, content, image_bytes, receivers):
+                success_count += 1
+            else:
+                fail_count += 1
 
-                if result:
-                    success_count += 1
-                else:
-                    fail_count += 1
+        logger.info(f"通知发送完成：成功 {success_count} 个，失败 {fail_count} 个")
+        return success_count > 0 or context_success
 
-            except Exception as e:
-                logger.error(f"{channel_name} 发送失败: {e}")
-                fail_count += 1
+    async def send_async(
+        self,
+        content: str,
+        email_stock_codes: Optional[List[str]] = None,
+        email_send_to_all: bool = False,
+        client: Any = None
+    ) -> bool:
+        """
+        统一发送接口（异步版本，PIPELINE_MODE=async 使用）
+
+        各渠道并发发送：自定义 Webhook 的文本推送通过共享的 httpx.AsyncClient 发出，
+        其余渠道（SMTP、各家 SDK/分段发送逻辑）在事件循环的有界线程池中执行同步实现
+
+        Args:
+            content: 消息内容（Markdown 格式）
+            email_stock_codes: 股票代码列表（可选，用于邮件渠道路由到对应分组邮箱）
+            email_send_to_all: 邮件是否发往所有配置邮箱
+            client: 共享的 httpx.AsyncClient；为 None 时全部渠道走线程池
+
+        Returns:
+            是否至少有一个渠道发送成功
+        """
+        context_success = await asyncio.to_thread(self.send_to_context, content)
+
+        if not self._available_channels:
+            if context_success:
+                logger.info("已通过消息上下文渠道完成推送（无其他通知渠道）")
+                return True
+            logger.warning("通知服务不可用，跳过推送")
+            return False
+
+        image_bytes = await asyncio.to_thread(self._render_markdown_image, content)
+        receivers = self._email_receivers(email_stock_codes, email_send_to_all)
+
+        channel_names = self.get_channel_names()
+        logger.info(f"正在向 {len(self._available_channels)} 个渠道发送通知：{channel_names}")
+
+        async def send_one(channel: NotificationChannel) -> bool:
+            use_image = self._should_use_image_for_channel(channel, image_bytes)
+            if channel == NotificationChannel.CUSTOM and not use_image and client is not None:
+                try:
+                    with profile_span(f"notify.{channel.value}"):
+                        return await self._send_to_custom_async(content, client)
+                except Exception as e:
+                    logger.error(f"{ChannelDetector.get_channel_name(channel)} 发送失败: {e}")
+                    return False
+            return await asyncio.to_thread(
+                self._send_to_channel_safely, channel, content, image_bytes, receivers
+            )
+
+        outcomes = await asyncio.gather(*(send_one(channel) for channel in self._available_channels))
+        success_count = sum(1 for ok in outcomes if ok)
+        fail_count = len(outcomes) - success_count
 
         logger.info(f"通知发送完成：成功 {success_count} 个，失败 {fail_count} 个")
         return success_count > 0 or context_success
+
+    def _render_markdown_image(self, content: str) -> Optional[bytes]:
+        """
+        Markdown 转图片（Issue #289）：任一渠道需要图片时转换一次
+
+        Returns:
+            图片字节；无渠道需要图片或转换失败时返回 None
+        """
+        # Per-channel decision via _should_use_image_for_channel (see send() docstring for fallback rules).
+        channels_needing_image = {
+            ch for ch in self._available_channels
+            if ch.value in self._markdown_to_image_channels
+        }
+        if not channels_needing_image:
+            return None
+        from src.md2img import markdown_to_image
+        image_bytes = markdown_to_image(
+            content, max_chars=self._markdown_to_image_max_chars
+        )
+        if image_bytes:
+            logger.info("Markdown 已转换为图片，将向 %s 发送图片",
+                        [ch.value for ch in channels_needing_image])
+        else:
+            logger.warning("Markdown 转图片失败，将回退为文本发送")
+
+        return image_bytes
+
+    def _email_receivers(
+        self,
+        email_stock_codes: Optional[List[str]],
+        email_send_to_all: bool
+    ) -> Optional[List[str]]:
+        """确定邮件渠道的收件人（None 表示使用默认收件人）"""
+        if email_send_to_all and self._stock_email_groups:
+            return self.get_all_email_receivers()
+        if email_stock_codes and self._stock_email_groups:
+            return self.get_receivers_for_stocks(email_stock_codes)
+        return None
+
+    def _send_to_channel_safely(
+        self,
+        channel: NotificationChannel,
+        content: str,
+        image_bytes: Optional[bytes],
+        receivers: Optional[List[str]]
+    ) -> bool:
+        try:
+            with profile_span(f"notify.{channel.value}"):
+                return bool(self._send_to_channel(channel, content, image_bytes, receivers))
+        except Exception as e:
+            logger.error(f"{ChannelDetector.get_channel_name(channel)} 发送失败: {e}")
+            return False
+
+    def _send_to_channel(
+        self,
+        channel: NotificationChannel,
+        content: str,
+        image_bytes: Optional[bytes],
+        receivers: Optional[List[str]]
+    ) -> bool:
+        """向单个渠道发送（按渠道配置决定发送图片还是文本）"""
+        use_image = self._should_use_image_for_channel(channel, image_bytes)
+        if channel == NotificationChannel.WECHAT:
+            if use_image:
+                return self._send_wechat_image(image_bytes)
+            else:
+                return self.send_to_wechat(content)
+        elif channel == NotificationChannel.FEISHU:
+            return self.send_to_feishu(content)
+        elif channel == NotificationChannel.TELEGRAM:
+            if use_image:
+                return self._send_telegram_photo(image_bytes)
+            else:
+                return self.send_to_telegram(content)
+        elif channel == NotificationChannel.EMAIL:
+            if use_image:
+                return self._send_email_with_inline_image(
+                    image_bytes, receivers=receivers
+                )
+            else:
+                return self.send_to_email(content, receivers=receivers)
+        elif channel == NotificationChannel.PUSHOVER:
+            return self.send_to_pushover(content)
+        elif channel == NotificationChannel.PUSHPLUS:
+            return self.send_to_pushplus(content)
+        elif channel == NotificationChannel.SERVERCHAN3:
+            return self.send_to_serverchan3(content)
+        elif channel == NotificationChannel.CUSTOM:
+            if use_image:
+                return self._send_custom_webhook_image(
+                    image_bytes, fallback_content=content
+                )
+            else:
+                return self.send_to_custom(content)
+        elif channel == NotificationChannel.DISCORD:
+            return self.send_to_discord(content)
+        elif channel == NotificationChannel.ASTRBOT:
+            return self.send_to_astrbot(content)
+        else:
+            logger.warning(f"不支持的通知渠道: {channel}")
+            return False
     
     def _send_chunked_messages(self, content: str, max_length: int) -> bool:
         """
@@ -3352,6 +3498,13 @@ class NotificationService:
         
         return all_success
     
+    @staticmethod
+    def get_reports_dir() -> Path:
+        """本地报告目录（项目根目录下的 reports，不存在时创建）"""
+        reports_dir = Path(__file__).parent.parent / 'reports'
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        return reports_dir
+
     def save_report_to_file(
         self, 
         content: str, 
@@ -3367,17 +3520,11 @@ class NotificationService:
         Returns:
             保存的文件路径
         """
-        from pathlib import Path
-        
         if filename is None:
             date_str = datetime.now().strftime('%Y%m%d')
             filename = f"report_{date_str}.md"
         
-        # 确保 reports 目录存在（使用项目根目录下的 reports）
-        reports_dir = Path(__file__).parent.parent / 'reports'
-        reports_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = reports_dir / filename
+        filepath = self.get_reports_dir() / filename
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
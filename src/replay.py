@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 离线录制/回放
+===================================
+
+职责：
+1. 录制模式：在数据源、实时行情、搜索、大模型调用边界记录原始返回（含异常与耗时）
+2. 回放模式：按调用顺序返回录制内容，并按配置注入合成延迟，完全不访问网络
+3. 用于在无网络的机器上确定性地压测完整的 StockAnalysisPipeline.run
+
+录制边界：
+- BaseFetcher._fetch_raw_data / _fetch_raw_data_batch
+- DataFetcherManager.get_realtime_quote / get_chip_distribution
+- BaseSearchProvider._do_search
+- GeminiAnalyzer._call_api_with_retry
+- 数据源 get_stock_list（证券主数据刷新）
+
+存储格式：
+- 单个 SQLite 文件，每次调用一行，返回值以 pickle + zlib 压缩保存
+- 调用键取参数 repr 的 SHA1；同一键多次调用按录制顺序依次返回，耗尽后重复最后一条
+- 可选的分组键（如 数据源+股票代码）在精确键未命中时兜底，
+  使依赖当天日期的请求参数在其他日期回放时仍能命中
+"""
+
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODES = ('off', 'record', 'replay')
+
+_MISSING = object()
+
+
+class ReplayMissError(Exception):
+    """回放模式下录制档案中没有对应的调用"""
+    pass
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()
+
+
+def _dump(value: Any) -> bytes:
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _dump_error(exc: BaseException) -> bytes:
+    """序列化异常；无法还原的异常类型降级为 RuntimeError"""
+    try:
+        payload = _dump(exc)
+        pickle.loads(zlib.decompress(payload))
+        return payload
+    except Exception:
+        return _dump(RuntimeError(f"{type(exc).__name__}: {exc}"))
+
+
+class TrafficArchive:
+    """
+    录制/回放档案（线程安全）
+
+    使用方式：
+        archive = TrafficArchive('./data/replay.db', mode='record')
+        df = archive.call('fetch_raw', ('AkshareFetcher', '600519', s, e), fetch)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        latency_scale: float = 1.0,
+        latency_ms: float = 0.0
+    ):
+        """
+        Args:
+            path: 档案文件路径
+            mode: record（清空后录制）/ replay（只读回放）
+            latency_scale: 回放时对录制耗时的缩放倍数（0 表示不复现录制耗时）
+            latency_ms: 回放时每次调用额外增加的固定延迟（毫秒）
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"不支持的录制/回放模式: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.latency_scale = max(0.0, latency_scale)
+        self.latency_ms = max(0.0, latency_ms)
+
+        self._lock = threading.Lock()
+        self._cursors: Dict[Tuple[str, str, str], int] = {}
+        self._stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+
+        if mode == 'replay' and not Path(path).exists():
+            raise FileNotFoundError(f"录制档案不存在: {path}")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT NOT NULL, "
+            "grp TEXT, latency REAL NOT NULL, is_error INTEGER NOT NULL, payload BLOB NOT NULL, "
+            "recorded_at TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_calls_key ON calls (kind, key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_calls_grp ON calls (kind, grp)")
+        if mode == 'record':
+            self._conn.execute("DELETE FROM calls")
+        self._conn.commit()
+        logger.info(f"[录制回放] {'录制' if mode == 'record' else '回放'}模式已启用: {path}")
+
+    def call(
+        self,
+        kind: str,
+        key: Any,
+        fn: Callable[[], Any],
+        group: Any = None,
+        on_miss: Any = _MISSING
+    ) -> Any:
+        """
+        经过档案执行一次调用
+
+        Args:
+            kind: 调用边界类别（fetch_raw / realtime_quote / search / llm ...）
+            key: 调用参数（repr 后作为精确键）
+            fn: 实际执行调用的无参函数（仅录制模式调用）
+            group: 精确键未命中时使用的分组键
+            on_miss: 回放未命中时的返回值，未指定则抛出 ReplayMissError
+
+        Returns:
+            实际或回放的返回值（录制的异常在回放时原样抛出）
+        """
+        key_hash = _digest(key)
+        group_hash = _digest(group) if group is not None else None
+        if self.mode == 'record':
+            return self._record(kind, key_hash, group_hash, fn)
+        return self._replay(kind, key_hash, group_hash, key, on_miss)
+
+    def _record(self, kind: str, key_hash: str, group_hash: Optional[str], fn: Callable[[], Any]) -> Any:
+        start = time.time()
+        try:
+            result = fn()
+        except Exception as e:
+            self._write(kind, key_hash, group_hash, time.time() - start, True, _dump_error(e))
+            raise
+        self._write(kind, key_hash, group_hash, time.time() - start, False, _dump(result))
+        return result
+
+    def _write(
+        self,
+        kind: str,
+        key_hash: str,
+        group_hash: Optional[str],
+        latency: float,
+        is_error: bool,
+        payload: bytes
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO calls (kind, key, grp, latency, is_error, payload, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, key_hash, group_hash, latency, int(is_error), payload, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+            self._stats['recorded'] += 1
+
+    def _next_entry(self, kind: str, column: str, value: str) -> Optional[Tuple[float, bool, bytes]]:
+        """按录制顺序取下一条（调用方需持有锁）"""
+        ids: List[int] = [
+            row[0] for row in self._conn.execute(
+                f"SELECT id FROM calls WHERE kind = ? AND {column} = ? ORDER BY id", (kind, value)
+            )
+        ]
+        if not ids:
+            return None
+        cursor_key = (kind, column, value)
+        index = self._cursors.get(cursor_key, 0)
+        self._cursors[cursor_key] = min(index + 1, len(ids) - 1)
+        row = self._conn.execute(
+            "SELECT latency, is_error, payload FROM calls WHERE id = ?", (ids[index],)
+        ).fetchone()
+        return row[0], bool(row[1]), row[2]
+
+    def _replay(
+        self,
+        kind: str,
+        key_hash: str,
+        group_hash: Optional[str],
+        key: Any,
+        on_miss: Any
+    ) -> Any:
+        with self._lock:
+            entry = self._next_entry(kind, 'key', key_hash)
+            if entry is None and group_hash is not None:
+                entry = self._next_entry(kind, 'grp', group_hash)
+            self._stats['replayed' if entry else 'missed'] += 1
+
+        if entry is None:
+            logger.debug(f"[录制回放] 未命中 {kind}: {repr(key)[:120]}")
+            if on_miss is not _MISSING:
+                return on_miss
+            raise ReplayMissError(f"录制档案中没有 {kind} 调用: {repr(key)[:120]}")
+
+        latency, is_error, payload = entry
+        delay = latency * self.latency_scale + self.latency_ms / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+        value = pickle.loads(zlib.decompress(payload))
+        if is_error:
+            raise value
+        return value
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取录制/回放计数（recorded / replayed / missed）"""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_archive: Optional[TrafficArchive] = None
+_archive_loaded = False
+_archive_lock = threading.Lock()
+
+
+def get_traffic_archive() -> Optional[TrafficArchive]:
+    """获取当前进程的录制/回放档案，REPLAY_MODE=off 时返回 None"""
+    global _archive, _archive_loaded
+    if _archive_loaded:
+        return _archive
+    with _archive_lock:
+        if not _archive_loaded:
+            from src.config import get_config
+
+            config = get_config()
+            mode = (config.replay_mode or 'off').lower()
+            if mode not in REPLAY_MODES:
+                logger.warning(f"[录制回放] 未知的 REPLAY_MODE={mode}，按 off 处理")
+                mode = 'off'
+            if mode != 'off':
+                _archive = TrafficArchive(
+                    config.replay_archive,
+                    mode,
+                    latency_scale=config.replay_latency_scale,
+                    latency_ms=config.replay_latency_ms,
+                )
+            _archive_loaded = True
+    return _archive
+
+
+def reset_traffic_archive() -> None:
+    """关闭并丢弃当前档案（用于测试或切换配置）"""
+    global _archive, _archive_loaded
+    with _archive_lock:
+        if _archive is not None:
+            _archive.close()
+        _archive = None
+        _archive_loaded = False
+
+
+def replay_call(
+    kind: str,
+    key: Any,
+    fn: Callable[[], Any],
+    group: Any = None,
+    on_miss: Any = _MISSING
+) -> Any:
+    """
+    在录制/回放边界执行调用；未启用时直接调用 fn
+
+    参数含义见 TrafficArchive.call
+    """
+    archive = get_traffic_archive()
+    if archive is None:
+        return fn()
+    return archive.call(kind, key, fn, group=group, on_miss=on_miss)
+
+
+def replayable(kind: str, on_miss: Any = _MISSING) -> Callable:
+    """
+    方法装饰器：以 (类名, 参数) 为键接入录制/回放
+
+    Args:
+        kind: 调用边界类别
+        on_miss: 回放未命中时的返回值
+    """
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (type(self).__name__, args, sorted(kwargs.items()))
+            return replay_call(kind, key, lambda: method(self, *args, **kwargs), on_miss=on_miss)
+        return wrapper
+    return decorator
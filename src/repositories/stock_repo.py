@@ -77,6 +77,29 @@ class StockRepository:
             logger.error(f"获取日期范围数据失败: {e}")
             return []
     
+    def get_range_df(
+        self,
+        code: str,
+        start_date: date,
+        end_date: date
+    ) -> pd.DataFrame:
+        """
+        获取指定日期范围的数据（DataFrame 形式，适合长窗口指标/回测）
+        
+        Args:
+            code: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            按日期升序的 DataFrame，失败时为空 DataFrame
+        """
+        try:
+            return self.db.get_daily_frame(code, start_date, end_date)
+        except Exception as e:
+            logger.error(f"获取日期范围数据失败: {e}")
+            return pd.DataFrame()
+    
     def save_dataframe(
         self,
         df: pd.DataFrame,
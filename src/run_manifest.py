@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 运行清单（断点续跑）
+===================================
+
+职责：
+1. 每次批量分析创建一份以 run_id 为键的运行清单，持久化到数据库（pipeline_run / pipeline_run_stock）
+2. 逐股记录阶段完成情况：data / search / llm / saved / notified，每个阶段完成即提交，进程崩溃不丢失
+3. main.py --resume 载入最近一次未完成的运行：已保存分析结果的股票不再重跑，
+   情报搜索已完成的股票复用保存的情报，汇总报告由 AnalysisHistory 中已保存的结果重建
+4. 续跑沿用首次运行的报告类型；汇总报告已推送过时只保存到本地，不重复推送
+
+各股票沿用清单中的 query_id，续跑写入的新闻情报与分析历史与首次运行关联到同一链路。
+"""
+
+import logging
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.storage import RUN_STAGES, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class RunManifest:
+    """
+    单次批量分析的运行清单
+
+    使用方式：
+        manifest = RunManifest.create(db, ['600519', '000001'], query_source='cli')
+        manifest.mark('600519', 'data')
+        manifest.is_done('600519', 'data')   # True
+
+        manifest = RunManifest.load(db)      # 最近一次未完成（中断或部分失败）的运行
+        manifest.pending_codes()             # 尚未保存分析结果的股票
+    """
+
+    def __init__(self, db: DatabaseManager, run: Dict[str, Any]):
+        self.db = db
+        self.run_id: str = run['run_id']
+        # 续跑沿用首次运行的报告类型；汇总报告已推送过的运行续跑时不再重复推送
+        self.report_type: Optional[str] = run.get('report_type')
+        self.summary_sent: bool = bool(run.get('summary_sent'))
+        self.created_at: Optional[datetime] = run.get('created_at')
+        self._stocks: Dict[str, Dict[str, Any]] = {stock['code']: stock for stock in run['stocks']}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls,
+        db: DatabaseManager,
+        stock_codes: List[str],
+        query_source: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> 'RunManifest':
+        """为本次运行创建清单，每只股票分配独立的 query_id"""
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        query_ids = {code: uuid.uuid4().hex for code in dict.fromkeys(stock_codes)}
+        db.create_pipeline_run(run_id, query_ids, query_source=query_source, report_type=report_type)
+        return cls.load(db, run_id)
+
+    @classmethod
+    def load(
+        cls,
+        db: DatabaseManager,
+        run_id: Optional[str] = None,
+        query_source: Optional[str] = None
+    ) -> Optional['RunManifest']:
+        """载入指定运行；run_id 为空时载入最近一次未完成的运行"""
+        run = db.get_pipeline_run(run_id, query_source=query_source)
+        return cls(db, run) if run else None
+
+    @property
+    def stock_codes(self) -> List[str]:
+        return list(self._stocks)
+
+    def query_id(self, code: str) -> Optional[str]:
+        stock = self._stocks.get(code)
+        return stock['query_id'] if stock else None
+
+    def is_done(self, code: str, stage: str) -> bool:
+        with self._lock:
+            stock = self._stocks.get(code)
+            return bool(stock and stock.get(f"{stage}_at"))
+
+    def news_context(self, code: str) -> Optional[str]:
+        stock = self._stocks.get(code)
+        return stock.get('news_context') if stock else None
+
+    def pending_codes(self) -> List[str]:
+        """尚未保存分析结果的股票（按原顺序）"""
+        return [code for code in self._stocks if not self.is_done(code, 'saved')]
+
+    def mark(self, code: str, stage: str, news_context: Optional[str] = None) -> None:
+        """
+        记录阶段完成并立即写入数据库
+
+        写入失败只记录日志：清单是续跑的加速手段，不影响本次分析
+        """
+        if code not in self._stocks:
+            return
+        try:
+            self.db.mark_pipeline_run_stage(self.run_id, code, stage, news_context=news_context)
+        except Exception as e:
+            logger.warning(f"[运行清单] {code} 阶段 {stage} 记录失败: {e}")
+            return
+        with self._lock:
+            stock = self._stocks[code]
+            stock[f"{stage}_at"] = datetime.now()
+            if stage == 'search':
+                stock['news_context'] = news_context
+
+    def progress(self) -> Dict[str, int]:
+        """各阶段已完成的股票数"""
+        with self._lock:
+            return {
+                stage: sum(1 for stock in self._stocks.values() if stock.get(f"{stage}_at"))
+                for stage in RUN_STAGES
+            }
+
+    def finish(self, summary_sent: bool = False) -> None:
+        """
+        记录运行结束：全部股票已保存分析结果为 completed，否则为 partial（仍可续跑）
+
+        summary_sent 与之前（首次运行或上一次续跑）的推送状态合并，已推送过的不会被清除
+        """
+        status = 'partial' if self.pending_codes() else 'completed'
+        self.summary_sent = self.summary_sent or summary_sent
+        try:
+            self.db.finish_pipeline_run(self.run_id, status=status, summary_sent=self.summary_sent)
+        except Exception as e:
+            logger.warning(f"[运行清单] 运行 {self.run_id} 完成状态记录失败: {e}")
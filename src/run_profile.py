@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 运行耗时剖析
+===================================
+
+职责：
+1. 以轻量 span（perf_counter 计时）记录流水线各阶段耗时，按 query_id 关联到单只股票
+2. 统计调用次数（如大模型重试）与缓存命中率（日线断点续传、日线窗口等）
+3. 运行结束时汇总为机器可读的 JSON：各阶段 p50/p95/max、调用次数、缓存命中率、逐股耗时
+
+阶段命名：
+- 流水线阶段：fetch / enrich / search / llm / persist / notify，汇总推送为 summary_notify
+- 运行级阶段：security_master / trading_calendar / prefetch_realtime / prefetch_daily
+- 细分阶段（带前缀）：source.<daily|realtime|chip|minute>.<数据源>、search.<搜索引擎>、report.<推送渠道>、
+  notify.<推送渠道>、llm.request_delay、llm.retry_wait
+- 计数：llm_retry.gemini / llm_retry.openai
+- 缓存：daily_data（日线断点续传/批量预取/增量同步本地命中）、bar_window（分析用日线窗口）
+
+模块内的 profile_* 函数记录到当前运行（StockAnalysisPipeline.run 期间激活）的剖析器，
+未激活时为空操作，供数据源、搜索、大模型、推送等底层模块使用。
+当前剖析器保存在 ContextVar 中，并发的多次运行（如定时任务与 API 触发的分析）互不干扰；
+向线程池/工作线程提交任务时需以 contextvars.copy_context().run 传递上下文（asyncio.to_thread 自动传递）。
+"""
+
+import json
+import logging
+import math
+import threading
+from contextvars import ContextVar
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩百分位（sorted_values 已升序且非空）"""
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class RunProfiler:
+    """
+    单次运行的耗时剖析器（线程安全）
+
+    使用方式：
+        profiler = RunProfiler()
+        with profiler.span('llm', query_id=query_id, code='600519'):
+            ...
+        profiler.record_cache('daily_data', hit=True)
+        profile = profiler.summary()
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.started_at = datetime.now()
+        self._origin = time.perf_counter()
+        self._durations: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._queries: Dict[str, Dict[str, Any]] = {}
+        self._counters: Dict[str, int] = {}
+        self._caches: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str, query_id: Optional[str] = None, code: Optional[str] = None) -> Iterator[None]:
+        """记录代码块耗时；代码块抛出异常时计入该阶段的错误数"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(stage, time.perf_counter() - start, query_id=query_id, code=code, ok=ok)
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        query_id: Optional[str] = None,
+        code: Optional[str] = None,
+        ok: bool = True
+    ) -> None:
+        """记录一次已完成的调用耗时（秒）"""
+        with self._lock:
+            self._durations.setdefault(stage, []).append(seconds)
+            if not ok:
+                self._errors[stage] = self._errors.get(stage, 0) + 1
+            if query_id:
+                query = self._queries.setdefault(query_id, {'code': code, 'stages': {}})
+                if code and not query['code']:
+                    query['code'] = code
+                query['stages'][stage] = round(query['stages'].get(stage, 0.0) + seconds, 4)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        self.add_cache_counts(name, 1 if hit else 0, 0 if hit else 1)
+
+    def add_cache_counts(self, name: str, hits: int, misses: int) -> None:
+        with self._lock:
+            counts = self._caches.setdefault(name, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    def summary(self, **extra: Any) -> Dict[str, Any]:
+        """
+        汇总为可 JSON 序列化的字典
+
+        Args:
+            extra: 附加的运行信息（如 mode、stock_count），原样写入顶层
+        """
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self._durations.items()}
+            errors = dict(self._errors)
+            queries = {
+                query_id: {'code': query['code'], 'stages': dict(query['stages'])}
+                for query_id, query in self._queries.items()
+            }
+            counters = dict(self._counters)
+            caches = {name: tuple(counts) for name, counts in self._caches.items()}
+
+        stages = {}
+        for stage, values in sorted(durations.items()):
+            stages[stage] = {
+                'count': len(values),
+                'errors': errors.get(stage, 0),
+                'total': round(sum(values), 4),
+                'p50': round(_percentile(values, 50), 4),
+                'p95': round(_percentile(values, 95), 4),
+                'max': round(values[-1], 4),
+            }
+
+        cache_stats = {}
+        for name, (hits, misses) in sorted(caches.items()):
+            total = hits + misses
+            cache_stats[name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / total, 4) if total else None,
+            }
+
+        profile = {
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_seconds': round(time.perf_counter() - self._origin, 3),
+        }
+        profile.update(extra)
+        profile.update({
+            'stages': stages,
+            'counters': dict(sorted(counters.items())),
+            'caches': cache_stats,
+            'queries': queries,
+        })
+        return profile
+
+    def to_json(self, **extra: Any) -> str:
+        return json.dumps(self.summary(**extra), ensure_ascii=False, indent=2)
+
+    def log_summary(self, top: int = 8) -> None:
+        """按总耗时输出最重的若干阶段"""
+        profile = self.summary()
+        heaviest = sorted(profile['stages'].items(), key=lambda item: item[1]['total'], reverse=True)[:top]
+        if not heaviest:
+            return
+        logger.info("[耗时剖析] 阶段耗时（总计/p50/p95/max，秒）: " + "; ".join(
+            f"{stage}×{stats['count']} {stats['total']:.2f}/{stats['p50']:.2f}/{stats['p95']:.2f}/{stats['max']:.2f}"
+            for stage, stats in heaviest
+        ))
+        if profile['caches']:
+            logger.info("[耗时剖析] 缓存命中率: " + ", ".join(
+                f"{name} {stats['hits']}/{stats['hits'] + stats['misses']}"
+                for name, stats in profile['caches'].items()
+            ))
+
+
+# 当前运行的剖析器（StockAnalysisPipeline.run 期间在其上下文中设置）
+_active: ContextVar[Optional[RunProfiler]] = ContextVar('active_run_profiler', default=None)
+
+
+def activate_profiler(profiler: Optional[RunProfiler]) -> Optional[RunProfiler]:
+    """在当前上下文中设置运行的剖析器，返回之前的剖析器以便恢复"""
+    previous = _active.get()
+    _active.set(profiler)
+    return previous
+
+
+def get_active_profiler() -> Optional[RunProfiler]:
+    return _active.get()
+
+
+def profile_span(stage: str, query_id: Optional[str] = None, code: Optional[str] = None):
+    """在当前剖析器上记录 span，未激活时为空操作"""
+    profiler = _active.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(stage, query_id=query_id, code=code)
+
+
+def profile_record(stage: str, seconds: float) -> None:
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.record(stage, seconds)
+
+
+def profile_count(name: str, n: int = 1) -> None:
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count(name, n)
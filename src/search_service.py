@@ -11,6 +11,7 @@ A股自选股智能分析系统 - 搜索服务模块
 4. 搜索结果缓存和格式化
 """
 
+import asyncio
 import logging
 import random
 import time
@@ -22,6 +23,9 @@ from itertools import cycle
 import requests
 from newspaper import Article, Config
 
+from src.replay import get_traffic_archive, replay_call
+from src.run_profile import profile_record
+
 logger = logging.getLogger(__name__)
 
 
@@ -156,6 +160,64 @@ class BaseSearchProvider(ABC):
         """执行搜索（子类实现）"""
         pass
     
+    async def _do_search_async(
+        self, query: str, api_key: str, max_results: int, days: int, client: Any
+    ) -> SearchResponse:
+        """
+        异步执行搜索
+
+        默认在事件循环的有界线程池中调用同步实现（SDK 类客户端），
+        直接发 HTTP 请求的子类可覆盖为 httpx 异步实现
+        """
+        return await asyncio.to_thread(self._do_search, query, api_key, max_results, days)
+
+    def _error_response(self, query: str, error_msg: str) -> SearchResponse:
+        """构造失败响应并记录日志"""
+        logger.error(f"[{self._name}] {error_msg}")
+        return SearchResponse(
+            query=query,
+            results=[],
+            provider=self._name,
+            success=False,
+            error_message=error_msg
+        )
+
+    def _missing_key_response(self, query: str) -> SearchResponse:
+        return SearchResponse(
+            query=query,
+            results=[],
+            provider=self._name,
+            success=False,
+            error_message=f"{self._name} 未配置 API Key"
+        )
+
+    def _finish_search(self, query: str, api_key: str, response: SearchResponse, start_time: float) -> SearchResponse:
+        """记录搜索耗时与 Key 的成功/错误计数"""
+        response.search_time = time.time() - start_time
+        profile_record(f"search.{self._name}", response.search_time)
+        
+        if response.success:
+            self._record_success(api_key)
+            logger.info(f"[{self._name}] 搜索 '{query}' 成功，返回 {len(response.results)} 条结果，耗时 {response.search_time:.2f}s")
+        else:
+            self._record_error(api_key)
+        
+        return response
+
+    def _failed_search(self, query: str, api_key: str, error: Exception, start_time: float) -> SearchResponse:
+        self._record_error(api_key)
+        elapsed = time.time() - start_time
+        profile_record(f"search.{self._name}", elapsed)
+        logger.error(f"[{self._name}] 搜索 '{query}' 失败: {error}")
+        return SearchResponse(
+            query=query,
+            results=[],
+            provider=self._name,
+            success=False,
+            error_message=str(error),
+            search_time=elapsed
+        )
+    
     def search(self, query: str, max_results: int = 5, days: int = 7) -> SearchResponse:
         """
         执行搜索
@@ -170,39 +232,45 @@ class BaseSearchProvider(ABC):
         """
         api_key = self._get_next_key()
         if not api_key:
-            return SearchResponse(
-                query=query,
-                results=[],
-                provider=self._name,
-                success=False,
-                error_message=f"{self._name} 未配置 API Key"
-            )
+            return self._missing_key_response(query)
         
         start_time = time.time()
         try:
-            response = self._do_search(query, api_key, max_results, days=days)
-            response.search_time = time.time() - start_time
-            
-            if response.success:
-                self._record_success(api_key)
-                logger.info(f"[{self._name}] 搜索 '{query}' 成功，返回 {len(response.results)} 条结果，耗时 {response.search_time:.2f}s")
-            else:
-                self._record_error(api_key)
-            
-            return response
-            
-        except Exception as e:
-            self._record_error(api_key)
-            elapsed = time.time() - start_time
-            logger.error(f"[{self._name}] 搜索 '{query}' 失败: {e}")
-            return SearchResponse(
-                query=query,
-                results=[],
-                provider=self._name,
-                success=False,
-                error_message=str(e),
-                search_time=elapsed
+            response = replay_call(
+                'search',
+                (self._name, query, max_results, days),
+                lambda: self._do_search(query, api_key, max_results, days=days),
             )
+            return self._finish_search(query, api_key, response, start_time)
+        except Exception as e:
+            return self._failed_search(query, api_key, e, start_time)
+
+    async def search_async(
+        self, query: str, max_results: int = 5, days: int = 7, client: Any = None
+    ) -> SearchResponse:
+        """
+        异步执行搜索（PIPELINE_MODE=async 使用）
+
+        Args:
+            query: 搜索关键词
+            max_results: 最大返回结果数
+            days: 搜索最近几天的时间范围
+            client: 共享的 httpx.AsyncClient；为 None 或启用流量录制/回放时走同步路径
+        """
+        if client is None or get_traffic_archive() is not None:
+            # 录制/回放需要经过 replay_call，直接复用同步实现
+            return await asyncio.to_thread(self.search, query, max_results, days)
+
+        api_key = self._get_next_key()
+        if not api_key:
+            return self._missing_key_response(query)
+
+        start_time = time.time()
+        try:
+            response = await self._do_search_async(query, api_key, max_results, days, client)
+            return self._finish_search(query, api_key, response, start_time)
+        except Exception as e:
+            return self._failed_search(query, api_key, e, start_time)
 
 
 class TavilySearchProvider(BaseSearchProvider):
@@ -514,6 +582,132 @@ class BochaSearchProvider(BaseSearchProvider):
     def __init__(self, api_keys: List[str]):
         super().__init__(api_keys, "Bocha")
     
+    def _build_request(self, query: str, api_key: str, max_results: int, days: int) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """构造博查搜索请求（同步与异步路径共用）"""
+        # API 端点
+        url = "https://api.bocha.cn/v1/web-search"
+
+        # 请求头
+        headers = {
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+
+        # 确定时间范围
+        freshness = "oneWeek"
+        if days <= 1:
+            freshness = "oneDay"
+        elif days <= 7:
+            freshness = "oneWeek"
+        elif days <= 30:
+            freshness = "oneMonth"
+        else:
+            freshness = "oneYear"
+
+        # 请求参数（严格按照API文档）
+        payload = {
+            "query": query,
+            "freshness": freshness,  # 动态时间范围
+            "summary": True,  # 启用AI摘要
+            "count": min(max_results, 50)  # 最大50条
+        }
+        return url, headers, payload
+
+    def _parse_response(self, query: str, response: Any, max_results: int) -> SearchResponse:
+        """解析博查响应（兼容 requests 与 httpx 的响应对象）"""
+        # 检查HTTP状态码
+        if response.status_code != 200:
+            # 尝试解析错误信息
+            try:
+                if response.headers.get('content-type', '').startswith('application/json'):
+                    error_data = response.json()
+                    error_message = error_data.get('message', response.text)
+                else:
+                    error_message = response.text
+            except:
+                error_message = response.text
+            
+            # 根据错误码处理
+            if response.status_code == 403:
+                error_msg = f"余额不足: {error_message}"
+            elif response.status_code == 401:
+                error_msg = f"API KEY无效: {error_message}"
+            elif response.status_code == 400:
+                error_msg = f"请求参数错误: {error_message}"
+            elif response.status_code == 429:
+                error_msg = f"请求频率达到限制: {error_message}"
+            else:
+                error_msg = f"HTTP {response.status_code}: {error_message}"
+            
+            logger.warning(f"[Bocha] 搜索失败: {error_msg}")
+            
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self.name,
+                success=False,
+                error_message=error_msg
+            )
+        
+        # 解析响应
+        try:
+            data = response.json()
+        except ValueError as e:
+            error_msg = f"响应JSON解析失败: {str(e)}"
+            logger.error(f"[Bocha] {error_msg}")
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self.name,
+                success=False,
+                error_message=error_msg
+            )
+        
+        # 检查响应code
+        if data.get('code') != 200:
+            error_msg = data.get('msg') or f"API返回错误码: {data.get('code')}"
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self.name,
+                success=False,
+                error_message=error_msg
+            )
+        
+        # 记录原始响应到日志
+        logger.info(f"[Bocha] 搜索完成，query='{query}'")
+        logger.debug(f"[Bocha] 原始响应: {data}")
+        
+        # 解析搜索结果
+        results = []
+        web_pages = data.get('data', {}).get('webPages', {})
+        value_list = web_pages.get('value', [])
+        
+        for item in value_list[:max_results]:
+            # 优先使用summary（AI摘要），fallback到snippet
+            snippet = item.get('summary') or item.get('snippet', '')
+            
+            # 截取摘要长度
+            if snippet:
+                snippet = snippet[:500]
+            
+            results.append(SearchResult(
+                title=item.get('name', ''),
+                snippet=snippet,
+                url=item.get('url', ''),
+                source=item.get('siteName') or self._extract_domain(item.get('url', '')),
+                published_date=item.get('datePublished'),  # UTC+8格式，无需转换
+            ))
+        
+        logger.info(f"[Bocha] 成功解析 {len(results)} 条结果")
+        
+        return SearchResponse(
+            query=query,
+            results=results,
+            provider=self.name,
+            success=True,
+        )
+
     def _do_search(self, query: str, api_key: str, max_results: int, days: int = 7) -> SearchResponse:
         """执行博查搜索"""
         try:
@@ -528,129 +722,11 @@ class BochaSearchProvider(BaseSearchProvider):
             )
         
         try:
-            # API 端点
-            url = "https://api.bocha.cn/v1/web-search"
-            
-            # 请求头
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            # 确定时间范围
-            freshness = "oneWeek"
-            if days <= 1:
-                freshness = "oneDay"
-            elif days <= 7:
-                freshness = "oneWeek"
-            elif days <= 30:
-                freshness = "oneMonth"
-            else:
-                freshness = "oneYear"
-
-            # 请求参数（严格按照API文档）
-            payload = {
-                "query": query,
-                "freshness": freshness,  # 动态时间范围
-                "summary": True,  # 启用AI摘要
-                "count": min(max_results, 50)  # 最大50条
-            }
+            url, headers, payload = self._build_request(query, api_key, max_results, days)
             
             # 执行搜索
             response = requests.post(url, headers=headers, json=payload, timeout=10)
-            
-            # 检查HTTP状态码
-            if response.status_code != 200:
-                # 尝试解析错误信息
-                try:
-                    if response.headers.get('content-type', '').startswith('application/json'):
-                        error_data = response.json()
-                        error_message = error_data.get('message', response.text)
-                    else:
-                        error_message = response.text
-                except:
-                    error_message = response.text
-                
-                # 根据错误码处理
-                if response.status_code == 403:
-                    error_msg = f"余额不足: {error_message}"
-                elif response.status_code == 401:
-                    error_msg = f"API KEY无效: {error_message}"
-                elif response.status_code == 400:
-                    error_msg = f"请求参数错误: {error_message}"
-                elif response.status_code == 429:
-                    error_msg = f"请求频率达到限制: {error_message}"
-                else:
-                    error_msg = f"HTTP {response.status_code}: {error_message}"
-                
-                logger.warning(f"[Bocha] 搜索失败: {error_msg}")
-                
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-            
-            # 解析响应
-            try:
-                data = response.json()
-            except ValueError as e:
-                error_msg = f"响应JSON解析失败: {str(e)}"
-                logger.error(f"[Bocha] {error_msg}")
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-            
-            # 检查响应code
-            if data.get('code') != 200:
-                error_msg = data.get('msg') or f"API返回错误码: {data.get('code')}"
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-            
-            # 记录原始响应到日志
-            logger.info(f"[Bocha] 搜索完成，query='{query}'")
-            logger.debug(f"[Bocha] 原始响应: {data}")
-            
-            # 解析搜索结果
-            results = []
-            web_pages = data.get('data', {}).get('webPages', {})
-            value_list = web_pages.get('value', [])
-            
-            for item in value_list[:max_results]:
-                # 优先使用summary（AI摘要），fallback到snippet
-                snippet = item.get('summary') or item.get('snippet', '')
-                
-                # 截取摘要长度
-                if snippet:
-                    snippet = snippet[:500]
-                
-                results.append(SearchResult(
-                    title=item.get('name', ''),
-                    snippet=snippet,
-                    url=item.get('url', ''),
-                    source=item.get('siteName') or self._extract_domain(item.get('url', '')),
-                    published_date=item.get('datePublished'),  # UTC+8格式，无需转换
-                ))
-            
-            logger.info(f"[Bocha] 成功解析 {len(results)} 条结果")
-            
-            return SearchResponse(
-                query=query,
-                results=results,
-                provider=self.name,
-                success=True,
-            )
+            return self._parse_response(query, response, max_results)
             
         except requests.exceptions.Timeout:
             error_msg = "请求超时"
@@ -683,6 +759,23 @@ class BochaSearchProvider(BaseSearchProvider):
                 error_message=error_msg
             )
     
+    async def _do_search_async(
+        self, query: str, api_key: str, max_results: int, days: int, client: Any
+    ) -> SearchResponse:
+        """执行博查搜索（httpx 异步请求）"""
+        import httpx
+
+        try:
+            url, headers, payload = self._build_request(query, api_key, max_results, days)
+            response = await client.post(url, headers=headers, json=payload, timeout=10)
+            return self._parse_response(query, response, max_results)
+        except httpx.TimeoutException:
+            return self._error_response(query, "请求超时")
+        except httpx.HTTPError as e:
+            return self._error_response(query, f"网络请求失败: {str(e)}")
+        except Exception as e:
+            return self._error_response(query, f"未知错误: {str(e)}")
+    
     @staticmethod
     def _extract_domain(url: str) -> str:
         """从 URL 提取域名作为来源"""
@@ -713,34 +806,104 @@ class BraveSearchProvider(BaseSearchProvider):
     def __init__(self, api_keys: List[str]):
         super().__init__(api_keys, "Brave")
 
-    def _do_search(self, query: str, api_key: str, max_results: int, days: int = 7) -> SearchResponse:
-        """执行 Brave 搜索"""
+    def _build_request(self, query: str, api_key: str, max_results: int, days: int) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """构造 Brave 搜索请求头与参数（同步与异步路径共用）"""
+        # 请求头
+        headers = {
+            'X-Subscription-Token': api_key,
+            'Accept': 'application/json'
+        }
+
+        # 确定时间范围（freshness 参数）
+        if days <= 1:
+            freshness = "pd"  # Past day (24小时)
+        elif days <= 7:
+            freshness = "pw"  # Past week
+        elif days <= 30:
+            freshness = "pm"  # Past month
+        else:
+            freshness = "py"  # Past year
+
+        # 请求参数
+        params = {
+            "q": query,
+            "count": min(max_results, 20),  # Brave 最大支持20条
+            "freshness": freshness,
+            "search_lang": "en",  # 英文内容（US股票优先）
+            "country": "US",  # 美国区域偏好
+            "safesearch": "moderate"
+        }
+        return headers, params
+
+    def _parse_response(self, query: str, response: Any, max_results: int) -> SearchResponse:
+        """解析 Brave 响应（兼容 requests 与 httpx 的响应对象）"""
+        # 检查HTTP状态码
+        if response.status_code != 200:
+            error_msg = self._parse_error(response)
+            logger.warning(f"[Brave] 搜索失败: {error_msg}")
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self.name,
+                success=False,
+                error_message=error_msg
+            )
+
+        # 解析响应
         try:
-            # 请求头
-            headers = {
-                'X-Subscription-Token': api_key,
-                'Accept': 'application/json'
-            }
+            data = response.json()
+        except ValueError as e:
+            error_msg = f"响应JSON解析失败: {str(e)}"
+            logger.error(f"[Brave] {error_msg}")
+            return SearchResponse(
+                query=query,
+                results=[],
+                provider=self.name,
+                success=False,
+                error_message=error_msg
+            )
 
-            # 确定时间范围（freshness 参数）
-            if days <= 1:
-                freshness = "pd"  # Past day (24小时)
-            elif days <= 7:
-                freshness = "pw"  # Past week
-            elif days <= 30:
-                freshness = "pm"  # Past month
-            else:
-                freshness = "py"  # Past year
+        logger.info(f"[Brave] 搜索完成，query='{query}'")
+        logger.debug(f"[Brave] 原始响应: {data}")
 
-            # 请求参数
-            params = {
-                "q": query,
-                "count": min(max_results, 20),  # Brave 最大支持20条
-                "freshness": freshness,
-                "search_lang": "en",  # 英文内容（US股票优先）
-                "country": "US",  # 美国区域偏好
-                "safesearch": "moderate"
-            }
+        # 解析搜索结果
+        results = []
+        web_data = data.get('web', {})
+        web_results = web_data.get('results', [])
+
+        for item in web_results[:max_results]:
+            # 解析发布日期（ISO 8601 格式）
+            published_date = None
+            age = item.get('age') or item.get('page_age')
+            if age:
+                try:
+                    # 转换 ISO 格式为简单日期字符串
+                    dt = datetime.fromisoformat(age.replace('Z', '+00:00'))
+                    published_date = dt.strftime('%Y-%m-%d')
+                except (ValueError, AttributeError):
+                    published_date = age  # 解析失败时使用原始值
+
+            results.append(SearchResult(
+                title=item.get('title', ''),
+                snippet=item.get('description', '')[:500],  # 截取到500字符
+                url=item.get('url', ''),
+                source=self._extract_domain(item.get('url', '')),
+                published_date=published_date
+            ))
+
+        logger.info(f"[Brave] 成功解析 {len(results)} 条结果")
+
+        return SearchResponse(
+            query=query,
+            results=results,
+            provider=self.name,
+            success=True
+        )
+
+    def _do_search(self, query: str, api_key: str, max_results: int, days: int = 7) -> SearchResponse:
+        """执行 Brave 搜索"""
+        try:
+            headers, params = self._build_request(query, api_key, max_results, days)
 
             # 执行搜索（GET 请求）
             response = requests.get(
@@ -749,69 +912,7 @@ class BraveSearchProvider(BaseSearchProvider):
                 params=params,
                 timeout=10
             )
-
-            # 检查HTTP状态码
-            if response.status_code != 200:
-                error_msg = self._parse_error(response)
-                logger.warning(f"[Brave] 搜索失败: {error_msg}")
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-
-            # 解析响应
-            try:
-                data = response.json()
-            except ValueError as e:
-                error_msg = f"响应JSON解析失败: {str(e)}"
-                logger.error(f"[Brave] {error_msg}")
-                return SearchResponse(
-                    query=query,
-                    results=[],
-                    provider=self.name,
-                    success=False,
-                    error_message=error_msg
-                )
-
-            logger.info(f"[Brave] 搜索完成，query='{query}'")
-            logger.debug(f"[Brave] 原始响应: {data}")
-
-            # 解析搜索结果
-            results = []
-            web_data = data.get('web', {})
-            web_results = web_data.get('results', [])
-
-            for item in web_results[:max_results]:
-                # 解析发布日期（ISO 8601 格式）
-                published_date = None
-                age = item.get('age') or item.get('page_age')
-                if age:
-                    try:
-                        # 转换 ISO 格式为简单日期字符串
-                        dt = datetime.fromisoformat(age.replace('Z', '+00:00'))
-                        published_date = dt.strftime('%Y-%m-%d')
-                    except (ValueError, AttributeError):
-                        published_date = age  # 解析失败时使用原始值
-
-                results.append(SearchResult(
-                    title=item.get('title', ''),
-                    snippet=item.get('description', '')[:500],  # 截取到500字符
-                    url=item.get('url', ''),
-                    source=self._extract_domain(item.get('url', '')),
-                    published_date=published_date
-                ))
-
-            logger.info(f"[Brave] 成功解析 {len(results)} 条结果")
-
-            return SearchResponse(
-                query=query,
-                results=results,
-                provider=self.name,
-                success=True
-            )
+            return self._parse_response(query, response, max_results)
 
         except requests.exceptions.Timeout:
             error_msg = "请求超时"
@@ -844,6 +945,23 @@ class BraveSearchProvider(BaseSearchProvider):
                 error_message=error_msg
             )
 
+    async def _do_search_async(
+        self, query: str, api_key: str, max_results: int, days: int, client: Any
+    ) -> SearchResponse:
+        """执行 Brave 搜索（httpx 异步请求）"""
+        import httpx
+
+        try:
+            headers, params = self._build_request(query, api_key, max_results, days)
+            response = await client.get(self.API_ENDPOINT, headers=headers, params=params, timeout=10)
+            return self._parse_response(query, response, max_results)
+        except httpx.TimeoutException:
+            return self._error_response(query, "请求超时")
+        except httpx.HTTPError as e:
+            return self._error_response(query, f"网络请求失败: {str(e)}")
+        except Exception as e:
+            return self._error_response(query, f"未知错误: {str(e)}")
+
     def _parse_error(self, response) -> str:
         """解析错误响应"""
         try:
@@ -1128,31 +1246,13 @@ class SearchService:
             error_message="事件搜索失败"
         )
     
-    def search_comprehensive_intel(
+    def _plan_intel_searches(
         self,
         stock_code: str,
         stock_name: str,
-        max_searches: int = 3
-    ) -> Dict[str, SearchResponse]:
-        """
-        多维度情报搜索（同时使用多个引擎、多个维度）
-        
-        搜索维度：
-        1. 最新消息 - 近期新闻动态
-        2. 风险排查 - 减持、处罚、利空
-        3. 业绩预期 - 年报预告、业绩快报
-        
-        Args:
-            stock_code: 股票代码
-            stock_name: 股票名称
-            max_searches: 最大搜索次数
-            
-        Returns:
-            {维度名称: SearchResponse} 字典
-        """
-        results = {}
-        search_count = 0
-        
+        max_searches: int
+    ) -> List[Tuple[Dict[str, str], BaseSearchProvider]]:
+        """确定多维度情报搜索的维度及各维度使用的搜索引擎（轮流使用）"""
         # 根据股票类型选择搜索关键词语言
         is_foreign = self._is_foreign_stock(stock_code)
 
@@ -1214,38 +1314,101 @@ class SearchService:
                 },
             ]
         
-        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})")
+        available_providers = [p for p in self._providers if p.is_available]
+        if not available_providers:
+            return []
         
         # 轮流使用不同的搜索引擎
-        provider_index = 0
+        return [
+            (dim, available_providers[index % len(available_providers)])
+            for index, dim in enumerate(search_dimensions[:max_searches])
+        ]
+
+    @staticmethod
+    def _log_intel_response(dim: Dict[str, str], response: SearchResponse) -> None:
+        if response.success:
+            logger.info(f"[情报搜索] {dim['desc']}: 获取 {len(response.results)} 条结果")
+        else:
+            logger.warning(f"[情报搜索] {dim['desc']}: 搜索失败 - {response.error_message}")
+    
+    def search_comprehensive_intel(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 3
+    ) -> Dict[str, SearchResponse]:
+        """
+        多维度情报搜索（同时使用多个引擎、多个维度）
         
-        for dim in search_dimensions:
-            if search_count >= max_searches:
-                break
-            
-            # 选择搜索引擎（轮流使用）
-            available_providers = [p for p in self._providers if p.is_available]
-            if not available_providers:
-                break
-            
-            provider = available_providers[provider_index % len(available_providers)]
-            provider_index += 1
+        搜索维度：
+        1. 最新消息 - 近期新闻动态
+        2. 风险排查 - 减持、处罚、利空
+        3. 业绩预期 - 年报预告、业绩快报
+        
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称
+            max_searches: 最大搜索次数
             
+        Returns:
+            {维度名称: SearchResponse} 字典
+        """
+        results = {}
+        
+        logger.info(f"开始多维度情报搜索: {stock_name}({stock_code})")
+        
+        for dim, provider in self._plan_intel_searches(stock_code, stock_name, max_searches):
             logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
             
             response = provider.search(dim['query'], max_results=3)
             results[dim['name']] = response
-            search_count += 1
-            
-            if response.success:
-                logger.info(f"[情报搜索] {dim['desc']}: 获取 {len(response.results)} 条结果")
-            else:
-                logger.warning(f"[情报搜索] {dim['desc']}: 搜索失败 - {response.error_message}")
+            self._log_intel_response(dim, response)
             
             # 短暂延迟避免请求过快
             time.sleep(0.5)
         
         return results
+
+    async def search_comprehensive_intel_async(
+        self,
+        stock_code: str,
+        stock_name: str,
+        max_searches: int = 3,
+        client: Any = None
+    ) -> Dict[str, SearchResponse]:
+        """
+        多维度情报搜索（异步版本，PIPELINE_MODE=async 使用）
+
+        维度与引擎分配同 search_comprehensive_intel；各维度的请求错开 0.5 秒发出后并发等待，
+        不再串行累加每次搜索的网络耗时
+
+        Args:
+            stock_code: 股票代码
+            stock_name: 股票名称
+            max_searches: 最大搜索次数
+            client: 共享的 httpx.AsyncClient
+
+        Returns:
+            {维度名称: SearchResponse} 字典
+        """
+        plan = self._plan_intel_searches(stock_code, stock_name, max_searches)
+        if not plan:
+            return {}
+
+        logger.info(f"开始多维度情报搜索(async): {stock_name}({stock_code})")
+
+        async def run(index: int, dim: Dict[str, str], provider: BaseSearchProvider) -> SearchResponse:
+            # 错开发出时间，与同步版本的请求间隔一致
+            await asyncio.sleep(0.5 * index)
+            logger.info(f"[情报搜索] {dim['desc']}: 使用 {provider.name}")
+            response = await provider.search_async(dim['query'], max_results=3, client=client)
+            self._log_intel_response(dim, response)
+            return response
+
+        responses = await asyncio.gather(
+            *(run(index, dim, provider) for index, (dim, provider) in enumerate(plan))
+        )
+        return {dim['name']: response for (dim, _), response in zip(plan, responses)}
     
     def format_intel_report(self, intel_results: Dict[str, SearchResponse], stock_name: str) -> str:
         """
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 证券主数据
+===================================
+
+职责：
+1. 维护全市场证券基础信息（代码、名称、市场、板块、类型、上市状态）
+2. 启动时从 security_master 表整表加载到内存字典，名称解析为 O(1) 查询
+3. 每日从支持 get_stock_list 的数据源批量刷新一次并持久化
+
+说明：
+- 热路径（分析、报告、推送）只读内存字典，不触发实时行情或网络请求
+- STOCK_NAME_MAP 作为内置种子，覆盖港股/美股等批量数据源不提供的常见代码
+"""
+
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.replay import replay_call
+
+logger = logging.getLogger(__name__)
+
+
+# 股票名称映射（常见股票，作为证券主数据的内置种子）
+STOCK_NAME_MAP = {
+    # === A股 ===
+    '600519': '贵州茅台',
+    '000001': '平安银行',
+    '300750': '宁德时代',
+    '002594': '比亚迪',
+    '600036': '招商银行',
+    '601318': '中国平安',
+    '000858': '五粮液',
+    '600276': '恒瑞医药',
+    '601012': '隆基绿能',
+    '002475': '立讯精密',
+    '300059': '东方财富',
+    '002415': '海康威视',
+    '600900': '长江电力',
+    '601166': '兴业银行',
+    '600028': '中国石化',
+
+    # === 美股 ===
+    'AAPL': '苹果',
+    'TSLA': '特斯拉',
+    'MSFT': '微软',
+    'GOOGL': '谷歌A',
+    'GOOG': '谷歌C',
+    'AMZN': '亚马逊',
+    'NVDA': '英伟达',
+    'META': 'Meta',
+    'AMD': 'AMD',
+    'INTC': '英特尔',
+    'BABA': '阿里巴巴',
+    'PDD': '拼多多',
+    'JD': '京东',
+    'BIDU': '百度',
+    'NIO': '蔚来',
+    'XPEV': '小鹏汽车',
+    'LI': '理想汽车',
+    'COIN': 'Coinbase',
+    'MSTR': 'MicroStrategy',
+
+    # === 港股 (5位数字) ===
+    '00700': '腾讯控股',
+    '03690': '美团',
+    '01810': '小米集团',
+    '09988': '阿里巴巴',
+    '09618': '京东集团',
+    '09888': '百度集团',
+    '01024': '快手',
+    '00981': '中芯国际',
+    '02015': '理想汽车',
+    '09868': '小鹏汽车',
+    '00005': '汇丰控股',
+    '01299': '友邦保险',
+    '00941': '中国移动',
+    '00883': '中国海洋石油',
+}
+
+_US_CODE_PATTERN = re.compile(r'^[A-Z]{1,5}(\.[A-Z])?$')
+
+# Tushare stock_basic.market 取值 -> 板块
+_TUSHARE_BOARDS = {'主板': '主板', '中小板': '主板', '创业板': '创业板', '科创板': '科创板', '北交所': '北交所', 'CDR': '科创板'}
+
+# Baostock query_stock_basic.type 取值 -> 资产类型（2 指数与个股代码重叠，不纳入）
+_BAOSTOCK_TYPES = {'1': 'stock', '5': 'etf'}
+
+
+def classify_security(code: str) -> Tuple[str, str, str]:
+    """
+    根据代码规则推断 (市场, 板块, 资产类型)
+
+    Examples:
+        >>> classify_security('688981')
+        ('SH', '科创板', 'stock')
+        >>> classify_security('510300')
+        ('SH', '', 'etf')
+    """
+    code = code.strip().upper()
+    if _US_CODE_PATTERN.match(code):
+        return 'US', '', 'stock'
+    if code.startswith('HK') or (code.isdigit() and len(code) == 5):
+        return 'HK', '', 'stock'
+    if not (code.isdigit() and len(code) == 6):
+        return '', '', 'stock'
+
+    if code.startswith(('51', '52', '56', '58')):
+        return 'SH', '', 'etf'
+    if code.startswith(('15', '16', '18')):
+        return 'SZ', '', 'etf'
+    if code.startswith('688'):
+        return 'SH', '科创板', 'stock'
+    if code.startswith('6'):
+        return 'SH', '主板', 'stock'
+    if code.startswith(('300', '301')):
+        return 'SZ', '创业板', 'stock'
+    if code.startswith('0'):
+        return 'SZ', '主板', 'stock'
+    if code.startswith(('4', '8', '92')):
+        return 'BJ', '北交所', 'stock'
+    return '', '', 'stock'
+
+
+def _normalize_stock_list(df: pd.DataFrame, source: str) -> List[Dict[str, Any]]:
+    """将数据源 get_stock_list 的结果转换为证券主数据记录（按列向量化处理）"""
+    df = df.dropna(subset=['code', 'name']).copy()
+    df['code'] = df['code'].astype(str).str.strip()
+
+    asset_types = None
+    if 'type' in df.columns:
+        df = df[df['type'].astype(str).isin(_BAOSTOCK_TYPES)]
+        asset_types = df['type'].astype(str).map(_BAOSTOCK_TYPES)
+
+    list_status = pd.Series('L', index=df.index)
+    if 'status' in df.columns:
+        list_status = df['status'].astype(str).map({'1': 'L', '0': 'D'}).fillna('L')
+
+    records = []
+    for code, name, status, tushare_market, asset_type in zip(
+        df['code'],
+        df['name'],
+        list_status,
+        df['market'] if 'market' in df.columns else [None] * len(df),
+        asset_types if asset_types is not None else [None] * len(df),
+    ):
+        market, board, inferred_type = classify_security(code)
+        records.append({
+            'code': code,
+            'name': str(name).strip(),
+            'market': market,
+            'board': _TUSHARE_BOARDS.get(tushare_market, board),
+            'asset_type': asset_type or inferred_type,
+            'list_status': status,
+            'data_source': source,
+        })
+    return records
+
+
+class SecurityMasterCache:
+    """
+    证券主数据内存索引（线程安全）
+
+    使用方式：
+        master = get_security_master()
+        name = master.get_name('600519')
+    """
+
+    # 批量刷新间隔
+    REFRESH_INTERVAL = timedelta(days=1)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._refreshed_at: Optional[datetime] = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+    def _load(self) -> None:
+        """从数据库整表加载（调用方需持有锁）"""
+        from src.storage import get_db
+
+        records: Dict[str, Dict[str, Any]] = {
+            code: dict(zip(('code', 'name', 'market', 'board', 'asset_type'), (code, name, *classify_security(code))))
+            for code, name in STOCK_NAME_MAP.items()
+        }
+        try:
+            db = get_db()
+            for record in db.get_security_master_records():
+                records[record['code']] = record
+            self._refreshed_at = db.get_security_master_updated_at()
+        except Exception as e:
+            logger.warning(f"[证券主数据] 加载失败，仅使用内置映射: {e}")
+
+        self._records = records
+        self._loaded = True
+        logger.info(f"[证券主数据] 已加载 {len(records)} 条")
+
+    def reload(self) -> None:
+        """重新从数据库加载"""
+        with self._lock:
+            self._load()
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        """获取证券信息（code, name, market, board, asset_type, list_status）"""
+        self._ensure_loaded()
+        return self._records.get(code)
+
+    def get_name(self, code: str) -> Optional[str]:
+        """获取证券名称，未收录时返回 None"""
+        record = self.get(code)
+        return record.get('name') if record else None
+
+    def get_names(self, codes: Iterable[str]) -> Dict[str, str]:
+        """批量获取证券名称，仅包含已收录的代码"""
+        self._ensure_loaded()
+        records = self._records
+        return {code: records[code]['name'] for code in codes if code in records and records[code].get('name')}
+
+    def remember(self, code: str, name: str, source: str = '') -> None:
+        """
+        记录热路径之外解析到的名称（如实时行情返回的名称）并持久化
+
+        已收录且名称相同的代码不会重复写库；补录不更新刷新时间，不影响每日全量刷新
+        """
+        if not code or not name:
+            return
+        self._ensure_loaded()
+        existing = self._records.get(code)
+        if existing and existing.get('name') == name:
+            return
+
+        market, board, asset_type = classify_security(code)
+        record = {
+            'code': code, 'name': name, 'market': market, 'board': board,
+            'asset_type': asset_type, 'data_source': source,
+        }
+        with self._lock:
+            self._records[code] = {**(existing or {}), **record}
+        try:
+            from src.storage import get_db
+
+            get_db().save_security_master([record], touch=False)
+        except Exception as e:
+            logger.debug(f"[证券主数据] 保存 {code} 失败: {e}")
+
+    def needs_refresh(self) -> bool:
+        """距上次批量刷新是否已超过 REFRESH_INTERVAL"""
+        self._ensure_loaded()
+        return self._refreshed_at is None or datetime.now() - self._refreshed_at >= self.REFRESH_INTERVAL
+
+    def refresh(self, fetchers: Iterable[Any], force: bool = False) -> int:
+        """
+        从数据源批量刷新证券主数据
+
+        依次调用各数据源的 get_stock_list，合并后一次性写库并更新内存索引。
+
+        Args:
+            fetchers: 数据源列表（按优先级，靠前的数据源覆盖靠后的同代码记录）
+            force: 忽略刷新间隔强制刷新
+
+        Returns:
+            刷新的记录数（未到刷新时间或全部数据源失败时为 0）
+        """
+        if not force and not self.needs_refresh():
+            return 0
+
+        merged: Dict[str, Dict[str, Any]] = {}
+        for fetcher in reversed(list(fetchers)):
+            if not hasattr(fetcher, 'get_stock_list'):
+                continue
+            try:
+                stock_list = replay_call('stock_list', (fetcher.name,), fetcher.get_stock_list)
+            except Exception as e:
+                logger.debug(f"[证券主数据] {fetcher.name} 获取股票列表失败: {e}")
+                continue
+            if stock_list is None or stock_list.empty:
+                continue
+            records = _normalize_stock_list(stock_list, fetcher.name)
+            merged.update((record['code'], record) for record in records)
+            logger.info(f"[证券主数据] 从 {fetcher.name} 获取 {len(records)} 条")
+
+        if not merged:
+            logger.warning("[证券主数据] 所有数据源均未返回股票列表，保留现有数据")
+            return 0
+
+        from src.storage import get_db
+
+        try:
+            get_db().save_security_master(list(merged.values()))
+        except Exception as e:
+            logger.warning(f"[证券主数据] 持久化失败: {e}")
+
+        with self._lock:
+            for code, record in merged.items():
+                self._records[code] = {**self._records.get(code, {}), **record}
+            self._refreshed_at = datetime.now()
+        logger.info(f"[证券主数据] 批量刷新完成，共 {len(merged)} 条")
+        return len(merged)
+
+
+_security_master: Optional[SecurityMasterCache] = None
+_security_master_lock = threading.Lock()
+
+
+def get_security_master() -> SecurityMasterCache:
+    """获取进程内共享的证券主数据索引"""
+    global _security_master
+    if _security_master is None:
+        with _security_master_lock:
+            if _security_master is None:
+                _security_master = SecurityMasterCache()
+    return _security_master
+
+
+def reset_security_master() -> None:
+    """丢弃内存索引（主要用于测试或切换数据库）"""
+    global _security_master
+    with _security_master_lock:
+        _security_master = None
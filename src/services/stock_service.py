@@ -7,17 +7,148 @@
 职责：
 1. 封装股票数据获取逻辑
 2. 提供实时行情和历史数据接口
+3. 由本地日线重采样周线/月线，并缓存转换结果
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+import pandas as pd
 
 from src.repositories.stock_repo import StockRepository
 
 logger = logging.getLogger(__name__)
 
 
+HISTORY_PERIODS = ("daily", "weekly", "monthly")
+
+# 本地最早日期晚于所需起始日期不超过该天数时视为已覆盖（节假日、停牌）
+_COVERAGE_TOLERANCE_DAYS = 10
+
+# 重采样结果缓存：(code, period, start_date) -> ((最新日期, 行数, 最新收盘价), K 线记录)
+_KLINE_CACHE_SIZE = 256
+_kline_cache: "OrderedDict[Tuple[str, str, date], Tuple[Tuple[Any, ...], List[Dict[str, Any]]]]" = OrderedDict()
+_kline_cache_lock = threading.Lock()
+
+
+def _period_start(start_date: date, period: str) -> date:
+    """将起始日期对齐到周期起点，避免第一根周线/月线只包含部分交易日"""
+    if period == "weekly":
+        return start_date - timedelta(days=start_date.weekday())
+    if period == "monthly":
+        return start_date.replace(day=1)
+    return start_date
+
+
+def resample_daily_bars(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    将日线重采样为周线/月线（向量化 groupby）
+    
+    Args:
+        df: 按日期升序的日线 DataFrame（date, open, high, low, close, volume, amount[, pct_chg]）
+        period: weekly / monthly（daily 原样返回）
+        
+    Returns:
+        重采样后的 DataFrame，date 为该周期内最后一个交易日
+    """
+    if period == "daily" or df.empty:
+        return df
+    
+    dates = pd.to_datetime(df["date"])
+    key = dates.dt.to_period("W" if period == "weekly" else "M")
+    frame = df.assign(date=dates)
+    grouped = frame.groupby(key.to_numpy(), sort=True)
+    result = grouped.agg(
+        date=("date", "last"),
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        volume=("volume", "sum"),
+        amount=("amount", "sum"),
+    ).reset_index(drop=True)
+    
+    # 周期涨跌幅：相对上一周期收盘；第一根由首日涨跌幅反推昨收
+    prev_close = result["close"].shift(1)
+    if "pct_chg" in frame.columns:
+        first = grouped.first()
+        first_prev = first["close"].to_numpy() / (1 + first["pct_chg"].to_numpy() / 100)
+        prev_close = prev_close.fillna(pd.Series(first_prev, index=result.index))
+    result["pct_chg"] = ((result["close"] / prev_close - 1) * 100).round(2)
+    return result
+
+
+def _to_kline_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """转换为 API 响应的 K 线记录列表"""
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    
+    def optional(col: str) -> List[Optional[float]]:
+        if col not in df.columns:
+            return [None] * len(df)
+        values = pd.to_numeric(df[col], errors="coerce")
+        return [float(v) if pd.notna(v) and v else None for v in values]
+    
+    prices = {
+        col: pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float).tolist()
+        for col in ("open", "high", "low", "close")
+    }
+    volume, amount, change = optional("volume"), optional("amount"), optional("pct_chg")
+    return [
+        {
+            "date": dates.iat[i],
+            "open": prices["open"][i],
+            "high": prices["high"][i],
+            "low": prices["low"][i],
+            "close": prices["close"][i],
+            "volume": volume[i],
+            "amount": amount[i],
+            "change_percent": change[i],
+        }
+        for i in range(len(df))
+    ]
+
+
+def _cached_kline_records(
+    stock_code: str,
+    period: str,
+    start_date: date,
+    daily: pd.DataFrame
+) -> List[Dict[str, Any]]:
+    """
+    获取 K 线记录（LRU 缓存，日线最新日期、行数或最新收盘价变化时失效）
+    
+    Args:
+        stock_code: 股票代码
+        period: daily / weekly / monthly
+        start_date: 区间起始日期
+        daily: 区间内的日线
+    """
+    key = (stock_code, period, start_date)
+    version = (daily["date"].iloc[-1], len(daily), float(daily["close"].iloc[-1]))
+    with _kline_cache_lock:
+        cached = _kline_cache.get(key)
+        if cached is not None and cached[0] == version:
+            _kline_cache.move_to_end(key)
+            return cached[1]
+    
+    records = _to_kline_records(resample_daily_bars(daily, period))
+    with _kline_cache_lock:
+        _kline_cache[key] = (version, records)
+        _kline_cache.move_to_end(key)
+        while len(_kline_cache) > _KLINE_CACHE_SIZE:
+            _kline_cache.popitem(last=False)
+    return records
+
+
+def clear_kline_cache() -> None:
+    """清空 K 线缓存（用于测试）"""
+    with _kline_cache_lock:
+        _kline_cache.clear()
+
+
 class StockService:
     """
     股票数据服务
@@ -40,10 +171,10 @@ class StockService:
             实时行情数据字典
         """
         try:
-            # 调用数据获取器获取实时行情
-            from data_provider.base import DataFetcherManager
+            # 调用进程内共享的数据获取器获取实时行情
+            from data_provider.base import get_fetcher_manager
             
-            manager = DataFetcherManager()
+            manager = get_fetcher_manager()
             quote = manager.get_realtime_quote(stock_code)
             
             if quote is None:
@@ -94,6 +225,9 @@ class StockService:
         """
         获取股票历史行情
         
+        日线直接读取 stock_daily，周线/月线由本地日线向量化重采样得到；
+        仅在本地缺少最新交易日或覆盖不足时请求数据源补齐并写库
+        
         Args:
             stock_code: 股票代码
             period: K 线周期 (daily/weekly/monthly)
@@ -103,21 +237,21 @@ class StockService:
             历史行情数据字典
             
         Raises:
-            ValueError: 当 period 不是 daily 时抛出（weekly/monthly 暂未实现）
+            ValueError: 当 period 不是 daily/weekly/monthly 时抛出
         """
-        # 验证 period 参数，只支持 daily
-        if period != "daily":
+        if period not in HISTORY_PERIODS:
             raise ValueError(
-                f"暂不支持 '{period}' 周期，目前仅支持 'daily'。"
-                "weekly/monthly 聚合功能将在后续版本实现。"
+                f"暂不支持 '{period}' 周期，目前仅支持 {'/'.join(HISTORY_PERIODS)}。"
             )
         
         try:
-            # 调用数据获取器获取历史数据
-            from data_provider.base import DataFetcherManager
+            from data_provider.base import get_fetcher_manager, normalize_stock_code
+            
+            manager = get_fetcher_manager()
+            stock_code = normalize_stock_code(stock_code)
             
-            manager = DataFetcherManager()
-            df, source = manager.get_daily_data(stock_code, days=days)
+            start_date = _period_start(date.today() - timedelta(days=days * 2), period)
+            df = self._load_history(manager, stock_code, start_date, days)
             
             if df is None or df.empty:
                 logger.warning(f"获取 {stock_code} 历史数据失败")
@@ -126,31 +260,11 @@ class StockService:
             # 获取股票名称
             stock_name = manager.get_stock_name(stock_code)
             
-            # 转换为响应格式
-            data = []
-            for _, row in df.iterrows():
-                date_val = row.get("date")
-                if hasattr(date_val, "strftime"):
-                    date_str = date_val.strftime("%Y-%m-%d")
-                else:
-                    date_str = str(date_val)
-                
-                data.append({
-                    "date": date_str,
-                    "open": float(row.get("open", 0)),
-                    "high": float(row.get("high", 0)),
-                    "low": float(row.get("low", 0)),
-                    "close": float(row.get("close", 0)),
-                    "volume": float(row.get("volume", 0)) if row.get("volume") else None,
-                    "amount": float(row.get("amount", 0)) if row.get("amount") else None,
-                    "change_percent": float(row.get("pct_chg", 0)) if row.get("pct_chg") else None,
-                })
-            
             return {
                 "stock_code": stock_code,
                 "stock_name": stock_name,
                 "period": period,
-                "data": data,
+                "data": _cached_kline_records(stock_code, period, start_date, df),
             }
             
         except ImportError:
@@ -160,6 +274,61 @@ class StockService:
             logger.error(f"获取历史数据失败: {e}", exc_info=True)
             return {"stock_code": stock_code, "period": period, "data": []}
     
+    def _load_history(
+        self,
+        manager: Any,
+        stock_code: str,
+        start_date: date,
+        days: int
+    ) -> Optional[pd.DataFrame]:
+        """
+        读取本地日线，必要时请求数据源补齐
+        
+        - 最新交易日数据已入库（按交易日历）且覆盖起始日期：直接返回本地数据
+        - 已覆盖起始日期但缺少最近交易日：增量请求缺失区间
+        - 本地无数据或起始日期未覆盖：按所需跨度全量请求
+        
+        Args:
+            manager: DataFetcherManager
+            stock_code: 股票代码
+            start_date: 开始日期
+            days: 获取天数
+            
+        Returns:
+            按日期升序的 DataFrame，获取失败时返回 None
+        """
+        from data_provider.base import LOCAL_CACHE_SOURCE
+        from src.config import get_config
+        from src.trading_calendar import get_trading_calendar
+        
+        end_date = date.today()
+        local = self.repo.get_range_df(stock_code, start_date, end_date)
+        covered = not local.empty and (
+            pd.Timestamp(local['date'].iloc[0]).date() <= start_date + timedelta(days=_COVERAGE_TOLERANCE_DAYS)
+        )
+        expected_date = get_trading_calendar().expected_bar_date_for(stock_code)
+        if covered and self.repo.has_today_data(stock_code, expected_date):
+            return local
+        
+        # 数据源按 days*2 个日历日估算起始日期；周线/月线起点对齐后可能更早，按需放大 days
+        fetch_days = max(days, ((end_date - start_date).days + 1) // 2)
+        if covered:
+            df, source = manager.get_daily_data(
+                stock_code, days=fetch_days, incremental=get_config().enable_incremental_sync
+            )
+        else:
+            df, source = manager.get_daily_data(stock_code, days=fetch_days)
+        if df is None or df.empty or source == LOCAL_CACHE_SOURCE:
+            return local if not local.empty else df
+        
+        # 写库后重新读取：增量结果只含新区间（数据源尚未发布新 K 线时仅有本地最后一行），
+        # 写库失败时同样不能直接返回增量结果
+        self.repo.save_dataframe(df, stock_code, source)
+        merged = self.repo.get_range_df(stock_code, start_date, end_date)
+        if not merged.empty:
+            return merged
+        return local if not local.empty else df
+    
     def _get_placeholder_quote(self, stock_code: str) -> Dict[str, Any]:
         """
         获取占位行情数据（用于测试）
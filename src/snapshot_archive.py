@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 全市场行情快照归档
+===================================
+
+职责：
+1. 东财全量实时行情（efinance / akshare）每次刷新后，按日期分区追加一份压缩列式快照
+2. 提供本地查询接口：按日期/代码/列读取、当日最后一次快照、市场涨跌统计、涨跌幅排行
+3. 历史市场宽度、选股筛选与回测直接读取归档，无需访问网络
+
+说明：
+- 依赖 pyarrow（可选），未安装或未配置 SNAPSHOT_ARCHIVE_DIR 时不启用
+- 目录结构 {root}/date=YYYY-MM-DD/{类型}-{HHMMSSffffff}-{来源}.parquet（zstd 压缩）
+- 列名统一为 UnifiedRealtimeQuote 字段名，与原始数据源的列名无关
+- 写入采用临时文件 + os.replace 原子替换，读者不会看到半写文件
+"""
+
+import logging
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime]
+
+
+def is_snapshot_archive_available() -> bool:
+    """pyarrow 是否可用"""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _day_str(value: DateLike) -> str:
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def calc_market_stats(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    由标准列名的行情快照计算涨跌统计（与数据源 get_market_stats 返回格式一致）
+
+    Args:
+        df: 包含 change_pct、amount 列的 DataFrame
+
+    Returns:
+        {'up_count', 'down_count', 'flat_count', 'limit_up_count', 'limit_down_count', 'total_amount'(亿)}
+    """
+    if df is None or df.empty or 'change_pct' not in df.columns:
+        return None
+    change = pd.to_numeric(df['change_pct'], errors='coerce')
+    stats = {
+        'up_count': int((change > 0).sum()),
+        'down_count': int((change < 0).sum()),
+        'flat_count': int((change == 0).sum()),
+        'limit_up_count': int((change >= 9.9).sum()),
+        'limit_down_count': int((change <= -9.9).sum()),
+        'total_amount': 0.0,
+    }
+    if 'amount' in df.columns:
+        stats['total_amount'] = float(pd.to_numeric(df['amount'], errors='coerce').sum()) / 1e8
+    return stats
+
+
+class SnapshotArchive:
+    """
+    按日期分区的全市场行情快照归档
+
+    使用方式：
+        archive = SnapshotArchive('./data/snapshots')
+        archive.append(snapshot.to_frame(), source='efinance')
+        df = archive.read('2026-01-07', codes=['600519'])
+        stats = archive.market_stats('2026-01-07')
+    """
+
+    SUFFIX = '.parquet'
+
+    def __init__(self, root_dir: str, compression: str = 'zstd'):
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def _partition(self, day: DateLike) -> Path:
+        return self.root / f"date={_day_str(day)}"
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        source: str,
+        asset_type: str = 'stock',
+        captured_at: Optional[datetime] = None
+    ) -> int:
+        """
+        追加一份快照
+
+        Args:
+            df: 标准列名的快照（RealtimeSnapshot.to_frame()）
+            source: 数据来源（efinance / akshare_em ...）
+            asset_type: stock / etf
+            captured_at: 快照时间（默认当前时间）
+
+        Returns:
+            写入的行数
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if df is None or df.empty:
+            return 0
+
+        captured_at = captured_at or datetime.now()
+        frame = df.copy()
+        frame['code'] = frame['code'].astype(str)
+        frame['name'] = frame['name'].astype(str) if 'name' in frame.columns else ''
+        frame['captured_at'] = pd.Timestamp(captured_at)
+        frame['source'] = source
+        frame['asset_type'] = asset_type
+
+        partition = self._partition(captured_at)
+        path = partition / f"{asset_type}-{captured_at.strftime('%H%M%S%f')}-{source}{self.SUFFIX}"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock:
+            partition.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            pq.write_table(table, str(tmp_path), compression=self.compression)
+            os.replace(tmp_path, path)
+
+        logger.debug(f"[快照归档] {source} {asset_type} 写入 {len(frame)} 条: {path.name}")
+        return len(frame)
+
+    def dates(self) -> List[date]:
+        """已归档的日期（升序）"""
+        days = []
+        for partition in self.root.glob('date=*'):
+            if partition.is_dir() and any(partition.glob(f"*{self.SUFFIX}")):
+                days.append(date.fromisoformat(partition.name.split('=', 1)[1]))
+        return sorted(days)
+
+    def read(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        codes: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+        asset_type: Optional[str] = 'stock',
+        latest: bool = True
+    ) -> pd.DataFrame:
+        """
+        读取归档快照
+
+        Args:
+            start: 开始日期（含），只传 start 时读取当天
+            end: 结束日期（含）
+            codes: 只读取这些代码
+            columns: 只读取这些列（date、code、captured_at 始终包含）
+            asset_type: stock / etf，None 表示全部
+            latest: 每个交易日每只代码只保留最后一次快照（收盘后即为当日收盘数据）
+
+        Returns:
+            DataFrame（date 列为 datetime.date），无数据时为空 DataFrame
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        days = self.dates()
+        if start is not None:
+            start_day = pd.Timestamp(start).date()
+            end_day = pd.Timestamp(end).date() if end is not None else start_day
+            days = [d for d in days if start_day <= d <= end_day]
+        elif end is not None:
+            end_day = pd.Timestamp(end).date()
+            days = [d for d in days if d <= end_day]
+        if not days:
+            return pd.DataFrame()
+
+        files = [str(f) for d in days for f in sorted(self._partition(d).glob(f"*{self.SUFFIX}"))]
+        # 不同来源/类型的快照列不完全相同，按所有文件的并集读取，缺失列为空
+        schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options='permissive')
+        dataset = ds.dataset(files, schema=schema, format='parquet')
+        if columns is not None:
+            wanted = ['code', 'captured_at', 'asset_type', *columns]
+            columns = [c for c in dict.fromkeys(wanted) if c in dataset.schema.names]
+
+        condition = None
+        if asset_type is not None:
+            condition = ds.field('asset_type') == asset_type
+        if codes is not None:
+            code_filter = ds.field('code').isin([str(c) for c in codes])
+            condition = code_filter if condition is None else condition & code_filter
+
+        df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+        if df.empty:
+            return df
+
+        df.insert(0, 'date', pd.to_datetime(df['captured_at']).dt.date)
+        df = df.sort_values(['date', 'captured_at'], kind='stable')
+        if latest:
+            df = df.drop_duplicates(subset=['date', 'code'], keep='last')
+        return df.reset_index(drop=True)
+
+    def market_stats(self, day: DateLike) -> Optional[Dict[str, Any]]:
+        """指定交易日（最后一次快照）的市场涨跌统计，无归档时返回 None"""
+        return calc_market_stats(self.read(day, columns=['change_pct', 'amount']))
+
+    def top_movers(
+        self,
+        day: DateLike,
+        n: int = 10,
+        by: str = 'change_pct',
+        ascending: bool = False
+    ) -> pd.DataFrame:
+        """指定交易日按某列排序的前 n 只股票（如涨幅榜、成交额榜）"""
+        df = self.read(day)
+        if df.empty or by not in df.columns:
+            return pd.DataFrame()
+        df = df.dropna(subset=[by])
+        return (df.nsmallest(n, by) if ascending else df.nlargest(n, by)).reset_index(drop=True)
+
+
+_archive: Optional[SnapshotArchive] = None
+_archive_loaded = False
+_archive_lock = threading.Lock()
+
+
+def get_snapshot_archive() -> Optional[SnapshotArchive]:
+    """获取快照归档，未配置 SNAPSHOT_ARCHIVE_DIR 或缺少 pyarrow 时返回 None"""
+    global _archive, _archive_loaded
+    if _archive_loaded:
+        return _archive
+    with _archive_lock:
+        if not _archive_loaded:
+            from src.config import get_config
+
+            root_dir = get_config().snapshot_archive_dir
+            if root_dir:
+                if is_snapshot_archive_available():
+                    _archive = SnapshotArchive(root_dir)
+                    logger.info(f"[快照归档] 已启用: {root_dir}")
+                else:
+                    logger.warning("[快照归档] 已配置 SNAPSHOT_ARCHIVE_DIR 但未安装 pyarrow，不归档")
+            _archive_loaded = True
+    return _archive
+
+
+def reset_snapshot_archive() -> None:
+    """丢弃当前归档实例（用于测试或切换配置）"""
+    global _archive, _archive_loaded
+    with _archive_lock:
+        _archive = None
+        _archive_loaded = False
+
+
+def archive_realtime_snapshot(snapshot: Any, source: str, asset_type: str = 'stock') -> None:
+    """
+    归档一份刚刷新的全市场快照（未启用时直接返回，失败不影响行情获取）
+
+    Args:
+        snapshot: RealtimeSnapshot
+        source: 数据来源
+        asset_type: stock / etf
+    """
+    archive = get_snapshot_archive()
+    if archive is None or snapshot is None or len(snapshot) == 0:
+        return
+    try:
+        archive.append(snapshot.to_frame(), source=source, asset_type=asset_type)
+    except Exception as e:
+        logger.warning(f"[快照归档] 写入 {source} {asset_type} 快照失败: {e}")
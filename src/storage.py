@@ -34,8 +34,11 @@ from sqlalchemy import (
     UniqueConstraint,
     Text,
     select,
+    insert,
+    update,
     and_,
     desc,
+    func,
 )
 from sqlalchemy.orm import (
     declarative_base,
@@ -128,6 +131,121 @@ class StockDaily(Base):
         }
 
 
+class SecurityMaster(Base):
+    """
+    证券主数据模型
+    
+    全市场证券基础信息，每日批量刷新一次，启动时整表加载到内存用于名称解析
+    """
+    __tablename__ = 'security_master'
+    
+    # 股票代码（A股 6 位 / 港股 5 位 / 美股 ticker）
+    code = Column(String(10), primary_key=True)
+    
+    name = Column(String(50))
+    market = Column(String(8))        # SH / SZ / BJ / HK / US
+    board = Column(String(20))        # 主板 / 创业板 / 科创板 / 北交所
+    asset_type = Column(String(10))   # stock / etf / index
+    list_status = Column(String(4))   # L 上市 / D 退市 / P 暂停上市
+    
+    # 数据来源
+    data_source = Column(String(50))
+    
+    # 最近一次批量刷新时间（零散补录的记录为空）
+    updated_at = Column(DateTime, index=True)
+    
+    def __repr__(self):
+        return f"<SecurityMaster(code={self.code}, name={self.name})>"
+
+
+class StockBar(Base):
+    """
+    分钟线及其聚合 K 线模型
+    
+    以 (code, period, ts) 为主键的 WITHOUT ROWID 表，不再额外建索引，
+    时间存为整数秒，每根 K 线只占一行紧凑记录
+    """
+    __tablename__ = 'stock_bar'
+    
+    code = Column(String(10), primary_key=True)
+    
+    # 周期（分钟）：1/5/15/30/60 分钟线，1440 日线，10080 周线
+    period = Column(Integer, primary_key=True)
+    
+    # K 线时间（本地时间的 Unix 秒）：分钟线为结束时间，日线为当日 0 点，周线为周一 0 点
+    ts = Column(Integer, primary_key=True)
+    
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    amount = Column(Float)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<StockBar(code={self.code}, period={self.period}, ts={self.ts})>"
+
+
+class ChipSnapshot(Base):
+    """
+    筹码分布快照模型
+    
+    筹码数据每个交易日只更新一次，按 (code, trade_date) 保存，
+    当日后续分析直接读取，不再请求数据源
+    """
+    __tablename__ = 'chip_snapshot'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    code = Column(String(10), nullable=False, index=True)
+    
+    # 筹码数据对应的交易日
+    trade_date = Column(Date, nullable=False)
+    
+    # 数据来源（akshare / tushare / efinance）
+    source = Column(String(20))
+    
+    profit_ratio = Column(Float)
+    avg_cost = Column(Float)
+    cost_90_low = Column(Float)
+    cost_90_high = Column(Float)
+    concentration_90 = Column(Float)
+    cost_70_low = Column(Float)
+    cost_70_high = Column(Float)
+    concentration_70 = Column(Float)
+    
+    # 最近一次从数据源获取的时间
+    fetched_at = Column(DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        UniqueConstraint('code', 'trade_date', name='uix_chip_code_date'),
+    )
+    
+    def __repr__(self):
+        return f"<ChipSnapshot(code={self.code}, trade_date={self.trade_date})>"
+
+
+class TradeCalendar(Base):
+    """
+    交易日历模型
+    
+    只保存开市日，某市场已覆盖日期范围内未出现的日期即为休市日
+    """
+    __tablename__ = 'trade_calendar'
+    
+    # 市场：cn（A股）/ hk（港股）/ us（美股）
+    market = Column(String(4), primary_key=True)
+    
+    cal_date = Column(Date, primary_key=True)
+    
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<TradeCalendar(market={self.market}, cal_date={self.cal_date})>"
+
+
 class NewsIntel(Base):
     """
     新闻情报数据模型
@@ -363,6 +481,85 @@ class BacktestSummary(Base):
     )
 
 
+# 运行清单中逐股记录的阶段（对应 PipelineRunStock 的 <stage>_at 列）
+RUN_STAGES = ('data', 'search', 'llm', 'saved', 'notified')
+
+
+class PipelineRun(Base):
+    """
+    批量分析运行清单
+
+    每次 StockAnalysisPipeline.run 一行，配合 PipelineRunStock 记录各股票的阶段完成情况，
+    运行中断后由 main.py --resume 只续跑未完成的部分
+    """
+    __tablename__ = 'pipeline_run'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(64), nullable=False, unique=True, index=True)
+    query_source = Column(String(32), index=True)  # bot/web/cli/system
+    report_type = Column(String(16))
+    stock_count = Column(Integer, default=0)
+
+    # running（进行中或已中断）/ partial（结束但有股票未完成分析）/ completed
+    status = Column(String(16), nullable=False, default='running', index=True)
+    summary_sent = Column(Boolean, default=False)
+
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    finished_at = Column(DateTime)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'query_source': self.query_source,
+            'report_type': self.report_type,
+            'stock_count': self.stock_count,
+            'status': self.status,
+            'summary_sent': bool(self.summary_sent),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class PipelineRunStock(Base):
+    """
+    运行清单中单只股票的进度
+
+    各阶段完成时写入对应的时间戳：
+    data（日线已入库）/ search（情报搜索完成，news_context 保存格式化后的情报）/
+    llm（AI 分析返回结果）/ saved（AnalysisHistory 已写入）/ notified（单股推送成功）
+    """
+    __tablename__ = 'pipeline_run_stock'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(64), nullable=False, index=True)
+    code = Column(String(10), nullable=False)
+    # 分析历史与新闻情报的关联 id，续跑时沿用
+    query_id = Column(String(64), nullable=False)
+    position = Column(Integer, default=0)
+
+    data_at = Column(DateTime)
+    search_at = Column(DateTime)
+    llm_at = Column(DateTime)
+    saved_at = Column(DateTime)
+    notified_at = Column(DateTime)
+
+    news_context = Column(Text)
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'code', name='uix_run_stock'),
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'code': self.code,
+            'query_id': self.query_id,
+            'news_context': self.news_context,
+        }
+        for stage in RUN_STAGES:
+            data[f"{stage}_at"] = getattr(self, f"{stage}_at")
+        return data
+
+
 class DatabaseManager:
     """
     数据库管理器 - 单例模式
@@ -376,6 +573,12 @@ class DatabaseManager:
     _instance: Optional['DatabaseManager'] = None
     _initialized: bool = False
     
+    # 筹码快照中的数值字段
+    _CHIP_VALUE_COLUMNS = (
+        'source', 'profit_ratio', 'avg_cost', 'cost_90_low', 'cost_90_high',
+        'concentration_90', 'cost_70_low', 'cost_70_high', 'concentration_70',
+    )
+    
     def __new__(cls, *args, **kwargs):
         """单例模式实现"""
         if cls._instance is None:
@@ -414,6 +617,9 @@ class DatabaseManager:
         # 创建所有表
         Base.metadata.create_all(self._engine)
 
+        # 可选的列式日线镜像（BAR_STORE_DIR 配置且 pyarrow 可用时启用）
+        self._bar_store = self._init_bar_store()
+
         self._initialized = True
         logger.info(f"数据库初始化完成: {db_url}")
 
@@ -436,6 +642,21 @@ class DatabaseManager:
             cls._instance._initialized = False
             cls._instance = None
 
+    @staticmethod
+    def _init_bar_store():
+        """初始化列式日线存储，未配置或缺少 pyarrow 时返回 None"""
+        bar_store_dir = get_config().bar_store_dir
+        if not bar_store_dir:
+            return None
+
+        from src.bar_store import ColumnarBarStore, is_bar_store_available
+
+        if not is_bar_store_available():
+            logger.warning("[列式存储] 已配置 BAR_STORE_DIR 但未安装 pyarrow，回退 SQLite 查询")
+            return None
+        logger.info(f"[列式存储] 已启用: {bar_store_dir}")
+        return ColumnarBarStore(bar_store_dir)
+
     @classmethod
     def _cleanup_engine(cls, engine) -> None:
         """
@@ -529,6 +750,291 @@ class DatabaseManager:
             
             return list(results)
 
+    def get_latest_date(self, code: str) -> Optional[date]:
+        """
+        获取指定股票已存储的最新交易日期
+
+        用于增量同步：只向数据源请求该日期之后缺失的区间
+
+        Args:
+            code: 股票代码
+
+        Returns:
+            最新交易日期，无数据时返回 None
+        """
+        with self.get_session() as session:
+            return session.execute(
+                select(func.max(StockDaily.date)).where(StockDaily.code == code)
+            ).scalar()
+
+    def get_bar_window(self, code: str, bars: int = 120) -> pd.DataFrame:
+        """
+        获取最近 N 根日线（DataFrame 形式）
+
+        一次按索引倒序取 N 行，供趋势分析（MA60/MACD/RSI）与 AI 分析上下文共用
+
+        Args:
+            code: 股票代码
+            bars: K 线根数
+
+        Returns:
+            按日期升序的 DataFrame（BAR_COLUMNS + data_source），无数据时为空 DataFrame
+        """
+        from src.bar_store import BAR_COLUMNS
+
+        columns = [getattr(StockDaily, col) for col in BAR_COLUMNS] + [StockDaily.data_source]
+        with self.get_session() as session:
+            rows = session.execute(
+                select(*columns)
+                .where(StockDaily.code == code)
+                .order_by(desc(StockDaily.date))
+                .limit(bars)
+            ).all()
+
+        df = pd.DataFrame(rows[::-1], columns=BAR_COLUMNS + ['data_source'])
+        df[BAR_COLUMNS[1:]] = df[BAR_COLUMNS[1:]].astype('float64')
+        return df
+
+    def save_security_master(self, records: List[Dict[str, Any]], touch: bool = True) -> int:
+        """
+        批量保存证券主数据
+        
+        策略：
+        - 已存在的代码按主键批量更新，不存在的批量插入
+        - 一次事务完成，不逐行查询
+        
+        Args:
+            records: 证券信息字典列表（code 必填，其余字段见 SecurityMaster）
+            touch: 是否更新 updated_at（仅批量刷新时为 True，
+                   零散补录的名称不应推迟下一次全量刷新）
+            
+        Returns:
+            新增的记录数
+        """
+        if not records:
+            return 0
+        
+        now = datetime.now()
+        columns = {col.name for col in SecurityMaster.__table__.columns}
+        rows = {}
+        for record in records:
+            if record.get('code'):
+                row = {k: v for k, v in record.items() if k in columns}
+                if touch:
+                    row['updated_at'] = now
+                rows[row['code']] = row
+        
+        with self.get_session() as session:
+            try:
+                existing = set(session.execute(select(SecurityMaster.code)).scalars().all())
+                updates = [row for code, row in rows.items() if code in existing]
+                inserts = [row for code, row in rows.items() if code not in existing]
+                if updates:
+                    session.execute(update(SecurityMaster), updates)
+                if inserts:
+                    session.execute(insert(SecurityMaster), inserts)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"保存证券主数据失败: {e}")
+                raise
+        
+        logger.info(f"[证券主数据] 保存 {len(rows)} 条（新增 {len(inserts)} 条）")
+        return len(inserts)
+    
+    def get_security_master_records(self) -> List[Dict[str, Any]]:
+        """
+        获取全部证券主数据
+        
+        Returns:
+            证券信息字典列表
+        """
+        with self.get_session() as session:
+            rows = session.execute(select(SecurityMaster.__table__)).mappings().all()
+            return [dict(row) for row in rows]
+    
+    def get_security_master_updated_at(self) -> Optional[datetime]:
+        """获取证券主数据最近一次批量刷新时间，从未刷新时返回 None"""
+        with self.get_session() as session:
+            return session.execute(select(func.max(SecurityMaster.updated_at))).scalar()
+    
+    def save_bars(self, code: str, period: int, df: pd.DataFrame) -> int:
+        """
+        保存分钟线/聚合 K 线（按 (code, period, time) upsert，一次批量执行）
+        
+        Args:
+            code: 股票代码
+            period: 周期（分钟）
+            df: 包含 time, open, high, low, close, volume, amount 列的 DataFrame
+            
+        Returns:
+            写入的行数
+        """
+        if df is None or df.empty:
+            return 0
+        
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        
+        frame = df[['time', 'open', 'high', 'low', 'close', 'volume', 'amount']].copy()
+        frame['ts'] = pd.to_datetime(frame.pop('time')).astype('datetime64[s]').astype('int64')
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = frame.to_dict('records')
+        for row in rows:
+            row['code'] = code
+            row['period'] = period
+        
+        stmt = sqlite_insert(StockBar)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code', 'period', 'ts'],
+            set_={col: stmt.excluded[col] for col in ('open', 'high', 'low', 'close', 'volume', 'amount')},
+        )
+        with self.get_session() as session:
+            try:
+                session.execute(stmt, rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"保存 {code} {period} 分钟 K 线失败: {e}")
+                raise
+        return len(rows)
+    
+    def get_bars(
+        self,
+        code: str,
+        period: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """
+        获取分钟线/聚合 K 线
+        
+        Args:
+            code: 股票代码
+            period: 周期（分钟）
+            start: 开始时间（含）
+            end: 结束时间（含）
+            
+        Returns:
+            按时间升序的 DataFrame（time 列为 datetime64）
+        """
+        conditions = [StockBar.code == code, StockBar.period == period]
+        if start is not None:
+            conditions.append(StockBar.ts >= int(pd.Timestamp(start).value // 10**9))
+        if end is not None:
+            conditions.append(StockBar.ts <= int(pd.Timestamp(end).value // 10**9))
+        
+        with self.get_session() as session:
+            rows = session.execute(
+                select(
+                    StockBar.ts, StockBar.open, StockBar.high, StockBar.low,
+                    StockBar.close, StockBar.volume, StockBar.amount,
+                ).where(and_(*conditions)).order_by(StockBar.ts)
+            ).all()
+        
+        df = pd.DataFrame(rows, columns=['ts', 'open', 'high', 'low', 'close', 'volume', 'amount'])
+        df.insert(0, 'time', pd.to_datetime(df.pop('ts'), unit='s'))
+        return df
+    
+    def get_latest_bar_time(self, code: str, period: int) -> Optional[datetime]:
+        """获取指定周期最新一根 K 线的时间，无数据时返回 None"""
+        with self.get_session() as session:
+            ts = session.execute(
+                select(func.max(StockBar.ts)).where(
+                    and_(StockBar.code == code, StockBar.period == period)
+                )
+            ).scalar()
+        return pd.to_datetime(ts, unit='s').to_pydatetime() if ts is not None else None
+    
+    def save_chip_snapshot(self, chip: Dict[str, Any], fetched_at: Optional[datetime] = None) -> None:
+        """
+        保存筹码分布快照（按 (code, trade_date) upsert）
+        
+        Args:
+            chip: ChipDistribution.to_dict() 形式的字典，date 为空时记为当天
+            fetched_at: 获取时间（默认当前时间）
+        """
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        
+        trade_date = pd.to_datetime(chip.get('date') or None, errors='coerce')
+        row = {
+            'code': chip['code'],
+            'trade_date': date.today() if pd.isna(trade_date) else trade_date.date(),
+            'fetched_at': fetched_at or datetime.now(),
+        }
+        for col in self._CHIP_VALUE_COLUMNS:
+            row[col] = chip.get(col)
+        
+        stmt = sqlite_insert(ChipSnapshot).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['code', 'trade_date'],
+            set_={col: stmt.excluded[col] for col in row if col not in ('code', 'trade_date')},
+        )
+        with self.get_session() as session:
+            try:
+                session.execute(stmt)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"保存 {chip.get('code')} 筹码分布失败: {e}")
+                raise
+    
+    def get_latest_chip_snapshot(self, code: str) -> Optional[Dict[str, Any]]:
+        """
+        获取指定股票最近交易日的筹码分布快照
+        
+        Returns:
+            包含 trade_date、fetched_at 及筹码字段的字典，无数据时返回 None
+        """
+        with self.get_session() as session:
+            snapshot = session.execute(
+                select(ChipSnapshot)
+                .where(ChipSnapshot.code == code)
+                .order_by(desc(ChipSnapshot.trade_date))
+                .limit(1)
+            ).scalar_one_or_none()
+            if snapshot is None:
+                return None
+            result = {col: getattr(snapshot, col) for col in self._CHIP_VALUE_COLUMNS}
+            result.update(code=snapshot.code, trade_date=snapshot.trade_date, fetched_at=snapshot.fetched_at)
+            return result
+    
+    def save_trade_dates(self, market: str, trade_dates: List[date]) -> int:
+        """
+        批量保存交易日（已存在的日期忽略）
+        
+        Args:
+            market: cn / hk / us
+            trade_dates: 开市日列表
+            
+        Returns:
+            提交的日期数
+        """
+        if not trade_dates:
+            return 0
+        
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        
+        rows = [{'market': market, 'cal_date': d} for d in sorted(set(trade_dates))]
+        stmt = sqlite_insert(TradeCalendar).on_conflict_do_nothing(index_elements=['market', 'cal_date'])
+        with self.get_session() as session:
+            try:
+                session.execute(stmt, rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"保存 {market} 交易日历失败: {e}")
+                raise
+        return len(rows)
+    
+    def get_trade_dates(self, market: str) -> List[date]:
+        """获取指定市场已保存的全部开市日（升序）"""
+        with self.get_session() as session:
+            return list(session.execute(
+                select(TradeCalendar.cal_date)
+                .where(TradeCalendar.market == market)
+                .order_by(TradeCalendar.cal_date)
+            ).scalars().all())
+    
     def save_news_intel(
         self,
         code: str,
@@ -842,6 +1348,121 @@ class DatabaseManager:
             
             return list(results), total
     
+    def create_pipeline_run(
+        self,
+        run_id: str,
+        query_ids: Dict[str, str],
+        query_source: Optional[str] = None,
+        report_type: Optional[str] = None
+    ) -> None:
+        """
+        创建运行清单
+
+        Args:
+            run_id: 运行 id
+            query_ids: 股票代码 -> 查询链路 id（按分析顺序）
+            query_source: 查询来源
+            report_type: 报告类型
+        """
+        with self.get_session() as session:
+            try:
+                session.add(PipelineRun(
+                    run_id=run_id,
+                    query_source=query_source,
+                    report_type=report_type,
+                    stock_count=len(query_ids),
+                    status='running',
+                    created_at=datetime.now(),
+                ))
+                session.add_all([
+                    PipelineRunStock(run_id=run_id, code=code, query_id=query_id, position=position)
+                    for position, (code, query_id) in enumerate(query_ids.items())
+                ])
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"创建运行清单 {run_id} 失败: {e}")
+                raise
+
+    def get_pipeline_run(
+        self,
+        run_id: Optional[str] = None,
+        query_source: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取运行清单
+
+        Args:
+            run_id: 运行 id；为空时返回最近一次未完成（running / partial）的运行
+            query_source: run_id 为空时按查询来源筛选
+
+        Returns:
+            运行信息字典（含 stocks：按分析顺序的逐股进度），不存在时返回 None
+        """
+        with self.get_session() as session:
+            query = select(PipelineRun)
+            if run_id:
+                query = query.where(PipelineRun.run_id == run_id)
+            else:
+                query = query.where(PipelineRun.status != 'completed')
+                if query_source:
+                    query = query.where(PipelineRun.query_source == query_source)
+            run = session.execute(
+                query.order_by(desc(PipelineRun.created_at), desc(PipelineRun.id)).limit(1)
+            ).scalar_one_or_none()
+            if run is None:
+                return None
+
+            stocks = session.execute(
+                select(PipelineRunStock)
+                .where(PipelineRunStock.run_id == run.run_id)
+                .order_by(PipelineRunStock.position)
+            ).scalars().all()
+            result = run.to_dict()
+            result['stocks'] = [stock.to_dict() for stock in stocks]
+            return result
+
+    def mark_pipeline_run_stage(
+        self,
+        run_id: str,
+        code: str,
+        stage: str,
+        news_context: Optional[str] = None
+    ) -> None:
+        """记录单只股票完成某一阶段（stage 取值见 RUN_STAGES）"""
+        if stage not in RUN_STAGES:
+            raise ValueError(f"未知的运行阶段: {stage}")
+        values: Dict[str, Any] = {f"{stage}_at": datetime.now()}
+        if stage == 'search':
+            values['news_context'] = news_context
+        with self.get_session() as session:
+            try:
+                session.execute(
+                    update(PipelineRunStock)
+                    .where(and_(PipelineRunStock.run_id == run_id, PipelineRunStock.code == code))
+                    .values(**values)
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"[{code}] 更新运行清单 {run_id} 阶段 {stage} 失败: {e}")
+                raise
+
+    def finish_pipeline_run(self, run_id: str, status: str = 'completed', summary_sent: bool = False) -> None:
+        """记录运行结束状态（completed / partial）"""
+        with self.get_session() as session:
+            try:
+                session.execute(
+                    update(PipelineRun)
+                    .where(PipelineRun.run_id == run_id)
+                    .values(status=status, summary_sent=summary_sent, finished_at=datetime.now())
+                )
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"更新运行清单 {run_id} 状态失败: {e}")
+                raise
+
     def get_data_range(
         self, 
         code: str, 
@@ -874,6 +1495,105 @@ class DatabaseManager:
             
             return list(results)
     
+    def get_daily_frame(
+        self,
+        code: str,
+        start_date: date,
+        end_date: date
+    ) -> pd.DataFrame:
+        """
+        获取指定日期范围的日线（DataFrame 形式）
+
+        与 get_data_range 相同的区间语义，但不构造 StockDaily 对象：
+        - 启用列式存储且已覆盖该区间（含 SQLite 中已有的最新日期）时，内存映射读取
+        - 否则按列查询 SQLite，并将该股票的完整历史回填到列式存储
+
+        Args:
+            code: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            按日期升序的 DataFrame（date 列为 datetime.date），无数据时为空 DataFrame
+        """
+        from src.bar_store import BAR_COLUMNS
+
+        store = self._bar_store
+        if store is not None:
+            try:
+                bounds = store.date_bounds(code)
+                if bounds is not None and self._mirror_covers(code, bounds, start_date, end_date):
+                    return store.read(code, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"[列式存储] 读取 {code} 失败，回退 SQLite: {e}")
+
+        columns = [getattr(StockDaily, col) for col in BAR_COLUMNS]
+        with self.get_session() as session:
+            if store is None:
+                rows = session.execute(
+                    select(*columns)
+                    .where(
+                        and_(
+                            StockDaily.code == code,
+                            StockDaily.date >= start_date,
+                            StockDaily.date <= end_date
+                        )
+                    )
+                    .order_by(StockDaily.date)
+                ).all()
+                return self._rows_to_frame(rows)
+
+            rows = session.execute(
+                select(*columns).where(StockDaily.code == code).order_by(StockDaily.date)
+            ).all()
+
+        df = self._rows_to_frame(rows)
+        if not df.empty:
+            try:
+                store.write(code, df)
+                logger.info(f"[列式存储] {code} 已从 SQLite 回填 {len(df)} 条")
+            except Exception as e:
+                logger.warning(f"[列式存储] 回填 {code} 失败: {e}")
+        mask = (df['date'] >= start_date) & (df['date'] <= end_date)
+        return df[mask].reset_index(drop=True)
+
+    def _mirror_covers(
+        self,
+        code: str,
+        bounds: Tuple[date, date],
+        start_date: date,
+        end_date: date
+    ) -> bool:
+        """
+        列式镜像是否完整覆盖查询区间
+
+        镜像写入失败或数据经未同步镜像的路径写入时，镜像尾部可能落后于 SQLite，
+        此时需回退 SQLite，避免静默返回截断的数据
+        """
+        first_date, last_date = bounds
+        if first_date > start_date and first_date != self._get_earliest_date(code):
+            return False
+        if last_date >= end_date:
+            return True
+        latest = self.get_latest_date(code)
+        return latest is None or last_date >= latest
+
+    @staticmethod
+    def _rows_to_frame(rows: List[Any]) -> pd.DataFrame:
+        """将按 BAR_COLUMNS 查询的结果行转为 DataFrame，数值列统一为 float64"""
+        from src.bar_store import BAR_COLUMNS
+
+        df = pd.DataFrame(rows, columns=BAR_COLUMNS)
+        df[BAR_COLUMNS[1:]] = df[BAR_COLUMNS[1:]].astype('float64')
+        return df
+
+    def _get_earliest_date(self, code: str) -> Optional[date]:
+        """获取指定股票已存储的最早交易日期"""
+        with self.get_session() as session:
+            return session.execute(
+                select(func.min(StockDaily.date)).where(StockDaily.code == code)
+            ).scalar()
+
     def save_daily_data(
         self, 
         df: pd.DataFrame, 
@@ -967,12 +1687,20 @@ class DatabaseManager:
                 logger.error(f"保存 {code} 数据失败: {e}")
                 raise
         
+        # 同步写入列式镜像（失败不影响 SQLite 主存储）
+        if self._bar_store is not None:
+            try:
+                self._bar_store.write(code, df)
+            except Exception as e:
+                logger.warning(f"[列式存储] 写入 {code} 失败: {e}")
+        
         return saved_count
     
     def get_analysis_context(
         self, 
         code: str,
-        target_date: Optional[date] = None
+        target_date: Optional[date] = None,
+        window: Optional[pd.DataFrame] = None
     ) -> Optional[Dict[str, Any]]:
         """
         获取分析所需的上下文数据
@@ -982,6 +1710,7 @@ class DatabaseManager:
         Args:
             code: 股票代码
             target_date: 目标日期（默认今天）
+            window: 已加载的日线窗口（get_bar_window 的结果），传入时直接取最后两根，不再查询
             
         Returns:
             包含今日数据、昨日对比等信息的字典
@@ -989,8 +1718,14 @@ class DatabaseManager:
         if target_date is None:
             target_date = date.today()
         
-        # 获取最近2天数据
-        recent_data = self.get_latest_data(code, days=2)
+        if window is not None:
+            latest = window.tail(2).iloc[::-1]
+            # 缺失值还原为 None，与 StockDaily.to_dict 一致
+            latest = latest.astype(object).where(latest.notna(), None)
+            recent_data = [{'code': code, **row} for row in latest.to_dict('records')]
+        else:
+            # 获取最近2天数据
+            recent_data = [item.to_dict() for item in self.get_latest_data(code, days=2)]
         
         if not recent_data:
             logger.warning(f"未找到 {code} 的数据")
@@ -1001,22 +1736,22 @@ class DatabaseManager:
         
         context = {
             'code': code,
-            'date': today_data.date.isoformat(),
-            'today': today_data.to_dict(),
+            'date': today_data['date'].isoformat(),
+            'today': today_data,
         }
         
         if yesterday_data:
-            context['yesterday'] = yesterday_data.to_dict()
+            context['yesterday'] = yesterday_data
             
             # 计算相比昨日的变化
-            if yesterday_data.volume and yesterday_data.volume > 0:
+            if yesterday_data['volume'] and yesterday_data['volume'] > 0:
                 context['volume_change_ratio'] = round(
-                    today_data.volume / yesterday_data.volume, 2
+                    today_data['volume'] / yesterday_data['volume'], 2
                 )
             
-            if yesterday_data.close and yesterday_data.close > 0:
+            if yesterday_data['close'] and yesterday_data['close'] > 0:
                 context['price_change_ratio'] = round(
-                    (today_data.close - yesterday_data.close) / yesterday_data.close * 100, 2
+                    (today_data['close'] - yesterday_data['close']) / yesterday_data['close'] * 100, 2
                 )
             
             # 均线形态判断
@@ -1024,7 +1759,7 @@ class DatabaseManager:
         
         return context
     
-    def _analyze_ma_status(self, data: StockDaily) -> str:
+    def _analyze_ma_status(self, data: Dict[str, Any]) -> str:
         """
         分析均线形态
         
@@ -1033,10 +1768,10 @@ class DatabaseManager:
         - 空头排列：close < ma5 < ma10 < ma20
         - 震荡整理：其他情况
         """
-        close = data.close or 0
-        ma5 = data.ma5 or 0
-        ma10 = data.ma10 or 0
-        ma20 = data.ma20 or 0
+        close = data.get('close') or 0
+        ma5 = data.get('ma5') or 0
+        ma10 = data.get('ma10') or 0
+        ma20 = data.get('ma20') or 0
         
         if close > ma5 > ma10 > ma20 > 0:
             return "多头排列 📈"
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+A股自选股智能分析系统 - 交易日历
+===================================
+
+职责：
+1. 维护 A 股 / 港股 / 美股的开市日，保存在本地 trade_calendar 表
+2. 按交易所当地时间解析"最新应有 K 线日期"：当日收盘后为当日，否则为上一交易日
+3. 供断点续传、增量同步与定时任务判断本地数据是否已是最新，
+   周末、节假日与盘前盘中运行时跳过不会产生新 K 线的请求
+
+数据来源：
+- 数据源的 get_trade_dates（Tushare trade_cal / hk_tradecal / us_tradecal，Akshare 新浪交易日历）
+- 每日最多刷新一次；日历未覆盖的日期按周一至周五开市估算
+"""
+
+import bisect
+import logging
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from src.replay import replay_call
+
+logger = logging.getLogger(__name__)
+
+MARKETS = ('cn', 'hk', 'us')
+
+# 各市场收盘时间与交易所时区
+_MARKET_SESSIONS: Dict[str, Tuple[time, str]] = {
+    'cn': (time(15, 0), 'Asia/Shanghai'),
+    'hk': (time(16, 0), 'Asia/Hong_Kong'),
+    'us': (time(16, 0), 'America/New_York'),
+}
+
+# 刷新时请求的日期范围（相对今天）
+_REFRESH_LOOKBACK_DAYS = 400
+_REFRESH_LOOKAHEAD_DAYS = 60
+
+# 日历覆盖到今天之后至少这么多天才视为无需刷新
+_MIN_COVERAGE_AHEAD_DAYS = 7
+
+
+def market_of(code: str) -> str:
+    """根据股票代码判断所属市场（cn / hk / us）"""
+    from src.security_master import classify_security
+
+    market = classify_security(code)[0]
+    if market == 'US':
+        return 'us'
+    if market == 'HK':
+        return 'hk'
+    return 'cn'
+
+
+class TradingCalendar:
+    """
+    多市场交易日历（线程安全，首次使用时从数据库加载）
+
+    使用方式：
+        calendar = get_trading_calendar()
+        calendar.latest_expected_bar_date('cn')
+        calendar.is_trading_day('hk', date(2026, 1, 1))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dates: Dict[str, List[date]] = {}
+        self._loaded = False
+        self._refresh_attempted: Dict[str, date] = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            from src.storage import get_db
+
+            for market in MARKETS:
+                try:
+                    self._dates[market] = get_db().get_trade_dates(market)
+                except Exception as e:
+                    logger.warning(f"[交易日历] 加载 {market} 日历失败，按工作日估算: {e}")
+                    self._dates[market] = []
+            self._loaded = True
+
+    def _coverage(self, market: str) -> Optional[Tuple[date, date]]:
+        dates = self._dates.get(market) or []
+        return (dates[0], dates[-1]) if dates else None
+
+    def market_now(self, market: str, now: Optional[datetime] = None) -> datetime:
+        """
+        交易所当地时间（不带时区）
+
+        Args:
+            now: 带时区的时间会换算到交易所时区；不带时区的时间视为已是交易所当地时间
+        """
+        tz = ZoneInfo(_MARKET_SESSIONS[market][1])
+        if now is None:
+            return datetime.now(tz).replace(tzinfo=None)
+        if now.tzinfo is not None:
+            return now.astimezone(tz).replace(tzinfo=None)
+        return now
+
+    def is_trading_day(self, market: str, day: date) -> bool:
+        """是否为开市日（日历未覆盖的日期按周一至周五估算）"""
+        self._ensure_loaded()
+        coverage = self._coverage(market)
+        if coverage is None or not coverage[0] <= day <= coverage[1]:
+            return day.weekday() < 5
+        dates = self._dates[market]
+        index = bisect.bisect_left(dates, day)
+        return index < len(dates) and dates[index] == day
+
+    def previous_trading_day(self, market: str, day: date) -> date:
+        """day 之前（不含）最近的开市日"""
+        self._ensure_loaded()
+        coverage = self._coverage(market)
+        if coverage is not None and coverage[0] < day <= coverage[1] + timedelta(days=1):
+            dates = self._dates[market]
+            return dates[bisect.bisect_left(dates, day) - 1]
+
+        candidate = day - timedelta(days=1)
+        while not self.is_trading_day(market, candidate):
+            candidate -= timedelta(days=1)
+        return candidate
+
+    def latest_expected_bar_date(self, market: str = 'cn', now: Optional[datetime] = None) -> date:
+        """
+        最新应有日线的日期
+
+        当日为开市日且已收盘时为当日，否则为上一开市日
+
+        Args:
+            market: cn / hk / us
+            now: 当前时间（默认系统时间，见 market_now）
+        """
+        local_now = self.market_now(market, now)
+        today = local_now.date()
+        if self.is_trading_day(market, today) and local_now.time() >= _MARKET_SESSIONS[market][0]:
+            return today
+        return self.previous_trading_day(market, today)
+
+    def expected_bar_date_for(self, code: str, now: Optional[datetime] = None) -> date:
+        """按股票代码所属市场获取最新应有日线的日期"""
+        return self.latest_expected_bar_date(market_of(code), now)
+
+    def is_bar_up_to_date(self, code: str, last_date: Optional[date], now: Optional[datetime] = None) -> bool:
+        """
+        本地最新日线是否已是最新，无需再请求数据源
+
+        收盘后当日的 K 线可能是盘中保存的未完成 K 线，仍需刷新
+        """
+        if last_date is None:
+            return False
+        market = market_of(code)
+        expected = self.latest_expected_bar_date(market, now)
+        if last_date < expected:
+            return False
+        return not (last_date == expected == self.market_now(market, now).date())
+
+    def any_market_open_today(self, codes: Iterable[str], now: Optional[datetime] = None) -> bool:
+        """
+        股票列表涉及的市场（始终包含 A 股，用于大盘复盘）中是否有市场今天开市
+
+        各市场按交易所当地日期判断
+        """
+        markets = {'cn'} | {market_of(code) for code in codes}
+        return any(
+            self.is_trading_day(market, self.market_now(market, now).date())
+            for market in markets
+        )
+
+    def needs_refresh(self, market: str) -> bool:
+        """日历未覆盖到今天之后一周，且今天尚未尝试刷新"""
+        self._ensure_loaded()
+        today = date.today()
+        if self._refresh_attempted.get(market) == today:
+            return False
+        coverage = self._coverage(market)
+        return coverage is None or coverage[1] < today + timedelta(days=_MIN_COVERAGE_AHEAD_DAYS)
+
+    def refresh(self, fetchers: Iterable[Any], markets: Iterable[str] = MARKETS, force: bool = False) -> int:
+        """
+        从数据源刷新交易日历
+
+        依次调用各数据源的 get_trade_dates，取第一个成功的结果写库并更新内存。
+
+        Args:
+            fetchers: 数据源列表（按优先级）
+            markets: 需要刷新的市场
+            force: 忽略每日一次的限制强制刷新
+
+        Returns:
+            刷新的交易日数
+        """
+        fetchers = [f for f in fetchers if hasattr(f, 'get_trade_dates')]
+        start = date.today() - timedelta(days=_REFRESH_LOOKBACK_DAYS)
+        end = date.today() + timedelta(days=_REFRESH_LOOKAHEAD_DAYS)
+        total = 0
+        for market in markets:
+            if not force and not self.needs_refresh(market):
+                continue
+            self._refresh_attempted[market] = date.today()
+            for fetcher in fetchers:
+                try:
+                    trade_dates = replay_call(
+                        'trade_dates', (fetcher.name, market, start, end),
+                        lambda f=fetcher: f.get_trade_dates(market, start, end),
+                        group=(fetcher.name, market),
+                    )
+                except Exception as e:
+                    logger.debug(f"[交易日历] {fetcher.name} 获取 {market} 日历失败: {e}")
+                    continue
+                if trade_dates:
+                    total += self._store(market, trade_dates, fetcher.name)
+                    break
+            else:
+                logger.info(f"[交易日历] 没有数据源提供 {market} 日历，按工作日估算")
+        return total
+
+    def _store(self, market: str, trade_dates: List[date], source: str) -> int:
+        from src.storage import get_db
+
+        try:
+            get_db().save_trade_dates(market, trade_dates)
+        except Exception as e:
+            logger.warning(f"[交易日历] {market} 日历持久化失败: {e}")
+        with self._lock:
+            self._dates[market] = sorted(set(self._dates.get(market, [])) | set(trade_dates))
+        logger.info(f"[交易日历] 从 {source} 刷新 {market} 日历 {len(trade_dates)} 个交易日")
+        return len(trade_dates)
+
+
+_calendar: Optional[TradingCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """获取进程内共享的交易日历"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = TradingCalendar()
+    return _calendar
+
+
+def reset_trading_calendar() -> None:
+    """丢弃内存中的交易日历（用于测试或切换数据库）"""
+    global _calendar
+    with _calendar_lock:
+        _calendar = None
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+asyncio 异步分析模式测试
+===================================
+
+职责：
+1. 验证博查搜索、多维度情报搜索的异步路径与同步路径结果一致且并发发出
+2. 验证 OpenAI 兼容 API 的异步调用（含输出长度参数降级，重试流程与同步调用一致）与自定义 Webhook 异步推送
+3. 验证 AsyncAnalysisRunner 的同步调用受 MAX_WORKERS 线程池限制，异步 I/O 在股票间重叠
+4. 验证运行清单相关的 SQLite 读写不在事件循环线程上执行
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from unittest.mock import MagicMock
+
+import httpx
+
+from data_provider.rate_limiter import TokenBucket
+from src.analyzer import AnalysisResult, GeminiAnalyzer
+from src.notification import NotificationChannel, NotificationService
+from src.search_service import BochaSearchProvider, SearchResponse, SearchService
+
+
+def _bocha_payload(count: int) -> dict:
+    return {
+        'code': 200,
+        'data': {'webPages': {'value': [
+            {'name': f"标题{i}", 'url': f"https://news.example.com/{i}", 'summary': '摘要'}
+            for i in range(count)
+        ]}},
+    }
+
+
+class _Gauge:
+    """记录并发执行数的峰值"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+class AsyncSearchTestCase(unittest.TestCase):
+    """搜索服务异步路径"""
+
+    def test_bocha_async_matches_sync_parser(self) -> None:
+        requests_seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            return httpx.Response(200, json=_bocha_payload(3))
+
+        async def go():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await provider.search_async('贵州茅台 最新', max_results=2, client=client)
+
+        provider = BochaSearchProvider(['bocha-key-123456'])
+        response = asyncio.run(go())
+
+        self.assertTrue(response.success)
+        self.assertEqual([r.title for r in response.results], ['标题0', '标题1'])
+        self.assertEqual(response.results[0].source, 'news.example.com')
+        self.assertEqual(requests_seen[0].headers['Authorization'], 'Bearer bocha-key-123456')
+        self.assertEqual(json.loads(requests_seen[0].content)['count'], 2)
+        self.assertEqual(provider._key_usage['bocha-key-123456'], 1)
+
+    def test_bocha_async_http_error(self) -> None:
+        async def go():
+            transport = httpx.MockTransport(lambda request: httpx.Response(403, text='no balance'))
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await provider.search_async('q', client=client)
+
+        provider = BochaSearchProvider(['bocha-key-123456'])
+        response = asyncio.run(go())
+        self.assertFalse(response.success)
+        self.assertIn('余额不足', response.error_message)
+        self.assertEqual(provider._key_errors['bocha-key-123456'], 1)
+
+    def test_comprehensive_intel_async_runs_concurrently(self) -> None:
+        service = SearchService()
+        provider = MagicMock(is_available=True)
+        provider.name = 'Fake'
+
+        async def slow_search(query, max_results=5, days=7, client=None):
+            await asyncio.sleep(0.6)
+            return SearchResponse(query=query, results=[], provider='Fake', success=True)
+
+        provider.search_async.side_effect = slow_search
+        service._providers = [provider]
+
+        start = time.monotonic()
+        results = asyncio.run(service.search_comprehensive_intel_async('600519', '贵州茅台', max_searches=3))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(list(results), ['latest_news', 'market_analysis', 'risk_check'])
+        # 串行需要 3 × (0.6 + 0.5) 秒，错开 0.5 秒并发只需约 1.6 秒
+        self.assertLess(elapsed, 2.5)
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if 'max_tokens' in kwargs:
+            raise Exception("Error code: 400 - Unsupported parameter: 'max_tokens'")
+        message = SimpleNamespace(content='{"sentiment_score": 70}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class AsyncAnalyzerTestCase(unittest.TestCase):
+    """GeminiAnalyzer.analyze_async 使用 AsyncOpenAI"""
+
+    def test_analyze_async_with_token_param_downgrade(self) -> None:
+        analyzer = GeminiAnalyzer.__new__(GeminiAnalyzer)
+        analyzer._model = None
+        analyzer._use_openai = True
+        analyzer._openai_client = object()
+        analyzer._current_model_name = 'o-model'
+        completions = _FakeCompletions()
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        parsed = AnalysisResult(code='600519', name='贵州茅台', sentiment_score=70,
+                                trend_prediction='看多', operation_advice='持有')
+
+        config = MagicMock(gemini_request_delay=0, gemini_max_retries=2, gemini_retry_delay=0,
+                           gemini_temperature=0.7, openai_temperature=0.7)
+        with mock.patch('src.analyzer.get_config', return_value=config), \
+                mock.patch.object(analyzer, '_get_async_openai_client', return_value=client), \
+                mock.patch.object(analyzer, '_call_api_with_retry') as sync_call, \
+                mock.patch.object(analyzer, '_format_prompt', return_value='prompt'), \
+                mock.patch.object(analyzer, '_parse_response', return_value=parsed), \
+                mock.patch.object(analyzer, '_build_market_snapshot', return_value={}):
+            result = asyncio.run(analyzer.analyze_async({'code': '600519', 'stock_name': '贵州茅台'}))
+
+        sync_call.assert_not_called()
+        self.assertIs(result, parsed)
+        self.assertEqual(result.raw_response, '{"sentiment_score": 70}')
+        self.assertEqual(len(completions.calls), 2)
+        self.assertIn('max_completion_tokens', completions.calls[1])
+        self.assertEqual(analyzer._token_param_mode['o-model'], 'max_completion_tokens')
+
+
+    def test_sync_and_async_share_retry_flow(self) -> None:
+        def script():
+            # 首次限流 → 重试时 max_tokens 不支持降级 → 成功
+            outcomes = iter([
+                Exception("Error code: 429 - rate limited"),
+                Exception("Error code: 400 - Unsupported parameter: 'max_tokens'"),
+                None,
+            ])
+            calls = []
+
+            def create(**kwargs):
+                calls.append(sorted(kwargs))
+                error = next(outcomes)
+                if error is not None:
+                    raise error
+                message = SimpleNamespace(content='ok')
+                return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+            return calls, create
+
+        def new_analyzer():
+            analyzer = GeminiAnalyzer.__new__(GeminiAnalyzer)
+            analyzer._current_model_name = 'o-model'
+            analyzer._token_param_mode = {}
+            return analyzer
+
+        config = MagicMock(gemini_max_retries=3, gemini_retry_delay=0.5, openai_temperature=0.7)
+        with mock.patch('src.analyzer.get_config', return_value=config):
+            sync_calls, sync_create = script()
+            analyzer = new_analyzer()
+            analyzer._openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=sync_create)))
+            with mock.patch('src.analyzer.time.sleep') as sleep:
+                self.assertEqual(analyzer._call_openai_api('prompt', {}), 'ok')
+            sync_sleeps = [c.args[0] for c in sleep.call_args_list]
+
+            async_calls, async_create = script()
+
+            async def create(**kwargs):
+                return async_create(**kwargs)
+
+            async_sleeps = []
+
+            async def fake_sleep(delay):
+                async_sleeps.append(delay)
+
+            analyzer = new_analyzer()
+            client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+            with mock.patch.object(analyzer, '_get_async_openai_client', return_value=client), \
+                    mock.patch('src.analyzer.asyncio.sleep', new=fake_sleep):
+                self.assertEqual(asyncio.run(analyzer._call_openai_api_async('prompt', {})), 'ok')
+
+        self.assertEqual(sync_calls, async_calls)
+        self.assertEqual(len(sync_calls), 3)
+        self.assertIn('max_completion_tokens', sync_calls[-1])
+        self.assertEqual(sync_sleeps, [0.5])
+        self.assertEqual(async_sleeps, sync_sleeps)
+
+class AsyncNotificationTestCase(unittest.TestCase):
+    """NotificationService.send_async 自定义 Webhook"""
+
+    def test_custom_webhooks_posted_via_async_client(self) -> None:
+        notifier = NotificationService.__new__(NotificationService)
+        notifier._available_channels = [NotificationChannel.CUSTOM]
+        notifier._custom_webhook_urls = ['https://hooks.example.com/a', 'https://hooks.example.com/b']
+        notifier._custom_webhook_bearer_token = 'token'
+        notifier._webhook_verify_ssl = True
+        notifier._markdown_to_image_channels = set()
+        notifier._stock_email_groups = []
+        notifier._source_message = None
+        posted = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            posted.append((str(request.url), request.headers['Authorization']))
+            return httpx.Response(200 if request.url.path == '/a' else 500)
+
+        async def go():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await notifier.send_async('# 报告', client=client)
+
+        with mock.patch.object(notifier, 'send_to_context', return_value=False), \
+                mock.patch('src.notification.requests.post') as sync_post:
+            self.assertTrue(asyncio.run(go()))
+            sync_post.assert_not_called()
+        self.assertEqual(sorted(posted), [
+            ('https://hooks.example.com/a', 'Bearer token'),
+            ('https://hooks.example.com/b', 'Bearer token'),
+        ])
+
+
+class AsyncRunnerTestCase(unittest.TestCase):
+    """AsyncAnalysisRunner 调度行为"""
+
+    def _pipeline(self, max_workers: int = 2):
+        from src.core.pipeline import StockAnalysisPipeline
+        from src.run_profile import RunProfiler
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.profiler = RunProfiler()
+        pipeline.manifest = None
+        pipeline.config = MagicMock(
+            pipeline_stage_workers='', pipeline_stage_rates='', pipeline_async_concurrency=16
+        )
+        pipeline.max_workers = max_workers
+        pipeline.thread_gauge = _Gauge()
+        pipeline.llm_gauge = _Gauge()
+        pipeline.persisted = []
+
+        def blocking(fn):
+            def wrapper(*args):
+                with pipeline.thread_gauge:
+                    time.sleep(0.02)
+                    return fn(*args)
+            return wrapper
+
+        pipeline.fetch_and_save_stock_data = blocking(lambda code: (True, None))
+        pipeline._enrich_stock = blocking(lambda job: setattr(job, 'stock_name', f"股票{job.code}"))
+        pipeline._build_llm_context = blocking(lambda job: {'code': job.code})
+        pipeline._apply_intel_results = blocking(lambda job, intel: setattr(job, 'news_context', 'news'))
+        pipeline._persist_analysis = blocking(lambda job: pipeline.persisted.append(job.code))
+        pipeline.search_service = MagicMock(is_available=True)
+
+        async def intel(stock_code, stock_name, max_searches, client):
+            return {'latest_news': SearchResponse(query=stock_name, results=[], provider='Fake', success=True)}
+
+        pipeline.search_service.search_comprehensive_intel_async.side_effect = intel
+
+        async def analyze(context, news_context=None):
+            with pipeline.llm_gauge:
+                await asyncio.sleep(0.2)
+            if context['code'] == 'bad':
+                return None
+            return MagicMock(code=context['code'], operation_advice='持有', sentiment_score=60)
+
+        pipeline.analyzer = MagicMock()
+        pipeline.analyzer.analyze_async.side_effect = analyze
+        pipeline._notify_single_stock_async = MagicMock(side_effect=lambda *a, **k: asyncio.sleep(0))
+        return pipeline
+
+    def test_threads_bounded_and_llm_overlaps(self) -> None:
+        from src.core.async_pipeline import AsyncAnalysisRunner
+        from src.enums import ReportType
+
+        pipeline = self._pipeline(max_workers=2)
+        codes = [f"{600000 + i}" for i in range(8)] + ['bad']
+        start = time.monotonic()
+        results = AsyncAnalysisRunner(pipeline).run(
+            codes, dry_run=False, single_stock_notify=True,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(r.code for r in results), sorted(codes[:-1]))
+        self.assertNotIn('bad', pipeline.persisted)
+        self.assertEqual(pipeline._notify_single_stock_async.call_count, 8)
+        # 同步调用受 MAX_WORKERS 线程池限制，AI 分析在股票间并发
+        self.assertLessEqual(pipeline.thread_gauge.peak, 2)
+        self.assertGreater(pipeline.llm_gauge.peak, 2)
+        self.assertLess(elapsed, 9 * 0.2)
+
+    def test_stage_limits_and_dry_run(self) -> None:
+        from src.core.async_pipeline import AsyncAnalysisRunner
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        pipeline.config.pipeline_stage_workers = 'llm=1'
+        AsyncAnalysisRunner(pipeline).run(
+            ['600519', '000001', '300750'], dry_run=False, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        self.assertEqual(pipeline.llm_gauge.peak, 1)
+
+        pipeline = self._pipeline()
+        results = AsyncAnalysisRunner(pipeline).run(
+            ['600519', '000001'], dry_run=True, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        self.assertEqual(results, [])
+        pipeline.analyzer.analyze_async.assert_not_called()
+
+    def test_manifest_calls_run_off_event_loop(self) -> None:
+        from src.core.async_pipeline import AsyncAnalysisRunner
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        loop_thread = threading.get_ident()
+        threads = {}
+
+        def record(name, value):
+            def wrapper(*args):
+                threads.setdefault(name, set()).add(threading.get_ident())
+                return value(*args)
+            return wrapper
+
+        pipeline._query_id_for = record('query_id', lambda code: f"q-{code}")
+        pipeline._restore_intel = record('restore', lambda job: False)
+        apply_result = pipeline._apply_analysis_result
+        pipeline._apply_analysis_result = record('apply', apply_result)
+        pipeline._checkpoint = MagicMock()
+
+        AsyncAnalysisRunner(pipeline).run(
+            ['600519', '000001'], dry_run=False, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+
+        self.assertEqual(set(threads), {'query_id', 'restore', 'apply'})
+        # 运行清单读写（SQLite）均在线程池中执行
+        for idents in threads.values():
+            self.assertNotIn(loop_thread, idents)
+
+    def test_token_bucket_reserve(self) -> None:
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
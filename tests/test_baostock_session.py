@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+Baostock 共享会话测试
+===================================
+
+职责：
+1. 验证多次请求只登录一次
+2. 验证会话失效错误码触发重新登录并重试
+3. 验证并发请求串行执行
+4. 验证空闲过久后重新登录
+"""
+
+import threading
+import time
+import unittest
+
+from data_provider import baostock_fetcher
+from data_provider.baostock_fetcher import BaostockFetcher
+
+
+class _Result:
+    def __init__(self, error_code='0', error_msg='success', fields=None, rows=None):
+        self.error_code = error_code
+        self.error_msg = error_msg
+        self.fields = fields or []
+        self._rows = list(rows or [])
+
+    def next(self):
+        return bool(self._rows)
+
+    def get_row_data(self):
+        return self._rows.pop(0)
+
+
+class _FakeBaostock:
+    """模拟 baostock 模块：记录登录次数与并发度"""
+
+    def __init__(self):
+        self.logins = 0
+        self.logouts = 0
+        self.expire_next = False
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def login(self):
+        self.logins += 1
+        return _Result()
+
+    def logout(self):
+        self.logouts += 1
+        return _Result()
+
+    def query_stock_basic(self, code=''):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        if self.expire_next:
+            self.expire_next = False
+            return _Result('10001001', '用户未登录')
+        return _Result(fields=['code', 'code_name'], rows=[[code, '贵州茅台']])
+
+
+class BaostockSessionTestCase(unittest.TestCase):
+    """BaostockFetcher 共享会话测试"""
+
+    def setUp(self) -> None:
+        baostock_fetcher._session_state.update({'logged_in': False, 'last_used': 0.0})
+        self.bs = _FakeBaostock()
+        self.fetcher = BaostockFetcher()
+        self.fetcher._bs_module = self.bs
+
+    def tearDown(self) -> None:
+        baostock_fetcher._session_state.update({'logged_in': False, 'last_used': 0.0})
+
+    def _query(self, code='sh.600519'):
+        return self.fetcher._query(lambda bs: bs.query_stock_basic(code=code))
+
+    def test_single_login_for_many_requests(self) -> None:
+        for _ in range(3):
+            df = self._query()
+            self.assertEqual(df.iloc[0]['code_name'], '贵州茅台')
+        self.assertEqual(self.bs.logins, 1)
+        self.assertEqual(self.bs.logouts, 0)
+
+    def test_relogin_on_expired_session(self) -> None:
+        self._query()
+        self.bs.expire_next = True
+        df = self._query()
+        self.assertEqual(len(df), 1)
+        self.assertEqual(self.bs.logins, 2)
+
+    def test_relogin_after_idle(self) -> None:
+        self._query()
+        baostock_fetcher._session_state['last_used'] -= baostock_fetcher.SESSION_IDLE_TIMEOUT + 1
+        self._query()
+        self.assertEqual(self.bs.logins, 2)
+        self.assertEqual(self.bs.logouts, 1)
+
+    def test_concurrent_requests_are_serialized(self) -> None:
+        threads = [threading.Thread(target=self._query) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.bs.max_active, 1)
+        self.assertEqual(self.bs.logins, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+列式日线存储测试
+===================================
+
+职责：
+1. 验证 ColumnarBarStore 按日期 upsert 与区间读取
+2. 验证 DatabaseManager 保存日线时同步写入列式镜像
+3. 验证列式文件未覆盖区间时回退 SQLite 并回填
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.bar_store import ColumnarBarStore, is_bar_store_available
+from src.config import Config
+from src.storage import DatabaseManager
+
+
+def _make_bars(start: date, count: int) -> pd.DataFrame:
+    dates = [start + timedelta(days=i) for i in range(count)]
+    closes = [10.0 + i for i in range(count)]
+    return pd.DataFrame({
+        'date': dates,
+        'open': closes,
+        'high': [c + 1 for c in closes],
+        'low': [c - 1 for c in closes],
+        'close': closes,
+        'volume': [1000.0] * count,
+        'amount': [10000.0] * count,
+        'pct_chg': [1.0] * count,
+        'ma5': closes,
+    })
+
+
+@unittest.skipUnless(is_bar_store_available(), "pyarrow 未安装")
+class ColumnarBarStoreTestCase(unittest.TestCase):
+    """ColumnarBarStore 读写测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.store = ColumnarBarStore(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_upsert_and_range_read(self) -> None:
+        self.store.write('600519', _make_bars(date(2026, 1, 1), 5))
+        updated = _make_bars(date(2026, 1, 5), 3)
+        updated['close'] = 99.0
+        total = self.store.write('600519', updated)
+
+        self.assertEqual(total, 7)
+        df = self.store.read('600519', date(2026, 1, 4), date(2026, 1, 6))
+        self.assertEqual(list(df['date']), [date(2026, 1, 4), date(2026, 1, 5), date(2026, 1, 6)])
+        self.assertEqual(list(df['close']), [13.0, 99.0, 99.0])
+        # 未提供的列以 NaN 保存
+        self.assertTrue(df['volume_ratio'].isna().all())
+        self.assertEqual(self.store.first_date('600519'), date(2026, 1, 1))
+        self.assertIsNone(self.store.read('000001'))
+
+    def test_range_read_bounds(self) -> None:
+        self.store.write('600519', _make_bars(date(2026, 1, 1), 5))
+
+        self.assertEqual(len(self.store.read('600519', date(2025, 12, 1), date(2026, 2, 1))), 5)
+        self.assertEqual(list(self.store.read('600519', end_date=date(2026, 1, 2))['date']),
+                         [date(2026, 1, 1), date(2026, 1, 2)])
+        self.assertEqual(list(self.store.read('600519', start_date=date(2026, 1, 5))['date']), [date(2026, 1, 5)])
+        self.assertTrue(self.store.read('600519', date(2026, 2, 1), date(2026, 3, 1)).empty)
+        self.assertTrue(self.store.read('600519', date(2026, 1, 4), date(2026, 1, 2)).empty)
+
+
+@unittest.skipUnless(is_bar_store_available(), "pyarrow 未安装")
+class DatabaseBarStoreTestCase(unittest.TestCase):
+    """DatabaseManager 列式镜像测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.bar_dir = os.path.join(self._temp_dir.name, "bars")
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_bar_store.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        os.environ.pop("BAR_STORE_DIR", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def _open_db(self, bar_store_dir: str = "") -> DatabaseManager:
+        os.environ["BAR_STORE_DIR"] = bar_store_dir
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        return DatabaseManager.get_instance()
+
+    def test_save_mirrors_to_store(self) -> None:
+        db = self._open_db(self.bar_dir)
+        db.save_daily_data(_make_bars(date(2026, 1, 1), 10), '600519', 'Test')
+
+        store = ColumnarBarStore(self.bar_dir)
+        self.assertEqual(len(store.read('600519')), 10)
+
+        df = db.get_daily_frame('600519', date(2026, 1, 3), date(2026, 1, 5))
+        self.assertEqual(list(df['close']), [12.0, 13.0, 14.0])
+
+    def test_backfill_from_sqlite(self) -> None:
+        # 未启用列式存储时写入的历史
+        db = self._open_db()
+        db.save_daily_data(_make_bars(date(2026, 1, 1), 10), '600519', 'Test')
+        sql_df = db.get_daily_frame('600519', date(2026, 1, 1), date(2026, 1, 10))
+        self.assertEqual(len(sql_df), 10)
+
+        db = self._open_db(self.bar_dir)
+        # 启用后仅镜像了新写入的 K 线，区间未覆盖时回退 SQLite 并回填完整历史
+        db.save_daily_data(_make_bars(date(2026, 1, 11), 1), '600519', 'Test')
+        df = db.get_daily_frame('600519', date(2026, 1, 1), date(2026, 1, 11))
+        self.assertEqual(len(df), 11)
+        self.assertEqual(ColumnarBarStore(self.bar_dir).first_date('600519'), date(2026, 1, 1))
+        pd.testing.assert_frame_equal(
+            df.drop(columns=['date']),
+            db.get_daily_frame('600519', date(2026, 1, 1), date(2026, 1, 11)).drop(columns=['date']),
+        )
+
+
+    def test_stale_mirror_tail_falls_back_to_sqlite(self) -> None:
+        db = self._open_db(self.bar_dir)
+        db.save_daily_data(_make_bars(date(2026, 1, 1), 10), '600519', 'Test')
+
+        # 未同步镜像的写入：SQLite 比镜像多一根更新的 K 线
+        db = self._open_db()
+        db.save_daily_data(_make_bars(date(2026, 1, 11), 1), '600519', 'Test')
+
+        db = self._open_db(self.bar_dir)
+        df = db.get_daily_frame('600519', date(2026, 1, 5), date(2026, 1, 20))
+        self.assertEqual(df['date'].iloc[-1], date(2026, 1, 11))
+        self.assertEqual(len(df), 7)
+        # 回退时已重新回填镜像
+        self.assertEqual(ColumnarBarStore(self.bar_dir).date_bounds('600519'), (date(2026, 1, 1), date(2026, 1, 11)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分析用日线窗口测试
+===================================
+
+职责：
+1. 验证 get_bar_window 取最近 N 根并按日期升序返回
+2. 验证由窗口构建的分析上下文与逐条查询的结果一致
+3. 验证同一只股票在一次运行中只查询一次，趋势分析拿到完整窗口（含 MA60）
+4. 验证本地历史不足窗口时流水线全量补齐，而不是增量追加
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from src.bar_window import BarWindowLoader
+from src.config import Config
+from src.storage import DatabaseManager
+
+
+def _make_bars(count: int) -> pd.DataFrame:
+    start = date(2026, 1, 1)
+    closes = [10.0 + 0.1 * i for i in range(count)]
+    return pd.DataFrame({
+        'date': [start + timedelta(days=i) for i in range(count)],
+        'open': closes,
+        'high': [c + 0.5 for c in closes],
+        'low': [c - 0.5 for c in closes],
+        'close': closes,
+        'volume': [1000.0 + i for i in range(count)],
+        'amount': [10000.0] * count,
+        'pct_chg': [1.0] * count,
+        'ma5': closes,
+        'ma10': closes,
+        'ma20': closes,
+    })
+
+
+class BarWindowTestCase(unittest.TestCase):
+    """日线窗口读取、缓存与上下文构建"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_bar_window.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        self.db.save_daily_data(_make_bars(150), '600519', 'TestSource')
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_window_is_latest_bars_ascending(self) -> None:
+        window = self.db.get_bar_window('600519', 120)
+        self.assertEqual(len(window), 120)
+        self.assertTrue(window['date'].is_monotonic_increasing)
+        self.assertEqual(window['date'].iloc[-1], date(2026, 1, 1) + timedelta(days=149))
+        self.assertEqual(window['data_source'].iloc[0], 'TestSource')
+        self.assertTrue(self.db.get_bar_window('999999').empty)
+
+    def test_context_from_window_matches_query(self) -> None:
+        window = self.db.get_bar_window('600519', 120)
+        from_window = self.db.get_analysis_context('600519', window=window)
+        from_query = self.db.get_analysis_context('600519')
+        self.assertEqual(from_window, from_query)
+        self.assertIsNone(from_window['today']['volume_ratio'])
+        self.assertIsNone(self.db.get_analysis_context('999999', window=self.db.get_bar_window('999999')))
+
+    def test_loader_caches_until_invalidated(self) -> None:
+        loader = BarWindowLoader(self.db, bars=120)
+        with mock.patch.object(self.db, 'get_bar_window', wraps=self.db.get_bar_window) as query:
+            first = loader.get('600519')
+            self.assertIs(loader.get('600519'), first)
+            self.assertEqual(query.call_count, 1)
+            loader.invalidate('600519')
+            loader.get('600519')
+            self.assertEqual(query.call_count, 2)
+        self.assertEqual((loader.hits, loader.misses), (1, 2))
+
+    def test_pipeline_shares_window_between_trend_and_context(self) -> None:
+        from src.core.pipeline import StockAnalysisPipeline, StockJob
+        from src.stock_analyzer import StockTrendAnalyzer
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.db = self.db
+        pipeline.bar_windows = BarWindowLoader(self.db, bars=120)
+        pipeline.trend_analyzer = StockTrendAnalyzer()
+        pipeline.minute_bar_sync = None
+        pipeline.fetcher_manager = mock.MagicMock()
+        pipeline.fetcher_manager.get_realtime_quote.return_value = None
+        pipeline.fetcher_manager.get_chip_distribution.return_value = None
+
+        job = StockJob(code='600519')
+        with mock.patch.object(self.db, 'get_bar_window', wraps=self.db.get_bar_window) as query, \
+                mock.patch.object(self.db, 'get_latest_data') as latest:
+            pipeline._enrich_stock(job)
+            context = pipeline._build_llm_context(job)
+
+        self.assertEqual(query.call_count, 1)
+        latest.assert_not_called()
+        self.assertIsNotNone(job.trend_result)
+        self.assertGreater(job.trend_result.ma60, 0)
+        self.assertEqual(context['code'], '600519')
+        self.assertIn('trend_analysis', context)
+
+
+    def _fetch_pipeline(self, bars: int):
+        from src.core.pipeline import StockAnalysisPipeline
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.db = self.db
+        pipeline.config = mock.MagicMock(analysis_window_bars=bars, enable_incremental_sync=True)
+        pipeline.bar_windows = BarWindowLoader(self.db, bars=bars)
+        pipeline.trading_calendar = mock.MagicMock()
+        pipeline.trading_calendar.expected_bar_date_for.return_value = date(2026, 5, 30)
+        pipeline.profiler = mock.MagicMock()
+        pipeline._prefetched_daily = set()
+        pipeline.fetcher_manager = mock.MagicMock()
+        pipeline.fetcher_manager.get_daily_data.return_value = (_make_bars(bars), 'FakeFetcher')
+        return pipeline
+
+    def test_short_history_backfilled_in_full(self) -> None:
+        # 本地最新交易日已入库但只有 150 根，不足 200 根分析窗口
+        pipeline = self._fetch_pipeline(200)
+
+        self.assertEqual(pipeline._fetch_and_save('600519', force_refresh=False), (True, None))
+        _, kwargs = pipeline.fetcher_manager.get_daily_data.call_args
+        self.assertEqual(kwargs['days'], 200)
+        self.assertFalse(kwargs['incremental'])
+
+        pipeline = self._fetch_pipeline(120)
+        pipeline._fetch_and_save('600519', force_refresh=False)
+        pipeline.fetcher_manager.get_daily_data.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+新浪/腾讯批量实时行情测试
+===================================
+
+职责：
+1. 验证按 URL 长度切分批次、每批一次请求
+2. 验证批量结果写入逐股缓存，单股查询直接命中
+3. 验证 prefetch_realtime_quotes 在新浪/腾讯优先时走批量预取
+4. 验证批量失败按同一熔断键记录与检查，逐股缓存有效期取 REALTIME_CACHE_TTL
+5. 验证从后续数据源补充字段时不修改缓存中的行情对象
+"""
+
+import unittest
+from unittest import mock
+
+from data_provider import akshare_fetcher
+from data_provider.akshare_fetcher import AkshareFetcher, _chunk_symbols
+from data_provider.base import DataFetcherManager
+from data_provider.realtime_types import RealtimeSource, UnifiedRealtimeQuote, get_realtime_circuit_breaker
+
+
+def _sina_line(symbol: str, name: str, price: float) -> str:
+    fields = [name, '10.00', '10.00', f"{price:.2f}", '10.50', '9.80', '0', '0', '123400', '1234567.00']
+    fields += ['0'] * 20 + ['2026-01-07', '15:00:00', '00']
+    return f'var hq_str_{symbol}="{",".join(fields)}";'
+
+
+def _tencent_line(symbol: str, name: str, price: float) -> str:
+    fields = ['1', name, symbol[2:], f"{price:.2f}", '10.00', '10.00', '1234'] + ['0'] * 43
+    fields[32] = '1.50'
+    fields[38] = '0.85'
+    fields[49] = '1.20'
+    return f'v_{symbol}="{"~".join(fields)}";'
+
+
+class _Response:
+    def __init__(self, text: str, status_code: int = 200):
+        self.text = text
+        self.status_code = status_code
+        self.encoding = None
+
+
+class _FakeSession:
+    """按请求 URL 中的代码返回对应行情行"""
+
+    def __init__(self, line_builder):
+        self.line_builder = line_builder
+        self.urls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.urls.append(url)
+        symbols = url.split('=', 1)[1].split(',')
+        lines = [self.line_builder(s, f"股票{s[2:]}", 10.15) for s in symbols if s != 'sz000404']
+        return _Response('\n'.join(lines))
+
+
+class BatchRealtimeQuoteTestCase(unittest.TestCase):
+    """批量请求、切分与逐股缓存"""
+
+    def setUp(self) -> None:
+        akshare_fetcher.clear_light_quote_cache()
+        get_realtime_circuit_breaker().reset()
+        self.fetcher = AkshareFetcher()
+        self._rate = mock.patch.object(self.fetcher, '_enforce_rate_limit')
+        self._rate.start()
+
+    def tearDown(self) -> None:
+        self._rate.stop()
+        akshare_fetcher.clear_light_quote_cache()
+
+    def test_chunk_by_url_length(self) -> None:
+        symbols = [f"sh{600000 + i}" for i in range(300)]
+        base = 'http://hq.sinajs.cn/list='
+        chunks = _chunk_symbols(symbols, base, max_len=200)
+        self.assertEqual([s for c in chunks for s in c], symbols)
+        for chunk in chunks:
+            self.assertLessEqual(len(base + ','.join(chunk)), 200)
+        self.assertEqual(len(chunks), -(-300 // ((200 - len(base) + 1) // 9)))
+
+    def test_sina_batch_fills_cache(self) -> None:
+        codes = [f"{600000 + i}" for i in range(120)] + ['000404', '00700', '510300']
+        session = _FakeSession(_sina_line)
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            quotes = self.fetcher.get_realtime_quotes_batch(codes, source='sina')
+
+        # 港股 / ETF 不走新浪，000404 接口无数据
+        self.assertEqual(len(quotes), 120)
+        self.assertGreater(len(session.urls), 1)
+        self.assertLess(len(session.urls), 10)
+        for url in session.urls:
+            self.assertLessEqual(len(url), akshare_fetcher._QUOTE_BATCH_MAX_URL_LEN)
+        quote = quotes['600000']
+        self.assertEqual(quote.source, RealtimeSource.AKSHARE_SINA)
+        self.assertAlmostEqual(quote.price, 10.15)
+        self.assertAlmostEqual(quote.change_pct, 1.5)
+
+        # 单股查询直接命中缓存，不再请求
+        with mock.patch('requests.get') as mocked_get:
+            cached = self.fetcher.get_realtime_quote('600001', source='sina')
+            mocked_get.assert_not_called()
+        self.assertEqual(cached.name, '股票600001')
+
+        # 再次批量时只请求未命中的代码
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            session.urls.clear()
+            self.fetcher.get_realtime_quotes_batch(['600000', '000404'], source='sina')
+        self.assertEqual(session.urls, ['http://hq.sinajs.cn/list=sz000404'])
+
+    def test_tencent_batch_and_single_share_parser(self) -> None:
+        session = _FakeSession(_tencent_line)
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            quotes = self.fetcher.get_realtime_quotes_batch(['600519', '000001'], source='tencent')
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(session.urls[0], 'http://qt.gtimg.cn/q=sh600519,sz000001')
+        quote = quotes['000001']
+        self.assertEqual(quote.source, RealtimeSource.TENCENT)
+        self.assertEqual(quote.volume, 123400)
+        self.assertAlmostEqual(quote.volume_ratio, 1.2)
+
+        # 单股接口的解析结果与批量一致
+        akshare_fetcher.clear_light_quote_cache()
+        with mock.patch('requests.get', return_value=_Response(_tencent_line('sh600519', '股票600519', 10.15))):
+            single = self.fetcher.get_realtime_quote('600519', source='tencent')
+        self.assertEqual(single, quotes['600519'])
+
+    def test_http_error_records_failure(self) -> None:
+        session = mock.MagicMock()
+        session.get.return_value = _Response('', status_code=503)
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            quotes = self.fetcher.get_realtime_quotes_batch(['600519'], source='sina')
+        self.assertEqual(quotes, {})
+        self.assertIsNone(akshare_fetcher._get_cached_light_quote('sina', '600519'))
+
+    def test_tencent_failures_open_breaker(self) -> None:
+        session = mock.MagicMock()
+        session.get.return_value = _Response('', status_code=503)
+        breaker = get_realtime_circuit_breaker()
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            for _ in range(breaker.failure_threshold):
+                self.fetcher.get_realtime_quotes_batch(['600519'], source='tencent')
+            session.get.reset_mock()
+            quotes = self.fetcher.get_realtime_quotes_batch(['600519'], source='tencent')
+
+        # 失败记录与熔断检查使用同一个键，熔断后不再请求
+        self.assertFalse(breaker.is_available('tencent'))
+        self.assertEqual(quotes, {})
+        session.get.assert_not_called()
+
+    def test_light_quote_ttl_follows_realtime_cache_ttl(self) -> None:
+        session = _FakeSession(_sina_line)
+        with mock.patch.object(self.fetcher, '_get_quote_session', return_value=session):
+            self.fetcher.get_realtime_quotes_batch(['600519'], source='sina')
+        written_at, quote = akshare_fetcher._light_quote_cache['quotes'][('sina', '600519')]
+        akshare_fetcher._light_quote_cache['quotes'][('sina', '600519')] = (written_at - 120, quote)
+
+        config = mock.MagicMock(realtime_cache_ttl=60)
+        with mock.patch('src.config.get_config', return_value=config), \
+                mock.patch.object(akshare_fetcher, 'get_shared_cache', return_value=None):
+            self.assertIsNone(akshare_fetcher._get_cached_light_quote('sina', '600519'))
+        config.realtime_cache_ttl = 600
+        with mock.patch('src.config.get_config', return_value=config):
+            self.assertIs(akshare_fetcher._get_cached_light_quote('sina', '600519'), quote)
+
+
+class PrefetchLightQuotesTestCase(unittest.TestCase):
+    """prefetch_realtime_quotes 走新浪/腾讯批量预取"""
+
+    def test_prefetch_uses_batch_for_leading_light_sources(self) -> None:
+        fetcher = mock.MagicMock()
+        fetcher.name = 'AkshareFetcher'
+        fetcher.get_realtime_quotes_batch.side_effect = lambda codes, source: {c: object() for c in codes}
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        config = mock.MagicMock(enable_realtime_quote=True, realtime_source_priority='tencent,akshare_sina,efinance')
+        with mock.patch('src.config.get_config', return_value=config):
+            count = manager.prefetch_realtime_quotes(['600519', '000001'])
+
+        self.assertEqual(count, 2)
+        sources = [call.kwargs['source'] for call in fetcher.get_realtime_quotes_batch.call_args_list]
+        self.assertEqual(sources, ['tencent', 'sina'])
+
+
+class SupplementQuoteTestCase(unittest.TestCase):
+    """实时行情字段补充"""
+
+    def test_supplement_does_not_mutate_cached_quote(self) -> None:
+        cached = UnifiedRealtimeQuote(code='600519', name='贵州茅台', source=RealtimeSource.TENCENT, price=1500.0)
+        full = UnifiedRealtimeQuote(
+            code='600519', source=RealtimeSource.AKSHARE_SINA, price=1500.0, volume_ratio=1.2,
+            turnover_rate=0.5, pe_ratio=30.0, pb_ratio=9.0, total_mv=1.9e12, circ_mv=1.9e12, amplitude=2.0,
+        )
+        fetcher = mock.MagicMock()
+        fetcher.name = 'AkshareFetcher'
+        # 腾讯返回的是轻量行情缓存中的同一实例
+        fetcher.get_realtime_quote.side_effect = lambda code, source: cached if source == 'tencent' else full
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        config = mock.MagicMock(enable_realtime_quote=True, realtime_source_priority='tencent,akshare_sina')
+        with mock.patch('src.config.get_config', return_value=config):
+            quote = manager.get_realtime_quote('600519')
+
+        self.assertIsNot(quote, cached)
+        self.assertEqual(quote.pe_ratio, 30.0)
+        self.assertEqual(quote.name, '贵州茅台')
+        self.assertIsNone(cached.pe_ratio)
+
+
+if __name__ == '__main__':
+    unittest.main()
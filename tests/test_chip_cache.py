@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+筹码分布交易日缓存测试
+===================================
+
+职责：
+1. 验证当日已获取的筹码数据直接从 chip_snapshot 表返回
+2. 验证缓存有效期按交易日历判断（收盘前 / 收盘后重新检查 / 周末沿用上一交易日）
+3. 验证数据源全部失败时降级返回最近一次缓存
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from data_provider.base import BaseFetcher, DataFetcherManager, DataFetchError
+from data_provider.realtime_types import ChipDistribution, get_chip_circuit_breaker
+from src.config import Config
+from src.storage import DatabaseManager
+from src.trading_calendar import reset_trading_calendar
+
+
+class _ChipFetcher(BaseFetcher):
+    name = "AkshareFetcher"
+    priority = 0
+
+    def __init__(self, chip_date: str):
+        self.chip_date = chip_date
+        self.fail = False
+        self.calls = 0
+
+    def get_chip_distribution(self, stock_code):
+        self.calls += 1
+        if self.fail:
+            raise DataFetchError("chip api down")
+        return ChipDistribution(
+            code=stock_code, date=self.chip_date, source='akshare',
+            profit_ratio=0.62, avg_cost=1500.0, concentration_90=0.12, cost_70_low=1450.0,
+        )
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        raise DataFetchError("unused")
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class ChipCacheTestCase(unittest.TestCase):
+    """筹码分布缓存测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_chip_cache.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        reset_trading_calendar()
+        get_chip_circuit_breaker().reset('akshare_chip')
+
+    def tearDown(self) -> None:
+        get_chip_circuit_breaker().reset('akshare_chip')
+        reset_trading_calendar()
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_same_day_chip_served_from_cache(self) -> None:
+        fetcher = _ChipFetcher(date.today().strftime('%Y-%m-%d'))
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        first = manager.get_chip_distribution('600519')
+        second = manager.get_chip_distribution('SH600519')
+
+        self.assertEqual(fetcher.calls, 1)
+        self.assertEqual(second.date, first.date)
+        self.assertAlmostEqual(second.profit_ratio, 0.62)
+        self.assertAlmostEqual(second.cost_70_low, 1450.0)
+        self.assertEqual(second.source, 'akshare')
+
+    def test_stale_chip_returned_when_sources_fail(self) -> None:
+        previous = date.today() - timedelta(days=3)
+        self.db.save_chip_snapshot(
+            {'code': '600519', 'date': previous.strftime('%Y-%m-%d'), 'source': 'akshare', 'avg_cost': 1400.0},
+            fetched_at=datetime.now() - timedelta(days=3),
+        )
+        fetcher = _ChipFetcher(previous.strftime('%Y-%m-%d'))
+        fetcher.fail = True
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        chip = manager.get_chip_distribution('600519')
+
+        self.assertEqual(fetcher.calls, 1)
+        self.assertEqual(chip.date, previous.strftime('%Y-%m-%d'))
+        self.assertAlmostEqual(chip.avg_cost, 1400.0)
+
+    def test_snapshot_freshness(self) -> None:
+        is_fresh = DataFetcherManager._chip_snapshot_is_fresh
+        tz = ZoneInfo('Asia/Shanghai')
+        today = date(2026, 1, 7)
+        yesterday = date(2026, 1, 6)
+        morning = datetime(2026, 1, 7, 10, 0, tzinfo=tz)
+        evening = datetime(2026, 1, 7, 16, 0, tzinfo=tz)
+
+        self.assertTrue(is_fresh('600519', today, morning, now=evening))
+        self.assertTrue(is_fresh('600519', yesterday, morning, now=datetime(2026, 1, 7, 14, 0, tzinfo=tz)))
+        # 收盘前获取的前一交易日数据在收盘后需要重新检查
+        self.assertFalse(is_fresh('600519', yesterday, morning, now=evening))
+        self.assertTrue(is_fresh('600519', yesterday, datetime(2026, 1, 7, 15, 50, tzinfo=tz), now=evening))
+        self.assertFalse(is_fresh('600519', yesterday, datetime(2026, 1, 7, 15, 10, tzinfo=tz), now=evening))
+
+    def test_weekend_keeps_friday_snapshot(self) -> None:
+        is_fresh = DataFetcherManager._chip_snapshot_is_fresh
+        tz = ZoneInfo('Asia/Shanghai')
+        friday = date(2026, 1, 9)
+        fetched = datetime(2026, 1, 9, 16, 0, tzinfo=tz)
+
+        # 周末与下周一开盘前不会有新的筹码数据
+        self.assertTrue(is_fresh('600519', friday, fetched, now=datetime(2026, 1, 10, 10, 0, tzinfo=tz)))
+        self.assertTrue(is_fresh('600519', friday, fetched, now=datetime(2026, 1, 12, 9, 0, tzinfo=tz)))
+        self.assertFalse(is_fresh('600519', friday, fetched, now=datetime(2026, 1, 12, 16, 0, tzinfo=tz)))
+
+
+if __name__ == '__main__':
+    unittest.main()
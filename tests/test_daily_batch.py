@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+日线批量获取测试
+===================================
+
+职责：
+1. 验证支持批量的数据源一次请求覆盖多只股票
+2. 验证批量未覆盖或失败的代码回退逐只故障切换
+3. 验证增量同步时批量结果与本地历史拼接
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetcherManager, DataFetchError
+from src.config import Config
+from src.storage import DatabaseManager
+
+
+def _bars(dates, base: float = 10.0) -> pd.DataFrame:
+    closes = [base + i for i in range(len(dates))]
+    return pd.DataFrame({
+        'date': dates,
+        'open': closes, 'high': [c + 0.5 for c in closes], 'low': [c - 0.5 for c in closes],
+        'close': closes, 'volume': [1000.0] * len(dates),
+        'amount': [10000.0] * len(dates), 'pct_chg': [0.0] * len(dates),
+    })
+
+
+class _BatchFetcher(BaseFetcher):
+    """只支持 6 位数字代码批量获取的数据源"""
+
+    def __init__(self, name: str, priority: int, fail_batch: bool = False):
+        self.name = name
+        self.priority = priority
+        self.fail_batch = fail_batch
+        self.batch_calls = []
+        self.single_calls = []
+
+    def supports_batch_code(self, stock_code):
+        return stock_code.isdigit()
+
+    def _fetch_raw_data_batch(self, stock_codes, start_date, end_date):
+        self.batch_calls.append((list(stock_codes), start_date))
+        if self.fail_batch:
+            raise DataFetchError("batch unavailable")
+        return {code: _bars(['2026-01-05', '2026-01-06']) for code in stock_codes if code != '000404'}
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.single_calls.append(stock_code)
+        return _bars(['2026-01-05', '2026-01-06'])
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class _SingleFetcher(_BatchFetcher):
+    """不支持批量的数据源"""
+
+    def supports_batch_code(self, stock_code):
+        return False
+
+
+class DailyBatchTestCase(unittest.TestCase):
+    """DataFetcherManager.get_daily_data_batch 测试"""
+
+    def setUp(self) -> None:
+        os.environ["DAILY_HEDGE_TIMEOUT"] = "0"
+        Config._instance = None
+
+    def tearDown(self) -> None:
+        os.environ.pop("DAILY_HEDGE_TIMEOUT", None)
+        Config._instance = None
+
+    def test_batch_source_covers_codes_in_one_call(self) -> None:
+        batch = _BatchFetcher("BatchFetcher", 0)
+        single = _SingleFetcher("SingleFetcher", 1)
+        manager = DataFetcherManager(fetchers=[batch, single])
+
+        results = manager.get_daily_data_batch(
+            ['600519', 'SH601318', '600519', 'AAPL'], start_date='2026-01-01', end_date='2026-01-06'
+        )
+
+        self.assertEqual(batch.batch_calls, [(['600519', '601318'], '2026-01-01')])
+        self.assertEqual(set(results), {'600519', '601318', 'AAPL'})
+        self.assertEqual(results['600519'][1], "BatchFetcher")
+        self.assertEqual(len(results['600519'][0]), 2)
+        # 美股不被批量源覆盖，逐只走故障切换（优先级最高的 BatchFetcher）
+        self.assertEqual(results['AAPL'][1], "BatchFetcher")
+        self.assertEqual(batch.single_calls, ['AAPL'])
+        self.assertEqual(single.single_calls, [])
+
+    def test_missing_and_failed_batch_codes_fall_back(self) -> None:
+        broken = _BatchFetcher("BrokenBatch", 0, fail_batch=True)
+        backup = _BatchFetcher("BackupBatch", 1)
+        manager = DataFetcherManager(fetchers=[broken, backup])
+
+        results = manager.get_daily_data_batch(
+            ['600519', '000404', '601318'], start_date='2026-01-01', end_date='2026-01-06'
+        )
+
+        self.assertEqual(len(broken.batch_calls), 1)
+        # 首选数据源批量失败后不改由低优先级数据源批量，逐只走故障切换（仍从首选数据源开始）
+        self.assertEqual(backup.batch_calls, [])
+        self.assertEqual(results['600519'][1], "BrokenBatch")
+        self.assertEqual(results['000404'][1], "BrokenBatch")
+        self.assertEqual(sorted(broken.single_calls), ['000404', '600519', '601318'])
+
+    def test_batch_not_used_below_non_batch_head(self) -> None:
+        single = _SingleFetcher("SingleFetcher", 0)
+        batch = _BatchFetcher("BatchFetcher", 1)
+        manager = DataFetcherManager(fetchers=[single, batch])
+
+        results = manager.get_daily_data_batch(
+            ['600519', '601318'], start_date='2026-01-01', end_date='2026-01-06'
+        )
+
+        # 首选数据源不支持批量：不越过它改用批量源（避免混入不同复权口径的数据）
+        self.assertEqual(batch.batch_calls, [])
+        self.assertEqual({source for _, source in results.values()}, {"SingleFetcher"})
+
+    def test_head_skips_sources_without_market_support(self) -> None:
+        a_share_only = _SingleFetcher("AShareOnly", 0)
+        a_share_only.supports_daily_code = lambda code: code.isdigit()
+        batch = _BatchFetcher("BatchFetcher", 1)
+        batch.supports_batch_code = lambda code: True
+        manager = DataFetcherManager(fetchers=[a_share_only, batch])
+
+        manager.get_daily_data_batch(['AAPL', 'MSFT', '600519'], start_date='2026-01-01', end_date='2026-01-06')
+
+        # 美股的首选数据源是批量源，A 股仍由 AShareOnly 逐只获取
+        self.assertEqual(batch.batch_calls, [(['AAPL', 'MSFT'], '2026-01-01')])
+        self.assertEqual(a_share_only.single_calls, ['600519'])
+
+    def test_single_code_skips_batch(self) -> None:
+        batch = _BatchFetcher("BatchFetcher", 0)
+        manager = DataFetcherManager(fetchers=[batch])
+
+        results = manager.get_daily_data_batch(['600519'], start_date='2026-01-01', end_date='2026-01-06')
+
+        self.assertEqual(batch.batch_calls, [])
+        self.assertEqual(batch.single_calls, ['600519'])
+        self.assertIn('600519', results)
+
+
+class DailyBatchIncrementalTestCase(unittest.TestCase):
+    """批量获取与增量同步结合的测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_daily_batch.db")
+        os.environ["DAILY_HEDGE_TIMEOUT"] = "0"
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+        # 本地 2026-01-05 与数据源返回的同日 K 线一致（同一复权口径）
+        history = _bars(['2026-01-02', '2026-01-05'], base=9.0)
+        self.db.save_daily_data(history, '600519', 'Seed')
+        self.db.save_daily_data(history, '601318', 'Seed')
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        os.environ.pop("DAILY_HEDGE_TIMEOUT", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_batch_starts_from_local_latest_date(self) -> None:
+        batch = _BatchFetcher("BatchFetcher", 0)
+        manager = DataFetcherManager(fetchers=[batch])
+
+        results = manager.get_daily_data_batch(
+            ['600519', '601318'], end_date='2026-01-06', incremental=True
+        )
+
+        self.assertEqual(batch.batch_calls, [(['600519', '601318'], '2026-01-05')])
+        df, source = results['600519']
+        self.assertEqual(source, "BatchFetcher")
+        self.assertEqual(list(pd.to_datetime(df['date']).dt.date), [date(2026, 1, 5), date(2026, 1, 6)])
+        # 指标基于本地历史 + 新数据重算：MA5 窗口内包含 2026-01-02 的收盘价 9.0
+        self.assertAlmostEqual(df['ma5'].iloc[0], 9.5)
+        # 涨跌幅按本地前一日收盘价重算，而非数据源窗口首行的 0
+        self.assertAlmostEqual(df['pct_chg'].iloc[0], 11.11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+日线对冲请求测试
+===================================
+
+职责：
+1. 验证主数据源超时后并行启动下一数据源并取最先返回的结果
+2. 验证主数据源快速失败时立即切换
+3. 验证关闭对冲时保持顺序切换
+"""
+
+import os
+import time
+import unittest
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetcherManager, DataFetchError
+from src.config import Config
+
+
+class _StubFetcher(BaseFetcher):
+    def __init__(self, name: str, priority: int, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.priority = priority
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise DataFetchError(f"{self.name} unavailable")
+        return pd.DataFrame({
+            'date': ['2026-01-05', '2026-01-06'],
+            'open': [10.0, 10.5], 'high': [11.0, 11.5], 'low': [9.5, 10.0],
+            'close': [10.5, 11.0], 'volume': [1000.0, 1200.0],
+            'amount': [10500.0, 13200.0], 'pct_chg': [1.0, 4.76],
+        })
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class DailyHedgeTestCase(unittest.TestCase):
+    """DataFetcherManager 对冲式故障切换测试"""
+
+    def setUp(self) -> None:
+        os.environ["DAILY_HEDGE_TIMEOUT"] = "0.1"
+        Config._instance = None
+
+    def tearDown(self) -> None:
+        os.environ.pop("DAILY_HEDGE_TIMEOUT", None)
+        Config._instance = None
+
+    def test_slow_primary_is_hedged(self) -> None:
+        slow = _StubFetcher("SlowFetcher", 0, delay=2.0)
+        fast = _StubFetcher("FastFetcher", 1)
+        manager = DataFetcherManager(fetchers=[slow, fast])
+
+        start = time.time()
+        df, source = manager.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+
+        self.assertEqual(source, "FastFetcher")
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(len(df), 2)
+        stats = manager.get_daily_source_stats()
+        self.assertEqual(stats['wins'], {"FastFetcher": 1})
+        self.assertEqual(stats['hedged_wins'], 1)
+
+    def test_failed_primary_switches_immediately(self) -> None:
+        broken = _StubFetcher("BrokenFetcher", 0, fail=True)
+        backup = _StubFetcher("BackupFetcher", 1)
+        unused = _StubFetcher("UnusedFetcher", 2)
+        manager = DataFetcherManager(fetchers=[broken, backup, unused])
+
+        _, source = manager.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+
+        self.assertEqual(source, "BackupFetcher")
+        self.assertEqual(unused.calls, 0)
+
+    def test_all_sources_fail(self) -> None:
+        manager = DataFetcherManager(fetchers=[
+            _StubFetcher("A", 0, fail=True),
+            _StubFetcher("B", 1, fail=True),
+        ])
+        with self.assertRaises(DataFetchError):
+            manager.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+
+    def test_sequential_when_disabled(self) -> None:
+        os.environ["DAILY_HEDGE_TIMEOUT"] = "0"
+        Config._instance = None
+        slow = _StubFetcher("SlowFetcher", 0, delay=0.2)
+        fast = _StubFetcher("FastFetcher", 1)
+        manager = DataFetcherManager(fetchers=[slow, fast])
+
+        _, source = manager.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+
+        self.assertEqual(source, "SlowFetcher")
+        self.assertEqual(fast.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
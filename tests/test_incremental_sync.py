@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+日线增量同步测试
+===================================
+
+职责：
+1. 验证本地无数据时执行全量获取
+2. 验证本地已有数据时只请求缺失区间
+3. 验证拼接后的技术指标与全量计算一致
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetcherManager
+from src.config import Config
+from src.storage import DatabaseManager
+
+
+def _make_bars(start: date, count: int) -> pd.DataFrame:
+    dates = [start + timedelta(days=i) for i in range(count)]
+    closes = [10.0 + i for i in range(count)]
+    return pd.DataFrame({
+        'date': [d.strftime('%Y-%m-%d') for d in dates],
+        'open': closes,
+        'high': [c + 1 for c in closes],
+        'low': [c - 1 for c in closes],
+        'close': closes,
+        'volume': [1000.0 + i * 10 for i in range(count)],
+        'amount': [10000.0] * count,
+        'pct_chg': [1.0] * count,
+    })
+
+
+class _FakeFetcher(BaseFetcher):
+    name = "FakeFetcher"
+    priority = 0
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.requests = []
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.requests.append((start_date, end_date))
+        mask = (self.bars['date'] >= start_date) & (self.bars['date'] <= end_date)
+        return self.bars[mask].copy()
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class _PctChangeFetcher(_FakeFetcher):
+    """与 pytdx/yfinance 相同，按请求窗口内的 close.pct_change() 计算涨跌幅"""
+    name = "PctChangeFetcher"
+
+    def __init__(self, bars: pd.DataFrame, adjust: float = 1.0):
+        super().__init__(bars)
+        self.adjust = adjust
+
+    def _normalize_data(self, df, stock_code):
+        df = df.copy()
+        for col in ('open', 'high', 'low', 'close'):
+            df[col] = df[col] * self.adjust
+        df['pct_chg'] = (df['close'].pct_change() * 100).fillna(0).round(2)
+        return df
+
+
+class IncrementalSyncTestCase(unittest.TestCase):
+    """DataFetcherManager 增量同步测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_incremental.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+        self.end = date.today()
+        self.all_bars = _make_bars(self.end - timedelta(days=39), 40)
+        self.fetcher = _FakeFetcher(self.all_bars)
+        self.manager = DataFetcherManager(fetchers=[self.fetcher])
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        self._temp_dir.cleanup()
+
+    def test_full_fetch_when_no_local_data(self) -> None:
+        df, source = self.manager.get_daily_data('600519', days=30, incremental=True)
+        self.assertEqual(source, "FakeFetcher")
+        start, _ = self.fetcher.requests[0]
+        self.assertEqual(start, (self.end - timedelta(days=60)).strftime('%Y-%m-%d'))
+        self.assertEqual(len(df), 40)
+
+    def test_only_missing_range_requested(self) -> None:
+        full_df = self.fetcher.get_daily_data('600519', days=30)
+        self.db.save_daily_data(full_df.iloc[:-3], '600519', 'FakeFetcher')
+        self.fetcher.requests.clear()
+
+        df, _ = self.manager.get_daily_data('600519', days=30, incremental=True)
+
+        last_stored = (self.end - timedelta(days=3)).strftime('%Y-%m-%d')
+        self.assertEqual(self.fetcher.requests, [(last_stored, self.end.strftime('%Y-%m-%d'))])
+        self.assertEqual(len(df), 4)
+        # 拼接本地历史后，均线与全量计算结果一致
+        expected = full_df.iloc[-4:].reset_index(drop=True)
+        self.assertEqual(list(df['ma20']), list(expected['ma20']))
+        self.assertEqual(list(df['volume_ratio']), list(expected['volume_ratio']))
+
+    def test_pct_chg_recomputed_across_overlap(self) -> None:
+        fetcher = _PctChangeFetcher(self.all_bars)
+        full_df = fetcher.get_daily_data('600519', days=30)
+        self.db.save_daily_data(full_df.iloc[:-3], '600519', 'PctChangeFetcher')
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        df, _ = manager.get_daily_data('600519', days=30, incremental=True)
+
+        # 增量窗口首行（本地最新日）的 pct_change 为 0，拼接后按前一日收盘价重算
+        expected = full_df.iloc[-4:].reset_index(drop=True)
+        self.assertEqual(list(df['pct_chg']), list(expected['pct_chg']))
+        self.assertNotEqual(df['pct_chg'].iloc[0], 0)
+
+    def test_adjustment_change_falls_back_to_full_fetch(self) -> None:
+        full_df = _PctChangeFetcher(self.all_bars).get_daily_data('600519', days=30)
+        self.db.save_daily_data(full_df.iloc[:-3], '600519', 'PctChangeFetcher')
+        # 除权后前复权价格整体下移，重叠日开盘价与本地不一致
+        fetcher = _PctChangeFetcher(self.all_bars, adjust=0.9)
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        df, _ = manager.get_daily_data('600519', days=30, incremental=True)
+
+        full_start = (self.end - timedelta(days=60)).strftime('%Y-%m-%d')
+        self.assertEqual([start for start, _ in fetcher.requests][-1], full_start)
+        self.assertEqual(len(df), 40)
+
+    def test_incremental_disabled_keeps_full_window(self) -> None:
+        self.db.save_daily_data(self.fetcher.get_daily_data('600519', days=30), '600519', 'FakeFetcher')
+        self.fetcher.requests.clear()
+
+        self.manager.get_daily_data('600519', days=30)
+
+        start, _ = self.fetcher.requests[0]
+        self.assertEqual(start, (self.end - timedelta(days=60)).strftime('%Y-%m-%d'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分钟线采集与增量聚合测试
+===================================
+
+职责：
+1. 验证分钟线按 A 股交易时段归入聚合 K 线
+2. 验证分批到达（含最后一分钟修订、更早分钟修订）的增量聚合与一次性全量聚合一致
+3. 验证 DataFetcherManager 分钟线故障切换
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetcherManager, DataFetchError
+from src.config import Config
+from src.minute_bars import (
+    AGGREGATE_PERIODS,
+    DAY_PERIOD,
+    WEEK_PERIOD,
+    MinuteBarSync,
+    aggregate_bars,
+    bucket_times,
+)
+from src.storage import DatabaseManager
+
+
+def _session_minutes(day: str) -> pd.DatetimeIndex:
+    morning = pd.date_range(f"{day} 09:31", f"{day} 11:30", freq='min')
+    afternoon = pd.date_range(f"{day} 13:01", f"{day} 15:00", freq='min')
+    return morning.append(afternoon)
+
+
+def _minute_bars(times: pd.DatetimeIndex, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 + rng.normal(0, 0.05, len(times)).cumsum()
+    return pd.DataFrame({
+        'time': times,
+        'open': close - 0.01,
+        'high': close + 0.02,
+        'low': close - 0.03,
+        'close': close,
+        'volume': rng.integers(100, 1000, len(times)).astype(float),
+        'amount': rng.integers(1000, 10000, len(times)).astype(float),
+    })
+
+
+class BucketTimesTestCase(unittest.TestCase):
+    """交易时段切分测试"""
+
+    def test_hourly_and_daily_labels(self) -> None:
+        times = pd.Series(pd.to_datetime([
+            '2026-01-07 09:30', '2026-01-07 09:31', '2026-01-07 10:30', '2026-01-07 10:31',
+            '2026-01-07 11:30', '2026-01-07 13:01', '2026-01-07 14:00', '2026-01-07 15:00',
+        ]))
+        hourly = bucket_times(times, 60).dt.strftime('%H:%M').tolist()
+        self.assertEqual(hourly, ['10:30', '10:30', '10:30', '11:30', '11:30', '14:00', '14:00', '15:00'])
+        self.assertEqual(bucket_times(times, 30).dt.strftime('%H:%M').tolist()[3], '11:00')
+        self.assertTrue((bucket_times(times, DAY_PERIOD) == pd.Timestamp('2026-01-07')).all())
+        # 2026-01-07 为周三，周线标记为周一
+        self.assertTrue((bucket_times(times, WEEK_PERIOD) == pd.Timestamp('2026-01-05')).all())
+
+
+class MinuteBarSyncTestCase(unittest.TestCase):
+    """增量聚合测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_minute_bars.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        self.sync = MinuteBarSync(self.db, base_period=1)
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def _assert_matches_full_aggregation(self, minutes: pd.DataFrame) -> None:
+        for period in AGGREGATE_PERIODS:
+            expected = aggregate_bars(minutes, period)
+            stored = self.db.get_bars('600519', period)
+            pd.testing.assert_frame_equal(
+                stored.reset_index(drop=True), expected.reset_index(drop=True),
+                check_dtype=False, obj=f"period={period}",
+            )
+
+    def test_incremental_matches_full_aggregation(self) -> None:
+        times = _session_minutes('2026-01-06').append(_session_minutes('2026-01-07'))
+        final = _minute_bars(times)
+
+        # 第一批：截至第 100 分钟，最后一分钟仍在形成
+        first = final.iloc[:100].copy()
+        first.loc[99, ['high', 'volume', 'amount']] -= [0.01, 50.0, 500.0]
+        self.sync.ingest('600519', first)
+
+        # 第二批：修订第 100 分钟并追加至跨日
+        counts = self.sync.ingest('600519', final.iloc[99:300])
+        self.assertEqual(counts[1], 200)
+        self._assert_matches_full_aggregation(final.iloc[:300])
+
+        # 第三批：追加剩余分钟
+        self.sync.ingest('600519', final.iloc[300:])
+        self._assert_matches_full_aggregation(final)
+
+        summary = self.sync.get_intraday_summary('600519')
+        self.assertEqual(summary['date'], '2026-01-07')
+        self.assertEqual(len(summary['hourly_volume']), 4)
+        self.assertAlmostEqual(summary['volume'], final.iloc[240:]['volume'].sum())
+
+    def test_earlier_revision_rebuilds_affected_bars(self) -> None:
+        final = _minute_bars(_session_minutes('2026-01-07'), seed=1)
+        stale = final.copy()
+        stale.loc[10, 'volume'] += 999.0
+        self.sync.ingest('600519', stale.iloc[:120])
+
+        self.sync.ingest('600519', final.iloc[5:])
+        self._assert_matches_full_aggregation(final)
+
+
+class _MinuteFetcher(BaseFetcher):
+    def __init__(self, name: str, priority: int, supported: bool = True, fail: bool = False):
+        self.name = name
+        self.priority = priority
+        self.supported = supported
+        self.fail = fail
+        self.calls = 0
+
+    def supports_minute_data(self, stock_code):
+        return self.supported
+
+    def _fetch_minute_raw(self, stock_code, period, count):
+        self.calls += 1
+        if self.fail:
+            raise DataFetchError("minute api down")
+        df = _minute_bars(_session_minutes('2026-01-07'))
+        df['time'] = df['time'].dt.strftime('%Y-%m-%d %H:%M')
+        return df.tail(count)
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        raise DataFetchError("unused")
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class MinuteFailoverTestCase(unittest.TestCase):
+    """分钟线故障切换测试"""
+
+    def test_failover_skips_unsupported_sources(self) -> None:
+        unsupported = _MinuteFetcher('Unsupported', 0, supported=False)
+        broken = _MinuteFetcher('Broken', 1, fail=True)
+        working = _MinuteFetcher('Working', 2)
+        manager = DataFetcherManager(fetchers=[unsupported, broken, working])
+
+        df, source = manager.get_minute_data('SH600519', period=1, count=30)
+
+        self.assertEqual(source, 'Working')
+        self.assertEqual(len(df), 30)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['time']))
+        self.assertEqual((unsupported.calls, broken.calls), (0, 1))
+
+        with self.assertRaises(DataFetchError):
+            DataFetcherManager(fetchers=[unsupported]).get_minute_data('600519')
+
+
+if __name__ == '__main__':
+    unittest.main()
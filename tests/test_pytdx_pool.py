@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+通达信连接池测试
+===================================
+
+职责：
+1. 验证服务器按测速结果排序，不可达服务器排在最后
+2. 验证连接复用与最大连接数限制
+3. 验证心跳失败/连接异常时替换连接
+4. 验证 PytdxFetcher 仅在"无数据"时归还连接，pytdx 返回 None（断连）时关闭连接
+"""
+
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from data_provider.base import DataFetchError
+from data_provider.pytdx_fetcher import PytdxFetcher
+from data_provider.pytdx_pool import TdxConnectionPool, TdxNoDataError
+
+
+HOSTS = [('slow', 1), ('down', 2), ('fast', 3)]
+DELAYS = {'slow': 0.05, 'fast': 0.0}
+
+
+class _FakeApi:
+    """模拟 TdxHq_API：按主机名决定建连延迟与是否可达"""
+
+    instances = []
+
+    def __init__(self):
+        self.host = None
+        self.alive = True
+        self.connected = False
+        _FakeApi.instances.append(self)
+
+    def connect(self, host, port, time_out=5.0):
+        if host == 'down':
+            return False
+        time.sleep(DELAYS[host])
+        self.host = host
+        self.connected = True
+        return True
+
+    def get_security_count(self, market):
+        return 100 if self.alive else None
+
+    def get_security_bars(self, category, market, code, start, count):
+        if not self.alive:
+            return None
+        if code == '000404':
+            return []
+        return [{'datetime': '2026-01-05 15:00', 'open': 10.0, 'close': 10.5, 'vol': 100.0}]
+
+    def to_df(self, data):
+        return pd.DataFrame(data)
+
+    def disconnect(self):
+        self.connected = False
+
+
+class TdxConnectionPoolTestCase(unittest.TestCase):
+    """TdxConnectionPool 行为测试"""
+
+    def setUp(self) -> None:
+        _FakeApi.instances = []
+        self.pool = TdxConnectionPool(_FakeApi, HOSTS, max_size=2)
+
+    def test_hosts_ranked_by_latency(self) -> None:
+        self.assertEqual(self.pool.rank_hosts(), [('fast', 3), ('slow', 1), ('down', 2)])
+        # 测速连接全部断开
+        self.assertFalse(any(api.connected for api in _FakeApi.instances))
+
+    def test_connection_reused_and_bounded(self) -> None:
+        with self.pool.connection() as api:
+            first = api
+            self.assertEqual(api.host, 'fast')
+        with self.pool.connection() as api:
+            self.assertIs(api, first)
+
+        entered = threading.Barrier(2)
+        seen = []
+
+        def worker():
+            with self.pool.connection() as api:
+                seen.append(api)
+                entered.wait(timeout=2)
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(map(id, seen))), 2)
+
+        self.pool.ACQUIRE_TIMEOUT = 0.1
+        with self.pool.connection(), self.pool.connection():
+            with self.assertRaises(DataFetchError):
+                with self.pool.connection():
+                    pass
+
+    def test_dead_connection_replaced(self) -> None:
+        with self.pool.connection() as api:
+            stale = api
+        stale.alive = False
+        self.pool._idle[0].last_used -= self.pool.HEARTBEAT_IDLE + 1
+
+        with self.pool.connection() as api:
+            self.assertIsNot(api, stale)
+        self.assertFalse(stale.connected)
+
+    def test_broken_connection_not_returned(self) -> None:
+        with self.assertRaises(ConnectionError):
+            with self.pool.connection() as api:
+                broken = api
+                raise ConnectionError("reset by peer")
+        self.assertFalse(broken.connected)
+        self.assertEqual(self.pool._created, 0)
+
+        # 服务器正常响应但无数据时归还连接
+        with self.assertRaises(TdxNoDataError):
+            with self.pool.connection():
+                raise TdxNoDataError("no data")
+        self.assertEqual(len(self.pool._idle), 1)
+
+        # 其余 DataFetchError（如 pytdx 返回 None）同样视为连接损坏
+        with self.assertRaises(DataFetchError):
+            with self.pool.connection():
+                raise DataFetchError("no response")
+        self.assertEqual((len(self.pool._idle), self.pool._created), (0, 0))
+
+
+class PytdxFetcherPoolTestCase(unittest.TestCase):
+    """PytdxFetcher 借还连接"""
+
+    def setUp(self) -> None:
+        _FakeApi.instances = []
+        self.fetcher = PytdxFetcher(hosts=[('fast', 3)])
+        self.pool = TdxConnectionPool(_FakeApi, [('fast', 3)], max_size=2)
+        self.fetcher._pool = self.pool
+
+    def test_no_data_returns_connection(self) -> None:
+        with self.assertRaises(TdxNoDataError):
+            self.fetcher._fetch_raw_data('000404', '2026-01-01', '2026-01-06')
+        self.assertEqual(len(self.pool._idle), 1)
+        self.assertTrue(self.pool._idle[0].api.connected)
+
+    def test_dead_socket_discards_connection(self) -> None:
+        self.fetcher._fetch_raw_data('600519', '2026-01-01', '2026-01-06')
+        dead = self.pool._idle[0].api
+        dead.alive = False
+
+        with self.assertRaises(DataFetchError):
+            self.fetcher._fetch_raw_data('600519', '2026-01-01', '2026-01-06')
+        self.assertFalse(dead.connected)
+        self.assertEqual((len(self.pool._idle), self.pool._created), (0, 0))
+
+    def test_batch_reconnects_after_dead_socket(self) -> None:
+        self.fetcher._fetch_raw_data('600519', '2026-01-01', '2026-01-06')
+        self.pool._idle[0].api.alive = False
+
+        results = self.fetcher._fetch_raw_data_batch(['600519', '000404', '601318'], '2026-01-01', '2026-01-06')
+
+        # 断连的股票跳过，其余股票换新连接继续；无数据的股票不影响连接复用
+        self.assertEqual(set(results), {'601318'})
+        self.assertEqual(len(self.pool._idle), 1)
+        self.assertTrue(self.pool._idle[0].api.alive)
+
+
+if __name__ == '__main__':
+    unittest.main()
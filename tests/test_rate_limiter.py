@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+令牌桶限流器测试
+===================================
+
+职责：
+1. 验证突发容量内立即放行
+2. 验证超出预算时按速率等待
+3. 验证多线程并发下总吞吐不超过预算
+4. 验证 RATE_LIMITS 配置解析与按主机共享
+5. 验证 Pytdx / Baostock / Yfinance 请求经过各自主机的令牌桶
+"""
+
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from data_provider.rate_limiter import (
+    DEFAULT_HOST_LIMITS,
+    TokenBucket,
+    get_rate_limiter,
+    reset_rate_limiters,
+    _parse_rate_limits,
+)
+from src.config import Config
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    """TokenBucket 行为测试"""
+
+    def test_burst_is_immediate(self) -> None:
+        bucket = TokenBucket(rate=1.0, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            self.assertEqual(bucket.acquire(), 0.0)
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertFalse(bucket.try_acquire())
+
+    def test_waits_only_for_missing_budget(self) -> None:
+        bucket = TokenBucket(rate=20.0, burst=1)
+        bucket.acquire()
+        waited = bucket.acquire()
+        self.assertAlmostEqual(waited, 0.05, delta=0.02)
+
+    def test_concurrent_acquire_respects_rate(self) -> None:
+        bucket = TokenBucket(rate=50.0, burst=2)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(12)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - start
+        # 前 2 个走突发额度，其余 10 个按 50 次/秒排队，约 0.2 秒
+        self.assertGreaterEqual(elapsed, 0.18)
+        self.assertLess(elapsed, 0.6)
+
+
+class RateLimiterRegistryTestCase(unittest.TestCase):
+    """按主机共享的限流器注册表测试"""
+
+    def setUp(self) -> None:
+        os.environ["RATE_LIMITS"] = "eastmoney=4:2,bad=abc"
+        Config._instance = None
+        reset_rate_limiters()
+
+    def tearDown(self) -> None:
+        os.environ.pop("RATE_LIMITS", None)
+        Config._instance = None
+        reset_rate_limiters()
+
+    def test_parse_rate_limits(self) -> None:
+        self.assertEqual(_parse_rate_limits("eastmoney=4:2,sina=1,bad=abc"),
+                         {'eastmoney': (4.0, 2.0), 'sina': (1.0, 1.0)})
+
+    def test_same_host_shares_bucket(self) -> None:
+        limiter = get_rate_limiter('eastmoney')
+        self.assertIs(limiter, get_rate_limiter('EastMoney'))
+        self.assertEqual((limiter.rate, limiter.burst), (4.0, 2.0))
+
+    def test_caller_default_used_when_not_configured(self) -> None:
+        limiter = get_rate_limiter('tushare', rate=1.25, burst=5)
+        self.assertEqual((limiter.rate, limiter.burst), (1.25, 5.0))
+
+
+
+class FetcherRateLimitTestCase(unittest.TestCase):
+    """Pytdx / Baostock / Yfinance 经过共享令牌桶"""
+
+    def setUp(self) -> None:
+        Config._instance = None
+        reset_rate_limiters()
+
+    def tearDown(self) -> None:
+        Config._instance = None
+        reset_rate_limiters()
+
+    def _hosts(self, module):
+        hosts = []
+
+        def limiter(host):
+            hosts.append(host)
+            return mock.MagicMock()
+
+        return hosts, mock.patch.object(module, 'get_rate_limiter', side_effect=limiter)
+
+    def test_default_limits_for_new_hosts(self) -> None:
+        for host in ('tdx', 'baostock', 'yahoo'):
+            self.assertIn(host, DEFAULT_HOST_LIMITS)
+            limiter = get_rate_limiter(host)
+            self.assertEqual((limiter.rate, limiter.burst), DEFAULT_HOST_LIMITS[host])
+
+    def test_pytdx_bars_use_tdx_bucket(self) -> None:
+        from data_provider import pytdx_fetcher
+
+        api = mock.MagicMock()
+        api.get_security_bars.return_value = [{'datetime': '2026-01-05 15:00', 'close': 10.0}]
+        api.to_df.side_effect = pd.DataFrame
+        hosts, patch = self._hosts(pytdx_fetcher)
+        with patch:
+            pytdx_fetcher.PytdxFetcher()._fetch_bars(api, '600519', '2026-01-01', '2026-01-06', 30)
+        self.assertEqual(hosts, ['tdx'])
+
+    def test_baostock_query_uses_baostock_bucket(self) -> None:
+        from data_provider import baostock_fetcher
+
+        fetcher = baostock_fetcher.BaostockFetcher()
+        result = mock.MagicMock(error_code='0', fields=['code'])
+        result.next.return_value = False
+        hosts, patch = self._hosts(baostock_fetcher)
+        with patch, mock.patch.object(fetcher, '_baostock_session') as session:
+            session.return_value.__enter__.return_value = mock.MagicMock()
+            fetcher._query(lambda bs: result)
+        self.assertEqual(hosts, ['baostock'])
+
+    def test_yfinance_download_uses_yahoo_bucket(self) -> None:
+        from data_provider import yfinance_fetcher
+
+        hosts, patch = self._hosts(yfinance_fetcher)
+        with patch, mock.patch('yfinance.download', return_value=pd.DataFrame({'Close': [1.0]})):
+            yfinance_fetcher.YfinanceFetcher()._fetch_raw_data('AAPL', '2026-01-01', '2026-01-06')
+        self.assertEqual(hosts, ['yahoo'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+实时行情代码索引快照测试
+===================================
+
+职责：
+1. 验证 RealtimeSnapshot 列名识别、数值转换与代码索引
+2. 验证东财缓存命中时按索引查询构造 UnifiedRealtimeQuote
+"""
+
+import time
+import unittest
+
+import pandas as pd
+
+from data_provider.realtime_types import RealtimeSnapshot, RealtimeSource
+
+
+class RealtimeSnapshotTestCase(unittest.TestCase):
+    """RealtimeSnapshot 构建与查询测试"""
+
+    def _frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'code': ['600519', '000002', '1'],
+            'name': ['贵州茅台', '平安银行', None],
+            'price': [1500.5, '-', 3.2],
+            'volume': [12345.0, 678.0, float('nan')],
+        })
+
+    def test_english_columns_and_conversion(self) -> None:
+        snapshot = RealtimeSnapshot.from_dataframe(
+            self._frame(), ('股票代码', 'code'), ('股票名称', 'name'),
+            {'price': ('最新价', 'price'), 'volume': ('成交量', 'volume'), 'pe_ratio': ('市盈率', 'pe_ratio')},
+        )
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.get('600519'), {'name': '贵州茅台', 'price': 1500.5, 'volume': 12345})
+        self.assertIsInstance(snapshot.get('600519')['volume'], int)
+        # '-' 与缺失列均不返回
+        self.assertEqual(snapshot.get('000002'), {'name': '平安银行', 'volume': 678})
+        # 纯数字代码补齐 6 位
+        self.assertIn('000001', snapshot)
+        self.assertEqual(snapshot.get('000001'), {'name': '', 'price': 3.2})
+        self.assertIsNone(snapshot.get('300750'))
+
+    def test_empty_frame(self) -> None:
+        snapshot = RealtimeSnapshot.from_dataframe(pd.DataFrame(), ('代码',), ('名称',), {})
+        self.assertEqual(len(snapshot), 0)
+        self.assertIsNone(snapshot.get('600519'))
+
+
+class AkshareEmSnapshotLookupTestCase(unittest.TestCase):
+    """东财实时行情缓存命中时的索引查询"""
+
+    def setUp(self) -> None:
+        from data_provider import akshare_fetcher
+
+        self.module = akshare_fetcher
+        self._saved = dict(akshare_fetcher._realtime_cache)
+        df = pd.DataFrame({
+            '代码': ['600519', '000001'],
+            '名称': ['贵州茅台', '平安银行'],
+            '最新价': [1500.0, 11.2],
+            '成交量': [1000, 2000],
+            '量比': [1.2, 0.8],
+            '市盈率-动态': [30.1, 5.2],
+        })
+        akshare_fetcher._realtime_cache.update({
+            'data': df,
+            'snapshot': akshare_fetcher._build_em_snapshot(df),
+            'timestamp': time.time(),
+        })
+
+    def tearDown(self) -> None:
+        self.module._realtime_cache.clear()
+        self.module._realtime_cache.update(self._saved)
+
+    def test_quote_from_snapshot(self) -> None:
+        fetcher = self.module.AkshareFetcher()
+        quote = fetcher.get_realtime_quote('000001', source='em')
+        self.assertIsNotNone(quote)
+        self.assertEqual(quote.name, '平安银行')
+        self.assertEqual(quote.source, RealtimeSource.AKSHARE_EM)
+        self.assertEqual(quote.price, 11.2)
+        self.assertEqual(quote.volume, 2000)
+        self.assertEqual(quote.pe_ratio, 5.2)
+        self.assertIsNone(quote.pb_ratio)
+        self.assertIsNone(fetcher.get_realtime_quote('300750', source='em'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+离线录制/回放测试
+===================================
+
+职责：
+1. 验证录制模式记录数据源原始返回与异常
+2. 验证回放模式不调用真实数据源，按录制顺序返回并注入合成延迟
+3. 验证请求日期变化时按分组键兜底命中
+4. 验证未命中时的默认返回值
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetchError
+from src.config import Config
+from src.replay import (
+    ReplayMissError,
+    TrafficArchive,
+    get_traffic_archive,
+    replay_call,
+    replayable,
+    reset_traffic_archive,
+)
+
+
+class _CountingFetcher(BaseFetcher):
+    """记录真实调用次数的数据源"""
+
+    name = 'CountingFetcher'
+    priority = 0
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.calls += 1
+        if self.fail:
+            raise DataFetchError("upstream down")
+        return pd.DataFrame({
+            'date': ['2026-01-05', '2026-01-06'],
+            'open': [10.0, 11.0], 'high': [10.5, 11.5], 'low': [9.5, 10.5], 'close': [10.0, 11.0],
+            'volume': [1000.0, 1000.0], 'amount': [10000.0, 10000.0], 'pct_chg': [0.0, 10.0],
+        })
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class _QuoteSource:
+    def __init__(self):
+        self.calls = 0
+
+    @replayable('realtime_quote', on_miss=None)
+    def get_realtime_quote(self, stock_code):
+        self.calls += 1
+        return {'code': stock_code, 'price': 10.0 + self.calls}
+
+
+class ReplayTestCase(unittest.TestCase):
+    """录制/回放测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.archive_path = os.path.join(self._temp_dir.name, "replay.db")
+        os.environ["REPLAY_ARCHIVE"] = self.archive_path
+
+    def tearDown(self) -> None:
+        reset_traffic_archive()
+        os.environ.pop("REPLAY_MODE", None)
+        os.environ.pop("REPLAY_ARCHIVE", None)
+        os.environ.pop("REPLAY_LATENCY_MS", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def _use_mode(self, mode: str, latency_ms: str = '0') -> None:
+        os.environ["REPLAY_MODE"] = mode
+        os.environ["REPLAY_LATENCY_MS"] = latency_ms
+        Config._instance = None
+        reset_traffic_archive()
+
+    def test_off_mode_calls_through(self) -> None:
+        self._use_mode('off')
+        self.assertIsNone(get_traffic_archive())
+        self.assertEqual(replay_call('llm', ('prompt',), lambda: 'live'), 'live')
+
+    def test_record_then_replay_fetcher(self) -> None:
+        self._use_mode('record')
+        live = _CountingFetcher()
+        recorded = live.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+        with self.assertRaises(DataFetchError):
+            _CountingFetcher(fail=True).get_daily_data('000001', start_date='2026-01-01', end_date='2026-01-06')
+        self.assertEqual(get_traffic_archive().get_stats()['recorded'], 2)
+
+        self._use_mode('replay', latency_ms='50')
+        offline = _CountingFetcher(fail=True)
+        start = time.time()
+        replayed = offline.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+        self.assertGreaterEqual(time.time() - start, 0.05)
+        self.assertEqual(offline.calls, 0)
+        pd.testing.assert_frame_equal(replayed, recorded)
+
+        # 录制时的失败同样被回放
+        with self.assertRaises(DataFetchError):
+            offline.get_daily_data('000001', start_date='2026-01-01', end_date='2026-01-06')
+
+        # 请求日期不同：按 数据源+代码 分组兜底
+        shifted = offline.get_daily_data('600519', start_date='2026-02-01', end_date='2026-02-06')
+        self.assertEqual(len(shifted), 2)
+        self.assertEqual(offline.calls, 0)
+
+        # 档案中没有的代码
+        with self.assertRaises(DataFetchError):
+            offline.get_daily_data('300750', start_date='2026-01-01', end_date='2026-01-06')
+
+    def test_replay_sequence_and_miss_default(self) -> None:
+        self._use_mode('record')
+        source = _QuoteSource()
+        first = source.get_realtime_quote('600519')
+        second = source.get_realtime_quote('600519')
+
+        self._use_mode('replay')
+        offline = _QuoteSource()
+        self.assertEqual(offline.get_realtime_quote('600519'), first)
+        self.assertEqual(offline.get_realtime_quote('600519'), second)
+        # 录制耗尽后重复最后一条
+        self.assertEqual(offline.get_realtime_quote('600519'), second)
+        self.assertIsNone(offline.get_realtime_quote('000001'))
+        self.assertEqual(offline.calls, 0)
+
+        with self.assertRaises(ReplayMissError):
+            replay_call('llm', ('unknown prompt',), lambda: 'live')
+
+    def test_replay_requires_archive(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            TrafficArchive(os.path.join(self._temp_dir.name, "missing.db"), 'replay')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+运行清单与断点续跑测试
+===================================
+
+职责：
+1. 验证运行清单的创建、阶段记录、按状态载入最近一次未完成的运行
+2. 验证续跑时只处理未完成的股票与阶段（复用已完成的情报搜索、跳过已就绪的日线）
+3. 验证续跑的汇总报告包含从 AnalysisHistory 还原的已完成结果
+4. 验证续跑沿用首次运行的报告类型，汇总已推送时不重复推送
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.analyzer import AnalysisResult
+from src.config import Config
+from src.run_manifest import RunManifest
+from src.storage import DatabaseManager
+
+
+class RunManifestTestCase(unittest.TestCase):
+    """运行清单持久化"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_run_manifest.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_stage_marks_survive_reload(self) -> None:
+        manifest = RunManifest.create(self.db, ['600519', '000001', '600519'], query_source='cli')
+        self.assertEqual(manifest.stock_codes, ['600519', '000001'])
+        manifest.mark('600519', 'data')
+        manifest.mark('600519', 'search', news_context='【贵州茅台 情报搜索结果】')
+        manifest.mark('999999', 'data')
+
+        reloaded = RunManifest.load(self.db)
+        self.assertEqual(reloaded.run_id, manifest.run_id)
+        self.assertEqual(reloaded.query_id('600519'), manifest.query_id('600519'))
+        self.assertTrue(reloaded.is_done('600519', 'search'))
+        self.assertFalse(reloaded.is_done('000001', 'data'))
+        self.assertEqual(reloaded.news_context('600519'), '【贵州茅台 情报搜索结果】')
+        self.assertEqual(reloaded.progress()['data'], 1)
+        self.assertIsNone(RunManifest.load(self.db, query_source='bot'))
+
+    def test_finish_status_controls_latest(self) -> None:
+        partial = RunManifest.create(self.db, ['600519', '000001'], query_source='cli')
+        partial.mark('600519', 'saved')
+        partial.finish()
+        self.assertEqual(RunManifest.load(self.db).run_id, partial.run_id)
+
+        completed = RunManifest.create(self.db, ['600519'], query_source='cli')
+        completed.mark('600519', 'saved')
+        completed.finish(summary_sent=True)
+        # 已完成的运行不参与 latest，但仍可按 run_id 载入
+        self.assertEqual(RunManifest.load(self.db).run_id, partial.run_id)
+        self.assertEqual(RunManifest.load(self.db, completed.run_id).pending_codes(), [])
+
+        partial.mark('000001', 'saved')
+        partial.finish()
+        self.assertIsNone(RunManifest.load(self.db))
+
+
+class PipelineResumeTestCase(unittest.TestCase):
+    """StockAnalysisPipeline.run 续跑"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_resume.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+
+    def tearDown(self) -> None:
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def _pipeline(self, failing: set):
+        from src.bar_window import BarWindowLoader
+        from src.core.pipeline import StockAnalysisPipeline
+        from src.run_profile import RunProfiler
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.config = MagicMock(
+            pipeline_mode='threads', single_stock_notify=False, report_type='simple', analysis_delay=0
+        )
+        pipeline.max_workers = 2
+        pipeline.query_id = None
+        pipeline.query_source = 'cli'
+        pipeline.source_message = None
+        pipeline.save_context_snapshot = False
+        pipeline.db = self.db
+        pipeline.manifest = None
+        pipeline.profiler = RunProfiler()
+        pipeline.bar_windows = BarWindowLoader(self.db)
+        pipeline.fetcher_manager = MagicMock()
+        pipeline.prefetch_daily_data = MagicMock(return_value=0)
+        pipeline._fetch_and_save = MagicMock(return_value=(True, None))
+        pipeline._enrich_stock = lambda job: job
+        pipeline._build_llm_context = lambda job: {'code': job.code}
+        pipeline._send_notifications = MagicMock()
+        pipeline._save_run_profile = MagicMock()
+
+        pipeline.search_service = MagicMock(is_available=True)
+        pipeline.search_service.search_comprehensive_intel.return_value = {'latest_news': MagicMock()}
+        pipeline.search_service.format_intel_report.side_effect = lambda intel, name: f"情报:{name}"
+
+        def analyze(context, news_context=None):
+            if context['code'] in failing:
+                return None
+            return AnalysisResult(
+                code=context['code'], name=f"股票{context['code']}", sentiment_score=66,
+                trend_prediction='看多', operation_advice='持有',
+            )
+
+        pipeline.analyzer = MagicMock()
+        pipeline.analyzer.analyze.side_effect = analyze
+        return pipeline
+
+    def test_resume_only_runs_unfinished_work(self) -> None:
+        codes = ['600519', '000001', '300750']
+        first = self._pipeline(failing={'300750'})
+        results = first.run(codes)
+        self.assertEqual(sorted(r.code for r in results), ['000001', '600519'])
+        self.assertIsNone(first.manifest)
+
+        manifest = RunManifest.load(self.db, query_source='cli')
+        self.assertEqual(manifest.pending_codes(), ['300750'])
+        self.assertTrue(manifest.is_done('300750', 'search'))
+
+        second = self._pipeline(failing=set())
+        resumed = second.run(resume='latest')
+
+        self.assertEqual(sorted(r.code for r in resumed), sorted(codes))
+        # 只有未完成的股票调用 AI，情报搜索与日线复用首次运行的结果
+        self.assertEqual(second.analyzer.analyze.call_count, 1)
+        self.assertEqual(second.analyzer.analyze.call_args.kwargs['news_context'], '情报:')
+        second.search_service.search_comprehensive_intel.assert_not_called()
+        second._fetch_and_save.assert_not_called()
+
+        # 汇总报告包含从分析历史还原的结果
+        summary_results = second._send_notifications.call_args.args[0]
+        restored = next(r for r in summary_results if r.code == '600519')
+        self.assertEqual((restored.name, restored.operation_advice), ('股票600519', '持有'))
+        records = self.db.get_analysis_history(query_id=manifest.query_id('300750'))
+        self.assertEqual(len(records), 1)
+        self.assertIsNone(RunManifest.load(self.db))
+
+    def test_resume_keeps_report_type_and_sent_summary(self) -> None:
+        from src.enums import ReportType
+
+        first = self._pipeline(failing={'300750'})
+        first.config.report_type = 'full'
+        first.run(['600519', '300750'])
+        self.assertEqual(first._send_notifications.call_args.kwargs, {})
+        manifest = RunManifest.load(self.db, query_source='cli')
+        self.assertTrue(manifest.summary_sent)
+
+        # 配置已改为 simple：续跑仍按首次运行的 full 报告生成，且不重复推送汇总
+        second = self._pipeline(failing=set())
+        second.process_single_stock = MagicMock(wraps=second.process_single_stock)
+        second.run(resume='latest')
+
+        self.assertEqual(second.process_single_stock.call_args.kwargs['report_type'], ReportType.FULL)
+        self.assertEqual(second._send_notifications.call_args.kwargs, {'skip_push': True})
+        self.assertTrue(self.db.get_pipeline_run(manifest.run_id)['summary_sent'])
+
+    def test_resume_without_unfinished_run(self) -> None:
+        pipeline = self._pipeline(failing=set())
+        self.assertEqual(pipeline.run(resume='latest'), [])
+        pipeline.analyzer.analyze.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
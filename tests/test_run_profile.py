@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+运行耗时剖析测试
+===================================
+
+职责：
+1. 验证 RunProfiler 的阶段分位数、错误数、逐股耗时、计数与缓存命中率汇总
+2. 验证 profile_* 函数仅在剖析器激活时记录，并发运行的剖析器互不干扰
+3. 验证流水线按 query_id 记录各阶段耗时并在运行结束时写出 JSON
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.run_profile import (
+    RunProfiler,
+    activate_profiler,
+    get_active_profiler,
+    profile_count,
+    profile_record,
+    profile_span,
+)
+
+
+class RunProfilerTestCase(unittest.TestCase):
+    """RunProfiler 汇总"""
+
+    def test_stage_percentiles_and_queries(self) -> None:
+        profiler = RunProfiler(run_id='test')
+        for i in range(1, 21):
+            profiler.record('llm', i / 10.0, query_id=f"q{i}", code=f"{600000 + i}")
+        profiler.record('search', 0.5, query_id='q1')
+        with self.assertRaises(RuntimeError):
+            with profiler.span('persist', query_id='q1'):
+                raise RuntimeError("boom")
+
+        profile = profiler.summary(mode='threads')
+        llm = profile['stages']['llm']
+        self.assertEqual(llm['count'], 20)
+        self.assertAlmostEqual(llm['p50'], 1.0)
+        self.assertAlmostEqual(llm['p95'], 1.9)
+        self.assertAlmostEqual(llm['max'], 2.0)
+        self.assertAlmostEqual(llm['total'], 21.0)
+        self.assertEqual(profile['stages']['persist']['errors'], 1)
+        self.assertEqual(profile['mode'], 'threads')
+        self.assertEqual(profile['queries']['q1']['code'], '600001')
+        self.assertEqual(set(profile['queries']['q1']['stages']), {'llm', 'search', 'persist'})
+
+    def test_counters_and_caches(self) -> None:
+        profiler = RunProfiler()
+        profiler.record_cache('daily_data', hit=True)
+        profiler.record_cache('daily_data', hit=True)
+        profiler.record_cache('daily_data', hit=False)
+        profiler.add_cache_counts('bar_window', 0, 0)
+
+        previous = activate_profiler(profiler)
+        try:
+            self.assertIs(get_active_profiler(), profiler)
+            profile_count('llm_retry.gemini')
+            profile_count('llm_retry.gemini')
+            profile_record('search.Bocha', 0.3)
+            with profile_span('notify.custom'):
+                pass
+        finally:
+            activate_profiler(previous)
+        profile_record('search.Bocha', 9.9)
+
+        profile = json.loads(profiler.to_json())
+        self.assertEqual(profile['caches']['daily_data'], {'hits': 2, 'misses': 1, 'hit_rate': 0.6667})
+        self.assertIsNone(profile['caches']['bar_window']['hit_rate'])
+        self.assertEqual(profile['counters'], {'llm_retry.gemini': 2})
+        self.assertEqual(profile['stages']['search.Bocha']['count'], 1)
+        self.assertIn('notify.custom', profile['stages'])
+
+    def test_concurrent_runs_keep_own_profiler(self) -> None:
+        from src.core.staged_executor import Stage, StagedExecutor
+
+        profilers = {name: RunProfiler(run_id=name) for name in ('scheduled', 'api')}
+        started = threading.Barrier(2)
+
+        def run(name):
+            activate_profiler(profilers[name])
+            started.wait(timeout=2)
+            profile_count(f"calls.{name}")
+            # 分阶段执行器的工作线程继承提交线程的剖析器
+            StagedExecutor([Stage('llm', lambda item: profile_count(f"calls.{name}") or item, workers=2)]).run(
+                list(range(3))
+            )
+            self.assertIs(get_active_profiler(), profilers[name])
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in profilers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        for name, profiler in profilers.items():
+            self.assertEqual(profiler.summary()['counters'], {f"calls.{name}": 4})
+        self.assertIsNone(get_active_profiler())
+
+    def test_concurrent_records(self) -> None:
+        profiler = RunProfiler()
+
+        def worker(n):
+            for _ in range(200):
+                profiler.record('fetch', 0.01, query_id=f"q{n}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        profile = profiler.summary()
+        self.assertEqual(profile['stages']['fetch']['count'], 1600)
+        self.assertAlmostEqual(profile['queries']['q3']['stages']['fetch'], 2.0)
+
+
+class PipelineProfileTestCase(unittest.TestCase):
+    """StockAnalysisPipeline 阶段计时与剖析输出"""
+
+    def _pipeline(self):
+        from src.bar_window import BarWindowLoader
+        from src.core.pipeline import StockAnalysisPipeline
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.profiler = RunProfiler(run_id='20261018_090000')
+        pipeline.manifest = None
+        pipeline.config = MagicMock(
+            pipeline_stage_workers='', pipeline_stage_rates='', pipeline_queue_size=2, pipeline_mode='threads',
+            analysis_window_bars=120,
+        )
+        pipeline.max_workers = 2
+        pipeline.query_id = None
+        pipeline.db = MagicMock()
+        pipeline.db.has_today_data.return_value = True
+        pipeline.db.get_bar_window.return_value = pd.DataFrame({'close': [10.0] * 120})
+        pipeline.trading_calendar = MagicMock()
+        pipeline._prefetched_daily = set()
+        pipeline.bar_windows = BarWindowLoader(pipeline.db)
+        pipeline.notifier = MagicMock()
+
+        def llm(job):
+            job.result = MagicMock(code=job.code, operation_advice='持有', sentiment_score=60)
+            return job
+
+        pipeline._enrich_stock = lambda job: job
+        pipeline._search_stock_intel = lambda job: job
+        pipeline._run_llm_analysis = llm
+        pipeline._persist_analysis = lambda job: job
+        pipeline._notify_single_stock = MagicMock()
+        return pipeline
+
+    def test_threaded_spans_keyed_by_query_id(self) -> None:
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        result = pipeline.process_single_stock(
+            '600519', single_stock_notify=True, report_type=ReportType.SIMPLE, analysis_query_id='q-600519'
+        )
+        self.assertIsNotNone(result)
+
+        profile = pipeline.profiler.summary()
+        stages = profile['queries']['q-600519']['stages']
+        self.assertEqual(profile['queries']['q-600519']['code'], '600519')
+        self.assertEqual(set(stages), {'fetch', 'enrich', 'search', 'llm', 'persist', 'notify'})
+        # 最新交易日数据已存在，断点续传命中
+        self.assertEqual(profile['caches']['daily_data']['hits'], 1)
+
+    def test_staged_spans_and_profile_file(self) -> None:
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        pipeline._run_staged(
+            ['600519', '000001'], dry_run=False, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        with tempfile.TemporaryDirectory() as reports_dir:
+            pipeline.notifier.get_reports_dir.return_value = Path(reports_dir)
+            pipeline._save_run_profile(stock_count=2, success_count=2, dry_run=False)
+            profile = json.loads(
+                (Path(reports_dir) / 'run_profile_20261018_090000.json').read_text(encoding='utf-8')
+            )
+
+        self.assertEqual(profile['stock_count'], 2)
+        self.assertEqual(profile['mode'], 'threads')
+        for stage in ('fetch', 'enrich', 'search', 'llm', 'persist'):
+            self.assertEqual(profile['stages'][stage]['count'], 2)
+        self.assertEqual(sorted(q['code'] for q in profile['queries'].values()), ['000001', '600519'])
+        self.assertIn('bar_window', profile['caches'])
+
+
+if __name__ == '__main__':
+    unittest.main()
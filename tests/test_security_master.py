@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+证券主数据测试
+===================================
+
+职责：
+1. 验证代码规则推断市场/板块/类型
+2. 验证数据源股票列表批量刷新、持久化与重新加载
+3. 验证补录名称不推迟每日全量刷新
+4. 验证 DataFetcherManager 名称解析优先命中主数据
+"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from data_provider.base import DataFetcherManager
+from src.config import Config
+from src.security_master import classify_security, get_security_master, reset_security_master
+from src.storage import DatabaseManager
+
+
+class _FakeTushare:
+    priority = 2
+    name = 'TushareFetcher'
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_stock_list(self):
+        self.calls += 1
+        return pd.DataFrame({
+            'code': ['600519', '300750', '688981'],
+            'name': ['贵州茅台', '宁德时代', '中芯国际'],
+            'industry': ['白酒', '电池', '半导体'],
+            'area': ['贵州', '福建', '上海'],
+            'market': ['主板', '创业板', '科创板'],
+        })
+
+
+class _FakeBaostock:
+    priority = 3
+    name = 'BaostockFetcher'
+
+    def get_stock_list(self):
+        return pd.DataFrame({
+            'code': ['600519', '000001', '510300', '000300'],
+            'name': ['茅台旧名', '平安银行', '沪深300ETF', '沪深300'],
+            'type': ['1', '1', '5', '2'],
+            'status': ['1', '1', '1', '1'],
+        })
+
+
+class _FailingFetcher:
+    priority = 0
+    name = 'FailingFetcher'
+
+    def get_stock_list(self):
+        raise RuntimeError("network down")
+
+    def get_stock_name(self, stock_code):
+        raise AssertionError("证券主数据已收录时不应请求数据源")
+
+
+class SecurityMasterTestCase(unittest.TestCase):
+    """证券主数据测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_security_master.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        reset_security_master()
+
+    def tearDown(self) -> None:
+        reset_security_master()
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_classify_security(self) -> None:
+        self.assertEqual(classify_security('600519'), ('SH', '主板', 'stock'))
+        self.assertEqual(classify_security('688981'), ('SH', '科创板', 'stock'))
+        self.assertEqual(classify_security('300750'), ('SZ', '创业板', 'stock'))
+        self.assertEqual(classify_security('159915'), ('SZ', '', 'etf'))
+        self.assertEqual(classify_security('830799'), ('BJ', '北交所', 'stock'))
+        self.assertEqual(classify_security('00700'), ('HK', '', 'stock'))
+        self.assertEqual(classify_security('AAPL'), ('US', '', 'stock'))
+
+    def test_refresh_persists_and_reloads(self) -> None:
+        master = get_security_master()
+        self.assertTrue(master.needs_refresh())
+
+        count = master.refresh([_FakeTushare(), _FakeBaostock(), _FailingFetcher()])
+
+        # 指数被过滤；同代码以靠前的数据源为准
+        self.assertEqual(count, 5)
+        self.assertIsNone(master.get('000300'))
+        self.assertEqual(master.get_name('600519'), '贵州茅台')
+        self.assertEqual(master.get('688981')['board'], '科创板')
+        self.assertEqual(master.get('510300')['asset_type'], 'etf')
+        self.assertFalse(master.needs_refresh())
+
+        # 再次刷新：未过期不请求数据源
+        tushare = _FakeTushare()
+        self.assertEqual(master.refresh([tushare]), 0)
+        self.assertEqual(tushare.calls, 0)
+
+        # 新进程从数据库加载
+        reset_security_master()
+        reloaded = get_security_master()
+        self.assertEqual(reloaded.get_name('000001'), '平安银行')
+        self.assertEqual(reloaded.get('300750')['list_status'], 'L')
+        self.assertFalse(reloaded.needs_refresh())
+
+    def test_remember_does_not_delay_refresh(self) -> None:
+        master = get_security_master()
+        master.remember('430047', '诺思兰德', 'realtime')
+
+        reset_security_master()
+        reloaded = get_security_master()
+        self.assertEqual(reloaded.get_name('430047'), '诺思兰德')
+        self.assertEqual(reloaded.get('430047')['market'], 'BJ')
+        self.assertTrue(reloaded.needs_refresh())
+
+    def test_manager_resolves_names_from_master(self) -> None:
+        manager = DataFetcherManager(fetchers=[_FakeTushare()])
+        manager.refresh_security_master()
+
+        manager._fetchers = [_FailingFetcher()]
+        self.assertEqual(manager.get_stock_name('SH600519'), '贵州茅台')
+        # 内置种子同样可直接命中
+        self.assertEqual(
+            manager.batch_get_stock_names(['300750', '00700']),
+            {'300750': '宁德时代', '00700': '腾讯控股'},
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
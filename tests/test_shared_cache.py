@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+跨进程共享行情缓存测试
+===================================
+
+职责：
+1. 验证 TTL、整条替换与过期清理
+2. 验证多个进程同时未命中时只有一个进程执行刷新
+3. 验证东财全量刷新与新浪/腾讯逐股缓存经共享缓存复用
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from data_provider import akshare_fetcher
+from data_provider.realtime_types import RealtimeSource, UnifiedRealtimeQuote
+from data_provider.shared_cache import SharedCache, get_shared_cache, reset_shared_cache
+from src.config import Config
+
+
+def _refresh_in_process(path: str, counter_dir: str, results) -> None:
+    cache = SharedCache(path)
+
+    def refresh():
+        open(os.path.join(counter_dir, f"refresh-{os.getpid()}"), 'w').close()
+        time.sleep(0.5)
+        return pd.DataFrame({'代码': ['600519'], '最新价': [1500.0]})
+
+    df, _, fetched = cache.get_or_refresh('akshare_em:stock', 60, refresh)
+    results.put((float(df['最新价'].iloc[0]), fetched))
+
+
+class SharedCacheTestCase(unittest.TestCase):
+    """SharedCache 基本读写与跨进程刷新"""
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'shared.db')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_ttl_and_replace(self) -> None:
+        cache = SharedCache(self.path)
+        cache.put('k', {'v': 1}, ttl=60)
+        cache.put('k', {'v': 2}, ttl=60)
+        value, created_at = cache.get('k')
+        self.assertEqual(value, {'v': 2})
+        self.assertLessEqual(created_at, time.time())
+
+        cache.put('old', 1, ttl=-1)
+        self.assertIsNone(cache.get('old'))
+
+        # 另一个连接（模拟另一进程）读取同一文件
+        other = SharedCache(self.path)
+        self.assertEqual(other.get('k')[0], {'v': 2})
+        cache.close()
+        other.close()
+
+    def test_failed_refresh_not_shared(self) -> None:
+        cache = SharedCache(self.path)
+        value, _, fetched = cache.get_or_refresh('k', 60, lambda: None)
+        self.assertIsNone(value)
+        self.assertTrue(fetched)
+        self.assertIsNone(cache.get('k'))
+        # 租约已释放，下次可立即刷新
+        value, _, fetched = cache.get_or_refresh('k', 60, lambda: 'ok')
+        self.assertEqual((value, fetched), ('ok', True))
+        value, _, fetched = cache.get_or_refresh('k', 60, lambda: 'again')
+        self.assertEqual((value, fetched), ('ok', False))
+        cache.close()
+
+    def test_concurrent_processes_refresh_once(self) -> None:
+        SharedCache(self.path).close()
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_refresh_in_process, args=(self.path, self.temp_dir, results))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=30)
+
+        outcomes = [results.get(timeout=5) for _ in processes]
+        refreshes = [f for f in os.listdir(self.temp_dir) if f.startswith('refresh-')]
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(sorted(f for _, f in outcomes), [False, False, True])
+        self.assertTrue(all(price == 1500.0 for price, _ in outcomes))
+
+
+class FetcherSharedCacheTestCase(unittest.TestCase):
+    """数据源经共享缓存复用全量刷新与逐股行情"""
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.mkdtemp()
+        os.environ['SHARED_CACHE_PATH'] = os.path.join(self.temp_dir, 'shared.db')
+        Config._instance = None
+        reset_shared_cache()
+        self._saved = dict(akshare_fetcher._realtime_cache)
+        akshare_fetcher.clear_light_quote_cache()
+
+    def tearDown(self) -> None:
+        akshare_fetcher._realtime_cache.update(self._saved)
+        akshare_fetcher.clear_light_quote_cache()
+        reset_shared_cache()
+        os.environ.pop('SHARED_CACHE_PATH', None)
+        Config._instance = None
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _expire_local(self) -> None:
+        akshare_fetcher._realtime_cache.update({'data': None, 'snapshot': None, 'timestamp': 0})
+
+    def test_em_refresh_reused_after_local_cache_lost(self) -> None:
+        fetcher = akshare_fetcher.AkshareFetcher()
+        df = pd.DataFrame({'代码': ['600519'], '名称': ['贵州茅台'], '最新价': [1500.0]})
+        self._expire_local()
+        with mock.patch.object(fetcher, '_download_em_spot', return_value=df) as download, \
+                mock.patch.object(akshare_fetcher, 'archive_realtime_snapshot') as archive:
+            fetcher._refresh_em_realtime_cache()
+            # 模拟另一个进程：进程内缓存为空，应直接读取共享缓存
+            self._expire_local()
+            quote = fetcher._get_stock_realtime_quote_em('600519')
+
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(archive.call_count, 1)
+        self.assertEqual(quote.price, 1500.0)
+        self.assertGreater(akshare_fetcher._realtime_cache['timestamp'], 0)
+
+    def test_light_quotes_shared(self) -> None:
+        quote = UnifiedRealtimeQuote(code='600519', name='贵州茅台', source=RealtimeSource.TENCENT, price=1500.0)
+        akshare_fetcher._put_light_quotes('tencent', {'600519': quote})
+        self.assertIsNotNone(get_shared_cache().get('quote:tencent:600519'))
+
+        akshare_fetcher.clear_light_quote_cache()
+        cached = akshare_fetcher._get_cached_light_quote('tencent', '600519')
+        self.assertEqual(cached, quote)
+        self.assertIsNone(akshare_fetcher._get_cached_light_quote('sina', '600519'))
+
+
+if __name__ == '__main__':
+    unittest.main()
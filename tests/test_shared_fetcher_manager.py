@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+共享数据源管理器测试
+===================================
+
+职责：
+1. 验证并发首次获取只初始化一个共享实例
+2. 验证历史行情接口在本地数据最新时只读数据库、不请求数据源
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from data_provider.base import DataFetcherManager, get_fetcher_manager
+from src.config import Config
+from src.services.stock_service import StockService
+from src.storage import DatabaseManager
+from src.trading_calendar import get_trading_calendar
+
+
+class SharedFetcherManagerTestCase(unittest.TestCase):
+    """共享实例测试"""
+
+    def setUp(self) -> None:
+        DataFetcherManager.reset_instance()
+
+    def tearDown(self) -> None:
+        DataFetcherManager.reset_instance()
+
+    def test_concurrent_first_use_initializes_once(self) -> None:
+        init_calls = []
+
+        def fake_init(manager):
+            init_calls.append(manager)
+            manager._fetchers = []
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(get_fetcher_manager())
+
+        with patch.object(DataFetcherManager, '_init_default_fetchers', fake_init):
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len(init_calls), 1)
+        self.assertTrue(all(m is results[0] for m in results))
+        self.assertIs(DataFetcherManager.get_instance(), results[0])
+
+
+class StockServiceHistoryTestCase(unittest.TestCase):
+    """历史行情读取测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_stock_service.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        DataFetcherManager.reset_instance()
+
+    def tearDown(self) -> None:
+        DataFetcherManager.reset_instance()
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_history_served_from_database_when_fresh(self) -> None:
+        today = date.today()
+        dates = [today - timedelta(days=i) for i in range(9, -1, -1)]
+        self.db.save_daily_data(pd.DataFrame({
+            'date': dates,
+            'open': 10.0, 'high': 11.0, 'low': 9.0, 'close': 10.5,
+            'volume': 1000.0, 'amount': 10000.0, 'pct_chg': 1.0,
+        }), '600519', 'Test')
+
+        manager = MagicMock()
+        manager.get_stock_name.return_value = '贵州茅台'
+        DataFetcherManager._shared_instance = manager
+
+        result = StockService().get_history_data('600519', days=5)
+
+        manager.get_daily_data.assert_not_called()
+        self.assertEqual(result['stock_name'], '贵州茅台')
+        self.assertEqual(len(result['data']), 10)
+        self.assertEqual(result['data'][-1]['date'], today.strftime('%Y-%m-%d'))
+
+    def test_history_fetches_and_saves_when_stale(self) -> None:
+        expected = get_trading_calendar().expected_bar_date_for('600519')
+        manager = MagicMock()
+        manager.get_stock_name.return_value = '贵州茅台'
+        manager.get_daily_data.return_value = (pd.DataFrame({
+            'date': [expected], 'open': [10.0], 'high': [11.0], 'low': [9.0], 'close': [10.5],
+            'volume': [1000.0], 'amount': [10000.0], 'pct_chg': [1.0],
+        }), 'FakeFetcher')
+        DataFetcherManager._shared_instance = manager
+
+        service = StockService()
+        service.get_history_data('600519', days=5)
+        service.get_history_data('600519', days=5)
+
+        self.assertEqual(manager.get_daily_data.call_count, 1)
+        self.assertTrue(self.db.has_today_data('600519', expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
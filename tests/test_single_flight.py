@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+Single-flight 请求合并测试
+===================================
+
+职责：
+1. 验证并发调用同一 key 只执行一次并共享结果
+2. 验证异常传递给所有等待者
+3. 验证全量行情缓存过期时并发未命中只刷新一次
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from data_provider.single_flight import SingleFlight
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    """SingleFlight 行为测试"""
+
+    def _run_concurrently(self, func, count: int = 8) -> list:
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                value = func()
+            except Exception as e:  # noqa: BLE001
+                value = e
+            with lock:
+                results.append(value)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_calls_share_one_execution(self) -> None:
+        flight = SingleFlight()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        results = self._run_concurrently(lambda: flight.do('k', refresh))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_error_propagates_to_waiters(self) -> None:
+        flight = SingleFlight()
+
+        def refresh():
+            time.sleep(0.1)
+            raise RuntimeError("boom")
+
+        results = self._run_concurrently(lambda: flight.do('k', refresh), count=4)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        # 失败后 key 被释放，下一次调用重新执行
+        self.assertEqual(flight.do('k', lambda: 42), 42)
+
+
+class AkshareRealtimeRefreshTestCase(unittest.TestCase):
+    """东财全量行情并发刷新合并"""
+
+    def setUp(self) -> None:
+        from data_provider import akshare_fetcher
+        from data_provider.realtime_types import get_realtime_circuit_breaker
+
+        self.module = akshare_fetcher
+        self._saved = dict(akshare_fetcher._realtime_cache)
+        akshare_fetcher._realtime_cache.update({'data': None, 'snapshot': None, 'timestamp': 0})
+        get_realtime_circuit_breaker().reset()
+
+    def tearDown(self) -> None:
+        self.module._realtime_cache.clear()
+        self.module._realtime_cache.update(self._saved)
+
+    def test_expired_cache_refreshed_once(self) -> None:
+        calls = []
+
+        def fake_spot():
+            calls.append(1)
+            time.sleep(0.2)
+            return pd.DataFrame({'代码': ['600519', '000001'], '名称': ['贵州茅台', '平安银行'], '最新价': [1500.0, 11.2]})
+
+        fetcher = self.module.AkshareFetcher()
+        with mock.patch('akshare.stock_zh_a_spot_em', side_effect=fake_spot), \
+                mock.patch.object(fetcher, '_enforce_rate_limit'):
+            codes = ['600519', '000001'] * 4
+            quotes = []
+            threads = [
+                threading.Thread(target=lambda c=c: quotes.append(fetcher.get_realtime_quote(c, source='em')))
+                for c in codes
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(quotes), 8)
+        self.assertTrue(all(q is not None and q.price for q in quotes))
+
+
+if __name__ == '__main__':
+    unittest.main()
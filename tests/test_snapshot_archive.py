@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+全市场行情快照归档测试
+===================================
+
+职责：
+1. 验证 RealtimeSnapshot 转换为标准列名并按日期追加归档
+2. 验证按日期/代码读取、当日最后一次快照去重与跨来源列合并
+3. 验证 DataFetcherManager 历史日期市场统计只读取归档
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from data_provider.base import DataFetcherManager
+from data_provider.realtime_types import RealtimeSnapshot
+from src.config import Config
+from src.snapshot_archive import (
+    SnapshotArchive,
+    get_snapshot_archive,
+    is_snapshot_archive_available,
+    reset_snapshot_archive,
+)
+
+
+def _snapshot(changes, amount=1e8, extra=None) -> RealtimeSnapshot:
+    df = pd.DataFrame({
+        '代码': ['600519', '000001', '300750'],
+        '名称': ['贵州茅台', '平安银行', '宁德时代'],
+        '涨跌幅': changes,
+        '成交额': [amount] * 3,
+    })
+    columns = {'change_pct': ('涨跌幅',), 'amount': ('成交额',)}
+    if extra:
+        df['市盈率-动态'] = extra
+        columns['pe_ratio'] = ('市盈率-动态',)
+    return RealtimeSnapshot.from_dataframe(df, ('代码',), ('名称',), columns)
+
+
+@unittest.skipUnless(is_snapshot_archive_available(), "pyarrow 未安装")
+class SnapshotArchiveTestCase(unittest.TestCase):
+    """快照归档读写测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.archive = SnapshotArchive(self._temp_dir.name)
+
+    def tearDown(self) -> None:
+        self._temp_dir.cleanup()
+
+    def test_to_frame_uses_standard_columns(self) -> None:
+        frame = _snapshot([1.0, -2.0, 0.0]).to_frame()
+        self.assertEqual(list(frame.columns), ['code', 'name', 'change_pct', 'amount'])
+        self.assertEqual(frame['code'].tolist(), ['600519', '000001', '300750'])
+
+    def test_latest_snapshot_per_day(self) -> None:
+        self.archive.append(_snapshot([1.0, -2.0, 0.0]).to_frame(), 'efinance',
+                            captured_at=datetime(2026, 1, 6, 15, 5))
+        self.archive.append(_snapshot([0.5, 0.5, 0.5]).to_frame(), 'efinance',
+                            captured_at=datetime(2026, 1, 7, 10, 0))
+        # 当日收盘后的快照来自另一数据源，多出 pe_ratio 列
+        self.archive.append(_snapshot([10.0, -10.0, 0.0], extra=[30.0, 5.0, 25.0]).to_frame(), 'akshare_em',
+                            captured_at=datetime(2026, 1, 7, 15, 5))
+        self.archive.append(_snapshot([9.0, 9.0, 9.0]).to_frame(), 'efinance', asset_type='etf',
+                            captured_at=datetime(2026, 1, 7, 15, 6))
+
+        self.assertEqual(self.archive.dates(), [date(2026, 1, 6), date(2026, 1, 7)])
+
+        day = self.archive.read('2026-01-07')
+        self.assertEqual(len(day), 3)
+        self.assertEqual(set(day['source']), {'akshare_em'})
+        self.assertEqual(day.set_index('code').loc['600519', 'pe_ratio'], 30.0)
+
+        history = self.archive.read('2026-01-06', '2026-01-07', codes=['600519'], columns=['change_pct'])
+        self.assertEqual(history['change_pct'].tolist(), [1.0, 10.0])
+        self.assertEqual(len(self.archive.read('2026-01-07', latest=False)), 6)
+
+        stats = self.archive.market_stats(date(2026, 1, 7))
+        self.assertEqual(
+            (stats['up_count'], stats['down_count'], stats['flat_count'],
+             stats['limit_up_count'], stats['limit_down_count']),
+            (1, 1, 1, 1, 1),
+        )
+        self.assertAlmostEqual(stats['total_amount'], 3.0)
+
+        top = self.archive.top_movers('2026-01-07', n=1)
+        self.assertEqual(top['code'].tolist(), ['600519'])
+        self.assertTrue(self.archive.read('2026-01-08').empty)
+
+
+@unittest.skipUnless(is_snapshot_archive_available(), "pyarrow 未安装")
+class ManagerMarketStatsTestCase(unittest.TestCase):
+    """历史市场统计测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["SNAPSHOT_ARCHIVE_DIR"] = self._temp_dir.name
+        Config._instance = None
+        reset_snapshot_archive()
+
+    def tearDown(self) -> None:
+        reset_snapshot_archive()
+        os.environ.pop("SNAPSHOT_ARCHIVE_DIR", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_history_stats_served_without_network(self) -> None:
+        get_snapshot_archive().append(_snapshot([1.0, 2.0, -1.0]).to_frame(), 'efinance',
+                                      captured_at=datetime(2026, 1, 7, 15, 5))
+        fetcher = MagicMock()
+        fetcher.priority = 0
+        manager = DataFetcherManager(fetchers=[fetcher])
+
+        stats = manager.get_market_stats(date(2026, 1, 7))
+
+        fetcher.get_market_stats.assert_not_called()
+        self.assertEqual((stats['up_count'], stats['down_count']), (2, 1))
+        self.assertEqual(manager.get_market_stats(date(2026, 1, 5)), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+数据源自适应排序测试
+===================================
+
+职责：
+1. 验证无样本时保持静态优先级
+2. 验证持续失败/高延迟的数据源被降级
+3. 验证长时间无样本后回归先验顺序
+4. 验证 DataFetcherManager 日线故障切换按自适应顺序尝试
+5. 验证数据源的能力限制（如不支持美股）不计入健康度
+"""
+
+import os
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from data_provider.base import BaseFetcher, DataFetcherManager, DataFetchError, UnsupportedCodeError
+from data_provider.source_health import SourceHealthTracker
+from src.config import Config
+
+
+class SourceHealthTrackerTestCase(unittest.TestCase):
+    """SourceHealthTracker 评分与排序测试"""
+
+    def test_prior_order_without_samples(self) -> None:
+        tracker = SourceHealthTracker()
+        self.assertEqual(tracker.rank('daily', ['A', 'B', 'C']), ['A', 'B', 'C'])
+
+    def test_failing_source_is_demoted(self) -> None:
+        tracker = SourceHealthTracker()
+        for _ in range(3):
+            tracker.record('daily', 'A', latency=8.0, success=False)
+            tracker.record('daily', 'B', latency=0.5, success=True)
+        self.assertEqual(tracker.rank('daily', ['A', 'B', 'C']), ['B', 'C', 'A'])
+        # 类别之间互不影响
+        self.assertEqual(tracker.rank('realtime', ['A', 'B']), ['A', 'B'])
+
+        stats = tracker.get_stats('daily')['daily']
+        self.assertEqual(stats['B']['success_rate'], 1.0)
+        self.assertLess(stats['A']['success_rate'], 0.5)
+
+    def test_single_slow_sample_does_not_flip_order(self) -> None:
+        tracker = SourceHealthTracker()
+        tracker.record('daily', 'A', latency=2.0, success=True)
+        self.assertEqual(tracker.rank('daily', ['A', 'B']), ['A', 'B'])
+
+    def test_stale_samples_decay_to_prior(self) -> None:
+        tracker = SourceHealthTracker()
+        for _ in range(5):
+            tracker.record('daily', 'A', latency=8.0, success=False)
+        self.assertEqual(tracker.rank('daily', ['A', 'B']), ['B', 'A'])
+
+        later = time.time() + tracker.DECAY_HALF_LIFE * 10
+        with mock.patch('data_provider.source_health.time.time', return_value=later):
+            self.assertEqual(tracker.rank('daily', ['A', 'B']), ['A', 'B'])
+
+
+class _StubFetcher(BaseFetcher):
+    def __init__(self, name: str, priority: int, fail: bool = False):
+        self.name = name
+        self.priority = priority
+        self.fail = fail
+        self.calls = 0
+
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.calls += 1
+        if self.fail:
+            raise DataFetchError(f"{self.name} unavailable")
+        return pd.DataFrame({
+            'date': ['2026-01-05'], 'open': [10.0], 'high': [11.0], 'low': [9.5],
+            'close': [10.5], 'volume': [1000.0], 'amount': [10500.0], 'pct_chg': [1.0],
+        })
+
+    def _normalize_data(self, df, stock_code):
+        return df
+
+
+class AdaptiveDailyFailoverTestCase(unittest.TestCase):
+    """DataFetcherManager 自适应日线故障切换测试"""
+
+    def tearDown(self) -> None:
+        os.environ.pop("ADAPTIVE_SOURCE_PRIORITY", None)
+        Config._instance = None
+
+    def _run(self, requests: int):
+        degraded = _StubFetcher("DegradedFetcher", 0, fail=True)
+        healthy = _StubFetcher("HealthyFetcher", 1)
+        manager = DataFetcherManager(fetchers=[degraded, healthy])
+        for _ in range(requests):
+            _, source = manager.get_daily_data('600519', start_date='2026-01-01', end_date='2026-01-06')
+            self.assertEqual(source, "HealthyFetcher")
+        return degraded, manager
+
+    def test_degraded_primary_is_skipped_after_failures(self) -> None:
+        Config._instance = None
+        degraded, manager = self._run(6)
+        # 前几次失败后降级，后续请求直接命中健康数据源
+        self.assertLess(degraded.calls, 6)
+        self.assertIn('DegradedFetcher', manager.get_source_health_stats()['daily'])
+
+    def test_static_order_when_disabled(self) -> None:
+        os.environ["ADAPTIVE_SOURCE_PRIORITY"] = "false"
+        Config._instance = None
+        degraded, _ = self._run(4)
+        self.assertEqual(degraded.calls, 4)
+
+
+class _AShareOnlyFetcher(_StubFetcher):
+    def supports_daily_code(self, stock_code):
+        return not stock_code.isalpha()
+
+
+class _RefusingFetcher(_StubFetcher):
+    def _fetch_raw_data(self, stock_code, start_date, end_date):
+        self.calls += 1
+        raise UnsupportedCodeError(f"{self.name} 不支持美股")
+
+
+class CapabilityRefusalTestCase(unittest.TestCase):
+    """能力限制不记为数据源失败"""
+
+    def tearDown(self) -> None:
+        Config._instance = None
+
+    def test_unsupported_source_skipped_for_us_code(self) -> None:
+        Config._instance = None
+        a_share = _AShareOnlyFetcher("AShareFetcher", 0)
+        us = _StubFetcher("UsFetcher", 1)
+        manager = DataFetcherManager(fetchers=[a_share, us])
+
+        _, source = manager.get_daily_data('AAPL', start_date='2026-01-01', end_date='2026-01-06')
+
+        self.assertEqual(source, "UsFetcher")
+        self.assertEqual(a_share.calls, 0)
+        self.assertNotIn('AShareFetcher', manager.get_source_health_stats().get('daily', {}))
+
+    def test_unsupported_code_error_not_recorded(self) -> None:
+        Config._instance = None
+        refusing = _RefusingFetcher("RefusingFetcher", 0)
+        us = _StubFetcher("UsFetcher", 1)
+        manager = DataFetcherManager(fetchers=[refusing, us])
+
+        for _ in range(5):
+            _, source = manager.get_daily_data('AAPL', start_date='2026-01-01', end_date='2026-01-06')
+            self.assertEqual(source, "UsFetcher")
+
+        self.assertGreaterEqual(refusing.calls, 1)
+        self.assertNotIn('RefusingFetcher', manager.get_source_health_stats().get('daily', {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+分阶段流水线执行器测试
+===================================
+
+职责：
+1. 验证各项流过所有阶段、返回 None 或异常时提前结束
+2. 验证各阶段并发上限与有界队列反压
+3. 验证 StockAnalysisPipeline 在 PIPELINE_MODE=staged 时按阶段调度
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.staged_executor import Stage, StagedExecutor, parse_stage_workers
+
+
+class _Gauge:
+    """记录并发执行数的峰值"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+class StagedExecutorTestCase(unittest.TestCase):
+    """StagedExecutor 调度行为"""
+
+    def test_items_flow_through_all_stages(self) -> None:
+        stages = [
+            Stage('double', lambda x: x * 2, workers=2),
+            Stage('drop_odd_input', lambda x: None if x % 4 else x, workers=2),
+            Stage('label', lambda x: f"v{x}", workers=1),
+        ]
+        completed = []
+        outputs = StagedExecutor(stages, queue_size=2).run(
+            list(range(10)), on_complete=lambda item, out: completed.append((item, out))
+        )
+        self.assertEqual(sorted(outputs), sorted(f"v{x * 2}" for x in range(0, 10, 2)))
+        self.assertEqual(len(completed), 10)
+        self.assertIsNone(dict(completed)[1])
+
+    def test_stage_exception_only_drops_item(self) -> None:
+        def explode(x):
+            if x == 3:
+                raise RuntimeError("boom")
+            return x
+
+        outputs = StagedExecutor([Stage('a', explode, workers=2), Stage('b', lambda x: x)]).run(range(6))
+        self.assertEqual(sorted(outputs), [0, 1, 2, 4, 5])
+
+    def test_concurrency_limits_and_overlap(self) -> None:
+        fetch_gauge, llm_gauge = _Gauge(), _Gauge()
+        llm_started = threading.Event()
+        fetch_after_llm = []
+
+        def fetch(x):
+            with fetch_gauge:
+                if llm_started.is_set():
+                    fetch_after_llm.append(x)
+                time.sleep(0.02)
+            return x
+
+        def llm(x):
+            llm_started.set()
+            with llm_gauge:
+                time.sleep(0.05)
+            return x
+
+        outputs = StagedExecutor(
+            [Stage('fetch', fetch, workers=3), Stage('llm', llm, workers=2)], queue_size=2
+        ).run(list(range(12)))
+
+        self.assertEqual(sorted(outputs), list(range(12)))
+        self.assertLessEqual(fetch_gauge.peak, 3)
+        self.assertLessEqual(llm_gauge.peak, 2)
+        self.assertEqual(llm_gauge.peak, 2)
+        # 数据获取与 AI 分析重叠进行
+        self.assertTrue(fetch_after_llm)
+
+    def test_bounded_queue_applies_backpressure(self) -> None:
+        release = threading.Event()
+        fetched = []
+
+        def fetch(x):
+            fetched.append(x)
+            return x
+
+        def slow(x):
+            release.wait(5)
+            return x
+
+        executor = StagedExecutor([Stage('fetch', fetch), Stage('slow', slow)], queue_size=1)
+        runner = threading.Thread(target=executor.run, args=(list(range(20)),))
+        runner.start()
+        time.sleep(0.3)
+        # 下游阻塞时：slow 处理中 1 个 + 队列 1 个 + fetch 阻塞在 put 的 1 个
+        self.assertLessEqual(len(fetched), 3)
+        release.set()
+        runner.join(5)
+        self.assertEqual(len(fetched), 20)
+
+    def test_rate_budget(self) -> None:
+        start = time.monotonic()
+        StagedExecutor([Stage('llm', lambda x: x, workers=4, rate=20, burst=1)]).run(range(5))
+        # 突发 1 个，其余 4 个按 20 次/秒
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_parse_stage_workers(self) -> None:
+        self.assertEqual(parse_stage_workers("llm=2, Search=3,bad=x,persist=0"),
+                         {'llm': 2, 'search': 3, 'persist': 1})
+
+
+class StagedPipelineTestCase(unittest.TestCase):
+    """StockAnalysisPipeline 分阶段模式"""
+
+    def _pipeline(self):
+        from src.core.pipeline import StockAnalysisPipeline
+        from src.run_profile import RunProfiler
+
+        pipeline = StockAnalysisPipeline.__new__(StockAnalysisPipeline)
+        pipeline.profiler = RunProfiler()
+        pipeline.manifest = None
+        pipeline.config = MagicMock(
+            pipeline_stage_workers='llm=1', pipeline_stage_rates='', pipeline_queue_size=2
+        )
+        pipeline.max_workers = 3
+        pipeline.calls = []
+        lock = threading.Lock()
+
+        def record(name, value=None):
+            def stage(job):
+                with lock:
+                    pipeline.calls.append((name, job.code))
+                if name == 'llm':
+                    if job.code == 'bad':
+                        return None
+                    job.result = MagicMock(code=job.code, operation_advice='持有', sentiment_score=60)
+                return job if value is None else value
+            return stage
+
+        pipeline.fetch_and_save_stock_data = lambda code: (True, None)
+        pipeline._enrich_stock = record('enrich')
+        pipeline._search_stock_intel = record('search')
+        pipeline._run_llm_analysis = record('llm')
+        pipeline._persist_analysis = record('persist')
+        pipeline._notify_single_stock = MagicMock()
+        return pipeline
+
+    def test_staged_run_collects_results(self) -> None:
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        stages = pipeline._build_stages(False, True, ReportType.SIMPLE, analysis_delay=2.0)
+        self.assertEqual([s.name for s in stages], ['fetch', 'enrich', 'search', 'llm', 'persist'])
+        self.assertEqual([s.workers for s in stages], [3, 3, 3, 1, 1])
+        self.assertAlmostEqual(stages[3].rate, 0.5)
+
+        results = pipeline._run_staged(
+            ['600519', 'bad', '000001'], dry_run=False, single_stock_notify=True,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        self.assertEqual(sorted(r.code for r in results), ['000001', '600519'])
+        self.assertNotIn(('persist', 'bad'), pipeline.calls)
+        self.assertEqual(pipeline._notify_single_stock.call_count, 2)
+
+    def test_dry_run_only_fetches(self) -> None:
+        from src.enums import ReportType
+
+        pipeline = self._pipeline()
+        results = pipeline._run_staged(
+            ['600519', '000001'], dry_run=True, single_stock_notify=False,
+            report_type=ReportType.SIMPLE, analysis_delay=0,
+        )
+        self.assertEqual(results, [])
+        self.assertEqual(pipeline.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
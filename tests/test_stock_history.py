@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+===================================
+周线/月线重采样与历史行情补齐测试
+===================================
+
+职责：
+1. 验证日线重采样为周线/月线的 OHLCV 与涨跌幅
+2. 验证周线/月线从本地日线返回，不请求数据源
+3. 验证仅缺少最近交易日时走增量补齐
+4. 验证增量结果未带来新 K 线时仍返回完整本地区间，全量请求不重复放大天数
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from data_provider.base import DataFetcherManager
+from src.config import Config
+from src.services.stock_service import StockService, clear_kline_cache, resample_daily_bars
+from src.storage import DatabaseManager
+from src.trading_calendar import get_trading_calendar
+
+
+def _daily_frame(dates) -> pd.DataFrame:
+    closes = [10.0 + i * 0.1 for i in range(len(dates))]
+    return pd.DataFrame({
+        'date': dates,
+        'open': [c - 0.05 for c in closes],
+        'high': [c + 0.2 for c in closes],
+        'low': [c - 0.2 for c in closes],
+        'close': closes,
+        'volume': 1000.0,
+        'amount': 10000.0,
+        'pct_chg': 1.0,
+    })
+
+
+class ResampleDailyBarsTestCase(unittest.TestCase):
+    """重采样测试"""
+
+    def test_weekly_and_monthly(self) -> None:
+        # 2026-01-26（周一）至 2026-02-06（周五），共两周、跨两个月
+        dates = [d.date() for d in pd.bdate_range('2026-01-26', '2026-02-06')]
+        daily = _daily_frame(dates)
+
+        weekly = resample_daily_bars(daily, 'weekly')
+        self.assertEqual(len(weekly), 2)
+        first = weekly.iloc[0]
+        self.assertEqual(first['date'], pd.Timestamp('2026-01-30'))
+        self.assertAlmostEqual(first['open'], daily['open'].iloc[0])
+        self.assertAlmostEqual(first['high'], daily['high'].iloc[:5].max())
+        self.assertAlmostEqual(first['low'], daily['low'].iloc[:5].min())
+        self.assertAlmostEqual(first['close'], daily['close'].iloc[4])
+        self.assertEqual(first['volume'], 5000.0)
+        # 第一根由首日涨跌幅反推昨收，第二根相对上周收盘
+        self.assertAlmostEqual(first['pct_chg'], round((10.4 / (10.0 / 1.01) - 1) * 100, 2))
+        self.assertAlmostEqual(weekly['pct_chg'].iloc[1], round((10.9 / 10.4 - 1) * 100, 2))
+
+        monthly = resample_daily_bars(daily, 'monthly')
+        self.assertEqual(monthly['date'].dt.strftime('%Y-%m-%d').tolist(), ['2026-01-30', '2026-02-06'])
+        self.assertEqual(monthly['volume'].tolist(), [5000.0, 5000.0])
+
+
+class StockServicePeriodTestCase(unittest.TestCase):
+    """周线/月线历史行情测试"""
+
+    def setUp(self) -> None:
+        self._temp_dir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_PATH"] = os.path.join(self._temp_dir.name, "test_stock_history.db")
+        Config._instance = None
+        DatabaseManager.reset_instance()
+        self.db = DatabaseManager.get_instance()
+        DataFetcherManager.reset_instance()
+        clear_kline_cache()
+
+        self.manager = MagicMock()
+        self.manager.get_stock_name.return_value = '贵州茅台'
+        DataFetcherManager._shared_instance = self.manager
+
+    def tearDown(self) -> None:
+        clear_kline_cache()
+        DataFetcherManager.reset_instance()
+        DatabaseManager.reset_instance()
+        os.environ.pop("DATABASE_PATH", None)
+        Config._instance = None
+        self._temp_dir.cleanup()
+
+    def test_weekly_served_from_local_bars(self) -> None:
+        today = date.today()
+        dates = [today - timedelta(days=i) for i in range(120, -1, -1)]
+        self.db.save_daily_data(_daily_frame(dates), '600519', 'Test')
+
+        service = StockService()
+        weekly = service.get_history_data('600519', period='weekly', days=30)
+        monthly = service.get_history_data('600519', period='monthly', days=30)
+        again = service.get_history_data('600519', period='weekly', days=30)
+
+        self.manager.get_daily_data.assert_not_called()
+        self.assertEqual(weekly['period'], 'weekly')
+        self.assertEqual(weekly['data'][-1]['date'], today.strftime('%Y-%m-%d'))
+        week_start = today - timedelta(days=60)
+        week_start -= timedelta(days=week_start.weekday())
+        self.assertEqual(sum(bar['volume'] for bar in weekly['data']), 1000.0 * ((today - week_start).days + 1))
+        self.assertEqual(monthly['data'][0]['date'][:7], (today - timedelta(days=60)).strftime('%Y-%m'))
+        self.assertIs(again['data'], weekly['data'])
+
+    def test_missing_recent_days_topped_up_incrementally(self) -> None:
+        expected = get_trading_calendar().expected_bar_date_for('600519')
+        dates = [expected - timedelta(days=i) for i in range(60, 0, -1)]
+        self.db.save_daily_data(_daily_frame(dates), '600519', 'Test')
+        self.manager.get_daily_data.return_value = (_daily_frame([expected]), 'FakeFetcher')
+
+        result = StockService().get_history_data('600519', period='weekly', days=20)
+
+        _, kwargs = self.manager.get_daily_data.call_args
+        self.assertTrue(kwargs['incremental'])
+        self.assertEqual(result['data'][-1]['date'], expected.strftime('%Y-%m-%d'))
+        self.assertTrue(self.db.has_today_data('600519', expected))
+
+    def test_unpublished_bar_returns_full_local_range(self) -> None:
+        expected = get_trading_calendar().expected_bar_date_for('600519')
+        dates = [expected - timedelta(days=i) for i in range(40, 0, -1)]
+        self.db.save_daily_data(_daily_frame(dates), '600519', 'Test')
+        # 数据源尚未发布最新 K 线：增量结果只有本地已有的最后一行
+        self.manager.get_daily_data.return_value = (_daily_frame(dates[-1:]), 'FakeFetcher')
+
+        result = StockService().get_history_data('600519', period='daily', days=10)
+
+        self.assertGreater(len(result['data']), 1)
+        self.assertEqual(result['data'][-1]['date'], dates[-1].strftime('%Y-%m-%d'))
+
+    def test_full_fetch_requests_days(self) -> None:
+        today = date.today()
+        self.manager.get_daily_data.return_value = (_daily_frame([today]), 'FakeFetcher')
+
+        StockService().get_history_data('600519', period='daily', days=30)
+
+        _, kwargs = self.manager.get_daily_data.call_args
+        self.assertEqual(kwargs['days'], 30)
+
+    def test_unsupported_period_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            StockService().get_history_data('600519', period='yearly')
+
+
+if __name__ == '__main__':
+    unittest.main()